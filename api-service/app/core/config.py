@@ -21,11 +21,28 @@ class Settings(BaseSettings):
     
     # Model Configuration
     model_path: str = "../../models/production/final_production_model_nested_cv.pkl"
+    # Versioned model bundle (relative to the project root); used instead of the .pkl when present
+    model_bundle_path: str = "models/production/final_production_model_bundle"
     pipeline_module: str = "models.production.00_predictions_pipeline"
     
     # Data Configuration
     max_batch_size: int = 1000
     prediction_timeout: int = 30  # seconds
+    prediction_cache_size: int = 10000  # cached predictions, 0 disables the cache
+    explain_top_k: int = 5  # features returned in top_factors with explain=true
+
+    # Scheduling Configuration
+    scheduler_workers: int = 4
+    scheduler_reserved_interactive_workers: int = 1  # slots bulk traffic never takes
+    scheduler_weights: dict = {"interactive": 16, "batch": 4, "background": 1}
+    scheduler_slo_ms: dict = {"interactive": 300, "batch": 5000, "background": 60000}
+    batch_chunk_size: int = 100  # customers per scheduled batch chunk
+
+    # Degraded-mode Configuration (fallback model packaged in the artifact)
+    fallback_enabled: bool = True
+    fallback_queue_wait_ms: float = 250.0  # shed to the fallback above this expected queue wait
+    fallback_workers: int = 1  # threads scoring shed requests, separate from scheduler_workers
+    fallback_max_pending: int = 8  # shed requests running or waiting; more are answered 503
     
     # Logging Configuration
     log_level: str = "INFO"
@@ -34,7 +51,15 @@ class Settings(BaseSettings):
     # Security Configuration
     api_key_header: str = "X-API-Key"
     cors_origins: list = ["*"]  # Configure appropriately for production
-    
+
+    # Admission Control Configuration (token bucket, 1 token = 1 customer scored)
+    rate_limit_enabled: bool = True
+    rate_limit_capacity: float = 2000.0  # burst size, must cover max_batch_size
+    rate_limit_refill_per_second: float = 50.0
+    rate_limit_max_clients: int = 10000  # LRU bound on tracked clients
+    rate_limit_backend: str = "memory"  # "memory" (per worker) or "sqlite" (shared)
+    rate_limit_sqlite_path: str = "rate_limit.db"
+
     # Health Check Configuration
     health_check_timeout: int = 5
     
@@ -0,0 +1,81 @@
+"""
+Request deadlines for the Income Prediction API Service
+
+Every prediction request gets a deadline: `settings.prediction_timeout`
+seconds from arrival, or the client's `X-Request-Deadline` header when that
+is earlier. The deadline travels with the request into the scheduler, which
+drops queued work that has already expired instead of spending CPU on a
+client that stopped waiting.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work is dropped because its request deadline has passed"""
+
+
+class Deadline:
+    """A point in time (on the monotonic clock) after which work is useless"""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        """Deadline `seconds` from now"""
+        return cls(time.monotonic() + seconds)
+
+    @classmethod
+    def from_request(cls, header_value: Optional[str], default_timeout: float) -> "Deadline":
+        """
+        Deadline for an incoming request
+
+        Args:
+            header_value: `X-Request-Deadline` header, an absolute time given as
+                Unix epoch seconds ("1757518200.5") or ISO-8601 ("2025-09-10T15:30:00Z")
+            default_timeout: Server-side timeout in seconds (prediction_timeout)
+
+        Returns:
+            The earlier of the server timeout and the client deadline
+
+        Raises:
+            ValueError: If the header cannot be parsed
+        """
+        deadline = cls.after(default_timeout)
+        if header_value:
+            client_deadline = cls(time.monotonic() + (_parse_epoch(header_value) - time.time()))
+            if client_deadline.expires_at < deadline.expires_at:
+                deadline = client_deadline
+        return deadline
+
+    def remaining(self) -> float:
+        """Seconds left (negative once expired)"""
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        """Whether the deadline has passed"""
+        return time.monotonic() >= self.expires_at
+
+
+def _parse_epoch(value: str) -> float:
+    """Parse an absolute deadline into Unix epoch seconds"""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(
+            "X-Request-Deadline must be Unix epoch seconds or an ISO-8601 timestamp"
+        )
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
@@ -0,0 +1,286 @@
+"""
+Token-bucket admission control for the Income Prediction API Service
+
+Each client (API key, or client address when no key is sent) owns a token
+bucket. A request costs one token per customer it scores, so a 500-row
+batch is charged 500 tokens and a single prediction is charged 1.
+
+Two backends are available:
+- "memory": per-process buckets in an LRU-bounded OrderedDict
+- "sqlite": buckets in a local SQLite file shared by every worker process
+  on the host, so all uvicorn workers enforce a single budget. Its charges
+  block on the database lock, so they run on the thread pool, never on
+  the event loop
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from .config import get_settings
+from .logging import get_logger
+
+logger = get_logger("rate_limit")
+settings = get_settings()
+
+
+class AdmissionDecision:
+    """Outcome of a single admission check"""
+
+    __slots__ = ("allowed", "remaining", "retry_after", "limit")
+
+    def __init__(self, allowed: bool, remaining: float, retry_after: float, limit: float):
+        self.allowed = allowed
+        self.remaining = remaining
+        self.retry_after = retry_after
+        self.limit = limit
+
+    def headers(self) -> Dict[str, str]:
+        """Rate limit headers for the response"""
+        headers = {
+            "X-RateLimit-Limit": str(int(self.limit)),
+            "X-RateLimit-Remaining": str(int(self.remaining)),
+        }
+        if not self.allowed and self.retry_after != float("inf"):
+            headers["Retry-After"] = str(max(1, int(self.retry_after + 0.999)))
+        return headers
+
+
+def _refill(tokens: float, updated: float, now: float, capacity: float, refill_rate: float) -> float:
+    """Return the token count after refilling from `updated` to `now`"""
+    elapsed = max(0.0, now - updated)
+    return min(capacity, tokens + elapsed * refill_rate)
+
+
+def _decide(tokens: float, cost: float, capacity: float, refill_rate: float):
+    """Apply a charge to a refilled bucket; returns (decision fields, new tokens)"""
+    if cost <= tokens:
+        return True, tokens - cost, 0.0
+    if cost > capacity or refill_rate <= 0:
+        # Can never be admitted, no point telling the client to wait
+        return False, tokens, float("inf")
+    return False, tokens, (cost - tokens) / refill_rate
+
+
+class MemoryTokenBucketBackend:
+    """
+    In-process token buckets with O(1) updates
+
+    Buckets live in an OrderedDict used as an LRU: every charge moves the
+    client to the end, and the least recently seen client is evicted once
+    the table holds `max_clients` entries. An evicted client simply starts
+    again with a full bucket.
+    """
+
+    # Charges never wait on I/O, so they run inline on the event loop
+    blocking = False
+
+    def __init__(self, capacity: float, refill_rate: float, max_clients: int):
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self.max_clients = int(max_clients)
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, cost: float = 1.0, now: Optional[float] = None) -> AdmissionDecision:
+        """Charge `cost` tokens to `key` if the bucket allows it"""
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_clients:
+                    self._buckets.popitem(last=False)
+                bucket = [self.capacity, now]
+                self._buckets[key] = bucket
+            else:
+                self._buckets.move_to_end(key)
+
+            tokens = _refill(bucket[0], bucket[1], now, self.capacity, self.refill_rate)
+            allowed, tokens, retry_after = _decide(tokens, cost, self.capacity, self.refill_rate)
+            bucket[0] = tokens
+            bucket[1] = now
+
+        return AdmissionDecision(allowed, tokens, retry_after, self.capacity)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteTokenBucketBackend:
+    """
+    Token buckets stored in a local SQLite file
+
+    Every worker process opens the same file, and each charge runs inside a
+    `BEGIN IMMEDIATE` transaction so concurrent workers serialize on the
+    bucket row. Wall-clock time is used because monotonic clocks are not
+    comparable across processes. The table is trimmed back to
+    `max_clients` rows (least recently updated first) every
+    `prune_interval` new clients.
+    """
+
+    # Charges may wait up to the busy timeout for another worker's transaction
+    blocking = True
+
+    def __init__(
+        self,
+        path: str,
+        capacity: float,
+        refill_rate: float,
+        max_clients: int,
+        prune_interval: int = 256,
+    ):
+        self.path = path
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self.max_clients = int(max_clients)
+        self.prune_interval = int(prune_interval)
+        self._local = threading.local()
+        self._inserts = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_buckets ("
+            " client_key TEXT PRIMARY KEY,"
+            " tokens REAL NOT NULL,"
+            " updated REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_token_buckets_updated ON token_buckets (updated)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def acquire(self, key: str, cost: float = 1.0, now: Optional[float] = None) -> AdmissionDecision:
+        """Charge `cost` tokens to `key` if the shared bucket allows it"""
+        now = time.time() if now is None else now
+        conn = self._connection()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM token_buckets WHERE client_key = ?", (key,)
+            ).fetchone()
+            is_new = row is None
+            tokens = self.capacity if is_new else _refill(
+                row[0], row[1], now, self.capacity, self.refill_rate
+            )
+            allowed, tokens, retry_after = _decide(tokens, cost, self.capacity, self.refill_rate)
+            conn.execute(
+                "INSERT INTO token_buckets (client_key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(client_key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now),
+            )
+            if is_new:
+                self._inserts += 1
+                if self._inserts % self.prune_interval == 0:
+                    self._prune(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return AdmissionDecision(allowed, tokens, retry_after, self.capacity)
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """Drop the least recently updated buckets beyond max_clients"""
+        conn.execute(
+            "DELETE FROM token_buckets WHERE client_key IN ("
+            " SELECT client_key FROM token_buckets ORDER BY updated DESC LIMIT -1 OFFSET ?)",
+            (self.max_clients,),
+        )
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM token_buckets").fetchone()[0]
+
+
+class RateLimiter:
+    """Resolves the client identity of a request and charges its bucket"""
+
+    def __init__(self, backend, api_key_header: str = "X-API-Key"):
+        self.backend = backend
+        self.api_key_header = api_key_header
+
+    def client_key(self, request: Request) -> str:
+        """API key when present, otherwise the client address"""
+        api_key = request.headers.get(self.api_key_header)
+        if api_key:
+            # Never keep raw API keys in memory tables or on disk
+            return "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:32]
+        host = request.client.host if request.client else "unknown"
+        return f"ip:{host}"
+
+    def admit(self, request: Request, cost: float = 1.0) -> AdmissionDecision:
+        """Charge the request's client; returns the decision"""
+        return self.backend.acquire(self.client_key(request), cost)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Get the process-wide rate limiter (None when disabled)"""
+    global _rate_limiter
+    if not settings.rate_limit_enabled:
+        return None
+    if _rate_limiter is None:
+        if settings.rate_limit_backend == "sqlite":
+            backend = SQLiteTokenBucketBackend(
+                settings.rate_limit_sqlite_path,
+                settings.rate_limit_capacity,
+                settings.rate_limit_refill_per_second,
+                settings.rate_limit_max_clients,
+            )
+        else:
+            backend = MemoryTokenBucketBackend(
+                settings.rate_limit_capacity,
+                settings.rate_limit_refill_per_second,
+                settings.rate_limit_max_clients,
+            )
+        _rate_limiter = RateLimiter(backend, settings.api_key_header)
+        logger.info(f"Rate limiter enabled ({settings.rate_limit_backend} backend)")
+    return _rate_limiter
+
+
+async def enforce_rate_limit(request: Request, response: Response, cost: float = 1.0) -> None:
+    """
+    Admit or reject a request
+
+    Raises HTTPException 429 when the client's bucket cannot cover `cost`.
+    On success the rate limit headers are added to `response`. Backends
+    that block (SQLite) are charged on the thread pool.
+    """
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return
+
+    if limiter.backend.blocking:
+        decision = await run_in_threadpool(limiter.admit, request, cost)
+    else:
+        decision = limiter.admit(request, cost)
+    if not decision.allowed:
+        logger.warning(f"Rate limit exceeded for {limiter.client_key(request)[:12]} (cost={cost:g})")
+        if decision.retry_after == float("inf"):
+            detail = f"Request cost {cost:g} exceeds the maximum burst of {decision.limit:g}"
+        else:
+            detail = "Rate limit exceeded. Please try again later."
+        raise HTTPException(status_code=429, detail=detail, headers=decision.headers())
+
+    response.headers.update(decision.headers())
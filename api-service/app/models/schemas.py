@@ -87,10 +87,16 @@ class PredictionResponse(BaseModel):
     predicted_income: float = Field(..., description="Predicted income in USD")
     confidence_score: Optional[float] = Field(None, ge=0, le=1, description="Prediction confidence (0-1)")
     prediction_range: Optional[Dict[str, float]] = Field(None, description="Prediction range (min/max)")
-    top_factors: Optional[List[Dict[str, Any]]] = Field(None, description="Top factors influencing prediction")
+    top_factors: Optional[List[Dict[str, Any]]] = Field(
+        None, description="Largest feature contributions (only with explain=true)"
+    )
     processing_time_ms: float = Field(..., description="Processing time in milliseconds")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Prediction timestamp")
     model_version: str = Field(default="1.0.0", description="Model version used")
+    serving_tier: str = Field(
+        default="primary",
+        description="Model tier that served the prediction: primary, or fallback under overload"
+    )
     
     class Config:
         schema_extra = {
@@ -103,12 +109,13 @@ class PredictionResponse(BaseModel):
                     "max": 1700.00
                 },
                 "top_factors": [
-                    {"feature": "ocupacion", "impact": "high", "value": "Ingeniero"},
-                    {"feature": "edad", "impact": "medium", "value": 35}
+                    {"feature": "saldo", "value": 5000.0, "contribution": 212.4, "impact": "positive"},
+                    {"feature": "edad", "value": 35.0, "contribution": -48.9, "impact": "negative"}
                 ],
                 "processing_time_ms": 45.2,
                 "timestamp": "2025-09-10T15:30:00Z",
-                "model_version": "1.0.0"
+                "model_version": "1.0.0",
+                "serving_tier": "primary"
             }
         }
 
@@ -119,6 +126,10 @@ class BatchPredictionResponse(BaseModel):
     predictions: List[PredictionResponse] = Field(..., description="List of predictions")
     batch_summary: Dict[str, Any] = Field(..., description="Batch processing summary")
     total_processing_time_ms: float = Field(..., description="Total batch processing time")
+    status: str = Field(
+        default="complete",
+        description="'complete', or 'partial_timeout' when the request deadline stopped the batch early"
+    )
     
     class Config:
         schema_extra = {
@@ -137,7 +148,8 @@ class BatchPredictionResponse(BaseModel):
                     "failed_predictions": 0,
                     "average_income": 1450.75
                 },
-                "total_processing_time_ms": 45.2
+                "total_processing_time_ms": 45.2,
+                "status": "complete"
             }
         }
 
@@ -2,9 +2,10 @@
 Prediction endpoints for the Income Prediction API
 """
 
+import asyncio
 import time
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Header, Query, Request, Response
 from fastapi.responses import JSONResponse
 
 from app.models.schemas import (
@@ -14,9 +15,19 @@ from app.models.schemas import (
     BatchPredictionResponse,
     ErrorResponse
 )
-from app.services.prediction_service import PredictionService
+from app.services.prediction_service import PredictionService, PRIMARY_TIER, FALLBACK_TIER
+from app.services.scheduler import (
+    INTERACTIVE,
+    BATCH,
+    FallbackSaturated,
+    PriorityScheduler,
+    get_scheduler,
+    resolve_traffic_class
+)
 from app.core.logging import get_logger
 from app.core.config import get_settings
+from app.core.rate_limit import enforce_rate_limit
+from app.core.deadline import Deadline, DeadlineExceeded
 
 logger = get_logger("predictions_router")
 settings = get_settings()
@@ -36,6 +47,37 @@ def get_prediction_service() -> PredictionService:
     return prediction_service
 
 
+def get_request_deadline(x_request_deadline: Optional[str] = Header(None)) -> Deadline:
+    """Dependency resolving the request deadline (prediction_timeout or X-Request-Deadline)"""
+    try:
+        deadline = Deadline.from_request(x_request_deadline, settings.prediction_timeout)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if deadline.expired():
+        raise HTTPException(status_code=504, detail="Request deadline already passed")
+    return deadline
+
+
+def should_use_fallback(
+    scheduler: PriorityScheduler,
+    service: PredictionService,
+    traffic_class: str
+) -> bool:
+    """
+    Whether to shed a request to the fallback model
+
+    True when degraded-mode serving is enabled, a fallback model is packaged
+    with the artifact, and new work for `traffic_class` would wait longer
+    than `fallback_queue_wait_ms` for a worker.
+    """
+    if not settings.fallback_enabled or not service.has_fallback():
+        return False
+    if scheduler.queue_wait_ms(traffic_class) <= settings.fallback_queue_wait_ms:
+        return False
+    scheduler.metrics[traffic_class].shed_to_fallback += 1
+    return True
+
+
 @router.post(
     "/predict",
     response_model=PredictionResponse,
@@ -44,14 +86,24 @@ def get_prediction_service() -> PredictionService:
 )
 async def predict_single_customer(
     customer: CustomerInput,
-    service: PredictionService = Depends(get_prediction_service)
+    request: Request,
+    response: Response,
+    explain: bool = Query(False, description="Return per-feature contributions in top_factors"),
+    x_traffic_class: Optional[str] = Header(None),
+    deadline: Deadline = Depends(get_request_deadline),
+    service: PredictionService = Depends(get_prediction_service),
+    scheduler: PriorityScheduler = Depends(get_scheduler)
 ) -> PredictionResponse:
     """
     Predict income for a single customer
     
     - **customer**: Customer data including demographics, employment, and financial information
-    - **returns**: Predicted income with confidence score and contributing factors
+    - **explain**: Compute feature contributions (TreeSHAP) for `top_factors`
+    - **returns**: Predicted income with confidence score and, with `explain`, contributing factors
     """
+    # Admission control (raises 429 outside the generic error handling below)
+    await enforce_rate_limit(request, response, cost=1)
+
     try:
         logger.info(f"Received prediction request for customer: {customer.cliente}")
         
@@ -62,12 +114,32 @@ async def predict_single_customer(
                 detail="Prediction service is not available"
             )
         
-        # Make prediction
-        prediction = service.predict_single(customer)
+        # Make prediction (queued as interactive traffic unless the client asked for less;
+        # answered by the fallback model on its own bounded pool when the queue is saturated)
+        traffic_class = resolve_traffic_class(INTERACTIVE, x_traffic_class)
+        if should_use_fallback(scheduler, service, traffic_class):
+            work = scheduler.run_fallback(service.predict_single, customer, FALLBACK_TIER, explain)
+        else:
+            work = scheduler.submit(
+                traffic_class, service.predict_single, customer, PRIMARY_TIER, explain, deadline=deadline
+            )
+        prediction = await asyncio.wait_for(work, timeout=max(deadline.remaining(), 0))
         
         logger.info(f"Prediction successful for customer {customer.cliente}: ${prediction.predicted_income:.2f}")
         return prediction
         
+    except HTTPException:
+        raise
+
+    except FallbackSaturated:
+        logger.warning(f"Fallback pool saturated, rejecting customer {customer.cliente}")
+        raise HTTPException(status_code=503, detail="Prediction service is overloaded",
+                            headers={"Retry-After": "1"})
+
+    except (DeadlineExceeded, asyncio.TimeoutError):
+        logger.warning(f"Deadline exceeded for customer {customer.cliente}")
+        raise HTTPException(status_code=504, detail="Prediction deadline exceeded")
+
     except ValueError as e:
         logger.error(f"Validation error for customer {customer.cliente}: {str(e)}")
         raise HTTPException(status_code=422, detail=str(e))
@@ -89,14 +161,33 @@ async def predict_single_customer(
 async def predict_batch_customers(
     batch_input: BatchPredictionInput,
     background_tasks: BackgroundTasks,
-    service: PredictionService = Depends(get_prediction_service)
+    request: Request,
+    response: Response,
+    explain: bool = Query(False, description="Return per-feature contributions in top_factors"),
+    x_traffic_class: Optional[str] = Header(None),
+    deadline: Deadline = Depends(get_request_deadline),
+    service: PredictionService = Depends(get_prediction_service),
+    scheduler: PriorityScheduler = Depends(get_scheduler)
 ) -> BatchPredictionResponse:
     """
     Predict income for multiple customers
     
     - **batch_input**: List of customers for batch prediction
-    - **returns**: List of predictions with batch summary statistics
+    - **explain**: Compute feature contributions for every customer (one call per chunk)
+    - **returns**: List of predictions with batch summary statistics. If the request
+      deadline passes mid-batch, the chunks finished so far are returned with
+      `status: "partial_timeout"`
     """
+    # Reject oversized batches before they are charged any tokens
+    if len(batch_input.customers) > settings.max_batch_size:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch size {len(batch_input.customers)} exceeds maximum allowed {settings.max_batch_size}"
+        )
+
+    # Batches are charged per customer, not per request
+    await enforce_rate_limit(request, response, cost=len(batch_input.customers))
+
     try:
         start_time = time.time()
         customer_count = len(batch_input.customers)
@@ -110,29 +201,85 @@ async def predict_batch_customers(
                 detail="Prediction service is not available"
             )
         
-        # Validate batch size
-        if customer_count > settings.max_batch_size:
-            raise HTTPException(
-                status_code=422,
-                detail=f"Batch size {customer_count} exceeds maximum allowed {settings.max_batch_size}"
+        # Make batch predictions: each chunk is scheduled separately so
+        # interactive requests can run between chunks of a large batch, and
+        # chunks still queued when the deadline passes are never started
+        traffic_class = resolve_traffic_class(BATCH, x_traffic_class)
+        chunk_size = max(1, settings.batch_chunk_size)
+        customers = batch_input.customers
+        # Rows / distinct feature rows scored, one dict per chunk
+        chunk_stats = [{} for _ in range(0, customer_count, chunk_size)]
+        if should_use_fallback(scheduler, service, traffic_class):
+            # Saturated: the whole batch is scored by the fallback model on the fallback pool
+            chunk_size = max(1, customer_count)
+            chunk_stats = [{}]
+            chunk_tasks = [asyncio.ensure_future(
+                scheduler.run_fallback(service.predict_many, customers, FALLBACK_TIER, explain, chunk_stats[0])
+            )]
+        else:
+            chunk_tasks = [
+                asyncio.ensure_future(scheduler.submit(
+                    traffic_class,
+                    service.predict_many,
+                    customers[i:i + chunk_size],
+                    PRIMARY_TIER,
+                    explain,
+                    stats,
+                    cost=len(customers[i:i + chunk_size]),
+                    deadline=deadline
+                ))
+                for i, stats in zip(range(0, customer_count, chunk_size), chunk_stats)
+            ]
+        done, pending = await asyncio.wait(chunk_tasks, timeout=max(deadline.remaining(), 0))
+        for task in pending:
+            task.cancel()
+
+        # Collect finished chunks in request order
+        predictions = []
+        finished_stats = []
+        timed_out_customers = 0
+        for i, task, stats in zip(range(0, customer_count, chunk_size), chunk_tasks, chunk_stats):
+            chunk_len = min(chunk_size, customer_count - i)
+            if task in pending or isinstance(task.exception(), DeadlineExceeded):
+                timed_out_customers += chunk_len
+                continue
+            if task.exception() is not None:
+                raise task.exception()
+            predictions.extend(task.result())
+            finished_stats.append(stats)
+
+        if timed_out_customers == customer_count:
+            raise HTTPException(status_code=504, detail="Batch prediction deadline exceeded")
+
+        batch_summary = service.summarize_batch(customer_count, predictions, timed_out_customers, finished_stats)
+        status = "partial_timeout" if timed_out_customers else "complete"
+        if timed_out_customers:
+            logger.warning(
+                f"Batch deadline exceeded: returning {len(predictions)}/{customer_count} predictions"
             )
         
-        # Make batch predictions
-        predictions, batch_summary = service.predict_batch(batch_input.customers)
-        
         # Calculate total processing time
         total_time_ms = (time.time() - start_time) * 1000
         
         # Create response
-        response = BatchPredictionResponse(
+        batch_response = BatchPredictionResponse(
             predictions=predictions,
             batch_summary=batch_summary,
-            total_processing_time_ms=total_time_ms
+            total_processing_time_ms=total_time_ms,
+            status=status
         )
         
         logger.info(f"Batch prediction completed: {len(predictions)}/{customer_count} successful")
-        return response
+        return batch_response
         
+    except HTTPException:
+        raise
+
+    except FallbackSaturated:
+        logger.warning("Fallback pool saturated, rejecting batch")
+        raise HTTPException(status_code=503, detail="Prediction service is overloaded",
+                            headers={"Retry-After": "1"})
+
     except ValueError as e:
         logger.error(f"Validation error in batch prediction: {str(e)}")
         raise HTTPException(status_code=422, detail=str(e))
@@ -172,3 +319,22 @@ async def get_model_info(
             status_code=500,
             detail=f"Failed to get model info: {str(e)}"
         )
+
+
+@router.get(
+    "/scheduler/stats",
+    summary="Get scheduler statistics",
+    description="Queue depths and per-class latency SLO metrics of the prediction scheduler"
+)
+async def get_scheduler_stats(
+    scheduler: PriorityScheduler = Depends(get_scheduler)
+) -> dict:
+    """
+    Get scheduler statistics
+
+    - **returns**: Queue depths, worker usage and per-class latency percentiles / SLO attainment
+    """
+    return {
+        "scheduler": scheduler.stats(),
+        "timestamp": time.time()
+    }
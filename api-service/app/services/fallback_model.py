@@ -0,0 +1,235 @@
+"""
+Lightweight fallback model for degraded-mode serving
+
+When the inference queue is saturated the API answers from a small model
+distilled from the production model instead of making clients wait. The
+fallback is fitted to the production model's own predictions (not to the
+raw target) on the training features, so it approximates the production
+model as closely as a cheap model can.
+
+The fitted fallback is stored in the main model artifact under the
+"fallback_model" key, next to "final_production_model" and "final_scaler",
+so both tiers are always deployed together. It is stored as plain
+parameters (kind, feature order, coefficients / intercept, or the sklearn
+tree ensemble) rather than as a FallbackModel instance, so the shared
+artifact never references this module; the API rebuilds the object with
+load_fallback_model().
+
+Offline tooling:
+    python -m app.services.fallback_model \\
+        --train-features ../sharing_package/data/processed/X_train.csv \\
+        --eval-features ../sharing_package/data/processed/X_valid.csv \\
+        --eval-target ../sharing_package/data/processed/y_valid.csv \\
+        --kind linear --save
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+FALLBACK_KINDS = ("linear", "trees")
+
+
+class FallbackModel:
+    """
+    Distilled approximation of the production model
+
+    Operates on the same scaled feature matrix as the production model.
+    "linear" is a ridge regression evaluated with a single matrix-vector
+    product; "trees" is a shallow gradient-boosted ensemble.
+    """
+
+    def __init__(self, kind: str, feature_columns: List[str]):
+        if kind not in FALLBACK_KINDS:
+            raise ValueError(f"Unknown fallback kind: {kind}")
+        self.kind = kind
+        self.feature_columns = list(feature_columns)
+        self.coef_: Optional[np.ndarray] = None
+        self.intercept_: float = 0.0
+        self.trees_ = None
+        self.fit_info: Dict[str, Any] = {}
+
+    def fit(self, X_scaled: np.ndarray, teacher_predictions: np.ndarray, alpha: float = 1.0) -> "FallbackModel":
+        """Fit the fallback to the production model's predictions"""
+        X_scaled = np.asarray(X_scaled, dtype=np.float64)
+        target = np.asarray(teacher_predictions, dtype=np.float64)
+
+        if self.kind == "linear":
+            # Closed-form ridge regression on centered data
+            x_mean = X_scaled.mean(axis=0)
+            y_mean = target.mean()
+            Xc = X_scaled - x_mean
+            gram = Xc.T @ Xc + alpha * np.eye(Xc.shape[1])
+            self.coef_ = np.linalg.solve(gram, Xc.T @ (target - y_mean))
+            self.intercept_ = float(y_mean - x_mean @ self.coef_)
+        else:
+            from sklearn.ensemble import GradientBoostingRegressor
+            self.trees_ = GradientBoostingRegressor(
+                n_estimators=50, max_depth=3, learning_rate=0.2, random_state=42
+            ).fit(X_scaled, target)
+
+        self.fit_info = {
+            "fitted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "training_rows": int(X_scaled.shape[0]),
+        }
+        return self
+
+    def predict(self, X_scaled: np.ndarray) -> np.ndarray:
+        """Predict from an already scaled feature matrix"""
+        if self.kind == "linear":
+            return np.asarray(X_scaled, dtype=np.float64) @ self.coef_ + self.intercept_
+        return self.trees_.predict(X_scaled)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain parameters for the model artifact (no reference to this class)"""
+        return {
+            "kind": self.kind,
+            "feature_columns": list(self.feature_columns),
+            "coef": None if self.coef_ is None else np.asarray(self.coef_, dtype=np.float64),
+            "intercept": float(self.intercept_),
+            "trees": self.trees_,
+            "fit_info": dict(self.fit_info),
+        }
+
+    @classmethod
+    def from_dict(cls, params: Dict[str, Any]) -> "FallbackModel":
+        """Rebuild a fallback from the parameters written by to_dict()"""
+        fallback = cls(params["kind"], params["feature_columns"])
+        if params.get("coef") is not None:
+            fallback.coef_ = np.asarray(params["coef"], dtype=np.float64)
+        fallback.intercept_ = float(params.get("intercept", 0.0))
+        fallback.trees_ = params.get("trees")
+        fallback.fit_info = dict(params.get("fit_info") or {})
+        return fallback
+
+
+def load_fallback_model(stored: Any) -> Optional[FallbackModel]:
+    """
+    Fallback model from a model artifact's "fallback_model" entry
+
+    Accepts the plain parameters written by to_dict(), a FallbackModel
+    pickled by earlier versions of this tool, or None (no fallback).
+    """
+    if stored is None or isinstance(stored, FallbackModel):
+        return stored
+    if isinstance(stored, dict):
+        return FallbackModel.from_dict(stored)
+    raise ValueError(f"Unsupported fallback model entry: {type(stored).__name__}")
+
+
+def _regression_metrics(reference: np.ndarray, predicted: np.ndarray) -> Dict[str, float]:
+    errors = predicted - reference
+    ss_tot = float(((reference - reference.mean()) ** 2).sum())
+    return {
+        "rmse": round(float(np.sqrt((errors ** 2).mean())), 2),
+        "mae": round(float(np.abs(errors).mean()), 2),
+        "r2": round(1 - float((errors ** 2).sum()) / ss_tot, 4) if ss_tot > 0 else None,
+    }
+
+
+def _time_per_row_us(predict, X: np.ndarray, repeats: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predict(X)
+    return round((time.perf_counter() - start) / repeats / len(X) * 1e6, 3)
+
+
+def evaluate_fallback(
+    model,
+    scaler,
+    fallback: FallbackModel,
+    X: pd.DataFrame,
+    y: Optional[np.ndarray] = None,
+) -> Dict[str, Any]:
+    """
+    Accuracy cost of serving from the fallback instead of the production model
+
+    Returns agreement with the production model and, when the true target
+    is given, the error of both tiers against it and the difference.
+    """
+    X_scaled = scaler.transform(X[fallback.feature_columns])
+    primary = np.asarray(model.predict(X_scaled), dtype=np.float64)
+    degraded = fallback.predict(X_scaled)
+
+    report: Dict[str, Any] = {
+        "rows": int(len(X)),
+        "fallback_kind": fallback.kind,
+        "agreement_with_primary": _regression_metrics(primary, degraded),
+        "latency_us_per_row": {
+            "primary": _time_per_row_us(model.predict, X_scaled),
+            "fallback": _time_per_row_us(fallback.predict, X_scaled),
+        },
+    }
+
+    if y is not None:
+        y = np.asarray(y, dtype=np.float64).ravel()
+        primary_error = _regression_metrics(y, primary)
+        fallback_error = _regression_metrics(y, degraded)
+        report["against_target"] = {
+            "primary": primary_error,
+            "fallback": fallback_error,
+            "rmse_increase": round(fallback_error["rmse"] - primary_error["rmse"], 2),
+            "rmse_increase_pct": round(
+                (fallback_error["rmse"] / primary_error["rmse"] - 1) * 100, 2
+            ) if primary_error["rmse"] else None,
+        }
+
+    return report
+
+
+def distill_fallback(model, scaler, feature_columns: List[str], X_train: pd.DataFrame, kind: str = "linear") -> FallbackModel:
+    """Fit a fallback model to the production model's outputs on X_train"""
+    missing = [col for col in feature_columns if col not in X_train.columns]
+    if missing:
+        raise ValueError(f"Training features missing model columns: {missing}")
+
+    X_scaled = scaler.transform(X_train[feature_columns])
+    teacher_predictions = model.predict(X_scaled)
+    return FallbackModel(kind, feature_columns).fit(X_scaled, teacher_predictions)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Fit, evaluate and optionally package the fallback model"""
+    from app.services.prediction_service import project_root
+
+    parser = argparse.ArgumentParser(description="Distill the degraded-mode fallback model")
+    parser.add_argument(
+        "--model-path",
+        default=os.path.join(project_root, "models/production/final_production_model_nested_cv.pkl"),
+    )
+    parser.add_argument("--train-features", required=True, help="CSV with the training feature matrix")
+    parser.add_argument("--eval-features", help="CSV to report accuracy cost on (default: training features)")
+    parser.add_argument("--eval-target", help="CSV with the true target for --eval-features")
+    parser.add_argument("--kind", choices=FALLBACK_KINDS, default="linear")
+    parser.add_argument("--save", action="store_true", help="Store the fallback in the model artifact")
+    args = parser.parse_args(argv)
+
+    artifacts = joblib.load(args.model_path)
+    model = artifacts["final_production_model"]
+    scaler = artifacts["final_scaler"]
+    feature_columns = artifacts["feature_columns"]
+
+    X_train = pd.read_csv(args.train_features)
+    fallback = distill_fallback(model, scaler, feature_columns, X_train, kind=args.kind)
+
+    X_eval = pd.read_csv(args.eval_features) if args.eval_features else X_train
+    y_eval = pd.read_csv(args.eval_target).iloc[:, 0].values if args.eval_target else None
+    report = evaluate_fallback(model, scaler, fallback, X_eval, y_eval)
+    fallback.fit_info["evaluation"] = report
+
+    print(json.dumps(report, indent=2))
+
+    if args.save:
+        artifacts["fallback_model"] = fallback.to_dict()
+        joblib.dump(artifacts, args.model_path)
+        print(f"Fallback model ({fallback.kind}) saved into {args.model_path}")
+
+
+if __name__ == "__main__":
+    main()
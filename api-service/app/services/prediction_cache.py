@@ -0,0 +1,81 @@
+"""
+In-process cache of recent predictions
+
+Branch staff often re-submit the same customer (form corrections, page
+reloads), and nightly batches overlap with the day's interactive traffic.
+Predictions are cached per (customer payload, serving tier, model version
+and checksum) together with their feature contributions when those were computed, so an explained
+prediction is served from the cache for both plain and `explain=true`
+requests. The service also clears the cache whenever it loads a model, so
+a reloaded model never answers from its predecessor's entries; the model
+in the key covers puts from work that started before the reload.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.schemas import CustomerInput
+
+# (prediction, top_factors or None when contributions were not computed)
+CacheEntry = Tuple[float, Optional[List[Dict[str, Any]]]]
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of predictions
+
+    Accessed from the scheduler's worker threads, so every operation takes
+    a lock.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(customer: CustomerInput, tier: str, model: str) -> str:
+        """Cache key for a customer payload scored on `tier` by `model` (version and checksum)"""
+        payload = json.dumps(customer.dict(), sort_keys=True, default=str)
+        return hashlib.sha256(f"{model}|{tier}|{payload}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str, need_factors: bool = False) -> Optional[CacheEntry]:
+        """Cached entry, or None on a miss (or when factors are needed but absent)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (need_factors and entry[1] is None):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, prediction: float, top_factors: Optional[List[Dict[str, Any]]]) -> None:
+        """Store a prediction, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (prediction, top_factors)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries (e.g. after a model reload)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and hit counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
@@ -8,6 +8,8 @@ without modifying any of your working code.
 import sys
 import os
 import time
+import hashlib
+import json
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
@@ -18,14 +20,42 @@ import joblib
 # Add the project root to Python path to import existing modules
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
 sys.path.insert(0, project_root)
+# Shared pipeline modules (feature engineering) live in production_test/
+sys.path.insert(0, os.path.join(project_root, "production_test"))
+
+from production_feature_transformer import DEFAULT_TRANSFORMER_PATH, FeatureTransformer
+from production_model_bundle import ModelBundle, is_model_bundle
+from production_scoring import unique_rows
 
 from app.core.logging import get_logger
 from app.core.config import get_settings
 from app.models.schemas import CustomerInput, PredictionResponse
+from app.services.fallback_model import load_fallback_model
+from app.services.prediction_cache import PredictionCache
 
 logger = get_logger("prediction_service")
 settings = get_settings()
 
+# Serving tiers: the production model, or the distilled fallback used under overload
+PRIMARY_TIER = "primary"
+FALLBACK_TIER = "fallback"
+
+
+def _count_scored(scoring_stats: Optional[Dict[str, int]], rows: int, unique: int) -> None:
+    """Add rows and distinct feature rows scored to `scoring_stats` (when given)"""
+    if scoring_stats is not None:
+        scoring_stats["rows"] = scoring_stats.get("rows", 0) + rows
+        scoring_stats["unique_rows"] = scoring_stats.get("unique_rows", 0) + unique
+
+
+def _file_sha256(path: str) -> str:
+    """Checksum of a model file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 
 class PredictionService:
     """
@@ -39,10 +69,15 @@ class PredictionService:
     def __init__(self):
         self.model = None
         self.scaler = None
+        self.fallback_model = None
+        self.feature_transformer = FeatureTransformer()
         self.model_loaded = False
         self.model_version = "1.0.0"
+        self.model_checksum = None
         self.feature_columns = None
         self.model_info = None
+        self.bundle = None
+        self.cache = PredictionCache(settings.prediction_cache_size) if settings.prediction_cache_size > 0 else None
         self._load_model()
         
     def _load_model(self) -> None:
@@ -50,6 +85,11 @@ class PredictionService:
         try:
             logger.info("Loading production model...")
 
+            bundle_path = os.path.join(project_root, settings.model_bundle_path)
+            if is_model_bundle(bundle_path):
+                self._load_bundle(bundle_path)
+                return
+
             # Path to your existing model
             model_path = os.path.join(project_root, "models/production/final_production_model_nested_cv.pkl")
 
@@ -58,6 +98,7 @@ class PredictionService:
 
             # Load the model artifacts using joblib (same as your pipeline)
             model_artifacts = joblib.load(model_path)
+            self.model_checksum = _file_sha256(model_path)
 
             # Extract the actual model from the artifacts dictionary
             self.model = model_artifacts['final_production_model']
@@ -67,6 +108,14 @@ class PredictionService:
             # Store additional metadata
             self.model_info = model_artifacts.get('training_info', {})
 
+            # Optional distilled model for degraded-mode serving
+            self.fallback_model = load_fallback_model(model_artifacts.get('fallback_model'))
+            if self.fallback_model is not None:
+                logger.info(f"Fallback model loaded ({self.fallback_model.kind})")
+
+            self.feature_transformer = self._load_feature_transformer()
+
+            self._clear_cache()
             self.model_loaded = True
             logger.info(f"Model loaded successfully. Features: {len(self.feature_columns)}")
 
@@ -75,23 +124,88 @@ class PredictionService:
             self.model_loaded = False
             raise
     
+    def _load_bundle(self, bundle_path: str) -> None:
+        """
+        Load the versioned model bundle (see production_model_bundle.py)
+
+        Booster, scaler arrays and frequency tables are verified against the
+        manifest checksums; training info stays on disk until it is asked for.
+        """
+        bundle = ModelBundle.load(bundle_path)
+
+        self.model = bundle.model
+        self.scaler = bundle.scaler
+        self.feature_columns = bundle.feature_columns
+        self.model_version = bundle.model_version or self.model_version
+        # Every member's checksum: a new booster, scaler, transformer or fallback is a new model
+        self.model_checksum = hashlib.sha256(
+            json.dumps(bundle.manifest['members'], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        self.fallback_model = load_fallback_model(bundle.member("fallback_model"))
+        if self.fallback_model is not None:
+            logger.info(f"Fallback model loaded ({self.fallback_model.kind})")
+        self.feature_transformer = bundle.transformer or self._load_feature_transformer()
+        self.bundle = bundle
+
+        self._clear_cache()
+        self.model_loaded = True
+        logger.info(f"Model bundle loaded (version {self.model_version}). Features: {len(self.feature_columns)}")
+
+    def _clear_cache(self) -> None:
+        """Forget predictions of the previously loaded model"""
+        if self.cache:
+            self.cache.clear()
+
+    @property
+    def training_info(self) -> Dict[str, Any]:
+        """Training metadata of the model (read from the bundle on first use)"""
+        if self.bundle is not None:
+            return self.bundle.training_info
+        return self.model_info or {}
+
+    def _load_feature_transformer(self) -> FeatureTransformer:
+        """
+        Shared feature engineering of the batch pipelines
+
+        The fitted artifact when present, otherwise a transformer around the
+        training-time frequency mappings.
+        """
+        transformer_path = os.path.join(project_root, DEFAULT_TRANSFORMER_PATH)
+        if os.path.exists(transformer_path):
+            transformer = FeatureTransformer.load(transformer_path)
+            logger.info(f"Feature transformer loaded (fitted on {transformer.training_rows} rows)")
+            return transformer
+
+        logger.warning("Fitted feature transformer not found - using frequency mappings only")
+        mappings_path = os.path.join(project_root, "models/production/production_frequency_mappings_catboost.pkl")
+        if not os.path.exists(mappings_path):
+            logger.warning("Frequency mappings not found - using default frequencies")
+            return FeatureTransformer()
+
+        with open(mappings_path, "rb") as f:
+            transformer = FeatureTransformer(pickle.load(f))
+        if not transformer.has_combo_table:
+            logger.warning("No location x occupation table in frequency mappings - using default frequency")
+        return transformer
+
     def _prepare_customer_data(self, customer: CustomerInput) -> pd.DataFrame:
+        """Prepare a single customer for prediction"""
+        return self._prepare_customers_data([customer])
+
+    def _prepare_customers_data(self, customers: List[CustomerInput]) -> pd.DataFrame:
         """
-        Prepare customer data for prediction using your existing preprocessing logic
+        Prepare customer data for prediction with the pipelines' FeatureTransformer
         
-        This method replicates the preprocessing from your 00_predictions_pipeline.py
-        without modifying the original file.
+        All customers are processed as one DataFrame so a batch is transformed
+        and scored in a single pass; the transform is per row, so a customer
+        gets the same features alone or in a batch.
         """
         try:
             # Convert customer input to DataFrame
-            customer_dict = customer.dict()
-            df = pd.DataFrame([customer_dict])
+            df = pd.DataFrame([customer.dict() for customer in customers])
             
-            # Apply the same preprocessing as your production pipeline
-            df = self._standardize_column_names(df)
-            df = self._convert_date_columns(df)
-            df = self._create_engineered_features(df)
-            df = self._apply_frequency_encoding(df)
+            # Same FeatureTransformer as the batch pipelines
+            df = self.feature_transformer.transform(df)
             
             # Select only the features the model expects
             df_features = df[self.feature_columns].copy()
@@ -105,90 +219,143 @@ class PredictionService:
             logger.error(f"Error preparing customer data: {str(e)}")
             raise ValueError(f"Data preparation failed: {str(e)}")
     
-    def _standardize_column_names(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Standardize column names (from your pipeline)"""
-        column_mapping = {
-            'Cliente': 'cliente',
-            'Identificador_Unico': 'identificador_unico',
-            'Edad': 'edad',
-            'Ocupacion': 'ocupacion',
-            'FechaIngresoEmpleo': 'fechaingresoempleo',
-            'NombreEmpleadorCliente': 'nombreempleadorcliente',
-            'CargoEmpleoCliente': 'cargoempleocliente',
-            'monto_letra': 'monto_letra',
-            'saldo': 'saldo',
-            'fecha_inicio': 'fecha_inicio'
-        }
-        
-        df = df.rename(columns=column_mapping)
-        df.columns = df.columns.str.lower().str.replace(' ', '_').str.replace('[^a-zA-Z0-9_]', '', regex=True)
-        
-        return df
-    
-    def _convert_date_columns(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Convert date columns to days (from your pipeline)"""
-        reference_date = pd.Timestamp('2025-01-01')
-        
-        date_columns = ['fechaingresoempleo', 'fecha_inicio', 'fecha_vencimiento']
-        
-        for col in date_columns:
-            if col in df.columns:
-                try:
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-                    df[f'{col}_days'] = (reference_date - df[col]).dt.days
-                except:
-                    df[f'{col}_days'] = 0
-        
-        return df
-    
-    def _create_engineered_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Create engineered features (from your pipeline)"""
-        try:
-            # Employment years
-            if 'fechaingresoempleo_days' in df.columns:
-                df['employment_years'] = df['fechaingresoempleo_days'] / 365.25
-                df['employment_years'] = df['employment_years'].clip(lower=0)
-            else:
-                df['employment_years'] = 0
-            
-            # Balance to payment ratio
-            if 'saldo' in df.columns and 'monto_letra' in df.columns:
-                df['balance_to_payment_ratio'] = df['saldo'] / (df['monto_letra'] + 1)
+    def has_fallback(self) -> bool:
+        """Whether a fallback model is available for degraded-mode serving"""
+        return self.fallback_model is not None
+
+    def _score(self, scaled: np.ndarray, tier: str) -> np.ndarray:
+        """Predict from scaled features with the model for `tier`"""
+        if tier == FALLBACK_TIER:
+            if self.fallback_model is None:
+                raise RuntimeError("Fallback model not loaded")
+            return self.fallback_model.predict(scaled)
+        return self.model.predict(scaled)
+
+    def _explain(self, customers_df: pd.DataFrame, scaled: np.ndarray) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        Top feature contributions for every customer, from one TreeSHAP call
+
+        Uses XGBoost's `pred_contribs` on the whole scaled matrix; contributions
+        are in income units and, with the bias term, sum to the prediction.
+        """
+        if not hasattr(self.model, "get_booster"):
+            logger.warning("Feature contributions require an XGBoost model, skipping explanations")
+            return [None] * len(customers_df)
+
+        import xgboost as xgb
+
+        booster = self.model.get_booster()
+        contribs = booster.predict(
+            xgb.DMatrix(scaled, feature_names=booster.feature_names),
+            pred_contribs=True
+        )[:, :-1]  # last column is the bias term
+
+        top_k = min(settings.explain_top_k, contribs.shape[1])
+        top_indices = np.argsort(-np.abs(contribs), axis=1)[:, :top_k]
+        values = customers_df.to_numpy()
+
+        return [
+            [
+                {
+                    "feature": self.feature_columns[j],
+                    "value": float(values[row, j]),
+                    "contribution": round(float(contribs[row, j]), 2),
+                    "impact": "positive" if contribs[row, j] >= 0 else "negative"
+                }
+                for j in top_indices[row]
+            ]
+            for row in range(len(customers_df))
+        ]
+
+    def _predict_customers(
+        self,
+        customers: List[CustomerInput],
+        tier: str,
+        explain: bool,
+        scoring_stats: Optional[Dict[str, int]] = None
+    ) -> Tuple[np.ndarray, List[Optional[List[Dict[str, Any]]]]]:
+        """
+        Predictions (and contributions when `explain`) for customers
+
+        Cached customers are answered from the cache; the rest are prepared,
+        scaled, scored and explained together in one pass and then cached.
+        Customers with the same final feature vector (e.g. one row per loan)
+        are scored and explained once; `scoring_stats` counts the rows and
+        distinct rows scored.
+        """
+        predictions = np.empty(len(customers), dtype=np.float64)
+        factors: List[Optional[List[Dict[str, Any]]]] = [None] * len(customers)
+        explain = explain and tier != FALLBACK_TIER
+
+        model_key = f"{self.model_version}:{self.model_checksum}"
+        keys = [PredictionCache.key(customer, tier, model_key) for customer in customers] if self.cache else None
+        missing = []
+        for i in range(len(customers)):
+            entry = self.cache.get(keys[i], need_factors=explain) if self.cache else None
+            if entry is None:
+                missing.append(i)
             else:
-                df['balance_to_payment_ratio'] = 0
-            
-            # Professional stability score
-            df['professional_stability_score'] = (
-                df.get('employment_years', 0) * 0.6 + 
-                (df.get('saldo', 0) / 1000) * 0.4
-            ).clip(upper=10)
-            
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error creating engineered features: {str(e)}")
-            return df
-    
-    def _apply_frequency_encoding(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Apply frequency encoding (simplified version)"""
-        # For production, you would load the actual frequency mappings
-        # For now, we'll use simplified encoding
-        
-        categorical_cols = ['ocupacion', 'nombreempleadorcliente', 'cargoempleocliente']
-        
-        for col in categorical_cols:
-            if col in df.columns:
-                # Simple frequency encoding (in production, use your saved mappings)
-                df[f'{col}_consolidated_freq'] = 1  # Default frequency
-        
-        return df
-    
-    def predict_single(self, customer: CustomerInput) -> PredictionResponse:
+                predictions[i] = entry[0]
+                factors[i] = entry[1] if explain else None
+
+        if missing:
+            customers_df = self._prepare_customers_data([customers[i] for i in missing])
+            features, inverse = unique_rows(customers_df.to_numpy(dtype=np.float64))
+            if inverse is not None:
+                customers_df = pd.DataFrame(features, columns=customers_df.columns)
+            scaled = self.scaler.transform(customers_df)
+            scored = self._score(scaled, tier)
+            explained = self._explain(customers_df, scaled) if explain else [None] * len(customers_df)
+            if inverse is not None:
+                # Every customer gets the results of its distinct feature vector
+                scored = np.asarray(scored)[inverse]
+                explained = [explained[j] for j in inverse]
+
+            for i, prediction, top_factors in zip(missing, scored, explained):
+                predictions[i] = prediction
+                factors[i] = top_factors
+                if self.cache:
+                    self.cache.put(keys[i], float(prediction), top_factors)
+            _count_scored(scoring_stats, len(missing), len(features))
+
+        return predictions, factors
+
+    def _build_response(
+        self,
+        customer: CustomerInput,
+        prediction: float,
+        processing_time_ms: float,
+        tier: str = PRIMARY_TIER,
+        top_factors: Optional[List[Dict[str, Any]]] = None
+    ) -> PredictionResponse:
+        """Create the API response for one scored customer"""
+        return PredictionResponse(
+            customer_id=customer.cliente,
+            predicted_income=float(prediction),
+            confidence_score=0.85,  # You can implement confidence calculation
+            prediction_range={
+                "min": float(prediction * 0.8),
+                "max": float(prediction * 1.2)
+            },
+            top_factors=top_factors,
+            processing_time_ms=processing_time_ms,
+            model_version=self.model_version,
+            serving_tier=tier
+        )
+
+    def predict_single(
+        self,
+        customer: CustomerInput,
+        tier: str = PRIMARY_TIER,
+        explain: bool = False
+    ) -> PredictionResponse:
         """
         Make a prediction for a single customer
         
         Args:
             customer: Customer input data
+            tier: Serving tier, "primary" or "fallback"
+            explain: Compute per-feature contributions for top_factors
             
         Returns:
             Prediction response with income estimate and metadata
@@ -199,34 +366,15 @@ class PredictionService:
             if not self.model_loaded:
                 raise RuntimeError("Model not loaded")
             
-            # Prepare data
-            customer_df = self._prepare_customer_data(customer)
-
-            # Apply scaling (same as production pipeline)
-            customer_scaled = self.scaler.transform(customer_df)
-
-            # Make prediction
-            prediction = self.model.predict(customer_scaled)[0]
+            # Prepare, scale (same as production pipeline) and predict
+            predictions, factors = self._predict_customers([customer], tier, explain)
+            prediction = predictions[0]
             
             # Calculate processing time
             processing_time_ms = (time.time() - start_time) * 1000
             
             # Create response
-            response = PredictionResponse(
-                customer_id=customer.cliente,
-                predicted_income=float(prediction),
-                confidence_score=0.85,  # You can implement confidence calculation
-                prediction_range={
-                    "min": float(prediction * 0.8),
-                    "max": float(prediction * 1.2)
-                },
-                top_factors=[
-                    {"feature": "ocupacion", "impact": "high", "value": customer.ocupacion},
-                    {"feature": "edad", "impact": "medium", "value": customer.edad}
-                ],
-                processing_time_ms=processing_time_ms,
-                model_version=self.model_version
-            )
+            response = self._build_response(customer, prediction, processing_time_ms, tier, factors[0])
             
             logger.info(f"Prediction completed for customer {customer.cliente}: ${prediction:.2f}")
             return response
@@ -234,51 +382,107 @@ class PredictionService:
         except Exception as e:
             logger.error(f"Prediction failed for customer {customer.cliente}: {str(e)}")
             raise ValueError(f"Prediction failed: {str(e)}")
-    
-    def predict_batch(self, customers: List[CustomerInput]) -> Tuple[List[PredictionResponse], Dict[str, Any]]:
+
+    def predict_many(
+        self,
+        customers: List[CustomerInput],
+        tier: str = PRIMARY_TIER,
+        explain: bool = False,
+        scoring_stats: Optional[Dict[str, int]] = None
+    ) -> List[PredictionResponse]:
         """
-        Make predictions for multiple customers
-        
-        Args:
-            customers: List of customer input data
-            
-        Returns:
-            Tuple of (predictions list, batch summary)
+        Score a list of customers with one transform and one model call
+
+        With `explain`, contributions for all customers come from a single
+        additional `pred_contribs` call. Repeated feature vectors are scored
+        once; `scoring_stats` receives the rows and distinct rows scored.
+
+        If the vectorized path fails (e.g. one malformed record), customers are
+        scored one by one so a single bad record does not fail the others.
+        Customers that still fail are left out of the returned list.
         """
+        if not customers:
+            return []
+
         start_time = time.time()
-        predictions = []
-        successful = 0
-        failed = 0
-        
-        logger.info(f"Starting batch prediction for {len(customers)} customers")
-        
-        for customer in customers:
-            try:
-                prediction = self.predict_single(customer)
-                predictions.append(prediction)
-                successful += 1
-            except Exception as e:
-                logger.error(f"Failed to predict for customer {customer.cliente}: {str(e)}")
-                failed += 1
-                # You might want to include failed predictions in response
-        
-        # Calculate batch summary
-        total_time_ms = (time.time() - start_time) * 1000
-        
+        try:
+            if not self.model_loaded:
+                raise RuntimeError("Model not loaded")
+
+            predictions, factors = self._predict_customers(customers, tier, explain, scoring_stats)
+        except Exception as e:
+            logger.warning(f"Vectorized scoring failed ({str(e)}), scoring customers individually")
+            results = []
+            for customer in customers:
+                try:
+                    results.append(self.predict_single(customer, tier, explain))
+                except Exception as customer_error:
+                    logger.error(f"Failed to predict for customer {customer.cliente}: {str(customer_error)}")
+            _count_scored(scoring_stats, len(results), len(results))
+            return results
+
+        per_customer_ms = (time.time() - start_time) * 1000 / len(customers)
+        return [
+            self._build_response(customer, prediction, per_customer_ms, tier, top_factors)
+            for customer, prediction, top_factors in zip(customers, predictions, factors)
+        ]
+
+    @staticmethod
+    def summarize_batch(
+        total_customers: int,
+        predictions: List[PredictionResponse],
+        timed_out_customers: int = 0,
+        scoring_stats: Optional[List[Dict[str, int]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Batch summary statistics for a (possibly chunked, possibly timed out) batch
+
+        scoring_stats: the `scoring_stats` of the chunks returned, adding the
+        distinct feature rows scored and the dedup ratio (rows per scored row)
+        """
+        successful = len(predictions)
+        failed = total_customers - successful - timed_out_customers
+
         if predictions:
             avg_income = sum(p.predicted_income for p in predictions) / len(predictions)
         else:
             avg_income = 0
-        
-        batch_summary = {
-            "total_customers": len(customers),
+
+        fallback_predictions = sum(1 for p in predictions if p.serving_tier == FALLBACK_TIER)
+
+        summary = {
+            "total_customers": total_customers,
             "successful_predictions": successful,
             "failed_predictions": failed,
+            "timed_out_customers": timed_out_customers,
+            "fallback_predictions": fallback_predictions,
             "average_income": avg_income,
-            "success_rate": successful / len(customers) if customers else 0
+            "success_rate": successful / total_customers if total_customers else 0
         }
+        if scoring_stats is not None:
+            rows = sum(stats.get("rows", 0) for stats in scoring_stats)
+            scored = sum(stats.get("unique_rows", 0) for stats in scoring_stats)
+            summary["scored_feature_rows"] = scored
+            summary["dedup_ratio"] = round(rows / scored, 2) if scored else None
+        return summary
+    
+    def predict_batch(self, customers: List[CustomerInput]) -> Tuple[List[PredictionResponse], Dict[str, Any]]:
+        """
+        Make predictions for multiple customers
         
-        logger.info(f"Batch prediction completed: {successful}/{len(customers)} successful")
+        Args:
+            customers: List of customer input data
+            
+        Returns:
+            Tuple of (predictions list, batch summary)
+        """
+        logger.info(f"Starting batch prediction for {len(customers)} customers")
+
+        scoring_stats: Dict[str, int] = {}
+        predictions = self.predict_many(customers, scoring_stats=scoring_stats)
+        batch_summary = self.summarize_batch(len(customers), predictions, scoring_stats=[scoring_stats])
+
+        logger.info(f"Batch prediction completed: {len(predictions)}/{len(customers)} successful")
         
         return predictions, batch_summary
     
@@ -292,5 +496,10 @@ class PredictionService:
             "model_loaded": self.model_loaded,
             "model_version": self.model_version,
             "feature_count": len(self.feature_columns) if self.feature_columns else 0,
+            "fallback_model": self.fallback_model.kind if self.fallback_model is not None else None,
+            "model_bundle": self.bundle.created_at if getattr(self, "bundle", None) is not None else None,
+            "feature_transformer": "fitted" if self.feature_transformer.is_fitted else "mappings",
+            "location_occupation_table": self.feature_transformer.has_combo_table,
+            "prediction_cache": self.cache.stats() if self.cache else None,
             "features": self.feature_columns
         }
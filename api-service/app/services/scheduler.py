@@ -0,0 +1,348 @@
+"""
+Priority-aware scheduler in front of the prediction service
+
+Inference work is queued per traffic class and dispatched onto a small
+thread pool:
+
+- "interactive": single predictions from branch staff
+- "batch": /predict/batch calls, split into chunks by the router
+- "background": bulk jobs that asked for the lowest priority
+
+Dispatch is weighted fair (stride scheduling): every class advances a
+virtual clock by cost/weight when one of its jobs starts, and the class
+with the lowest clock among the non-empty queues goes next. Because batch
+requests are submitted as independent chunks, a long batch re-queues
+between chunks and interactive work overtakes it. In addition,
+`reserved_interactive` worker slots are never handed to bulk classes, so
+an interactive request arriving during a bulk burst starts immediately.
+
+Jobs carry the request deadline; a job whose deadline has passed by the
+time a worker is free is dropped with DeadlineExceeded instead of run.
+
+`queue_wait_ms()` estimates how long new work for a class would wait; the
+router uses it to shed load to the fallback model when the pool is
+saturated (see app/services/fallback_model.py). Shed work runs through
+`run_fallback()` on its own small thread pool, which admits at most
+`fallback_max_pending` jobs at a time and rejects the rest with
+FallbackSaturated, so degraded mode cannot grow an unbounded backlog of
+threads of its own.
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.deadline import Deadline, DeadlineExceeded
+from app.core.logging import get_logger
+
+logger = get_logger("scheduler")
+settings = get_settings()
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BACKGROUND = "background"
+TRAFFIC_CLASSES = (INTERACTIVE, BATCH, BACKGROUND)
+
+
+class FallbackSaturated(Exception):
+    """The fallback pool already holds as many jobs as it admits"""
+
+
+class _Job:
+    """A unit of inference work waiting for a worker slot"""
+
+    __slots__ = ("fn", "args", "future", "cost", "deadline", "enqueued_at")
+
+    def __init__(
+        self,
+        fn: Callable,
+        args: tuple,
+        future: asyncio.Future,
+        cost: float,
+        deadline: Optional[Deadline],
+    ):
+        self.fn = fn
+        self.args = args
+        self.future = future
+        self.cost = cost
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+
+
+class ClassMetrics:
+    """Latency and SLO counters for one traffic class"""
+
+    def __init__(self, slo_ms: float, window: int = 2048):
+        self.slo_ms = float(slo_ms)
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped_expired = 0
+        self.shed_to_fallback = 0
+        self.slo_violations = 0
+        self._queue_wait_ms: Deque[float] = deque(maxlen=window)
+        self._latency_ms: Deque[float] = deque(maxlen=window)
+
+    def record(self, queue_wait_ms: float, latency_ms: float, ok: bool) -> None:
+        """Record one finished job"""
+        self._queue_wait_ms.append(queue_wait_ms)
+        self._latency_ms.append(latency_ms)
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        if latency_ms > self.slo_ms:
+            self.slo_violations += 1
+
+    def recent_queue_wait_ms(self) -> float:
+        """Median queue wait over the window (0 with no history)"""
+        if not self._queue_wait_ms:
+            return 0.0
+        return float(np.median(np.fromiter(self._queue_wait_ms, dtype=float)))
+
+    @staticmethod
+    def _percentiles(samples: Deque[float]) -> Dict[str, Optional[float]]:
+        if not samples:
+            return {"p50": None, "p95": None, "p99": None}
+        p50, p95, p99 = np.percentile(np.fromiter(samples, dtype=float), [50, 95, 99])
+        return {"p50": round(p50, 2), "p95": round(p95, 2), "p99": round(p99, 2)}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Metrics as a JSON-serializable dict"""
+        finished = self.completed + self.failed
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped_expired": self.dropped_expired,
+            "shed_to_fallback": self.shed_to_fallback,
+            "slo_ms": self.slo_ms,
+            "slo_violations": self.slo_violations,
+            "slo_attainment": round(1 - self.slo_violations / finished, 4) if finished else None,
+            "queue_wait_ms": self._percentiles(self._queue_wait_ms),
+            "latency_ms": self._percentiles(self._latency_ms),
+        }
+
+
+class PriorityScheduler:
+    """
+    Weighted fair scheduler with per-class queues
+
+    All queue manipulation happens on the event loop thread; only the job
+    functions themselves run on the worker threads.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        weights: Dict[str, float],
+        slo_ms: Dict[str, float],
+        reserved_interactive: int = 1,
+        fallback_workers: int = 1,
+        fallback_max_pending: int = 8,
+    ):
+        self.workers = max(1, int(workers))
+        self.reserved_interactive = min(max(0, int(reserved_interactive)), self.workers - 1)
+        self.weights = {cls: float(weights.get(cls, 1.0)) for cls in TRAFFIC_CLASSES}
+        self.metrics = {cls: ClassMetrics(slo_ms.get(cls, 1000.0)) for cls in TRAFFIC_CLASSES}
+        self._queues: Dict[str, Deque[_Job]] = {cls: deque() for cls in TRAFFIC_CLASSES}
+        self._pass: Dict[str, float] = {cls: 0.0 for cls in TRAFFIC_CLASSES}
+        self._virtual_time = 0.0
+        self._running = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        self.fallback_workers = max(1, int(fallback_workers))
+        self.fallback_max_pending = max(self.fallback_workers, int(fallback_max_pending))
+        self.fallback_rejected = 0
+        self._fallback_pending = 0
+        self._fallback_executor = ThreadPoolExecutor(
+            max_workers=self.fallback_workers, thread_name_prefix="fallback"
+        )
+
+    async def submit(
+        self,
+        traffic_class: str,
+        fn: Callable,
+        *args,
+        cost: float = 1.0,
+        deadline: Optional[Deadline] = None,
+    ) -> Any:
+        """
+        Queue `fn(*args)` under `traffic_class` and wait for its result
+
+        Raises:
+            DeadlineExceeded: If `deadline` passed before a worker picked the job up
+        """
+        if traffic_class not in self._queues:
+            raise ValueError(f"Unknown traffic class: {traffic_class}")
+
+        loop = asyncio.get_running_loop()
+        job = _Job(fn, args, loop.create_future(), cost, deadline)
+
+        queue = self._queues[traffic_class]
+        if not queue:
+            # A class returning from idle must not spend credit banked while idle
+            self._pass[traffic_class] = max(self._pass[traffic_class], self._virtual_time)
+        queue.append(job)
+        self.metrics[traffic_class].submitted += 1
+
+        self._dispatch(loop)
+        return await job.future
+
+    async def run_fallback(self, fn: Callable, *args) -> Any:
+        """
+        Run shed work `fn(*args)` on the fallback pool and wait for its result
+
+        Raises:
+            FallbackSaturated: If `fallback_max_pending` jobs are already running or waiting
+        """
+        if self._fallback_pending >= self.fallback_max_pending:
+            self.fallback_rejected += 1
+            raise FallbackSaturated("Fallback pool is saturated")
+
+        loop = asyncio.get_running_loop()
+        self._fallback_pending += 1
+        worker_future = asyncio.wrap_future(self._fallback_executor.submit(fn, *args), loop=loop)
+
+        def _done(fut: asyncio.Future) -> None:
+            self._fallback_pending -= 1
+
+        worker_future.add_done_callback(_done)
+        # Shielded: a client giving up must not release the slot before the thread finishes
+        return await asyncio.shield(worker_future)
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Number of queued (not yet started) jobs per class"""
+        return {cls: len(queue) for cls, queue in self._queues.items()}
+
+    def queue_wait_ms(self, traffic_class: str) -> float:
+        """
+        How long a job submitted now to `traffic_class` is likely to wait
+
+        Zero when a worker slot is free for the class; otherwise the age of
+        the oldest job queued at or above its priority, or of the class's
+        recent median queue wait when nothing is queued yet.
+        """
+        free = self.workers - self._running
+        if traffic_class == INTERACTIVE:
+            if free > 0:
+                return 0.0
+        elif free > self.reserved_interactive:
+            return 0.0
+
+        now = time.monotonic()
+        ahead = TRAFFIC_CLASSES[:TRAFFIC_CLASSES.index(traffic_class) + 1]
+        oldest = [self._queues[cls][0].enqueued_at for cls in ahead if self._queues[cls]]
+        if oldest:
+            return (now - min(oldest)) * 1000
+        return self.metrics[traffic_class].recent_queue_wait_ms()
+
+    def _next_class(self) -> Optional[str]:
+        free = self.workers - self._running
+        candidates = [cls for cls in TRAFFIC_CLASSES if self._queues[cls]]
+        if free <= self.reserved_interactive:
+            # Only interactive work may take the reserved slots
+            candidates = [cls for cls in candidates if cls == INTERACTIVE]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda cls: (self._pass[cls], TRAFFIC_CLASSES.index(cls)))
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        while self._running < self.workers:
+            traffic_class = self._next_class()
+            if traffic_class is None:
+                return
+
+            job = self._queues[traffic_class].popleft()
+            if job.future.cancelled():
+                continue
+            if job.deadline is not None and job.deadline.expired():
+                # The client has given up: drop the work before it starts
+                self.metrics[traffic_class].dropped_expired += 1
+                job.future.set_exception(DeadlineExceeded("Request deadline passed while queued"))
+                continue
+
+            self._virtual_time = self._pass[traffic_class]
+            self._pass[traffic_class] += job.cost / self.weights[traffic_class]
+            self._start(loop, traffic_class, job)
+
+    def _start(self, loop: asyncio.AbstractEventLoop, traffic_class: str, job: _Job) -> None:
+        self._running += 1
+        started_at = time.monotonic()
+        worker_future = asyncio.wrap_future(self._executor.submit(job.fn, *job.args), loop=loop)
+
+        def _done(fut: asyncio.Future) -> None:
+            self._running -= 1
+            finished_at = time.monotonic()
+            error = fut.exception() if not fut.cancelled() else asyncio.CancelledError()
+            self.metrics[traffic_class].record(
+                (started_at - job.enqueued_at) * 1000,
+                (finished_at - job.enqueued_at) * 1000,
+                ok=error is None,
+            )
+            if not job.future.done():
+                if error is None:
+                    job.future.set_result(fut.result())
+                else:
+                    job.future.set_exception(error)
+            self._dispatch(loop)
+
+        worker_future.add_done_callback(_done)
+
+    def stats(self) -> Dict[str, Any]:
+        """Scheduler state and per-class SLO metrics"""
+        return {
+            "workers": self.workers,
+            "reserved_interactive_workers": self.reserved_interactive,
+            "running": self._running,
+            "weights": self.weights,
+            "queue_depths": self.queue_depths(),
+            "fallback": {
+                "workers": self.fallback_workers,
+                "max_pending": self.fallback_max_pending,
+                "pending": self._fallback_pending,
+                "rejected": self.fallback_rejected,
+            },
+            "classes": {cls: metrics.snapshot() for cls, metrics in self.metrics.items()},
+        }
+
+
+def resolve_traffic_class(default_class: str, requested: Optional[str]) -> str:
+    """
+    Traffic class for a request
+
+    Clients may only lower their priority (e.g. a nightly job sending
+    `X-Traffic-Class: background`), never raise it.
+    """
+    if requested:
+        requested = requested.strip().lower()
+        if requested in TRAFFIC_CLASSES and (
+            TRAFFIC_CLASSES.index(requested) > TRAFFIC_CLASSES.index(default_class)
+        ):
+            return requested
+    return default_class
+
+
+_scheduler: Optional[PriorityScheduler] = None
+
+
+def get_scheduler() -> PriorityScheduler:
+    """Get the process-wide scheduler instance"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PriorityScheduler(
+            workers=settings.scheduler_workers,
+            weights=settings.scheduler_weights,
+            slo_ms=settings.scheduler_slo_ms,
+            reserved_interactive=settings.scheduler_reserved_interactive_workers,
+            fallback_workers=settings.fallback_workers,
+            fallback_max_pending=settings.fallback_max_pending,
+        )
+        logger.info(
+            f"Priority scheduler started: {_scheduler.workers} workers, weights {_scheduler.weights}"
+        )
+    return _scheduler
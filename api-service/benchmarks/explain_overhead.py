@@ -0,0 +1,61 @@
+"""
+Latency overhead of explain=true (pred_contribs) at different batch sizes
+
+Scores synthetic customers with the production model artifact, with and
+without feature contributions, and prints the median time per call.
+The prediction cache is disabled so every call does the full work.
+
+Usage (from api-service/):
+    python -m benchmarks.explain_overhead
+"""
+
+import statistics
+import time
+
+from app.models.schemas import CustomerInput
+from app.services.prediction_service import PredictionService
+
+BATCH_SIZES = (1, 100, 1000)
+REPEATS = 7
+
+
+def make_customers(n: int):
+    return [
+        CustomerInput(
+            cliente=f"BENCH{i:05d}",
+            edad=20 + i % 50,
+            ocupacion=["Ingeniero", "Contador", "Docente", "Vendedor"][i % 4],
+            fechaingresoempleo=f"{2000 + i % 24}-0{1 + i % 9}-15",
+            nombreempleadorcliente=f"Empresa {i % 37}",
+            cargoempleocliente="Analista",
+            saldo=500.0 + 37.5 * (i % 400),
+            monto_letra=50.0 + i % 300,
+            fecha_inicio=f"{2010 + i % 14}-06-01",
+        )
+        for i in range(n)
+    ]
+
+
+def median_ms(fn, *args) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    service = PredictionService()
+    service.cache = None
+
+    print(f"{'batch':>6} {'plain ms':>10} {'explain ms':>11} {'overhead':>9}")
+    for size in BATCH_SIZES:
+        customers = make_customers(size)
+        plain = median_ms(service.predict_many, customers, "primary", False)
+        explained = median_ms(service.predict_many, customers, "primary", True)
+        print(f"{size:>6} {plain:>10.2f} {explained:>11.2f} {explained / plain - 1:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
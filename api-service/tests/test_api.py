@@ -4,13 +4,48 @@ Test suite for the Income Prediction API
 
 import pytest
 import json
+import numpy as np
+import xgboost as xgb
 from fastapi.testclient import TestClient
+from sklearn.preprocessing import StandardScaler
+
 from app.main import app
+from app.core.config import get_settings
+from app.routers import predictions
+from app.services.prediction_service import FeatureTransformer
+from production_model_bundle import save_model_bundle
+
+FEATURES = [
+    "edad", "fechaingresoempleo_days", "balance_to_payment_ratio", "fecha_inicio_days", "saldo",
+    "ocupacion_consolidated_freq", "nombreempleadorcliente_consolidated_freq",
+    "cargoempleocliente_consolidated_freq", "employment_years", "professional_stability_score",
+]
 
 # Create test client
 client = TestClient(app)
 
 
+@pytest.fixture(scope="module", autouse=True)
+def model_bundle(tmp_path_factory):
+    """Serve a small model bundle built here, never an artifact from models/"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, len(FEATURES)))
+    scaler = StandardScaler().fit(X)
+    model = xgb.XGBRegressor(n_estimators=10, max_depth=3).fit(scaler.transform(X), 1000 + 100 * X[:, 0])
+    bundle_path = save_model_bundle(
+        str(tmp_path_factory.mktemp("model") / "bundle"), model, FEATURES, scaler,
+        transformer=FeatureTransformer(), model_version="test"
+    )
+
+    settings = get_settings()
+    previous_path = settings.model_bundle_path
+    settings.model_bundle_path = bundle_path
+    predictions.prediction_service = None
+    yield bundle_path
+    settings.model_bundle_path = previous_path
+    predictions.prediction_service = None
+
+
 class TestHealthEndpoints:
     """Test health check endpoints"""
     
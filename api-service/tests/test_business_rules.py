@@ -0,0 +1,81 @@
+"""
+Tests for the compiled business rules of Part 3
+"""
+
+import copy
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.services.prediction_service  # noqa: F401  (puts production_test/ on sys.path)
+from production_business_rules import DEFAULT_BUSINESS_RULES, BusinessRules, load_business_rules
+
+
+def per_row_labels(income, width):
+    """The thresholds as the per-row Part 3 code applied them"""
+    segment = ("LOW_INCOME_HIGH_RISK" if income < 500 else "LOW_INCOME_STABLE" if income < 1000
+               else "MIDDLE_INCOME_STABLE" if income < 1500 else "MIDDLE_INCOME_GROWTH" if income < 2000
+               else "HIGH_INCOME_STABLE" if income < 3000 else "HIGH_INCOME_PREMIUM")
+    confidence = ("HIGH_CONFIDENCE" if income < 1500 and width < 1200
+                  else "MEDIUM_CONFIDENCE" if income < 2000 and width < 1400 else "LOWER_CONFIDENCE")
+    if confidence != "HIGH_CONFIDENCE":
+        priority = "REVIEW_REQUIRED"
+    elif segment in ("MIDDLE_INCOME_STABLE", "MIDDLE_INCOME_GROWTH"):
+        priority = "HIGH_PRIORITY"
+    elif segment in ("HIGH_INCOME_STABLE", "HIGH_INCOME_PREMIUM"):
+        priority = "PREMIUM_PRIORITY"
+    else:
+        priority = "STANDARD_PRIORITY"
+    return segment, confidence, priority, DEFAULT_BUSINESS_RULES["recommendations"][priority]
+
+
+class TestCompiledRules:
+    """Test the vectorized rules against the per-row rules"""
+
+    def test_same_labels_as_per_row_rules(self):
+        boundaries = [0, 499.99, 500, 999.99, 1000, 1499.99, 1500, 1999.99, 2000, 2999.99, 3000, 1e6, np.nan]
+        widths = [0, 1199.99, 1200, 1399.99, 1400, 5000, np.nan]
+        income, width = (a.ravel() for a in np.meshgrid(boundaries, widths))
+
+        labels = BusinessRules().classify(income, width)
+
+        expected = list(zip(*(per_row_labels(i, w) for i, w in zip(income, width))))
+        for column, values in zip(["income_segment", "confidence_category", "business_priority",
+                                   "recommendation"], expected):
+            assert np.asarray(labels[column]).tolist() == list(values), column
+            assert labels[column].codes.dtype == np.int8
+
+    def test_rules_from_config(self, tmp_path):
+        rules = copy.deepcopy(DEFAULT_BUSINESS_RULES)
+        rules["income_segments"] = {"cutoffs": [1000], "labels": ["LOW_INCOME_STABLE", "HIGH_INCOME_STABLE"]}
+        rules["priority"]["table"] = {"HIGH_CONFIDENCE": {"HIGH_INCOME_STABLE": "PREMIUM_PRIORITY"}}
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps(rules))
+
+        labels = load_business_rules(str(path)).classify([400, 1400, 1400], [100, 100, 1300])
+
+        assert list(labels["income_segment"]) == ["LOW_INCOME_STABLE", "HIGH_INCOME_STABLE", "HIGH_INCOME_STABLE"]
+        assert list(labels["business_priority"]) == ["REVIEW_REQUIRED", "PREMIUM_PRIORITY", "REVIEW_REQUIRED"]
+
+    def test_invalid_rules(self):
+        rules = copy.deepcopy(DEFAULT_BUSINESS_RULES)
+        rules["priority"]["table"]["HIGH_CONFIDENCE"]["MIDDLE_INCOME_STABLE"] = "TOP_PRIORITY"
+
+        with pytest.raises(ValueError, match="TOP_PRIORITY"):
+            BusinessRules(rules)
+        with pytest.raises(ValueError, match="cut-offs"):
+            BusinessRules({**DEFAULT_BUSINESS_RULES, "income_segments": {"cutoffs": [2, 1], "labels": ["a", "b", "c"]}})
+
+    def test_part3_uses_the_rules(self):
+        from production_part3_business_formatting import classify_income_risk_segments
+        from production_events import SILENT
+
+        df = pd.DataFrame({"predicted_income": [1200.0, 2500.0],
+                           "income_lower_90": [700.0, 2000.0], "income_upper_90": [1800.0, 2900.0]})
+
+        result = classify_income_risk_segments(df, SILENT)
+
+        assert list(result["business_priority"]) == ["HIGH_PRIORITY", "REVIEW_REQUIRED"]
+        assert list(result["recommendation"].cat.categories) == list(DEFAULT_BUSINESS_RULES["recommendations"].values())
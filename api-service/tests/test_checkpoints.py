@@ -0,0 +1,123 @@
+"""
+Tests for the columnar checkpoints handed between pipeline stages
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import app.services.prediction_service  # noqa: F401  (puts production_test/ on sys.path)
+from production_checkpoints import CheckpointWriter, read_checkpoint, write_checkpoint
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def clean_frame():
+    return pd.DataFrame({
+        "cliente": [1, 2, 3],
+        "identificador_unico": ["8-1", "8-2", "8-3"],
+        "edad": pd.array([30.5, 41.0, 52.25], dtype="float32"),
+        "ocupacion_consolidated_freq": pd.array([10, 20, 30], dtype="int32"),
+        "ciudad": pd.Categorical(["PANAMA", "DAVID", "PANAMA"]),
+    }, index=[5, 6, 7])
+
+
+class TestCheckpoints:
+    """Test writing and reading checkpoints"""
+
+    @pytest.mark.parametrize("name", ["clean.arrow", "clean.parquet"])
+    def test_round_trip_keeps_dtypes(self, clean_frame, tmp_path, name):
+        path = write_checkpoint(clean_frame, str(tmp_path / name))
+
+        df = read_checkpoint(path)
+
+        pd.testing.assert_frame_equal(df, clean_frame.reset_index(drop=True))
+
+    def test_csv_extension_writes_text(self, clean_frame, tmp_path):
+        path = write_checkpoint(clean_frame, str(tmp_path / "clean.csv"))
+
+        assert open(path).readline().strip() == ",".join(clean_frame.columns)
+        assert read_checkpoint(path, columns=["cliente"]).columns.tolist() == ["cliente"]
+
+    def test_mixed_id_column_is_written_as_text(self, tmp_path):
+        df = pd.DataFrame({"identificador_unico": [123, "8-2", None]})
+
+        result = read_checkpoint(write_checkpoint(df, str(tmp_path / "ids.arrow")))
+
+        assert result["identificador_unico"].tolist() == ["123", "8-2", None]
+
+    def test_writer_appends_chunks_with_first_chunk_types(self, tmp_path):
+        path = str(tmp_path / "clean.arrow")
+        first = pd.DataFrame({"cliente": [1, 2], "saldo": pd.array([1.5, 2.5], dtype="float32")})
+        second = pd.DataFrame({"cliente": [3], "saldo": pd.array([4], dtype="int32")})
+
+        with CheckpointWriter(path) as writer:
+            writer.write(first)
+            writer.write(second)
+
+        df = read_checkpoint(path)
+        assert writer.rows == 3 and df["cliente"].tolist() == [1, 2, 3]
+        assert str(df["saldo"].dtype) == "float32"
+
+
+class TestPart1Checkpoint:
+    """Test Part 1 writing its output as a checkpoint"""
+
+    @pytest.fixture
+    def raw_file(self, tmp_path):
+        path = tmp_path / "raw.csv"
+        pd.DataFrame({
+            "Cliente": [1, 2, 3, 4],
+            "Identificador_Unico": ["8-1", "8-2", "8-3", "8-4"],
+            "Edad": [30, None, 45, 52],
+            "Ciudad": ["PANAMA", "DAVID", "PANAMA", "COLON"],
+            "Ocupacion": ["DOCENTE", "CONTADOR", "DOCENTE", "VENDEDOR"],
+            "FechaIngresoEmpleo": ["01/02/2015", "15/06/2010", "", "20/11/2018"],
+            "NombreEmpleadorCliente": ["CCSS", "ICE", "CCSS", "OTRA"],
+            "monto_letra": [250.0, 400.0, 300.0, 150.0],
+            "saldo": [5000.0, 12000.0, 7000.0, 3000.0],
+            "fecha_inicio": ["01/01/2020", "01/03/2019", "15/07/2021", "01/01/2022"],
+            "fecha_vencimiento": ["01/01/2030", "01/03/2029", "15/07/2031", "01/01/2032"],
+        }).to_csv(path, index=False)
+        return str(path)
+
+    def test_in_memory_and_streaming_checkpoints_match(self, raw_file, tmp_path):
+        from production_events import SILENT
+        from production_part1_data_cleaning import production_part1_main
+
+        df_clean = production_part1_main(raw_file, str(tmp_path / "clean.arrow"), events=SILENT)
+        production_part1_main(raw_file, str(tmp_path / "stream.arrow"), chunksize=2, events=SILENT)
+
+        in_memory = read_checkpoint(str(tmp_path / "clean.arrow"))
+        pd.testing.assert_frame_equal(in_memory, df_clean.reset_index(drop=True))
+        # Streaming keeps a feature float32 when it is float in any chunk
+        pd.testing.assert_frame_equal(read_checkpoint(str(tmp_path / "stream.arrow")), in_memory, check_dtype=False)
+
+    def test_fitted_medians_are_not_recollected(self, raw_file):
+        from production_events import SILENT
+        from production_part1_data_cleaning import FINAL_FEATURES, collect_streaming_statistics
+
+        _, all_medians, _, missing = collect_streaming_statistics(raw_file, 2, pd.Timestamp("2026-10-19"),
+                                                                  events=SILENT)
+        _, fill_values, _, missing_only = collect_streaming_statistics(raw_file, 2, pd.Timestamp("2026-10-19"),
+                                                                       events=SILENT, median_features=[])
+
+        assert all_medians["edad"] == 45.0 and set(all_medians) <= set(FINAL_FEATURES)
+        assert fill_values == {} and missing_only == missing and missing["edad"] == 1
+
+    def test_master_dataset_loads_from_checkpoint(self, tmp_path, capsys):
+        from production_incremental_predictions import IncrementalPredictionManager
+
+        manager = IncrementalPredictionManager(str(tmp_path / "preds"))
+        master = pd.DataFrame({
+            "identificador_unico": ["8-1"], "cliente": [1], "predicted_income": [1500.0],
+            "income_segment": ["Medium"], "business_priority": ["High"], "confidence_category": ["High"],
+            "prediction_date": ["2026-10-19 10:00:00"], "batch_id": ["b1"],
+        })
+        assert manager.save_master_dataset(master)
+        assert os.path.exists(manager.master_checkpoint) and os.path.exists(manager.master_csv)
+
+        assert manager._master_source() == manager.master_checkpoint
+        pd.testing.assert_frame_equal(manager.load_master_dataset(), master)
@@ -0,0 +1,37 @@
+"""
+Tests for the shared date parsing engine used by the FeatureTransformer
+"""
+
+import numpy as np
+import pandas as pd
+
+import app.services.prediction_service  # noqa: F401  (puts production_test/ on sys.path)
+from production_date_parsing import infer_date_format, parse_date_column
+
+
+class TestDateParsing:
+    """Test format inference and per-value parsing of unique dates"""
+
+    def test_infers_production_format(self):
+        assert infer_date_format(np.array(["15/05/2010", "01/12/2020"], dtype=object)) == "%d/%m/%Y"
+        assert infer_date_format(np.array(["2010-05-15", "2020-12-01"], dtype=object)) == "%Y-%m-%d"
+
+    def test_mixed_formats_parsed_per_value(self):
+        series = pd.Series(["15/05/2010", "2010-05-15", "May 15, 2010", "15/05/2010", None, "garbage"])
+        parsed = parse_date_column(series)
+
+        assert list(parsed[:4]) == [pd.Timestamp("2010-05-15")] * 4
+        assert parsed[4:].isna().all()
+
+    def test_matches_row_by_row_parsing(self):
+        dates = pd.Series(["03/04/2015", "28/02/2019", "", "31/12/1999"] * 250)
+        expected = pd.to_datetime(dates, format="%d/%m/%Y", errors="coerce")
+        pd.testing.assert_series_equal(parse_date_column(dates), expected)
+
+    def test_preserves_index_and_all_missing(self):
+        series = pd.Series([np.nan, np.nan], index=[10, 11], name="fecha_inicio")
+        parsed = parse_date_column(series)
+
+        assert list(parsed.index) == [10, 11]
+        assert parsed.name == "fecha_inicio"
+        assert parsed.isna().all()
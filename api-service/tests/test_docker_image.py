@@ -0,0 +1,42 @@
+"""
+Smoke test of the API image layout: the service must import from the files
+the Dockerfile copies, not from the whole tree on disk
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROJECT_ROOT = os.path.dirname(API_DIR)
+
+
+def dockerfile_copies():
+    """(sources, destination) of every COPY instruction, continuation lines joined"""
+    with open(os.path.join(API_DIR, "Dockerfile"), encoding="utf-8") as f:
+        instructions = f.read().replace("\\\n", " ").splitlines()
+    copies = []
+    for line in instructions:
+        tokens = line.split()
+        if tokens and tokens[0] == "COPY":
+            copies.append((tokens[1:-1], tokens[-1]))
+    return copies
+
+
+def test_service_imports_from_image_layout(tmp_path):
+    # Build context paths -> /app; models/ and data/ are not needed to import
+    for sources, _ in dockerfile_copies():
+        for source in sources:
+            if source == "api-service/":
+                shutil.copytree(os.path.join(API_DIR, "app"), tmp_path / "api-service" / "app",
+                                ignore=shutil.ignore_patterns("__pycache__"))
+            elif source.startswith("production_test/"):
+                (tmp_path / "production_test").mkdir(exist_ok=True)
+                shutil.copy(os.path.join(PROJECT_ROOT, source), tmp_path / "production_test")
+
+    env = {**os.environ, "PYTHONPATH": str(tmp_path), "PYTHONDONTWRITEBYTECODE": "1"}
+    result = subprocess.run([sys.executable, "-c", "import app.main, app.services.prediction_service"],
+                            cwd=tmp_path / "api-service", env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
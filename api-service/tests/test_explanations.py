@@ -0,0 +1,139 @@
+"""
+Tests for feature contributions (explain=true) and the prediction cache
+"""
+
+import numpy as np
+import pytest
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+
+from app.models.schemas import CustomerInput
+from app.services.prediction_cache import PredictionCache
+from app.services.prediction_service import FeatureTransformer, PredictionService
+
+FEATURES = ["edad", "saldo", "monto_letra", "employment_years", "balance_to_payment_ratio"]
+
+
+def _customer(cliente: str, edad: int, saldo: float) -> CustomerInput:
+    return CustomerInput(
+        cliente=cliente,
+        edad=edad,
+        ocupacion="Ingeniero",
+        fechaingresoempleo="2015-03-01",
+        nombreempleadorcliente="Tech Company SA",
+        cargoempleocliente="Senior Engineer",
+        saldo=saldo,
+        monto_letra=250.0,
+        fecha_inicio="2019-06-01",
+    )
+
+
+@pytest.fixture
+def service():
+    """PredictionService around a small XGBoost model, without the artifact on disk"""
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.integers(18, 80, 300),
+        rng.gamma(2.0, 5000.0, 300),
+        rng.gamma(2.0, 200.0, 300),
+        rng.uniform(0, 30, 300),
+        rng.gamma(2.0, 20.0, 300),
+    ])
+    y = 500 + 10 * X[:, 0] + 0.05 * X[:, 1] + 20 * X[:, 3]
+    scaler = StandardScaler().fit(X)
+
+    svc = PredictionService.__new__(PredictionService)
+    svc.model = xgb.XGBRegressor(n_estimators=20, max_depth=3).fit(scaler.transform(X), y)
+    svc.scaler = scaler
+    svc.fallback_model = None
+    svc.feature_transformer = FeatureTransformer()
+    svc.feature_columns = FEATURES
+    svc.model_loaded = True
+    svc.model_version = "test"
+    svc.model_checksum = "0" * 64
+    svc.cache = PredictionCache(100)
+    return svc
+
+
+class TestExplanations:
+    """Test batched pred_contribs explanations"""
+
+    def test_default_path_has_no_factors(self, service):
+        assert service.predict_single(_customer("C1", 35, 5000.0)).top_factors is None
+
+    def test_contributions_sum_to_prediction(self, service):
+        customers = [_customer(f"C{i}", 20 + i, 1000.0 * i) for i in range(1, 6)]
+        results = service.predict_many(customers, explain=True)
+
+        scaled = service.scaler.transform(service._prepare_customers_data(customers))
+        bias = service.model.get_booster().predict(xgb.DMatrix(scaled), pred_contribs=True)[:, -1]
+        for result, base in zip(results, bias):
+            assert len(result.top_factors) == len(FEATURES)
+            total = sum(f["contribution"] for f in result.top_factors) + base
+            assert total == pytest.approx(result.predicted_income, abs=0.1)
+
+    def test_factors_sorted_by_magnitude(self, service):
+        factors = service.predict_single(_customer("C1", 60, 20000.0), explain=True).top_factors
+        magnitudes = [abs(f["contribution"]) for f in factors]
+        assert magnitudes == sorted(magnitudes, reverse=True)
+        assert {f["impact"] for f in factors} <= {"positive", "negative"}
+
+
+class TestPredictionCache:
+    """Test caching of predictions and contributions"""
+
+    def test_repeat_request_served_from_cache(self, service):
+        customer = _customer("C1", 35, 5000.0)
+        first = service.predict_single(customer)
+        second = service.predict_single(customer)
+
+        assert first.predicted_income == second.predicted_income
+        assert service.cache.stats()["hits"] == 1
+
+    def test_explain_recomputes_unexplained_entry(self, service):
+        customer = _customer("C1", 35, 5000.0)
+        service.predict_single(customer)
+        explained = service.predict_single(customer, explain=True)
+        plain = service.predict_single(customer)
+
+        assert explained.top_factors is not None
+        assert plain.top_factors is None
+        assert service.cache.stats()["hits"] == 1
+
+    def test_other_model_not_served_from_cache(self, service):
+        customer = _customer("C1", 35, 5000.0)
+        service.predict_single(customer)
+        service.model_checksum = "1" * 64
+        service.predict_single(customer)
+
+        assert service.cache.stats()["hits"] == 0
+        assert service.cache.stats()["entries"] == 2
+
+    def test_lru_eviction(self):
+        cache = PredictionCache(2)
+        cache.put("a", 1.0, None)
+        cache.put("b", 2.0, None)
+        cache.get("a")
+        cache.put("c", 3.0, None)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == (1.0, None)
+
+
+class TestRepeatedCustomers:
+    """Test customers with the same features scored once per batch"""
+
+    def test_duplicates_scored_once(self, service):
+        service.cache = None
+        customers = [_customer(f"C{i}", 30 + i % 3, 1000.0 * (i % 3)) for i in range(9)]
+        stats = {}
+
+        results = service.predict_many(customers, explain=True, scoring_stats=stats)
+
+        singles = [service.predict_single(customer, explain=True) for customer in customers]
+        assert [r.predicted_income for r in results] == [r.predicted_income for r in singles]
+        assert [r.top_factors for r in results] == [r.top_factors for r in singles]
+        assert [r.customer_id for r in results] == [f"C{i}" for i in range(9)]
+        assert stats == {"rows": 9, "unique_rows": 3}
+        summary = service.summarize_batch(9, results, scoring_stats=[stats])
+        assert summary["scored_feature_rows"] == 3 and summary["dedup_ratio"] == 3.0
@@ -0,0 +1,123 @@
+"""
+Tests for the concurrent, compressed export of prediction deliverables
+"""
+
+import gzip
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.services.prediction_service  # noqa: F401  (puts production_test/ on sys.path)
+from production_export import (export_files, export_path, open_export, write_csv_file, write_json_document,
+                               write_parquet_file)
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(5)
+    return pd.DataFrame({
+        "identificador_unico": [f"8-{i}" for i in range(250)],
+        "predicted_income": rng.gamma(2.0, 600.0, 250).round(2),
+        "income_segment": rng.choice(["LOW_INCOME_STABLE", "MIDDLE_INCOME_GROWTH"], 250),
+    })
+
+
+class TestFileWriters:
+    """Test chunked CSV / Parquet / JSON writers"""
+
+    @pytest.mark.parametrize("compression", [None, "gzip"])
+    def test_csv_in_chunks(self, df, tmp_path, compression):
+        path = export_path(str(tmp_path / "p.csv"), compression)
+
+        rows = write_csv_file(df, path, compression, chunksize=64)
+
+        content = gzip.open(path).read() if compression else open(path, "rb").read()
+        assert rows == 250 and path.endswith(".csv.gz" if compression else ".csv")
+        assert content == df.to_csv(index=False).encode("utf-8")
+
+    def test_empty_csv_keeps_header(self, df, tmp_path):
+        write_csv_file(df.iloc[:0], str(tmp_path / "e.csv"))
+
+        assert (tmp_path / "e.csv").read_text() == "identificador_unico,predicted_income,income_segment\n"
+
+    def test_parquet_row_groups(self, df, tmp_path):
+        import pyarrow.parquet as pq
+
+        path = str(tmp_path / "p.parquet")
+        write_parquet_file(df, path, "gzip", chunksize=100)
+
+        assert pq.ParquetFile(path).metadata.num_row_groups == 3
+        pd.testing.assert_frame_equal(pd.read_parquet(path), df)
+
+    @pytest.mark.parametrize("n_records", [0, 1, 5])
+    def test_json_document(self, tmp_path, n_records):
+        head = {"metadata": {"total": n_records, "range": {"min": 1.5, "max": "ñ"}}, "note": "x"}
+        records = [{"id": i, "value": i / 3, "nested": {"a": [1, 2]}} for i in range(n_records)]
+        path = tmp_path / "d.json"
+
+        with open(path, "wb") as f:
+            written = write_json_document(f, head, "records", [records[:2], records[2:]])
+        with open(tmp_path / "c.json", "wb") as f:
+            write_json_document(f, head, "records", [records], "compact")
+
+        expected = {**head, "records": records}
+        assert written == n_records
+        assert path.read_text(encoding="utf-8") == json.dumps(expected, indent=2, ensure_ascii=False)
+        assert json.loads((tmp_path / "c.json").read_text(encoding="utf-8")) == expected
+
+    def test_zstd_needs_zstandard(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(sys.modules, "zstandard", None)
+
+        with pytest.raises(ImportError, match="zstandard"):
+            open_export(str(tmp_path / "p.csv.zst"), "zstd")
+        with pytest.raises(ValueError, match="lz4"):
+            export_path("p.csv", "lz4")
+
+
+class TestExportFiles:
+    """Test concurrent deliverables and their reports"""
+
+    def test_reports(self, df, tmp_path):
+        exports = {
+            "csv": (str(tmp_path / "p.csv.gz"), lambda path: write_csv_file(df, path, "gzip")),
+            "parquet": (str(tmp_path / "p.parquet"), lambda path: write_parquet_file(df, path)),
+        }
+
+        reports = export_files(exports)
+
+        assert set(reports) == {"csv", "parquet"}
+        for report in reports.values():
+            assert report["rows"] == 250 and report["bytes"] == os.path.getsize(report["path"])
+            assert report["mb_per_s"] is not None and report["rows_per_s"] > 0
+
+    def test_error_is_raised(self, tmp_path):
+        def failing(path):
+            raise RuntimeError("disk full")
+
+        with pytest.raises(RuntimeError, match="disk full"):
+            export_files({"csv": (str(tmp_path / "p.csv"), failing)})
+
+    def test_part3_compressed_files(self, tmp_path, capsys):
+        from production_output import set_batch_metadata
+        from production_part3_business_formatting import format, save_prediction_files
+
+        predictions = pd.DataFrame({"identificador_unico": ["8-1", "8-2"], "cliente": [1, 2],
+                                    "predicted_income": [450.0, 1800.0],
+                                    "income_lower_90": [0.0, 1289.07], "income_upper_90": [1205.02, 2555.02]})
+        df = format(set_batch_metadata(predictions, confidence_level=0.9, prediction_date="2026-10-19 10:00:00",
+                                       model_version="XGBoost_v1.0_Final"))
+        plain = save_prediction_files(df, str(tmp_path))
+
+        saved = save_prediction_files(df, str(tmp_path), compression="gzip", parquet=True)
+
+        assert saved["csv_file"].endswith(".csv.gz") and saved["json_file"].endswith(".json.gz")
+        assert gzip.open(saved["csv_file"]).read() == open(plain["csv_file"], "rb").read()
+        assert json.load(gzip.open(saved["json_file"]))["customer_predictions"] == \
+            json.load(open(plain["json_file"], encoding="utf-8"))["customer_predictions"]
+        assert pd.read_parquet(saved["parquet_file"])["recommendation"].tolist() == \
+            pd.read_csv(plain["csv_file"])["recommendation"].tolist()
+        assert "MB/s" in capsys.readouterr().out
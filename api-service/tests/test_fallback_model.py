@@ -0,0 +1,172 @@
+"""
+Tests for the degraded-mode fallback model and load shedding
+"""
+
+import asyncio
+import pickle
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from app.services.fallback_model import FallbackModel, distill_fallback, evaluate_fallback, load_fallback_model
+from app.services.scheduler import BATCH, INTERACTIVE, FallbackSaturated, PriorityScheduler
+
+WEIGHTS = {"interactive": 16, "batch": 4, "background": 1}
+SLO_MS = {"interactive": 300, "batch": 5000, "background": 60000}
+FEATURES = ["edad", "saldo", "monto_letra"]
+
+
+class _LinearTeacher:
+    """Stand-in for the production model"""
+
+    def predict(self, X):
+        return 1000 + 200 * X[:, 0] + 50 * X[:, 1] - 30 * X[:, 2]
+
+
+@pytest.fixture
+def training_data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({
+        "edad": rng.integers(18, 80, 500),
+        "saldo": rng.gamma(2.0, 5000.0, 500),
+        "monto_letra": rng.gamma(2.0, 200.0, 500),
+        "unused": rng.normal(size=500),
+    })
+    scaler = StandardScaler().fit(X[FEATURES])
+    return X, scaler
+
+
+class TestFallbackModel:
+    """Test distillation and the accuracy-cost report"""
+
+    @pytest.mark.parametrize("kind", ["linear", "trees"])
+    def test_distilled_model_tracks_teacher(self, training_data, kind):
+        X, scaler = training_data
+        teacher = _LinearTeacher()
+        fallback = distill_fallback(teacher, scaler, FEATURES, X, kind=kind)
+
+        report = evaluate_fallback(teacher, scaler, fallback, X)
+
+        assert report["fallback_kind"] == kind
+        assert report["agreement_with_primary"]["r2"] > 0.9
+        assert set(report["latency_us_per_row"]) == {"primary", "fallback"}
+
+    def test_report_includes_target_error(self, training_data):
+        X, scaler = training_data
+        teacher = _LinearTeacher()
+        fallback = distill_fallback(teacher, scaler, FEATURES, X)
+        y = teacher.predict(scaler.transform(X[FEATURES])) + 10
+
+        report = evaluate_fallback(teacher, scaler, fallback, X, y)
+
+        assert report["against_target"]["primary"]["mae"] == pytest.approx(10, abs=0.01)
+        assert "rmse_increase" in report["against_target"]
+
+    def test_missing_feature_rejected(self, training_data):
+        X, scaler = training_data
+        with pytest.raises(ValueError):
+            distill_fallback(_LinearTeacher(), scaler, FEATURES, X.drop(columns=["saldo"]))
+
+    def test_unknown_kind_rejected(self):
+        with pytest.raises(ValueError):
+            FallbackModel("deep", FEATURES)
+
+    @pytest.mark.parametrize("kind", ["linear", "trees"])
+    def test_stored_as_plain_parameters(self, training_data, kind):
+        X, scaler = training_data
+        fallback = distill_fallback(_LinearTeacher(), scaler, FEATURES, X, kind=kind)
+
+        stored = pickle.dumps(fallback.to_dict())
+        restored = load_fallback_model(pickle.loads(stored))
+
+        # The artifact must not depend on this module to unpickle
+        assert b"app.services" not in stored
+        assert restored.kind == kind and restored.feature_columns == FEATURES
+        X_scaled = scaler.transform(X[FEATURES])
+        np.testing.assert_array_equal(restored.predict(X_scaled), fallback.predict(X_scaled))
+
+    def test_legacy_instance_and_missing_entry_accepted(self, training_data):
+        X, scaler = training_data
+        fallback = distill_fallback(_LinearTeacher(), scaler, FEATURES, X)
+
+        assert load_fallback_model(fallback) is fallback
+        assert load_fallback_model(None) is None
+
+
+class TestQueueWait:
+    """Test the scheduler's queue-wait estimate used for load shedding"""
+
+    def test_no_wait_with_free_worker(self):
+        scheduler = PriorityScheduler(2, WEIGHTS, SLO_MS, reserved_interactive=1)
+        assert scheduler.queue_wait_ms(INTERACTIVE) == 0.0
+        assert scheduler.queue_wait_ms(BATCH) == 0.0
+
+    def test_wait_grows_while_saturated(self):
+        gate = threading.Event()
+
+        def blocking():
+            gate.wait(5)
+
+        async def scenario():
+            scheduler = PriorityScheduler(1, WEIGHTS, SLO_MS, reserved_interactive=0)
+            jobs = [asyncio.ensure_future(scheduler.submit(BATCH, blocking)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            batch_wait = scheduler.queue_wait_ms(BATCH)
+            interactive_wait = scheduler.queue_wait_ms(INTERACTIVE)
+            gate.set()
+            await asyncio.gather(*jobs)
+            return batch_wait, interactive_wait
+
+        batch_wait, interactive_wait = asyncio.run(scenario())
+
+        # A queued batch job is ahead of new batch work, but not of interactive work
+        assert batch_wait >= 40
+        assert interactive_wait < batch_wait
+
+
+class TestFallbackPool:
+    """Test that shed work runs on a bounded pool of its own"""
+
+    def test_excess_shed_work_rejected(self):
+        gate = threading.Event()
+
+        def blocking():
+            gate.wait(5)
+            return "done"
+
+        async def scenario():
+            scheduler = PriorityScheduler(1, WEIGHTS, SLO_MS, reserved_interactive=0,
+                                          fallback_workers=1, fallback_max_pending=2)
+            jobs = [asyncio.ensure_future(scheduler.run_fallback(blocking)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            with pytest.raises(FallbackSaturated):
+                await scheduler.run_fallback(blocking)
+            stats = scheduler.stats()["fallback"]
+            gate.set()
+            results = await asyncio.gather(*jobs)
+            return results, stats, scheduler.stats()["fallback"]
+
+        results, saturated, drained = asyncio.run(scenario())
+
+        assert results == ["done", "done"]
+        assert saturated == {"workers": 1, "max_pending": 2, "pending": 2, "rejected": 1}
+        assert drained["pending"] == 0
+
+    def test_slot_held_until_cancelled_work_finishes(self):
+        gate = threading.Event()
+
+        async def scenario():
+            scheduler = PriorityScheduler(1, WEIGHTS, SLO_MS, fallback_max_pending=1)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(scheduler.run_fallback(gate.wait, 5), timeout=0.05)
+            # The thread is still scoring: the client timing out frees nothing
+            pending_after_timeout = scheduler.stats()["fallback"]["pending"]
+            gate.set()
+            await asyncio.sleep(0.05)
+            return pending_after_timeout, scheduler.stats()["fallback"]["pending"]
+
+        assert asyncio.run(scenario()) == (1, 0)
@@ -0,0 +1,60 @@
+"""
+Tests for the shared FeatureTransformer (fit / transform / save / load)
+"""
+
+import pickle
+
+import pandas as pd
+import pytest
+
+from app.services.prediction_service import FeatureTransformer
+from production_feature_transformer import API_FEATURES, MODEL_FEATURES
+
+
+def _raw(n: int = 6) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Cliente": range(n),
+        "Edad": [25, 40, None, 55, 33, 61][:n],
+        "Ciudad": ["Panama", "Colon", "Panama", "David", "Panama", "Colon"][:n],
+        "Ocupacion": ["Ingeniero", "Docente", "Ingeniero", "Docente", "Contador", "Docente"][:n],
+        "FechaIngresoEmpleo": ["15/05/2010", "2018-01-01", None, "01/02/2005", "20/11/2015", "03/03/2000"][:n],
+        "NombreEmpleadorCliente": ["Tech SA", "Gobierno", "Tech SA", "Banco", "Tech SA", "Gobierno"][:n],
+        "monto_letra": [250.0, 0.0, 300.0, None, 120.0, 410.0][:n],
+        "saldo": [5000.0, 1200.0, 80000.0, 300.0, None, 9000.0][:n],
+        "fecha_inicio": ["01/06/2019"] * n,
+        "fecha_vencimiento": ["01/06/2029"] * n,
+    })
+
+
+@pytest.fixture
+def fitted():
+    return FeatureTransformer(reference_date=pd.Timestamp("2025-01-01")).fit(_raw())
+
+
+class TestFeatureTransformer:
+    """Test fitting, stateless transform and the versioned artifact"""
+
+    def test_fit_captures_state(self, fitted):
+        assert fitted.is_fitted and fitted.has_combo_table
+        assert fitted.freq_maps["nombreempleadorcliente"]["TECH SA"] == 3
+        assert set(MODEL_FEATURES) <= set(fitted.fill_values)
+
+    def test_rows_independent_of_batch(self, fitted):
+        batch = fitted.transform(_raw())[MODEL_FEATURES + API_FEATURES]
+        singles = pd.concat([fitted.transform(_raw().iloc[[i]].copy()) for i in range(6)])
+
+        pd.testing.assert_frame_equal(batch, singles[MODEL_FEATURES + API_FEATURES], check_dtype=False)
+        assert not batch.isna().any().any()
+
+    def test_save_load_roundtrip(self, fitted, tmp_path):
+        path = fitted.save(str(tmp_path / "transformer.pkl"))
+        loaded = FeatureTransformer.load(path)
+
+        pd.testing.assert_frame_equal(loaded.transform(_raw()), fitted.transform(_raw()))
+        assert loaded.training_rows == 6
+
+    def test_unknown_artifact_version_rejected(self, tmp_path):
+        path = tmp_path / "transformer.pkl"
+        path.write_bytes(pickle.dumps({"format_version": 99}))
+        with pytest.raises(ValueError, match="Unsupported feature transformer format"):
+            FeatureTransformer.load(str(path))
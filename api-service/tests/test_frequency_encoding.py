@@ -0,0 +1,46 @@
+"""
+Tests for batch-independent frequency encoding (location x occupation table)
+"""
+
+import pandas as pd
+
+from app.services.prediction_service import FeatureTransformer
+from production_frequency_encoding import COMBO_TABLE_KEY, build_combo_table
+
+
+def _customers():
+    return pd.DataFrame({
+        "ciudad": ["Panama", "Colon", "David", None],
+        "ocupacion": ["Ingeniero", " docente", "Ingeniero", "Docente"],
+        "nombreempleadorcliente": ["Tech Company SA", "Otro", "Tech Company SA", "Otro"],
+    })
+
+
+class TestFrequencyEncoding:
+    """Test training-time combo table lookups"""
+
+    def test_combo_table_counts(self):
+        table = build_combo_table(
+            pd.Series(["Panama", "PANAMA ", "Colon"]), pd.Series(["Ingeniero", "INGENIERO", "Docente"])
+        )
+        assert table["ciudad"] == ["PANAMA", "COLON"]
+        assert table["counts"].tolist() == [[2, 0], [0, 1]]
+
+    def test_encoding_independent_of_batch(self):
+        table = build_combo_table(
+            pd.Series(["Panama", "Panama", "Colon", None]), pd.Series(["Ingeniero", "Ingeniero", "Docente", "Docente"])
+        )
+        transformer = FeatureTransformer({COMBO_TABLE_KEY: table, "nombreempleadorcliente": {"TECH COMPANY SA": 60, "Others": 1}})
+
+        batch = transformer.add_frequency_features(_customers())
+        singles = [transformer.add_frequency_features(_customers().iloc[[i]].copy()) for i in range(4)]
+
+        # Unseen city (David) falls back to the default frequency
+        assert batch["location_x_occupation"].tolist() == [2, 1, 1, 1]
+        assert [s["location_x_occupation"].iloc[0] for s in singles] == [2, 1, 1, 1]
+        assert batch["nombreempleadorcliente_consolidated_freq"].tolist() == [60, 1, 60, 1]
+
+    def test_defaults_without_mappings(self):
+        df = FeatureTransformer().add_frequency_features(_customers())
+        assert (df["location_x_occupation"] == 1).all()
+        assert (df["ocupacion_consolidated_freq"] == 1).all()
@@ -0,0 +1,98 @@
+"""
+Tests for the streamed customer predictions JSON of Part 3
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.services.prediction_service  # noqa: F401  (puts production_test/ on sys.path)
+import production_json_export
+from production_json_export import text_values, write_predictions_json
+
+GENERATION_DATE = "2026-10-19 10:00:00"
+
+
+@pytest.fixture
+def export_df(capsys):
+    from production_output import export_frame, set_batch_metadata
+    from production_part3_business_formatting import format
+
+    df = pd.DataFrame({
+        "identificador_unico": ["8-1", None, "8-3ñ", "8-4", "8-5"],
+        "cliente": np.array([1, 2, np.nan, 4, 5], dtype="float32"),
+        "predicted_income": np.array([450.0, 1200.0, np.nan, 3500.0, 999.995], dtype="float32"),
+        "income_lower_90": [0.0, 689.07, 2.675, 2989.07, 489.065],
+        "income_upper_90": [1205.02, 1955.02, 1.005, 4255.02, 1755.015],
+    })
+    df = set_batch_metadata(df, confidence_level=0.9, prediction_date=GENERATION_DATE,
+                            model_version="XGBoost_v1.0_Final")
+    return export_frame(format(df))
+
+
+def previous_document(df):
+    """The document Part 3 built row by row with iterrows()"""
+    from production_part3_business_formatting import safe_round_float, safe_string
+
+    records = [{
+        "customer_identification": {"identificador_unico": safe_string(row.get("identificador_unico", "")),
+                                    "cliente": safe_string(row.get("cliente", ""))},
+        "income_prediction": {
+            "predicted_income": safe_round_float(row["predicted_income"]),
+            "confidence_interval": {"lower_bound": safe_round_float(row["income_lower_90"]),
+                                    "upper_bound": safe_round_float(row["income_upper_90"]),
+                                    "confidence_level": safe_round_float(row["confidence_level"], 2),
+                                    "interval_width": safe_round_float(row["ci_width"])}
+        },
+        "business_classification": {column: safe_string(row[column]) for column in
+                                    ("income_segment", "confidence_category", "business_priority", "recommendation")},
+        "metadata": {"prediction_date": safe_string(row["prediction_date"]),
+                     "model_version": safe_string(row["model_version"])}
+    } for _, row in df.iterrows()]
+    return {"prediction_summary": {"total_customers": len(records), "generation_date": GENERATION_DATE,
+                                   "model_version": "XGBoost_v1.0_Final"},
+            "customer_predictions": records}
+
+
+class TestStreamedJson:
+    """Test the streamed writer against the previous document"""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    @pytest.mark.parametrize("chunksize", [1, 2, 50000])
+    def test_pretty_file_is_unchanged(self, export_df, tmp_path, monkeypatch, use_orjson, chunksize):
+        if not use_orjson:
+            monkeypatch.setattr(production_json_export, "orjson", None)
+        path = tmp_path / "predictions.json"
+
+        report = write_predictions_json(export_df, str(path), "pretty", chunksize, GENERATION_DATE)
+
+        expected = json.dumps(previous_document(export_df), indent=2, ensure_ascii=False)
+        assert path.read_text(encoding="utf-8") == expected
+        assert report["records"] == 5 and report["bytes"] == path.stat().st_size
+
+    def test_compact_and_ndjson(self, export_df, tmp_path):
+        expected = previous_document(export_df)
+
+        write_predictions_json(export_df, str(tmp_path / "c.json"), "compact", 2, GENERATION_DATE)
+        write_predictions_json(export_df, str(tmp_path / "p.ndjson"), "ndjson", 2)
+
+        compact = (tmp_path / "c.json").read_text(encoding="utf-8")
+        assert "\n" not in compact and json.loads(compact) == expected
+        lines = (tmp_path / "p.ndjson").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == expected["customer_predictions"]
+
+    def test_empty_frame_and_unknown_format(self, export_df, tmp_path):
+        path = tmp_path / "empty.json"
+        write_predictions_json(export_df.iloc[:0], str(path), "pretty", generation_date=GENERATION_DATE)
+
+        assert path.read_text() == json.dumps(previous_document(export_df.iloc[:0]), indent=2)
+        with pytest.raises(ValueError, match="yaml"):
+            write_predictions_json(export_df, str(path), "yaml")
+
+    def test_text_values(self):
+        labels = pd.Series(pd.Categorical(["B", None, "A"], categories=["A", "B"]))
+
+        assert text_values(labels) == ["B", "", "A"]
+        assert text_values(pd.Series([1.5, np.nan, 3.0])) == ["1.5", "", "3.0"]
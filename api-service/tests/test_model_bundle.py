@@ -0,0 +1,156 @@
+"""
+Tests for the versioned model bundle read by the pipelines and the API
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+
+from app.models.schemas import CustomerInput
+from app.services.prediction_cache import PredictionCache
+from app.services.prediction_service import FeatureTransformer, PredictionService
+from production_model_bundle import MANIFEST_FILE, ModelBundle, is_model_bundle, save_model_bundle
+
+FEATURES = ["edad", "saldo", "monto_letra", "employment_years", "balance_to_payment_ratio"]
+
+
+@pytest.fixture
+def training_data():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.integers(18, 80, 300),
+        rng.gamma(2.0, 5000.0, 300),
+        rng.gamma(2.0, 200.0, 300),
+        rng.uniform(0, 30, 300),
+        rng.gamma(2.0, 20.0, 300),
+    ])
+    y = 500 + 10 * X[:, 0] + 0.05 * X[:, 1] + 20 * X[:, 3]
+    return X, y
+
+
+@pytest.fixture
+def artifacts(training_data):
+    X, y = training_data
+    scaler = StandardScaler().fit(X)
+    model = xgb.XGBRegressor(n_estimators=20, max_depth=3).fit(scaler.transform(X), y)
+    return model, scaler
+
+
+@pytest.fixture
+def bundle_path(artifacts, tmp_path):
+    model, scaler = artifacts
+    return save_model_bundle(
+        str(tmp_path / "bundle"), model, FEATURES, scaler,
+        transformer=FeatureTransformer({"ocupacion": {"INGENIERO": 150}}),
+        model_version="2.0.0", training_info={"rows": 300}
+    )
+
+
+class TestModelBundle:
+    """Test writing, verifying and reading bundles"""
+
+    def test_predictions_match_the_estimator(self, artifacts, training_data, bundle_path):
+        model, scaler = artifacts
+        X, _ = training_data
+
+        bundle = ModelBundle.load(bundle_path)
+
+        assert is_model_bundle(bundle_path)
+        assert bundle.feature_columns == FEATURES and bundle.model_version == "2.0.0"
+        np.testing.assert_array_equal(bundle.scaler.transform(X), scaler.transform(X))
+        np.testing.assert_array_equal(bundle.model.predict(bundle.scaler.transform(X)), model.predict(scaler.transform(X)))
+        np.testing.assert_array_equal(bundle.predict(pd.DataFrame(X, columns=FEATURES)), model.predict(scaler.transform(X)))
+        assert bundle.transformer.freq_maps["ocupacion"] == {"INGENIERO": 150}
+
+    def test_corrupted_member_fails_to_load(self, bundle_path):
+        with open(os.path.join(bundle_path, "booster.ubj"), "ab") as f:
+            f.write(b"\0")
+
+        with pytest.raises(ValueError, match="checksum"):
+            ModelBundle.load(bundle_path)
+
+    def test_optional_members_are_read_on_first_use(self, bundle_path):
+        info_path = os.path.join(bundle_path, "training_info.json")
+        bundle = ModelBundle.load(bundle_path)
+        assert bundle.training_info == {"rows": 300}
+
+        with open(info_path, "w") as f:
+            f.write('{"rows": 1}')
+
+        # Loading does not read optional members; reading one verifies it
+        bundle = ModelBundle.load(bundle_path)
+        with pytest.raises(ValueError, match="checksum"):
+            bundle.training_info
+        assert bundle.member("explainer") is None
+
+    def test_unknown_format_version(self, bundle_path):
+        manifest_path = os.path.join(bundle_path, MANIFEST_FILE)
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        manifest["format_version"] = 99
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+
+        with pytest.raises(ValueError, match="Unsupported model bundle format"):
+            ModelBundle.load(bundle_path)
+
+
+class TestBundleConsumers:
+    """Test the API service and Part 2 reading a bundle"""
+
+    def test_service_scores_from_bundle(self, artifacts, bundle_path):
+        model, scaler = artifacts
+        svc = PredictionService.__new__(PredictionService)
+        svc.model_version = "1.0.0"
+        svc.cache = None
+        svc._load_bundle(bundle_path)
+
+        customer = CustomerInput(
+            cliente="C1", edad=35, ocupacion="Ingeniero", fechaingresoempleo="2015-03-01",
+            nombreempleadorcliente="Tech Company SA", cargoempleocliente="Senior Engineer",
+            saldo=5000.0, monto_letra=250.0, fecha_inicio="2019-06-01",
+        )
+        result = svc.predict_single(customer, explain=True)
+        expected = model.predict(scaler.transform(svc._prepare_customers_data([customer])))[0]
+
+        assert result.predicted_income == pytest.approx(float(expected))
+        assert result.model_version == "2.0.0" and len(result.top_factors) == len(FEATURES)
+        assert svc.training_info == {"rows": 300} and svc.fallback_model is None
+
+    def test_bundle_load_clears_cache(self, bundle_path):
+        svc = PredictionService.__new__(PredictionService)
+        svc.model_version = "1.0.0"
+        svc.cache = PredictionCache(10)
+        svc.cache.put("stale", 1.0, None)
+
+        svc._load_bundle(bundle_path)
+
+        assert svc.cache.stats()["entries"] == 0 and len(svc.model_checksum) == 64
+
+    def test_part2_uses_bundle_features_and_interval(self, tmp_path, monkeypatch):
+        import production_part2_model_inference as part2
+        from production_events import SILENT
+        from production_feature_transformer import MODEL_FEATURES
+
+        rng = np.random.default_rng(1)
+        df_clean = pd.DataFrame(rng.uniform(1, 100, (50, len(MODEL_FEATURES))), columns=MODEL_FEATURES)
+        df_clean.insert(0, "cliente", range(50))
+        model = xgb.XGBRegressor(n_estimators=10, max_depth=3).fit(df_clean[MODEL_FEATURES], df_clean["saldo"] * 10)
+        interval = {"lower_offset": -100.0, "upper_offset": 200.0, "confidence_level": 0.8}
+        path = save_model_bundle(str(tmp_path / "bundle"), model, MODEL_FEATURES, interval=interval)
+        clean_path = str(tmp_path / "clean.csv")
+        # Columns in another order than the model's
+        df_clean[["cliente"] + MODEL_FEATURES[::-1]].to_csv(clean_path, index=False)
+        monkeypatch.setattr(part2, "MODEL_BUNDLE_PATH", path)
+
+        predictions = part2.production_part2_main(clean_path, events=SILENT)
+
+        expected = model.predict(pd.read_csv(clean_path)[MODEL_FEATURES])
+        np.testing.assert_allclose(predictions["predicted_income"], expected.round(2))
+        np.testing.assert_allclose(predictions["income_upper_90"], (expected + 200.0).round(2))
+        assert (predictions["confidence_level"] == 0.8).all()
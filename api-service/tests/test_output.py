@@ -0,0 +1,71 @@
+"""
+Tests for the compact prediction frames of Part 2 / Part 3 and their exports
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.services.prediction_service  # noqa: F401  (puts production_test/ on sys.path)
+from production_output import constant_column, export_frame, label_counts, set_batch_metadata
+
+
+@pytest.fixture
+def predictions():
+    df = pd.DataFrame({
+        "identificador_unico": ["8-1", "8-2", "8-3", "8-4"],
+        "cliente": [1, 2, 3, 4],
+        "predicted_income": np.array([450.0, 1200.0, 1800.0, 3500.0], dtype="float32"),
+    })
+    df["income_lower_90"] = np.maximum(df["predicted_income"] - 510.93, 0).round(2)
+    df["income_upper_90"] = (df["predicted_income"] + 755.02).round(2)
+    return set_batch_metadata(df, confidence_level=0.9, prediction_date="2026-10-19 10:00:00",
+                              model_version="XGBoost_v1.0_Final", ci_lower_offset=-510.93)
+
+
+class TestCompactFrame:
+    """Test batch metadata and label columns stored as codes"""
+
+    def test_batch_metadata_is_stored_once(self, predictions):
+        assert predictions.attrs["batch"]["model_version"] == "XGBoost_v1.0_Final"
+        assert predictions.attrs["batch"]["ci_lower_offset"] == -510.93
+        assert "ci_width" not in predictions.columns
+        for column in ("confidence_level", "prediction_date", "model_version"):
+            assert isinstance(predictions[column].dtype, pd.CategoricalDtype)
+            assert len(predictions[column].cat.categories) == 1
+            assert predictions[column].cat.codes.dtype == np.int8
+        assert (predictions["confidence_level"] == 0.9).all()
+
+    def test_constant_column_memory(self):
+        column = pd.Series(constant_column("2026-10-19 10:00:00", 1_000_000))
+
+        assert column.memory_usage(deep=True) < 1.1e6
+
+    def test_export_expands_values(self, predictions):
+        exported = export_frame(predictions)
+
+        assert list(exported.columns)[-1] == "ci_width"
+        np.testing.assert_allclose(exported["ci_width"], [1205.02, 1265.95, 1265.95, 1265.95], rtol=1e-6)
+        assert exported["model_version"].dtype == object and exported["confidence_level"].dtype == np.float64
+        assert exported.drop(columns="ci_width").astype(str).equals(predictions.astype(str))
+
+
+class TestPart3Labels:
+    """Test Part 3 label columns as categoricals"""
+
+    def test_labels_are_categorical_and_exported_as_text(self, predictions, tmp_path, capsys):
+        from production_part3_business_formatting import BUSINESS_PRIORITIES, format, save_prediction_files
+
+        df = format(predictions)
+
+        assert list(df["business_priority"].cat.categories) == BUSINESS_PRIORITIES
+        assert df["income_segment"].tolist() == [
+            "LOW_INCOME_HIGH_RISK", "MIDDLE_INCOME_STABLE", "MIDDLE_INCOME_GROWTH", "HIGH_INCOME_PREMIUM"
+        ]
+        # Unused categories are not counted
+        assert label_counts(df["confidence_category"]) == {"MEDIUM_CONFIDENCE": 3, "LOWER_CONFIDENCE": 1}
+
+        saved = save_prediction_files(df, str(tmp_path))
+        csv = pd.read_csv(saved["csv_file"])
+        assert (csv["recommendation"] == "Requires manual review before product offers").all()
+        assert csv["ci_width"].round(2).tolist() == [1205.02, 1265.95, 1265.95, 1265.95]
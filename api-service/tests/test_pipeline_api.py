@@ -0,0 +1,105 @@
+"""
+Tests for the in-memory stage API of the batch pipelines (clean, score, format, run)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+import app.services.prediction_service  # noqa: F401  (puts production_test/ on sys.path)
+from production_events import SILENT
+
+
+@pytest.fixture
+def df_raw():
+    return pd.DataFrame({
+        "Cliente": [1, 2, 3, 4],
+        "Identificador_Unico": ["8-1", "8-2", "8-3", "8-4"],
+        "Edad": [30, None, 45, 52],
+        "Ciudad": ["PANAMA", "DAVID", "PANAMA", "COLON"],
+        "Ocupacion": ["DOCENTE", "CONTADOR", "DOCENTE", "VENDEDOR"],
+        "FechaIngresoEmpleo": ["01/02/2015", "15/06/2010", "", "20/11/2018"],
+        "NombreEmpleadorCliente": ["CCSS", "ICE", "CCSS", "OTRA"],
+        "monto_letra": [250.0, 400.0, 300.0, 150.0],
+        "saldo": [5000.0, 12000.0, 7000.0, 3000.0],
+        "fecha_inicio": ["01/01/2020", "01/03/2019", "15/07/2021", "01/01/2022"],
+        "fecha_vencimiento": ["01/01/2030", "01/03/2029", "15/07/2031", "01/01/2032"],
+    })
+
+
+@pytest.fixture
+def model_bundle(tmp_path, monkeypatch):
+    """A small bundled model over the 11 features, used by Part 2"""
+    import production_part2_model_inference as part2
+    from production_feature_transformer import MODEL_FEATURES
+    from production_model_bundle import save_model_bundle
+
+    rng = np.random.default_rng(2)
+    X = pd.DataFrame(rng.uniform(1, 100, (60, len(MODEL_FEATURES))), columns=MODEL_FEATURES)
+    model = xgb.XGBRegressor(n_estimators=10, max_depth=3).fit(X, X["saldo"] * 10)
+    path = save_model_bundle(str(tmp_path / "bundle"), model, MODEL_FEATURES)
+    monkeypatch.setattr(part2, "MODEL_BUNDLE_PATH", path)
+    return model
+
+
+class TestStages:
+    """Test each stage as a DataFrame-in/DataFrame-out function"""
+
+    def test_clean_matches_part1_main(self, df_raw, tmp_path):
+        from production_part1_data_cleaning import clean, production_part1_main
+
+        raw_file = str(tmp_path / "raw.csv")
+        df_raw.to_csv(raw_file, index=False)
+        original = df_raw.copy()
+
+        df_clean = clean(df_raw, SILENT)
+
+        pd.testing.assert_frame_equal(df_raw, original)
+        # Part 1 reads numerics as float32; the clean frame has the same values
+        pd.testing.assert_frame_equal(df_clean, production_part1_main(raw_file, events=SILENT), check_dtype=False)
+
+    def test_score_and_format(self, df_raw, model_bundle):
+        from production_feature_transformer import MODEL_FEATURES
+        from production_part1_data_cleaning import clean
+        from production_part2_model_inference import score
+        from production_part3_business_formatting import format as format_predictions
+
+        df_clean = clean(df_raw, SILENT)
+        df_predictions = score(df_clean, SILENT)
+        df_business = format_predictions(df_predictions, SILENT)
+
+        expected = model_bundle.predict(df_clean[MODEL_FEATURES])
+        np.testing.assert_allclose(df_predictions["predicted_income"], expected.round(2), rtol=1e-6)
+        assert {"income_segment", "business_priority", "confidence_category"} <= set(df_business.columns)
+        assert len(df_business) == len(df_raw)
+
+
+class TestRun:
+    """Test the composed pipelines"""
+
+    def test_run_writes_nothing_without_checkpoints(self, df_raw, model_bundle, tmp_path, monkeypatch):
+        from production_pipeline_complete import run
+
+        monkeypatch.chdir(tmp_path)
+        before = set(os.listdir(tmp_path))
+
+        df_business = run(df_raw, events=SILENT)
+
+        assert df_business["cliente"].tolist() == [1, 2, 3, 4]
+        assert set(os.listdir(tmp_path)) == before
+
+    def test_checkpoints_are_unique_per_run(self, df_raw, model_bundle, tmp_path):
+        from production_checkpoints import read_checkpoint
+        from production_pipeline_complete import run
+
+        checkpoint_dir = tmp_path / "checkpoints"
+        first = run(df_raw, checkpoint_dir=str(checkpoint_dir), events=SILENT)
+        run(df_raw, checkpoint_dir=str(checkpoint_dir), events=SILENT)
+
+        files = sorted(os.listdir(checkpoint_dir))
+        assert len(files) == 4
+        predictions = read_checkpoint(str(checkpoint_dir / next(f for f in files if f.startswith("predictions"))))
+        np.testing.assert_allclose(predictions["predicted_income"], first["predicted_income"])
@@ -0,0 +1,123 @@
+"""
+Tests for the structured pipeline events shared by the batch pipelines
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+import app.services.prediction_service  # noqa: F401  (puts production_test/ on sys.path)
+from production_events import SILENT, JsonLinesSink, MetricsSink, PipelineEvents
+
+
+@pytest.fixture
+def raw_file(tmp_path):
+    path = tmp_path / "raw.csv"
+    pd.DataFrame({
+        "Cliente": [1, 2, 3, 4],
+        "Identificador_Unico": ["8-1", "8-2", "8-3", "8-4"],
+        "Edad": [30, None, 45, 52],
+        "Ciudad": ["PANAMA", "DAVID", "PANAMA", "COLON"],
+        "Ocupacion": ["DOCENTE", "CONTADOR", "DOCENTE", "VENDEDOR"],
+        "FechaIngresoEmpleo": ["01/02/2015", "15/06/2010", "", "20/11/2018"],
+        "NombreEmpleadorCliente": ["CCSS", "ICE", "CCSS", "OTRA"],
+        "monto_letra": [250.0, 400.0, 300.0, 150.0],
+        "saldo": [5000.0, 12000.0, 7000.0, 3000.0],
+        "fecha_inicio": ["01/01/2020", "01/03/2019", "15/07/2021", "01/01/2022"],
+        "fecha_vencimiento": ["01/01/2030", "01/03/2029", "15/07/2031", "01/01/2032"],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+class TestPipelineEvents:
+    """Test the emitter and its sinks"""
+
+    def test_stage_reports_fields_duration_and_memory(self):
+        records = []
+        events = PipelineEvents(records.append, run="test")
+
+        with events.stage("load") as stage:
+            stage["rows_out"] = 10
+
+        start, end = records
+        assert (start["event"], end["event"]) == ("stage_start", "stage_end")
+        assert end["stage"] == "load" and end["rows_out"] == 10 and end["run"] == "test"
+        assert end["status"] == "ok" and end["duration_s"] >= 0 and end["peak_rss_mb"] > 0
+
+    def test_failed_and_raising_stages(self):
+        metrics = MetricsSink()
+        events = PipelineEvents(metrics)
+
+        with events.stage("validate") as stage:
+            stage["status"] = "failed"
+        with pytest.raises(ValueError):
+            with events.stage("validate"):
+                raise ValueError("boom")
+
+        assert metrics.stages["validate"]["runs"] == 2
+        assert metrics.stages["validate"]["failures"] == 2
+
+    def test_silent_emitter_does_nothing(self):
+        assert not SILENT.enabled and not SILENT.verbose
+        with SILENT.stage("load") as stage:
+            stage["rows_out"] = 1
+        SILENT.message("not shown")
+        SILENT.emit("imputed", feature="edad", count=1)
+
+    def test_quiet_keeps_events_without_messages(self):
+        records = []
+        events = PipelineEvents(records.append).quiet()
+
+        events.message("progress line")
+        events.emit("imputed", feature="edad", count=2)
+
+        assert [record["event"] for record in records] == ["imputed"]
+
+    def test_json_lines_sink(self, tmp_path):
+        path = tmp_path / "logs" / "events.jsonl"
+        sink = JsonLinesSink(str(path))
+        events = PipelineEvents(sink)
+
+        events.message("not written")
+        with events.stage("save"):
+            pass
+        sink.close()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["event"] for line in lines] == ["stage_start", "stage_end"]
+
+
+class TestPart1Events:
+    """Test the events Part 1 emits in place of printed output"""
+
+    def test_silent_run_prints_nothing(self, raw_file, tmp_path, capsys):
+        from production_part1_data_cleaning import production_part1_main
+
+        df = production_part1_main(raw_file, str(tmp_path / "clean.csv"), events=SILENT)
+
+        assert len(df) == 4
+        assert capsys.readouterr().out == ""
+
+    def test_metrics_cover_stages_and_imputation(self, raw_file, tmp_path, capsys):
+        from production_part1_data_cleaning import production_part1_main
+
+        metrics = MetricsSink()
+        production_part1_main(raw_file, str(tmp_path / "clean.csv"), events=PipelineEvents(metrics))
+        summary = metrics.summary()
+
+        assert capsys.readouterr().out == ""
+        assert {"part1.load", "part1.features", "part1.validate", "part1.save"} <= set(summary["stages"])
+        assert summary["stages"]["part1.load"]["rows_out"] == 4
+        assert summary["imputed"]["edad"] == 1
+        assert summary["counters"]["ingestion"] == 1
+
+    def test_streaming_reports_the_same_imputation(self, raw_file, tmp_path):
+        from production_part1_data_cleaning import production_part1_main
+
+        metrics = MetricsSink()
+        production_part1_main(raw_file, str(tmp_path / "clean.csv"), chunksize=2, events=PipelineEvents(metrics))
+
+        assert metrics.imputed["edad"] == 1
+        assert metrics.stages["part1.features"]["rows_out"] == 4
+        assert metrics.counters["chunk_written"] >= 1
@@ -0,0 +1,141 @@
+"""
+Tests for token-bucket admission control
+"""
+
+import asyncio
+import sqlite3
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core import rate_limit
+from app.core.config import get_settings
+from app.core.rate_limit import (
+    MemoryTokenBucketBackend,
+    RateLimiter,
+    SQLiteTokenBucketBackend,
+    enforce_rate_limit,
+)
+
+
+class TestMemoryTokenBucket:
+    """Test the in-process backend"""
+
+    def test_burst_then_reject(self):
+        """Bucket admits up to capacity, then rejects with a retry hint"""
+        backend = MemoryTokenBucketBackend(capacity=10, refill_rate=2, max_clients=100)
+
+        assert backend.acquire("a", cost=10, now=0.0).allowed
+        decision = backend.acquire("a", cost=4, now=0.0)
+        assert not decision.allowed
+        assert decision.retry_after == pytest.approx(2.0)
+
+    def test_refill_over_time(self):
+        """Tokens refill at the configured rate, capped at capacity"""
+        backend = MemoryTokenBucketBackend(capacity=10, refill_rate=2, max_clients=100)
+
+        backend.acquire("a", cost=10, now=0.0)
+        assert backend.acquire("a", cost=4, now=2.0).allowed
+        assert backend.acquire("a", cost=1, now=100.0).remaining == pytest.approx(9.0)
+
+    def test_batch_cost_above_capacity_never_admitted(self):
+        """A charge larger than the burst size is rejected without a retry time"""
+        backend = MemoryTokenBucketBackend(capacity=10, refill_rate=2, max_clients=100)
+
+        decision = backend.acquire("a", cost=11, now=0.0)
+        assert not decision.allowed
+        assert "Retry-After" not in decision.headers()
+
+    def test_lru_bound(self):
+        """Least recently seen clients are evicted once the table is full"""
+        backend = MemoryTokenBucketBackend(capacity=10, refill_rate=0.1, max_clients=2)
+
+        backend.acquire("a", cost=10, now=0.0)
+        backend.acquire("b", cost=1, now=0.0)
+        backend.acquire("b", cost=1, now=0.0)
+        backend.acquire("c", cost=1, now=0.0)  # evicts "a"
+
+        assert len(backend) == 2
+        assert backend.acquire("a", cost=10, now=0.0).allowed
+
+
+class TestSQLiteTokenBucket:
+    """Test the shared local backend"""
+
+    def test_budget_shared_between_instances(self, tmp_path):
+        """Two backends on the same file (two workers) share one budget"""
+        path = str(tmp_path / "buckets.db")
+        worker_1 = SQLiteTokenBucketBackend(path, capacity=10, refill_rate=1, max_clients=100)
+        worker_2 = SQLiteTokenBucketBackend(path, capacity=10, refill_rate=1, max_clients=100)
+
+        assert worker_1.acquire("a", cost=6, now=1000.0).allowed
+        assert not worker_2.acquire("a", cost=6, now=1000.0).allowed
+        assert worker_2.acquire("a", cost=6, now=1002.0).allowed
+
+    def test_prune_keeps_most_recent(self, tmp_path):
+        """The table is trimmed back to max_clients rows"""
+        backend = SQLiteTokenBucketBackend(
+            str(tmp_path / "buckets.db"), capacity=10, refill_rate=1, max_clients=3, prune_interval=5
+        )
+
+        for i in range(5):
+            backend.acquire(f"client-{i}", cost=1, now=1000.0 + i)
+
+        assert len(backend) == 3
+
+
+class TestEnforcement:
+    """Test admission control in the request path"""
+
+    def test_oversized_batch_rejected_before_charging(self, monkeypatch):
+        """A batch above max_batch_size gets 422 and costs no tokens"""
+        from app.main import app
+        from app.routers.predictions import get_prediction_service
+
+        # The batch is rejected before the service is used
+        monkeypatch.setitem(app.dependency_overrides, get_prediction_service, lambda: None)
+        settings = get_settings()
+        backend = MemoryTokenBucketBackend(capacity=100, refill_rate=0, max_clients=10)
+        # Below the schema's own limit, so the router check is the one that rejects
+        monkeypatch.setattr(settings, "max_batch_size", 5)
+        monkeypatch.setattr(settings, "rate_limit_enabled", True)
+        monkeypatch.setattr(rate_limit, "_rate_limiter", RateLimiter(backend))
+        customer = {
+            "cliente": "C1", "edad": 35, "ocupacion": "Ingeniero", "fechaingresoempleo": "2015-03-01",
+            "nombreempleadorcliente": "Tech Company SA", "cargoempleocliente": "Senior Engineer",
+            "saldo": 5000.0, "fecha_inicio": "2019-06-01",
+        }
+
+        response = TestClient(app).post(
+            "/api/v1/predict/batch", json={"customers": [customer] * 6}
+        )
+
+        assert response.status_code == 422
+        assert len(backend) == 0
+
+    def test_sqlite_charge_does_not_block_event_loop(self, tmp_path, monkeypatch):
+        """A charge waiting on the database lock leaves the event loop free"""
+        path = str(tmp_path / "buckets.db")
+        backend = SQLiteTokenBucketBackend(path, capacity=10, refill_rate=1, max_clients=100)
+        monkeypatch.setattr(get_settings(), "rate_limit_enabled", True)
+        monkeypatch.setattr(rate_limit, "_rate_limiter", RateLimiter(backend))
+        request = Request({"type": "http", "headers": [], "client": ("10.0.0.1", 1234)})
+        other_worker = sqlite3.connect(path, isolation_level=None)
+        other_worker.execute("BEGIN IMMEDIATE")
+
+        async def scenario():
+            charge = asyncio.ensure_future(enforce_rate_limit(request, Response(), cost=1))
+            ticks = 0
+            start = time.monotonic()
+            while time.monotonic() - start < 0.3:
+                await asyncio.sleep(0.01)
+                ticks += 1
+            other_worker.execute("COMMIT")
+            await charge
+            return ticks
+
+        assert asyncio.run(scenario()) > 10
+        assert len(backend) == 1
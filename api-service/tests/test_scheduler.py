@@ -0,0 +1,155 @@
+"""
+Tests for the priority-aware prediction scheduler
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.deadline import Deadline, DeadlineExceeded
+from app.services.scheduler import (
+    BACKGROUND,
+    BATCH,
+    INTERACTIVE,
+    PriorityScheduler,
+    resolve_traffic_class,
+)
+
+WEIGHTS = {"interactive": 16, "batch": 4, "background": 1}
+SLO_MS = {"interactive": 300, "batch": 5000, "background": 60000}
+
+
+def _record(order, gate=None):
+    def work(tag):
+        if gate is not None and tag == "blocker":
+            gate.wait(5)
+        order.append(tag)
+        return tag
+    return work
+
+
+class TestPriorityScheduler:
+    """Test dispatch order and metrics"""
+
+    def test_interactive_overtakes_queued_batch(self):
+        """An interactive job runs before batch chunks that were queued earlier"""
+        order = []
+        gate = threading.Event()
+        work = _record(order, gate)
+
+        async def scenario():
+            scheduler = PriorityScheduler(1, WEIGHTS, SLO_MS, reserved_interactive=0)
+            blocker = asyncio.ensure_future(scheduler.submit(BATCH, work, "blocker"))
+            await asyncio.sleep(0)
+            chunks = [asyncio.ensure_future(scheduler.submit(BATCH, work, f"chunk{i}")) for i in range(3)]
+            interactive = asyncio.ensure_future(scheduler.submit(INTERACTIVE, work, "interactive"))
+            await asyncio.sleep(0)
+            gate.set()
+            await asyncio.gather(blocker, interactive, *chunks)
+            return scheduler.stats()
+
+        stats = asyncio.run(scenario())
+
+        assert order[:2] == ["blocker", "interactive"]
+        assert stats["classes"]["batch"]["completed"] == 4
+        assert stats["classes"]["interactive"]["latency_ms"]["p50"] is not None
+
+    def test_reserved_slot_kept_for_interactive(self):
+        """Bulk traffic never occupies the reserved worker slot"""
+        gate = threading.Event()
+
+        def blocking(tag):
+            gate.wait(5)
+            return tag
+
+        async def scenario():
+            scheduler = PriorityScheduler(2, WEIGHTS, SLO_MS, reserved_interactive=1)
+            bulk = [asyncio.ensure_future(scheduler.submit(BACKGROUND, blocking, i)) for i in range(3)]
+            await asyncio.sleep(0)
+            running_bulk = scheduler.stats()["running"]
+            interactive = asyncio.ensure_future(scheduler.submit(INTERACTIVE, lambda: "fast"))
+            result = await asyncio.wait_for(interactive, timeout=2)
+            gate.set()
+            await asyncio.gather(*bulk)
+            return running_bulk, result
+
+        running_bulk, result = asyncio.run(scenario())
+
+        assert running_bulk == 1
+        assert result == "fast"
+
+    def test_errors_propagate(self):
+        """Exceptions raised by a job reach the caller and count as failures"""
+        def failing():
+            raise ValueError("bad record")
+
+        async def scenario():
+            scheduler = PriorityScheduler(1, WEIGHTS, SLO_MS, reserved_interactive=0)
+            try:
+                await scheduler.submit(INTERACTIVE, failing)
+            except ValueError as e:
+                return str(e), scheduler.stats()
+
+        message, stats = asyncio.run(scenario())
+
+        assert message == "bad record"
+        assert stats["classes"]["interactive"]["failed"] == 1
+
+    def test_expired_jobs_dropped_before_start(self):
+        """Queued chunks whose deadline passed while waiting never run"""
+        order = []
+        gate = threading.Event()
+        work = _record(order, gate)
+
+        async def scenario():
+            scheduler = PriorityScheduler(1, WEIGHTS, SLO_MS, reserved_interactive=0)
+            deadline = Deadline.after(0.05)
+            blocker = asyncio.ensure_future(scheduler.submit(BATCH, work, "blocker"))
+            await asyncio.sleep(0)
+            chunk = asyncio.ensure_future(scheduler.submit(BATCH, work, "chunk", deadline=deadline))
+            await asyncio.sleep(0.1)
+            gate.set()
+            await blocker
+            with pytest.raises(DeadlineExceeded):
+                await chunk
+            return scheduler.stats()
+
+        stats = asyncio.run(scenario())
+
+        assert order == ["blocker"]
+        assert stats["classes"]["batch"]["dropped_expired"] == 1
+
+
+class TestDeadline:
+    """Test request deadline resolution"""
+
+    def test_default_timeout_used_without_header(self):
+        deadline = Deadline.from_request(None, default_timeout=30)
+        assert 29 < deadline.remaining() <= 30
+
+    def test_earlier_client_deadline_wins(self):
+        deadline = Deadline.from_request(str(time.time() + 5), default_timeout=30)
+        assert 4 < deadline.remaining() <= 5
+
+    def test_later_client_deadline_capped_by_server(self):
+        deadline = Deadline.from_request("2999-01-01T00:00:00Z", default_timeout=30)
+        assert deadline.remaining() <= 30
+
+    def test_past_iso_deadline_is_expired(self):
+        assert Deadline.from_request("2020-01-01T00:00:00Z", default_timeout=30).expired()
+
+    def test_invalid_header_rejected(self):
+        with pytest.raises(ValueError):
+            Deadline.from_request("tomorrow", default_timeout=30)
+
+
+class TestTrafficClass:
+    """Test traffic class resolution"""
+
+    def test_client_can_only_lower_priority(self):
+        assert resolve_traffic_class(BATCH, "background") == BACKGROUND
+        assert resolve_traffic_class(BATCH, "interactive") == BATCH
+        assert resolve_traffic_class(INTERACTIVE, None) == INTERACTIVE
+        assert resolve_traffic_class(INTERACTIVE, "unknown") == INTERACTIVE
@@ -0,0 +1,183 @@
+"""
+Tests for the chunked scoring used by Part 2
+"""
+
+import json
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+import app.services.prediction_service  # noqa: F401  (puts production_test/ on sys.path)
+import production_scoring
+from production_scoring import FILL_ROWS, build_feature_matrix, fill_block, predict_in_chunks, unique_rows
+
+FEATURES = ["edad", "saldo", "monto_letra"]
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "edad": rng.integers(18, 80, 1000).astype("float32"),
+        "saldo": rng.gamma(2.0, 5000.0, 1000),
+        "monto_letra": rng.gamma(2.0, 200.0, 1000),
+    })
+    df.loc[::9, "edad"] = np.nan
+    return df
+
+
+@pytest.fixture
+def model(frame):
+    return xgb.XGBRegressor(n_estimators=20, max_depth=4).fit(frame[FEATURES], frame["saldo"] * 0.1)
+
+
+class TestChunkedScoring:
+    """Test predictions scored chunk by chunk"""
+
+    @pytest.mark.parametrize("chunksize", [None, 1, 64, 999])
+    def test_chunks_match_one_predict_call(self, frame, model, chunksize):
+        median = frame["edad"].median()
+
+        predictions, report = predict_in_chunks(model, frame, FEATURES, {"edad": median}, chunksize, nthread=2)
+
+        expected = model.predict(frame[FEATURES].fillna({"edad": median}))
+        np.testing.assert_array_equal(predictions, expected)
+        assert report["rows"] == 1000 and report["chunks"] == -(-1000 // (chunksize or 1000))
+        assert report["rows_per_s"] > 0
+        assert json.loads(model.get_booster().save_config())["learner"]["generic_param"]["nthread"] == "2"
+
+    def test_block_is_filled_in_place(self):
+        block = np.full((2, 2), -1, dtype=np.float32)
+        columns = [np.array([1.0, np.nan, 3.0]), np.array([4, 5, 6])]
+
+        result = fill_block(block, columns, 1, {0: 9.5})
+
+        assert result is block and block.flags.c_contiguous
+        np.testing.assert_array_equal(block, [[9.5, 5], [3, 6]])
+
+    def test_text_and_nullable_columns(self, model):
+        df = pd.DataFrame({
+            "edad": ["30", "x", "52"],
+            "saldo": pd.array([5000.0, None, 7000.0], dtype="Float64"),
+            "monto_letra": [250.0, 400.0, 300.0],
+        })
+
+        predictions, _ = predict_in_chunks(model, df, FEATURES, {"edad": 0, "saldo": 6000.0}, chunksize=2)
+
+        expected = model.predict(pd.DataFrame({"edad": [30.0, 0, 52], "saldo": [5000.0, 6000, 7000],
+                                               "monto_letra": [250.0, 400, 300]}))
+        np.testing.assert_array_equal(predictions, expected)
+
+
+class RecordingModel:
+    """XGBoost-like model recording the blocks it is given"""
+
+    def __init__(self):
+        self.blocks = []
+
+    def get_booster(self):
+        return self
+
+    def set_param(self, *args):
+        pass
+
+    def predict(self, X):
+        self.blocks.append(X)
+        return np.zeros(len(X), dtype=np.float32)
+
+
+class TestFeatureMatrix:
+    """Test the float32 model input built from the clean frame"""
+
+    @pytest.fixture
+    def large_frame(self):
+        rng = np.random.default_rng(4)
+        n = 200_000
+        df = pd.DataFrame({
+            "edad": rng.integers(18, 80, n).astype("float32"),
+            "saldo": rng.gamma(2.0, 5000.0, n),
+            "monto_letra": rng.integers(10, 2000, n).astype("int32"),
+        })
+        df.loc[::3, "saldo"] = np.nan
+        return df
+
+    def test_matrix_is_the_only_allocation(self, large_frame):
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+            matrix = build_feature_matrix(large_frame, FEATURES, {"saldo": 1.5})
+
+            current, peak = tracemalloc.get_traced_memory()
+            large = [trace for trace in tracemalloc.take_snapshot().traces if trace.size >= 64 * 1024]
+        finally:
+            tracemalloc.stop()
+
+        assert len(large) == 1 and large[0].size == matrix.nbytes
+        # Temporaries: one missing-value mask of FILL_ROWS rows and NumPy's
+        # casting buffers, far less than any column copy (800 KB-1.6 MB here)
+        assert peak - before <= matrix.nbytes + FILL_ROWS + 128 * 1024
+        assert current - before >= matrix.nbytes
+
+    def test_matrix_values_and_layout(self, large_frame):
+        matrix = build_feature_matrix(large_frame, FEATURES[::-1], {"saldo": 1.5})
+
+        expected = large_frame[FEATURES[::-1]].fillna({"saldo": 1.5}).to_numpy(dtype=np.float32)
+        assert matrix.dtype == np.float32 and matrix.flags.c_contiguous
+        np.testing.assert_array_equal(matrix, expected)
+
+    def test_chunks_are_views_of_the_matrix(self, large_frame):
+        matrix = build_feature_matrix(large_frame, FEATURES, {"saldo": 1.5})
+        model = RecordingModel()
+
+        predictions, report = predict_in_chunks(model, matrix, FEATURES, chunksize=70_000)
+
+        assert report["chunks"] == 3 and len(predictions) == len(matrix)
+        assert all(block.base is matrix and block.flags.c_contiguous for block in model.blocks)
+
+
+class TestDeduplication:
+    """Test scoring each distinct feature row once"""
+
+    @pytest.fixture
+    def repeated(self, frame):
+        # Customers repeated once per loan, in shuffled order
+        return frame.iloc[np.random.default_rng(6).integers(0, 400, 1500)].reset_index(drop=True)
+
+    def test_unique_rows(self, repeated):
+        matrix = build_feature_matrix(repeated, FEATURES)
+
+        unique, inverse = unique_rows(matrix)
+
+        # Rows are compared by bit pattern: repeated NaN rows are equal too
+        assert len(unique) == len(np.unique(matrix.view(np.uint32), axis=0)) < len(matrix)
+        np.testing.assert_array_equal(unique[inverse], matrix)
+        np.testing.assert_array_equal(unique[0], matrix[0])
+        distinct = np.arange(12, dtype=np.float64).reshape(6, 2)
+        assert unique_rows(distinct)[0] is distinct and unique_rows(distinct)[1] is None
+
+    def test_hash_collisions_keep_rows_apart(self, repeated, monkeypatch):
+        matrix = build_feature_matrix(repeated, FEATURES)
+        monkeypatch.setattr(production_scoring, "_row_hashes", lambda words: np.zeros(len(words), dtype=np.uint64))
+
+        unique, inverse = unique_rows(matrix)
+
+        np.testing.assert_array_equal(unique[inverse], matrix)
+        assert len(unique) == len(np.unique(matrix.view(np.uint32), axis=0))
+
+    @pytest.mark.parametrize("as_matrix", [True, False])
+    def test_same_predictions_as_every_row(self, repeated, model, as_matrix):
+        fill = {"edad": repeated["edad"].median()}
+        data = build_feature_matrix(repeated, FEATURES, fill) if as_matrix else repeated
+
+        predictions, report = predict_in_chunks(model, data, FEATURES, fill, chunksize=100, deduplicate=True)
+
+        expected, _ = predict_in_chunks(model, data, FEATURES, fill, chunksize=100)
+        np.testing.assert_array_equal(predictions, expected)
+        assert report["rows"] == 1500 and report["unique_rows"] < 400
+        assert report["dedup_ratio"] == round(1500 / report["unique_rows"], 2)
+        assert report["chunks"] == -(-report["unique_rows"] // 100)
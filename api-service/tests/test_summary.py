@@ -0,0 +1,149 @@
+"""
+Tests for the single-pass, mergeable summary statistics
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.services.prediction_service  # noqa: F401  (puts production_test/ on sys.path)
+from production_summary import (DEFAULT_RELATIVE_ACCURACY, BoundedMedian, QuantileSketch, SummaryAccumulator,
+                                summarize)
+
+
+def business_frame(n, seed=0, prediction_date="2026-10-19 10:00:00"):
+    from production_output import set_batch_metadata
+    from production_part3_business_formatting import format
+
+    rng = np.random.default_rng(seed)
+    income = rng.gamma(2.0, 600.0, n).astype("float32")
+    df = pd.DataFrame({
+        "identificador_unico": [f"8-{seed}-{i}" for i in range(n)],
+        "cliente": np.arange(n),
+        "predicted_income": income,
+        "income_lower_90": np.maximum(income - rng.uniform(100, 700, n), 0).round(2),
+        "income_upper_90": (income + rng.uniform(400, 900, n)).round(2),
+    })
+    df = set_batch_metadata(df, confidence_level=0.9, prediction_date=prediction_date,
+                            model_version="XGBoost_v1.0_Final")
+    return format(df)
+
+
+class TestQuantileSketch:
+    """Test sketched quantiles and merging"""
+
+    def test_relative_accuracy(self):
+        rng = np.random.default_rng(1)
+        values = np.concatenate([rng.gamma(2.0, 700.0, 20_000), -rng.gamma(1.0, 50.0, 500), np.zeros(100)])
+        sketch = QuantileSketch().add(values)
+
+        for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+            expected = np.quantile(values, q, method="lower")
+            assert abs(sketch.quantile(q) - expected) <= DEFAULT_RELATIVE_ACCURACY * abs(expected) + 1e-9
+
+    def test_merge_equals_one_sketch(self):
+        values = np.random.default_rng(2).gamma(2.0, 700.0, 10_000)
+
+        merged = QuantileSketch().add(values[:3000]).merge(QuantileSketch().add(values[3000:]))
+        restored = QuantileSketch.from_dict(merged.to_dict())
+
+        assert restored.positive == QuantileSketch().add(values).positive
+        assert restored.quantile(0.5) == merged.quantile(0.5)
+        assert np.isnan(QuantileSketch().quantile(0.5))
+
+
+class TestBoundedMedian:
+    """Test the bounded medians of Part 1 streaming"""
+
+    def test_exact_for_few_distinct_values(self):
+        values = np.random.default_rng(3).integers(18, 80, 10_001).astype(float)
+        values[::7] = np.nan
+
+        merged = BoundedMedian().add(values[:4000]).merge(BoundedMedian().add(values[4000:]))
+
+        assert merged.exact and merged.median() == pd.Series(values).median()
+        assert BoundedMedian().add(values[:4]).median() == pd.Series(values[:4]).median()
+        assert np.isnan(BoundedMedian().median())
+
+    def test_sketch_for_continuous_values(self):
+        values = np.random.default_rng(4).gamma(2.0, 5000.0, 50_000)
+
+        merged = BoundedMedian(max_values=1000)
+        for part in np.array_split(values, 7):
+            merged.merge(BoundedMedian(max_values=1000).add(part))
+
+        assert not merged.exact and merged.counts == {} and merged.count == 50_000
+        assert merged.median() == pytest.approx(np.median(values), rel=2 * DEFAULT_RELATIVE_ACCURACY)
+        # Buckets follow the value range, not the row count
+        assert len(merged.sketch.positive) < 20_000
+
+
+class TestSummaryAccumulator:
+    """Test statistics added by chunk and merged"""
+
+    @pytest.fixture
+    def df(self, capsys):
+        return business_frame(5000)
+
+    def test_statistics_match_pandas(self, df):
+        from production_output import ci_width, label_counts
+
+        summary = summarize(df, chunksize=700)
+
+        income = summary.numeric["predicted_income"]
+        assert summary.rows == 5000 and income.count == 5000
+        assert income.mean == pytest.approx(df["predicted_income"].mean(), rel=1e-9)
+        assert income.std() == pytest.approx(df["predicted_income"].std(), rel=1e-9)
+        assert (income.min, income.max) == (df["predicted_income"].min(), df["predicted_income"].max())
+        assert income.quantile(0.5) == pytest.approx(df["predicted_income"].median(), rel=2e-3)
+        assert summary.numeric["ci_width"].mean == pytest.approx(ci_width(df).mean(), rel=1e-9)
+        for column in ("income_segment", "business_priority", "confidence_category"):
+            assert list(summary.label_counts(column).items()) == list(label_counts(df[column]).items())
+        assert summary.earliest == summary.latest == "2026-10-19 10:00:00"
+
+    def test_merge_and_serialize(self, df):
+        whole = summarize(df)
+        parts = SummaryAccumulator.from_dict(summarize(df.iloc[:1234]).to_dict())
+        parts.merge(summarize(df.iloc[1234:]))
+
+        assert parts.rows == whole.rows and parts.labels == whole.labels
+        assert parts.numeric["predicted_income"].std() == pytest.approx(whole.numeric["predicted_income"].std())
+        assert parts.numeric["ci_width"].quantile(0.5) == whole.numeric["ci_width"].quantile(0.5)
+
+    def test_business_summary(self, df):
+        from production_part3_business_formatting import create_business_summary
+
+        summary = create_business_summary(df)
+
+        assert summary["prediction_metadata"]["total_customers"] == 5000
+        assert summary["confidence_analysis"]["review_required_customers"] == \
+            int((df["business_priority"] == "REVIEW_REQUIRED").sum())
+        assert summary["income_statistics"]["max_predicted_income"] == round(float(df["predicted_income"].max()), 2)
+
+
+class TestMasterSummary:
+    """Test the day summaries kept by the incremental manager"""
+
+    def test_only_changed_days_are_summarized(self, tmp_path, monkeypatch, capsys):
+        import json
+
+        from production_incremental_predictions import process_new_predictions_incremental
+
+        monkeypatch.chdir(tmp_path)
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")
+        today = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        process_new_predictions_incremental(business_frame(300, 1, yesterday))
+        capsys.readouterr()
+        results = process_new_predictions_incremental(business_frame(200, 2, today))
+
+        assert "1 of 2 prediction days summarized" in capsys.readouterr().out
+        master = pd.read_csv(tmp_path / "model_pred_files" / "master_predictions.csv")
+        with open(tmp_path / "model_pred_files" / "master_predictions.json", encoding="utf-8") as f:
+            master_json = json.load(f)
+        assert master_json["dataset_metadata"]["total_predictions"] == 500
+        assert master_json["business_summary"]["income_segments"] == master["income_segment"].value_counts().to_dict()
+        assert results["business_insights"]["average_predicted_income"] == \
+            pytest.approx(master["predicted_income"].mean(), rel=1e-6)
@@ -7,7 +7,18 @@
 # OUTPUT: Predictions with confidence intervals
 #
 # USAGE:
-# python income_prediction_pipeline.py input_data.csv
+# python income_prediction_pipeline.py input_data.csv [--verbose] [--events run_events.jsonl]
+#                                      [--checkpoint checkpoint_folder] [--compress gzip|zstd] [--parquet]
+#
+# --verbose:    full progress output of every stage
+# --events:     structured stage events (rows, duration, peak memory, imputed
+#               values) appended to a JSON lines file, see production_events.py
+# --checkpoint: also keep the clean data and predictions of the run in a
+#               folder (stages otherwise hand DataFrames over in memory)
+# --compress:   write the CSV and JSON results compressed (.gz / .zst)
+# --parquet:    also write the results as a Parquet file
+#
+# OR in memory: from income_prediction_pipeline import run; df_out = run(df_raw)
 #
 # REQUIREMENTS:
 # - input_data.csv: Customer data file
@@ -19,8 +30,13 @@ import pandas as pd
 import numpy as np
 import sys
 import os
+import uuid
 from datetime import datetime
 import warnings
+from production_checkpoints import checkpoint_path, write_checkpoint
+from production_events import ConsoleSink, JsonLinesSink, PipelineEvents, console_events
+from production_export import (DEFAULT_EXPORT_CHUNKSIZE, EXPORT_COMPRESSIONS, export_files, export_path, open_export,
+                               write_csv_file, write_json_document, write_parquet_file, zstd_available)
 warnings.filterwarnings('ignore')
 
 class PipelineConfig:
@@ -40,188 +56,240 @@ class PipelineConfig:
         "ci_upper_offset": 755.02,   # From model analysis
     }
 
-def run_income_prediction_pipeline(input_file):
+def format(df_predictions):
+    """
+    Partner output: IDs, prediction and 90% confidence interval
+
+    DataFrame in / DataFrame out (Part 2 predictions -> final columns).
+    """
+    # Ensure confidence intervals exist
+    if 'income_lower_90' not in df_predictions.columns:
+        df_predictions['income_lower_90'] = (
+            df_predictions['predicted_income'] + PipelineConfig.MODEL_CONFIG['ci_lower_offset']
+        ).round(6)
+
+    if 'income_upper_90' not in df_predictions.columns:
+        df_predictions['income_upper_90'] = (
+            df_predictions['predicted_income'] + PipelineConfig.MODEL_CONFIG['ci_upper_offset']
+        ).round(6)
+    
+    # Select final columns
+    final_columns = [
+        'identificador_unico', 'cliente', 'predicted_income', 
+        'income_lower_90', 'income_upper_90'
+    ]
+    
+    # Ensure all columns exist
+    for col in final_columns:
+        if col not in df_predictions.columns:
+            if col == 'cliente':
+                df_predictions['cliente'] = df_predictions.get('Cliente', 'N/A')
+            elif col == 'identificador_unico':
+                df_predictions['identificador_unico'] = df_predictions.get('Identificador_Unico', 'N/A')
+    
+    return df_predictions[final_columns].copy()
+
+def run(df, events=None, checkpoint_dir=None):
+    """
+    In-memory pipeline: raw customer DataFrame -> partner predictions
+
+    clean (Part 1) -> score (Part 2) -> format, each DataFrame in /
+    DataFrame out. Nothing is written unless checkpoint_dir is given: then
+    the clean data and predictions are also saved there, under names unique
+    to this run.
+
+    Raises on failure (run_income_prediction_pipeline reports it).
+    """
+    from production_part1_data_cleaning import clean
+    from production_part2_model_inference import score
+
+    events = events if events is not None else console_events()
+    checkpoints = {}
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        checkpoints = {
+            stage: checkpoint_path(os.path.join(checkpoint_dir, f"{stage}_{run_id}"))
+            for stage in ('clean_data', 'predictions')
+        }
+
+    # Step 2: Feature engineering
+    events.message("🔧 Processing features...")
+    try:
+        df_clean = clean(df, events)
+    except Exception as e:
+        raise Exception(f"Feature engineering error: {str(e)}")
+
+    if df_clean is None:
+        raise Exception("Feature engineering returned None")
+    if checkpoints:
+        write_checkpoint(df_clean, checkpoints['clean_data'])
+
+    # Step 3: Model prediction (stage events only, no progress lines)
+    events.message("🤖 Generating predictions...")
+    df_predictions = score(df_clean, events.quiet())
+
+    if df_predictions is None:
+        raise Exception("Model prediction failed")
+    if checkpoints:
+        write_checkpoint(df_predictions, checkpoints['predictions'])
+        events.emit('checkpoints', **checkpoints)
+
+    # Step 4: Format results
+    return format(df_predictions)
+
+def run_income_prediction_pipeline(input_file, events=None, checkpoint_dir=None):
     """
     Complete income prediction pipeline
     
     Args:
-        input_file (str): Path to input CSV file
+        input_file (str): Path to input CSV or JSON file
+        events (PipelineEvents): where progress lines and stage events go;
+            defaults to the console, production_events.SILENT runs quietly
+        checkpoint_dir (str): also save the intermediate stage outputs there
+            (default: stages hand DataFrames over in memory, no temp files)
         
     Returns:
         pandas.DataFrame: Predictions with confidence intervals
     """
+    events = events if events is not None else console_events()
+    log = events.message
     
-    print("🚀 INCOME PREDICTION PIPELINE")
-    print("=" * 50)
-    print(f"📁 Processing: {input_file}")
-    print(f"⏰ Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    log("🚀 INCOME PREDICTION PIPELINE")
+    log("=" * 50)
+    log(f"📁 Processing: {input_file}")
+    log(f"⏰ Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
     try:
         # Step 1: Load input data (supports CSV and JSON)
         if not os.path.exists(input_file):
             raise FileNotFoundError(f"Input file not found: {input_file}")
 
-        # Detect file format and load accordingly
-        if input_file.lower().endswith('.json'):
-            import json
-            with open(input_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            df_raw = pd.DataFrame(data)
-            print(f"📊 Loaded {len(df_raw)} customers from JSON")
-        else:
-            df_raw = pd.read_csv(input_file)
-            print(f"📊 Loaded {len(df_raw)} customers from CSV")
-
-        # Step 2: Feature engineering
-        print("🔧 Processing features...")
-        from production_part1_data_cleaning import production_part1_main
-
-        try:
-            # Convert JSON to CSV if needed for feature engineering
+        # Detect file format and load accordingly (read once, then passed in memory)
+        with events.stage('input', input_file=input_file) as stage:
             if input_file.lower().endswith('.json'):
-                temp_input_file = "temp_input_data.csv"
-                df_raw.to_csv(temp_input_file, index=False)
-                input_for_processing = temp_input_file
+                import json
+                with open(input_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                df_raw = pd.DataFrame(data)
+                log(f"📊 Loaded {len(df_raw)} customers from JSON")
             else:
-                input_for_processing = input_file
-
-            temp_clean_file = "temp_cleaned_data.csv"
-            df_clean = production_part1_main(
-                input_file_path=input_for_processing,
-                output_file_path=temp_clean_file
-            )
-        except Exception as e:
-            raise Exception(f"Feature engineering error: {str(e)}")
-
-        if df_clean is None:
-            raise Exception("Feature engineering returned None")
-
-        # Step 3: Model prediction (suppress verbose output)
-        print("🤖 Generating predictions...")
-        from production_part2_model_inference import production_part2_main
-
-        from io import StringIO
-        old_stdout = sys.stdout
-        sys.stdout = StringIO()
-
-        try:
-            temp_pred_file = "temp_predictions.csv"
-            df_predictions = production_part2_main(
-                clean_data_path=temp_clean_file,
-                output_path=temp_pred_file
-            )
-        finally:
-            sys.stdout = old_stdout
-
-        if df_predictions is None:
-            raise Exception("Model prediction failed")
-
-        # Step 4: Format results
-        # Ensure confidence intervals exist
-        if 'income_lower_90' not in df_predictions.columns:
-            df_predictions['income_lower_90'] = (
-                df_predictions['predicted_income'] + PipelineConfig.MODEL_CONFIG['ci_lower_offset']
-            ).round(6)
-
-        if 'income_upper_90' not in df_predictions.columns:
-            df_predictions['income_upper_90'] = (
-                df_predictions['predicted_income'] + PipelineConfig.MODEL_CONFIG['ci_upper_offset']
-            ).round(6)
-        
-        # Select final columns
-        final_columns = [
-            'identificador_unico', 'cliente', 'predicted_income', 
-            'income_lower_90', 'income_upper_90'
-        ]
-        
-        # Ensure all columns exist
-        for col in final_columns:
-            if col not in df_predictions.columns:
-                if col == 'cliente':
-                    df_predictions['cliente'] = df_predictions.get('Cliente', 'N/A')
-                elif col == 'identificador_unico':
-                    df_predictions['identificador_unico'] = df_predictions.get('Identificador_Unico', 'N/A')
-        
-        df_final = df_predictions[final_columns].copy()
-        
-        # Clean up temporary files
-        for temp_file in [temp_clean_file, temp_pred_file]:
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-
-        print("✅ Processing completed!")
-        print()
-        print("📊 PREDICTION RESULTS:")
-        print("=" * 50)
-        print(df_final.to_string(index=False))
-        print()
-        print(f"📈 Summary:")
-        print(f"   👥 Total customers: {len(df_final)}")
-        print(f"   💰 Average income: ${df_final['predicted_income'].mean():,.2f}")
-        print(f"   📊 Income range: ${df_final['predicted_income'].min():,.2f} - ${df_final['predicted_income'].max():,.2f}")
+                from production_part1_data_cleaning import load_production_data
+                df_raw = load_production_data(input_file, events=events)
+                if df_raw is None:
+                    raise Exception(f"Could not read {input_file}")
+                log(f"📊 Loaded {len(df_raw)} customers from CSV")
+            stage['rows_out'] = len(df_raw)
+
+        df_final = run(df_raw, events, checkpoint_dir)
+
+        events.emit('predictions', rows=len(df_final),
+                    average_income=float(df_final['predicted_income'].mean()))
+        log("✅ Processing completed!")
+        if events.verbose:
+            log()
+            print_prediction_results(df_final, log)
 
         return df_final
 
     except Exception as e:
-        print(f"❌ Pipeline failed: {str(e)}")
+        log(f"❌ Pipeline failed: {str(e)}")
+        events.emit('pipeline_failed', error=str(e))
         return None
 
-def save_predictions(df_predictions, base_filename="predictions"):
+def print_prediction_results(df_final, log=print):
+    """Prediction table and summary (log: print-like callable)"""
+    log("📊 PREDICTION RESULTS:")
+    log("=" * 50)
+    log(df_final.to_string(index=False))
+    log()
+    log(f"📈 Summary:")
+    log(f"   👥 Total customers: {len(df_final)}")
+    log(f"   💰 Average income: ${df_final['predicted_income'].mean():,.2f}")
+    log(f"   📊 Income range: ${df_final['predicted_income'].min():,.2f} - ${df_final['predicted_income'].max():,.2f}")
+
+def save_predictions(df_predictions, base_filename="predictions", compression=None, parquet=False):
     """
     Save predictions to both CSV and JSON formats
 
     Args:
         df_predictions: DataFrame with predictions
         base_filename: Base name for output files
+        compression: None (plain files), 'gzip' (.gz) or 'zstd' (.zst)
+        parquet: also save the predictions as a Parquet file
+
+    The files are written at the same time, in chunks (production_export.py).
 
     Returns:
-        dict: Paths to saved files
+        dict: Paths to saved files, plus 'export_report' (bytes and
+        throughput of each file)
     """
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-    # Save CSV
-    csv_file = f"{base_filename}_{timestamp}.csv"
-    df_predictions.to_csv(csv_file, index=False)
-
-    # Save JSON (more structured format)
-    json_file = f"{base_filename}_{timestamp}.json"
-
-    # Create structured JSON
-    json_data = {
-        "metadata": {
-            "total_customers": len(df_predictions),
-            "average_income": float(df_predictions['predicted_income'].mean()),
-            "income_range": {
-                "min": float(df_predictions['predicted_income'].min()),
-                "max": float(df_predictions['predicted_income'].max())
-            },
-            "generated_at": datetime.now().isoformat(),
-            "confidence_level": "90%"
+    # Structured JSON: metadata, then the prediction records streamed in chunks
+    metadata = {
+        "total_customers": len(df_predictions),
+        "average_income": float(df_predictions['predicted_income'].mean()),
+        "income_range": {
+            "min": float(df_predictions['predicted_income'].min()),
+            "max": float(df_predictions['predicted_income'].max())
         },
-        "predictions": df_predictions.to_dict('records')
+        "generated_at": datetime.now().isoformat(),
+        "confidence_level": "90%"
     }
 
-    import json
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, indent=2, ensure_ascii=False)
+    def write_json(path):
+        record_chunks = (df_predictions.iloc[start:start + DEFAULT_EXPORT_CHUNKSIZE].to_dict('records')
+                         for start in range(0, len(df_predictions), DEFAULT_EXPORT_CHUNKSIZE))
+        with open_export(path, compression) as f:
+            return write_json_document(f, {"metadata": metadata}, "predictions", record_chunks)
 
-    return {
-        "csv_file": csv_file,
-        "json_file": json_file
+    exports = {
+        "csv_file": (export_path(f"{base_filename}_{timestamp}.csv", compression),
+                     lambda path: write_csv_file(df_predictions, path, compression)),
+        "json_file": (export_path(f"{base_filename}_{timestamp}.json", compression), write_json)
     }
+    if parquet:
+        exports["parquet_file"] = (f"{base_filename}_{timestamp}.parquet",
+                                   lambda path: write_parquet_file(df_predictions, path, compression))
+    export_report = export_files(exports)
+
+    saved_files = {name: report["path"] for name, report in export_report.items()}
+    saved_files["export_report"] = export_report
+    return saved_files
 
 def main():
     """
     Main function for command line usage
     """
-    if len(sys.argv) < 2 or len(sys.argv) > 3:
-        print("Usage: python income_prediction_pipeline.py <input_file.csv> [--verbose]")
+    args = sys.argv[1:]
+    verbose_mode = "--verbose" in args
+    parquet = "--parquet" in args
+    options = {}
+    for option in ("--events", "--checkpoint", "--compress"):
+        if option in args:
+            position = args.index(option)
+            options[option] = args[position + 1] if position + 1 < len(args) else None
+            del args[position:position + 2]
+    events_file = options.get("--events")
+    args = [arg for arg in args if arg not in ("--verbose", "--parquet")]
+    compression = options.get("--compress")
+
+    if len(args) != 1 or None in options.values() or compression not in (None,) + EXPORT_COMPRESSIONS:
+        print("Usage: python income_prediction_pipeline.py <input_file.csv> [--verbose] [--events <events.jsonl>] "
+              "[--checkpoint <folder>] [--compress gzip|zstd] [--parquet]")
         print("Example: python income_prediction_pipeline.py customer_data.csv")
         print("         python income_prediction_pipeline.py customer_data.csv --verbose")
+        print("         python income_prediction_pipeline.py customer_data.csv --events run_events.jsonl")
+        print("         python income_prediction_pipeline.py customer_data.csv --checkpoint checkpoints")
+        print("         python income_prediction_pipeline.py customer_data.csv --compress gzip --parquet")
         sys.exit(1)
 
-    input_file = sys.argv[1]
-    verbose_mode = len(sys.argv) == 3 and sys.argv[2] == "--verbose"
+    input_file = args[0]
+
+    if compression == 'zstd' and not zstd_available():
+        print("❌ --compress zstd needs the zstandard package (pip install zstandard), or use --compress gzip")
+        sys.exit(1)
     
     # Validate model files exist
     for file_type, file_path in PipelineConfig.MODEL_FILES.items():
@@ -230,51 +298,39 @@ def main():
             print("Please ensure model files are in the same directory as this script")
             sys.exit(1)
     
-    # Run pipeline
+    # Verbose mode prints every stage; the default clean mode sends nothing
+    # to the console until the results (stage events still reach --events)
+    sinks = [ConsoleSink()] if verbose_mode else []
+    events_sink = JsonLinesSink(events_file) if events_file else None
+    if events_sink:
+        sinks.append(events_sink)
+    events = PipelineEvents(*sinks, pipeline='income_prediction')
+
+    try:
+        results = run_income_prediction_pipeline(input_file, events, options.get("--checkpoint"))
+    finally:
+        if events_sink:
+            events_sink.close()
+
+    if results is None:
+        print("❌ Pipeline failed")
+        sys.exit(1)
+
+    # Save results to both CSV and JSON
+    saved_files = save_predictions(results, compression=compression, parquet=parquet)
     if verbose_mode:
-        # Verbose mode with full output
-        results = run_income_prediction_pipeline(input_file)
-
-        if results is not None:
-            # Save results to both CSV and JSON
-            saved_files = save_predictions(results)
-            print(f"💾 Results saved to:")
-            print(f"   📄 CSV: {saved_files['csv_file']}")
-            print(f"   📄 JSON: {saved_files['json_file']}")
-            print()
-            print("🎯 Quick Access:")
-            print(f"   • Open CSV in Excel: {saved_files['csv_file']}")
-            print(f"   • Use JSON for APIs: {saved_files['json_file']}")
-        else:
-            sys.exit(1)
+        print(f"💾 Results saved to:")
+        for report in saved_files['export_report'].values():
+            print(f"   📄 {report['path']} ({report['bytes'] / 1e6:.2f} MB, {report['mb_per_s'] or 0:,} MB/s, "
+                  f"{report['rows_per_s'] or 0:,} rows/s)")
+        print()
+        print("🎯 Quick Access:")
+        print(f"   • Open CSV in Excel: {saved_files['csv_file']}")
+        print(f"   • Use JSON for APIs: {saved_files['json_file']}")
     else:
-        # Default: Clean mode with minimal output
-        from io import StringIO
-        old_stdout = sys.stdout
-        sys.stdout = StringIO()
-
-        try:
-            results = run_income_prediction_pipeline(input_file)
-        finally:
-            sys.stdout = old_stdout
-
-        if results is not None:
-            # Show only the essential results
-            print("📊 PREDICTION RESULTS:")
-            print("=" * 50)
-            print(results.to_string(index=False))
-            print()
-            print(f"📈 Summary:")
-            print(f"   👥 Total customers: {len(results)}")
-            print(f"   💰 Average income: ${results['predicted_income'].mean():,.2f}")
-            print(f"   📊 Income range: ${results['predicted_income'].min():,.2f} - ${results['predicted_income'].max():,.2f}")
-
-            # Save files quietly
-            saved_files = save_predictions(results)
-            print(f"💾 Saved: {saved_files['csv_file']}")
-        else:
-            print("❌ Pipeline failed")
-            sys.exit(1)
+        # Show only the essential results
+        print_prediction_results(results)
+        print(f"💾 Saved: {saved_files['csv_file']}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,155 @@
+# =============================================================================
+# PRODUCTION CHECKPOINTS - TYPED COLUMNAR FILES BETWEEN PIPELINE STAGES
+# =============================================================================
+#
+# OBJECTIVE: Hand DataFrames from one stage to the next without formatting
+# them as CSV text and parsing them back
+#
+# Intermediate files (Part 1 -> Part 2 -> Part 3, the incremental master
+# dataset) are written as Arrow IPC files (Feather v2), uncompressed so they
+# can be memory-mapped: a read maps the file and converts the columns it
+# needs, dtypes included (float32 features, int32 counts, categories), with
+# no text parsing and no re-inference.
+#
+# The format follows the file extension:
+#   .arrow / .feather   Arrow IPC, memory-mapped reads
+#   .parquet            Parquet (compressed, for checkpoints kept on disk)
+#   anything else       CSV, as before (partner-facing exports)
+#
+# pyarrow is optional: checkpoint_path() picks '.csv' when it is not
+# installed, so the pipelines keep working with CSV checkpoints.
+#
+# Shared by production_test/ and partner_pipeline_2/.
+# =============================================================================
+
+import os
+
+import pandas as pd
+
+ARROW_EXTENSIONS = ('.arrow', '.feather')
+COLUMNAR_EXTENSIONS = ARROW_EXTENSIONS + ('.parquet',)
+
+def arrow_available():
+    """Whether pyarrow is installed (columnar checkpoints need it)"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def checkpoint_path(path):
+    """
+    `path` with the checkpoint extension: '.arrow' when pyarrow is
+    installed, '.csv' otherwise
+    """
+    root, _ = os.path.splitext(path)
+    return root + ('.arrow' if arrow_available() else '.csv')
+
+def is_columnar(path):
+    return os.path.splitext(path)[1].lower() in COLUMNAR_EXTENSIONS
+
+def _arrow_safe(df):
+    """
+    Object columns mixing numbers and text (an ID column inferred as int in
+    one block and str in another) as text, which is what a CSV round trip
+    gives them; Arrow columns have a single type
+    """
+    mixed = [
+        col for col in df.columns
+        if df[col].dtype == object
+        and pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed')
+    ]
+    if not mixed:
+        return df
+    df = df.copy()
+    for col in mixed:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+def _to_table(df, schema=None):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(_arrow_safe(df), preserve_index=False)
+    if schema is not None and not table.schema.equals(schema):
+        # Same column types in every chunk (e.g. int32 in one, float32 in the next)
+        table = table.cast(schema)
+    return table
+
+def write_checkpoint(df, path):
+    """Write `df` (without its index) in the format of `path`'s extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ARROW_EXTENSIONS:
+        from pyarrow import feather
+        feather.write_feather(_to_table(df), path, compression='uncompressed')
+    elif extension == '.parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(_to_table(df), path)
+    else:
+        df.to_csv(path, index=False, encoding='utf-8')
+    return path
+
+def read_checkpoint(path, columns=None):
+    """
+    Read a checkpoint written by write_checkpoint (or any CSV)
+
+    columns: only these columns are converted (columnar files) or parsed (CSV)
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ARROW_EXTENSIONS:
+        from pyarrow import feather
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    if extension == '.parquet':
+        return pd.read_parquet(path, columns=columns, memory_map=True)
+    return pd.read_csv(path, usecols=columns, encoding='utf-8')
+
+class CheckpointWriter:
+    """
+    Checkpoint written chunk by chunk (streaming Part 1)
+
+    Arrow files get one record batch per chunk, with the first chunk's
+    column types; CSV files are appended to with a single header.
+    compression: Parquet codec ('snappy' when None, 'gzip', 'zstd', ...)
+
+        with CheckpointWriter(path) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, path, compression=None):
+        self.path = path
+        self.compression = compression
+        self.columnar = is_columnar(path)
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, chunk):
+        if not self.columnar:
+            chunk.to_csv(self.path, mode='a', header=self.rows == 0, index=False, encoding='utf-8')
+        else:
+            table = _to_table(chunk, self._schema)
+            if self._writer is None:
+                self._schema = table.schema
+                self._writer = self._open(table.schema)
+            self._writer.write_table(table)
+        self.rows += len(chunk)
+
+    def _open(self, schema):
+        if os.path.splitext(self.path)[1].lower() == '.parquet':
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.path, schema, compression=self.compression or 'snappy')
+        import pyarrow as pa
+        return pa.ipc.new_file(self.path, schema)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,166 @@
+# =============================================================================
+# PRODUCTION EXPORT - COMPRESSED, CHUNKED, CONCURRENT DELIVERABLES
+# =============================================================================
+#
+# OBJECTIVE: Write the prediction deliverables of a run (CSV, JSON and
+# optionally Parquet) at the same time, a chunk at a time, compressed when
+# asked, instead of one uncompressed file after the other
+#
+# - export_files() writes each deliverable in its own thread; formatting
+#   holds the GIL, but compression (zlib / zstd) and disk writes release
+#   it, so the files overlap instead of adding up
+# - CSV and JSON are streamed chunk by chunk into the (compressed) file:
+#   the full text of a file is never held in memory
+# - compression: None (plain files, as before), 'gzip' (.gz) or 'zstd'
+#   (.zst, needs the zstandard package); Parquet files use it as their
+#   column codec instead
+# - every deliverable gets a report: rows, bytes written, seconds, MB/s
+#
+# Uncompressed CSV / JSON files have the same bytes as before
+# (to_csv(index=False), json.dump(indent=2, ensure_ascii=False)).
+#
+# Used by Part 3 and income_prediction_pipeline.save_predictions.
+# Shared by production_test/ and partner_pipeline_2/.
+# =============================================================================
+
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from production_checkpoints import CheckpointWriter
+
+EXPORT_COMPRESSIONS = ('gzip', 'zstd')
+COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+
+# Rows formatted and written at a time
+DEFAULT_EXPORT_CHUNKSIZE = 100000
+
+# Compression levels: fast settings, exports are written on every run
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+def _check_compression(compression):
+    if compression is not None and compression not in EXPORT_COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression} (expected one of {', '.join(EXPORT_COMPRESSIONS)})")
+
+def zstd_available():
+    """Whether the zstandard package is installed ('zstd' compression needs it)"""
+    try:
+        import zstandard  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def export_path(path, compression=None):
+    """`path` with the extension of its compression (.gz / .zst)"""
+    _check_compression(compression)
+    return path + COMPRESSION_EXTENSIONS.get(compression, '')
+
+def open_export(path, compression=None):
+    """Binary file to write an export to, compressed with `compression`"""
+    _check_compression(compression)
+    if compression == 'gzip':
+        return gzip.open(path, 'wb', compresslevel=GZIP_LEVEL)
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstd compression needs the zstandard package (pip install zstandard)") from None
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(open(path, 'wb'))
+    return open(path, 'wb')
+
+def write_csv_file(df, path, compression=None, chunksize=DEFAULT_EXPORT_CHUNKSIZE):
+    """`df` as CSV (no index, UTF-8) written chunk by chunk; returns rows"""
+    with open_export(path, compression) as f:
+        for start in range(0, max(len(df), 1), chunksize):
+            f.write(df.iloc[start:start + chunksize].to_csv(index=False, header=start == 0).encode('utf-8'))
+    return len(df)
+
+def write_parquet_file(df, path, compression=None, chunksize=DEFAULT_EXPORT_CHUNKSIZE):
+    """`df` as Parquet, one row group per chunk (compression: column codec); returns rows"""
+    with CheckpointWriter(path, compression=compression) as writer:
+        for start in range(0, max(len(df), 1), chunksize):
+            writer.write(df.iloc[start:start + chunksize])
+    return len(df)
+
+def json_dumps(value, pretty=False):
+    """`value` as UTF-8 JSON bytes with the json module (pretty: 2-space indent)"""
+    if pretty:
+        return json.dumps(value, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def write_json_document(f, head, records_key, record_chunks, json_format='pretty', dumps=json_dumps):
+    """
+    Stream {**head, records_key: [records...]} to the binary file `f`
+
+    record_chunks: lists of records, written as each one is ready
+    json_format: 'pretty' (same bytes as json.dump(indent=2)), 'compact',
+    or 'ndjson' (one record per line, head left out)
+    dumps: dumps(value, pretty) -> bytes
+
+    Returns the number of records.
+    """
+    n_records = 0
+    if json_format == 'ndjson':
+        for records in record_chunks:
+            f.write(b''.join(dumps(record) + b'\n' for record in records))
+            n_records += len(records)
+        return n_records
+
+    pretty = json_format == 'pretty'
+    # Top-level members; records sit two levels deep in the document
+    opening = b'{'
+    for key, value in list(head.items()) + [(records_key, None)]:
+        name = dumps(key)
+        if pretty:
+            opening += b'\n  ' + name + b': '
+        else:
+            opening += name + b':'
+        if key != records_key:
+            opening += (dumps(value, True).replace(b'\n', b'\n  ') if pretty else dumps(value)) + b','
+    f.write(opening + b'[')
+    for records in record_chunks:
+        parts = []
+        for record in records:
+            encoded = dumps(record, pretty)
+            if pretty:
+                encoded = b'\n    ' + encoded.replace(b'\n', b'\n    ')
+            parts.append(b',' + encoded if n_records else encoded)
+            n_records += 1
+        f.write(b''.join(parts))
+    if pretty:
+        f.write(b'\n  ]\n}' if n_records else b']\n}')
+    else:
+        f.write(b']}')
+    return n_records
+
+def export_files(exports, workers=None):
+    """
+    Write several deliverables at the same time, one thread per file
+
+    exports: {name: (path, write)}, write(path) writes the file and returns
+    its rows / records
+    workers: threads (default: one per deliverable)
+
+    Returns {name: report} with report = path, rows, bytes, seconds, mb_per_s,
+    rows_per_s. An error in any deliverable is raised once all have finished.
+    """
+    def timed(path, write):
+        started = time.perf_counter()
+        rows = write(path)
+        seconds = time.perf_counter() - started
+        size = os.path.getsize(path)
+        return {
+            'path': path,
+            'rows': rows,
+            'bytes': size,
+            'seconds': round(seconds, 3),
+            'mb_per_s': round(size / 1e6 / seconds, 1) if seconds > 0 else None,
+            'rows_per_s': round(rows / seconds) if seconds > 0 else None
+        }
+
+    with ThreadPoolExecutor(max_workers=workers or max(len(exports), 1)) as pool:
+        futures = {name: pool.submit(timed, path, write) for name, (path, write) in exports.items()}
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,277 @@
+# =============================================================================
+# PRODUCTION FEATURE TRANSFORMER - ONE FEATURE ENGINEERING FOR ALL SCORERS
+# =============================================================================
+#
+# OBJECTIVE: A single, fitted feature engineering step shared by the batch
+# pipelines (production_test, partner_pipeline_2) and the API service
+#
+# fit(training_df) captures everything that depends on data:
+#   - fill values (medians) of every model feature
+#   - frequency maps of employer, occupation and job title
+#   - the location x occupation combo table (production_frequency_encoding)
+# transform(df) is stateless and vectorized: a customer gets the same
+# features alone, in a batch, in a streaming chunk or in a parallel worker.
+#
+# The fitted state is saved as a versioned artifact (save / load).
+# Without an artifact, FeatureTransformer(freq_maps=...) encodes with the
+# existing frequency mappings and leaves missing values for the caller.
+#
+# USAGE (fit on the training extract and save the artifact):
+#   python production_feature_transformer.py <training_raw.csv> [transformer.pkl] [mappings.pkl]
+# =============================================================================
+
+import os
+import pickle
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from production_csv_ingestion import standardized_column_name
+from production_date_parsing import parse_date_column
+from production_frequency_encoding import (
+    COMBO_TABLE_KEY, DEFAULT_COMBO_FREQUENCY, build_combo_table, combo_frequencies,
+    factorize_category, lookup_codes
+)
+
+TRANSFORMER_FORMAT_VERSION = 1
+DEFAULT_TRANSFORMER_PATH = os.path.join('models', 'production', 'production_feature_transformer.pkl')
+
+DATE_COLUMNS = ['fechaingresoempleo', 'fecha_inicio', 'fecha_vencimiento']
+FREQUENCY_COLUMNS = ['nombreempleadorcliente', 'ocupacion', 'cargoempleocliente']
+
+# The exact 11 features our XGBoost model expects, in output order
+MODEL_FEATURES = [
+    'edad', 'fechaingresoempleo_days', 'balance_to_payment_ratio',
+    'fecha_inicio_days', 'saldo', 'nombreempleadorcliente_consolidated_freq',
+    'location_x_occupation', 'monto_letra', 'fecha_vencimiento_days',
+    'balance_coverage_ratio', 'payment_per_age'
+]
+
+DAY_FEATURES = ['fechaingresoempleo_days', 'fecha_inicio_days', 'fecha_vencimiento_days']
+
+# Features of the API model artifact on top of the shared ones
+API_FEATURES = [
+    'ocupacion_consolidated_freq', 'cargoempleocliente_consolidated_freq',
+    'employment_years', 'professional_stability_score'
+]
+
+# Values used when the source column is not in the input at all
+MISSING_COLUMN_DEFAULTS = {
+    'fechaingresoempleo_days': 1000,  # ~3 years
+    'fecha_inicio_days': 500,         # ~1.5 years
+    'fecha_vencimiento_days': 365,    # 1 year remaining
+    'balance_to_payment_ratio': 1.0,
+    'balance_coverage_ratio': 0.5,
+    'payment_per_age': 10.0
+}
+
+class FeatureTransformer:
+    """
+    Fitted feature engineering: raw customer columns -> model features
+
+    freq_maps: frequency mappings artifact (may hold the combo table)
+    fill_values: per-feature values for missing data (fitted medians)
+    reference_date: date the day features are counted from; None means the
+    moment transform() runs
+    """
+
+    def __init__(self, freq_maps=None, fill_values=None, reference_date=None):
+        self.freq_maps = dict(freq_maps or {})
+        self.fill_values = dict(fill_values or {})
+        self.reference_date = reference_date
+        self.fitted_at = None
+        self.training_rows = 0
+
+    @property
+    def has_combo_table(self):
+        return COMBO_TABLE_KEY in self.freq_maps
+
+    @property
+    def is_fitted(self):
+        return self.fitted_at is not None
+
+    def fit(self, df):
+        """
+        Capture frequency maps, combo table and fill values from training data
+
+        Maps already given to the constructor (e.g. the consolidated employer
+        map from the training notebooks) are kept; missing ones are counted
+        from `df`.
+        """
+        df = self.prepare_inputs(df.copy())
+
+        for col in FREQUENCY_COLUMNS:
+            if col in df.columns and not self.freq_maps.get(col):
+                codes, keys = factorize_category(df[col])
+                self.freq_maps[col] = dict(zip(keys.tolist(), np.bincount(codes, minlength=len(keys)).tolist()))
+        if not self.has_combo_table and 'ciudad' in df.columns and 'ocupacion' in df.columns:
+            self.freq_maps[COMBO_TABLE_KEY] = build_combo_table(df['ciudad'], df['ocupacion'])
+
+        self.fill_values = {}
+        features = self.transform(df)
+        for feature in MODEL_FEATURES + API_FEATURES:
+            if feature in features.columns and features[feature].notna().any():
+                self.fill_values[feature] = float(features[feature].median())
+
+        self.fitted_at = datetime.now()
+        self.training_rows = len(df)
+        return self
+
+    def prepare_inputs(self, df):
+        """Standardized column names and parsed date columns"""
+        df = df.rename(columns=standardized_column_name)
+        for col in DATE_COLUMNS:
+            if col in df.columns:
+                df[col] = parse_date_column(df[col])
+        return df
+
+    def add_frequency_features(self, df):
+        """
+        Frequency encodings: *_consolidated_freq and location_x_occupation
+
+        Categorical columns are normalized once per distinct value and kept
+        as pandas categoricals. Without a combo table location_x_occupation
+        gets the default frequency.
+        """
+        for col in FREQUENCY_COLUMNS:
+            feature = f'{col}_consolidated_freq'
+            if col not in df.columns:
+                df[feature] = 1
+                continue
+            codes, keys = factorize_category(df[col])
+            df[col] = pd.Categorical.from_codes(codes, keys)
+            freq_map = self.freq_maps.get(col)
+            df[feature] = lookup_codes(codes, keys, freq_map, min(freq_map.values())) if freq_map else 1
+
+        if 'ciudad' in df.columns:
+            ciudad = factorize_category(df['ciudad'])
+            df['ciudad'] = pd.Categorical.from_codes(*ciudad)
+
+        if self.has_combo_table and 'ciudad' in df.columns and 'ocupacion' in df.columns:
+            df['location_x_occupation'] = combo_frequencies(
+                self.freq_maps[COMBO_TABLE_KEY], ciudad, factorize_category(df['ocupacion'])
+            )
+        else:
+            df['location_x_occupation'] = DEFAULT_COMBO_FREQUENCY
+        return df
+
+    def add_temporal_features(self, df, reference_date=None):
+        """Days since employment / account start and days to loan maturity"""
+        reference_date = reference_date or self.reference_date or datetime.now()
+        for col, feature in zip(DATE_COLUMNS, DAY_FEATURES):
+            if col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col]):
+                if feature == 'fecha_vencimiento_days':
+                    df[feature] = (df[col] - reference_date).dt.days
+                else:
+                    df[feature] = (reference_date - df[col]).dt.days
+            else:
+                df[feature] = MISSING_COLUMN_DEFAULTS[feature]
+        return df
+
+    def add_ratio_features(self, df):
+        """Financial ratios, zero when the denominator is not positive, capped for stability"""
+        if 'saldo' in df.columns and 'monto_letra' in df.columns:
+            df['balance_to_payment_ratio'] = np.clip(
+                np.where(df['monto_letra'] > 0, df['saldo'] / df['monto_letra'], 0), 0, 100
+            )
+            # How many years of payments the balance covers
+            df['balance_coverage_ratio'] = np.clip(
+                np.where(df['monto_letra'] > 0, df['saldo'] / (df['monto_letra'] * 12), 0), 0, 10
+            )
+        else:
+            df['balance_to_payment_ratio'] = MISSING_COLUMN_DEFAULTS['balance_to_payment_ratio']
+            df['balance_coverage_ratio'] = MISSING_COLUMN_DEFAULTS['balance_coverage_ratio']
+
+        if 'monto_letra' in df.columns and 'edad' in df.columns:
+            df['payment_per_age'] = np.clip(np.where(df['edad'] > 0, df['monto_letra'] / df['edad'], 0), 0, 1000)
+        else:
+            df['payment_per_age'] = MISSING_COLUMN_DEFAULTS['payment_per_age']
+        return df
+
+    def add_api_features(self, df):
+        """Employment years and professional stability score (API model)"""
+        df['employment_years'] = (df['fechaingresoempleo_days'] / 365.25).clip(lower=0)
+        saldo = df['saldo'] / 1000 if 'saldo' in df.columns else 0
+        df['professional_stability_score'] = (df['employment_years'] * 0.6 + saldo * 0.4).clip(upper=10)
+        return df
+
+    def fill_missing(self, df):
+        """Fill missing feature values with the fitted values (unfitted: left as is)"""
+        for feature, value in self.fill_values.items():
+            if feature in df.columns:
+                df[feature] = df[feature].fillna(value)
+        return df
+
+    def transform(self, df, reference_date=None):
+        """
+        Raw customer columns -> every feature (model features and API features)
+
+        Stateless: each row only depends on itself and the fitted state.
+        Modifies and returns `df`; callers select the columns their model uses.
+        """
+        df = self.prepare_inputs(df)
+        df = self.add_frequency_features(df)
+        df = self.add_temporal_features(df, reference_date)
+        df = self.add_ratio_features(df)
+        df = self.add_api_features(df)
+        return self.fill_missing(df)
+
+    def save(self, path=DEFAULT_TRANSFORMER_PATH):
+        """Save the fitted state as a versioned artifact"""
+        state = {
+            'format_version': TRANSFORMER_FORMAT_VERSION,
+            'freq_maps': self.freq_maps,
+            'fill_values': self.fill_values,
+            'reference_date': self.reference_date,
+            'fitted_at': self.fitted_at,
+            'training_rows': self.training_rows
+        }
+        with open(path, 'wb') as f:
+            pickle.dump(state, f)
+        return path
+
+    @classmethod
+    def load(cls, path=DEFAULT_TRANSFORMER_PATH):
+        """Load an artifact written by save()"""
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        if state.get('format_version') != TRANSFORMER_FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature transformer format: {state.get('format_version')} "
+                             f"(expected {TRANSFORMER_FORMAT_VERSION})")
+        transformer = cls(state['freq_maps'], state['fill_values'], state['reference_date'])
+        transformer.fitted_at = state['fitted_at']
+        transformer.training_rows = state['training_rows']
+        return transformer
+
+def fit_feature_transformer(training_file_path, output_path=DEFAULT_TRANSFORMER_PATH, mappings_path=None):
+    """
+    Fit the transformer on a raw training extract and save the artifact
+
+    mappings_path: existing frequency mappings to keep (employer map etc.)
+    """
+    print("\n🧩 FITTING FEATURE TRANSFORMER")
+    print("="*50)
+
+    freq_maps = {}
+    if mappings_path and os.path.exists(mappings_path):
+        with open(mappings_path, 'rb') as f:
+            freq_maps = pickle.load(f)
+
+    training = pd.read_csv(training_file_path, encoding='latin-1', sep=',')
+    transformer = FeatureTransformer(freq_maps).fit(training)
+    transformer.save(output_path)
+
+    print(f"✅ Fitted on {transformer.training_rows:,} rows: "
+          f"{len(transformer.fill_values)} fill values, "
+          f"frequency maps for {sorted(col for col in transformer.freq_maps if col != COMBO_TABLE_KEY)}, "
+          f"combo table: {'yes' if transformer.has_combo_table else 'no'}")
+    print(f"💾 Saved to: {output_path}")
+    return transformer
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python production_feature_transformer.py <training_raw.csv> [transformer.pkl] [mappings.pkl]")
+        sys.exit(1)
+    fit_feature_transformer(sys.argv[1], *sys.argv[2:4])
@@ -0,0 +1,66 @@
+# =============================================================================
+# PRODUCTION OUTPUT - COMPACT PREDICTION FRAMES
+# =============================================================================
+#
+# OBJECTIVE: Keep prediction frames small for millions of rows: values that
+# are the same for the whole batch are stored once and labels are
+# categorical codes; text is written only by the final exports
+#
+# - Batch metadata (prediction_date, model_version, confidence_level,
+#   interval offsets) is kept once in df.attrs['batch']; the per-row columns
+#   are constant categoricals (one category, 1-byte codes)
+# - Label columns (income segment, confidence, priority, recommendation)
+#   are categoricals with fixed categories (Part 3)
+# - ci_width is not stored: ci_width(df) derives it from the interval bounds
+#
+# Arrow checkpoints keep the categoricals as dictionary columns.
+# export_frame() adds ci_width and turns the codes back into values, right
+# before CSV/JSON files and the master dataset are written.
+#
+# Used by Part 2 and Part 3. Shared by production_test/ and partner_pipeline_2/.
+# =============================================================================
+
+import numpy as np
+import pandas as pd
+
+# Per-row columns holding batch metadata
+BATCH_COLUMNS = ['confidence_level', 'prediction_date', 'model_version']
+
+def constant_column(value, n_rows):
+    """Categorical column with `value` in every row (stored once, 1-byte codes)"""
+    return pd.Categorical.from_codes(np.zeros(n_rows, dtype=np.int8), categories=[value])
+
+def set_batch_metadata(df, **metadata):
+    """
+    Record batch metadata once in df.attrs['batch']; the ones in
+    BATCH_COLUMNS also become constant columns
+    """
+    df.attrs['batch'] = {**df.attrs.get('batch', {}), **metadata}
+    for column in BATCH_COLUMNS:
+        if column in metadata:
+            df[column] = constant_column(metadata[column], len(df))
+    return df
+
+def ci_width(df):
+    """Confidence interval width per row (upper - lower 90% bound)"""
+    if 'ci_width' in df.columns:
+        return df['ci_width']
+    return df['income_upper_90'] - df['income_lower_90']
+
+def label_counts(column):
+    """{label: rows} of the labels present, most frequent first (unused categories left out)"""
+    counts = column.value_counts()
+    return {label: int(count) for label, count in counts[counts > 0].items()}
+
+def export_frame(df):
+    """
+    `df` as written to files: ci_width added back (last column, as Part 2
+    used to write it) and categorical codes expanded to their values
+    """
+    df = df.copy()
+    if 'ci_width' not in df.columns and 'income_upper_90' in df.columns:
+        df['ci_width'] = ci_width(df)
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = np.asarray(df[column])
+    return df
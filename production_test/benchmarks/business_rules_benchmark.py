@@ -0,0 +1,116 @@
+# =============================================================================
+# BENCHMARK - PART 3 BUSINESS RULES (per-row apply vs compiled rules)
+# =============================================================================
+#
+# Classifies synthetic predictions with the previous per-row rules (one
+# Series.apply and three DataFrame.apply(axis=1) passes) and with the
+# compiled BusinessRules used by Part 3, reports both times and checks the
+# four label columns are identical.
+#
+# USAGE (from production_test/):
+#   python benchmarks/business_rules_benchmark.py [rows]   (default 1,000,000)
+# =============================================================================
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from production_business_rules import BusinessRules
+
+LABEL_COLUMNS = ['income_segment', 'confidence_category', 'business_priority', 'recommendation']
+
+def synthetic_predictions(rows, seed=0):
+    """Predicted income with 90% bounds around it, a few rows missing"""
+    rng = np.random.default_rng(seed)
+    income = rng.gamma(2.0, 700.0, rows).round(2)
+    income[rng.random(rows) < 0.001] = np.nan
+    lower = np.maximum(income - rng.uniform(300, 700, rows), 0).round(2)
+    upper = (income + rng.uniform(500, 900, rows)).round(2)
+    return pd.DataFrame({'predicted_income': income, 'income_lower_90': lower, 'income_upper_90': upper})
+
+def classify_per_row(df):
+    """Part 3 classification as it was before the rules engine"""
+    def get_income_segment(income):
+        if income < 500:
+            return "LOW_INCOME_HIGH_RISK"
+        elif income < 1000:
+            return "LOW_INCOME_STABLE"
+        elif income < 1500:
+            return "MIDDLE_INCOME_STABLE"
+        elif income < 2000:
+            return "MIDDLE_INCOME_GROWTH"
+        elif income < 3000:
+            return "HIGH_INCOME_STABLE"
+        else:
+            return "HIGH_INCOME_PREMIUM"
+
+    def get_confidence_category(predicted_income, ci_width):
+        if predicted_income < 1500 and ci_width < 1200:
+            return "HIGH_CONFIDENCE"
+        elif predicted_income < 2000 and ci_width < 1400:
+            return "MEDIUM_CONFIDENCE"
+        else:
+            return "LOWER_CONFIDENCE"
+
+    def get_business_priority(income_segment, confidence_category):
+        if confidence_category == "HIGH_CONFIDENCE":
+            if income_segment in ["MIDDLE_INCOME_STABLE", "MIDDLE_INCOME_GROWTH"]:
+                return "HIGH_PRIORITY"
+            elif income_segment in ["HIGH_INCOME_STABLE", "HIGH_INCOME_PREMIUM"]:
+                return "PREMIUM_PRIORITY"
+            else:
+                return "STANDARD_PRIORITY"
+        else:
+            return "REVIEW_REQUIRED"
+
+    def get_recommendation(business_priority):
+        if business_priority == "PREMIUM_PRIORITY":
+            return "Offer premium products and personalized services"
+        elif business_priority == "HIGH_PRIORITY":
+            return "Target for standard loan products and credit increases"
+        elif business_priority == "STANDARD_PRIORITY":
+            return "Monitor and offer basic financial products"
+        else:
+            return "Requires manual review before product offers"
+
+    df = df.copy()
+    df['ci_width'] = df['income_upper_90'] - df['income_lower_90']
+    df['income_segment'] = df['predicted_income'].apply(get_income_segment)
+    df['confidence_category'] = df.apply(
+        lambda row: get_confidence_category(row['predicted_income'], row['ci_width']), axis=1)
+    df['business_priority'] = df.apply(
+        lambda row: get_business_priority(row['income_segment'], row['confidence_category']), axis=1)
+    df['recommendation'] = df.apply(lambda row: get_recommendation(row['business_priority']), axis=1)
+    return df
+
+def time_call(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print(f"🧪 Synthetic predictions: {rows:,} rows")
+    df = synthetic_predictions(rows)
+
+    per_row_seconds, df_per_row = time_call(lambda: classify_per_row(df))
+    print(f"\n⏱️ per-row apply (previous):  {per_row_seconds:7.2f}s  {rows / per_row_seconds:>12,.0f} rows/s")
+
+    rules = BusinessRules()
+    compiled_seconds, labels = time_call(
+        lambda: rules.classify(df['predicted_income'], df['income_upper_90'] - df['income_lower_90']))
+    print(f"⏱️ compiled rules:            {compiled_seconds:7.2f}s  {rows / compiled_seconds:>12,.0f} rows/s  "
+          f"speedup x{per_row_seconds / compiled_seconds:.0f}")
+
+    same = all(np.array_equal(np.asarray(labels[column], dtype=object), df_per_row[column].to_numpy())
+               for column in LABEL_COLUMNS)
+    print(f"\n✅ Labels identical" if same else "\n❌ Labels DIFFERENT")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# =============================================================================
+# BENCHMARK - RAW CSV INGESTION (python engine vs production_csv_ingestion)
+# =============================================================================
+#
+# Generates a synthetic raw customer file (production format, latin-1, a few
+# malformed lines) and times:
+#   1. pd.read_csv(engine='python', on_bad_lines='skip')   (previous loader)
+#   2. read_production_csv(engine='c')
+#   3. read_production_csv(engine='pyarrow')                (if installed)
+#
+# USAGE (from production_test/):
+#   python benchmarks/csv_ingestion_benchmark.py [rows]     (default 1,000,000)
+# =============================================================================
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from production_csv_ingestion import read_production_csv, resolve_engine
+
+def write_synthetic_raw_file(path, rows, bad_lines=25, seed=42, continuous=False):
+    """
+    Raw customer extract with the production header and some malformed lines
+    continuous: amounts with 8 decimals (nearly every saldo / monto_letra
+    value distinct) instead of cents
+    """
+    rng = np.random.default_rng(seed)
+
+    def dates(start, end):
+        days = rng.integers(start, end, rows)
+        values = (pd.Timestamp('1990-01-01') + pd.to_timedelta(days, unit='D')).strftime('%d/%m/%Y')
+        values = values.to_numpy(dtype=object)
+        values[rng.random(rows) < 0.03] = ''
+        return values
+
+    df = pd.DataFrame({
+        'Cliente': np.arange(rows),
+        'Identificador_Unico': [f'8-{i}-{i % 997}' for i in range(rows)],
+        'Edad': rng.integers(18, 80, rows),
+        'Sexo': rng.choice(['M', 'F'], rows),
+        'Ciudad': rng.choice(['PANAMA', 'COLON', 'DAVID', 'CHITRE', 'SANTIAGO', 'LA CHORRERA'], rows),
+        'Pais': 'PANAMA',
+        'Ocupacion': rng.choice(['INGENIERO', 'CONTADOR', 'DOCENTE', 'VENDEDOR', 'SECRETARIA'], rows),
+        'Estado_Civil': rng.choice(['SOLTERO', 'CASADO', 'UNIDO'], rows),
+        'FechaIngresoEmpleo': dates(5000, 12500),
+        'NombreEmpleadorCliente': rng.choice([f'EMPRESA {i}' for i in range(400)], rows),
+        'CargoEmpleoCliente': rng.choice(['ANALISTA', 'GERENTE', 'ASISTENTE'], rows),
+        'monto_letra': np.round(rng.gamma(2.0, 200.0, rows), 8 if continuous else 2),
+        'saldo': np.round(rng.gamma(2.0, 5000.0, rows), 8 if continuous else 2),
+        'fecha_inicio': dates(9000, 12500),
+        'fecha_vencimiento': dates(12000, 16000),
+    })
+    df.to_csv(path, index=False, encoding='latin-1')
+
+    # Malformed lines (extra fields) spread through the file
+    with open(path, 'a', encoding='latin-1') as f:
+        for i in range(bad_lines):
+            f.write(','.join(str(v) for v in range(17 + i % 3)) + '\n')
+
+def time_call(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'raw_customers.csv')
+        print(f"🧪 Writing synthetic raw file: {rows:,} rows...")
+        write_synthetic_raw_file(path, rows)
+        print(f"   {os.path.getsize(path) / 1e6:.1f} MB")
+
+        python_seconds, df_python = time_call(lambda: pd.read_csv(
+            path, encoding='latin-1', sep=',', on_bad_lines='skip', engine='python'))
+        print(f"\n⏱️ python engine (previous loader): {python_seconds:6.2f}s  {df_python.shape}")
+
+        engines = ['c'] + (['pyarrow'] if resolve_engine('auto') == 'pyarrow' else [])
+        for engine in engines:
+            seconds, (df, report) = time_call(lambda: read_production_csv(path, engine=engine))
+            print(f"⏱️ {engine:<7} engine + fallback:         {seconds:6.2f}s  {df.shape}  "
+                  f"speedup x{python_seconds / seconds:.1f}, "
+                  f"{len(report['bad_lines'])} bad lines reported, "
+                  f"{sum(block['bytes'] for block in report['fallback_blocks']) / 1e3:.0f} kB "
+                  f"on the Python parser")
+
+if __name__ == "__main__":
+    main()
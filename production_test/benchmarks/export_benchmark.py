@@ -0,0 +1,72 @@
+# =============================================================================
+# BENCHMARK - PREDICTION DELIVERABLES (one after the other vs concurrent)
+# =============================================================================
+#
+# Writes the CSV and customer predictions JSON of a synthetic Part 3 batch
+# the previous way (plain files, one after the other) and with
+# production_export.export_files for each compression, plus Parquet, and
+# reports wall seconds and the bytes / throughput of every file.
+#
+# USAGE (from production_test/):
+#   python benchmarks/export_benchmark.py [rows]   (default 1,000,000)
+# =============================================================================
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from json_export_benchmark import synthetic_export_frame
+from production_export import (export_files, export_path, write_csv_file, write_parquet_file,
+                               zstd_available)
+from production_json_export import write_predictions_json
+from production_part3_business_formatting import format_for_csv_export
+
+def deliverables(df, df_csv, base_path, compression, parquet=False):
+    exports = {
+        'csv': (export_path(base_path + '.csv', compression),
+                lambda path: write_csv_file(df_csv, path, compression)),
+        'json': (export_path(base_path + '.json', compression),
+                 lambda path: write_predictions_json(df, path, compression=compression)['records'])
+    }
+    if parquet:
+        exports['parquet'] = (base_path + '.parquet', lambda path: write_parquet_file(df_csv, path, compression))
+    return exports
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print(f"🧪 Synthetic Part 3 predictions: {rows:,} rows ({os.cpu_count()} CPUs)")
+    df = synthetic_export_frame(rows)
+    df_csv = format_for_csv_export(df)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        df_csv.to_csv(os.path.join(tmp, 'previous.csv'), index=False)
+        write_predictions_json(df, os.path.join(tmp, 'previous.json'))
+        previous_seconds = time.perf_counter() - start
+        previous_mb = sum(os.path.getsize(os.path.join(tmp, f'previous.{ext}')) for ext in ('csv', 'json')) / 1e6
+        print(f"\n{'export':<26} {'wall s':>7} {'MB':>8} {'speedup':>8}")
+        print(f"{'sequential plain':<26} {previous_seconds:>7.2f} {previous_mb:>8.1f}")
+
+        compressions = [None, 'gzip'] + (['zstd'] if zstd_available() else [])
+        for compression in compressions:
+            for parquet in (False, True):
+                name = f"concurrent {compression or 'plain'}" + (' +parquet' if parquet else '')
+                start = time.perf_counter()
+                reports = export_files(deliverables(df, df_csv, os.path.join(tmp, name.replace(' ', '_')),
+                                                    compression, parquet))
+                seconds = time.perf_counter() - start
+                size = sum(report['bytes'] for report in reports.values()) / 1e6
+                print(f"{name:<26} {seconds:>7.2f} {size:>8.1f} {previous_seconds / seconds:>7.1f}x")
+                for file_name, report in reports.items():
+                    print(f"   {file_name:<8} {report['bytes'] / 1e6:>8.1f} MB {report['seconds']:>7.2f}s "
+                          f"{report['mb_per_s'] or 0:>7,} MB/s {report['rows_per_s'] or 0:>10,} rows/s")
+        if not zstd_available():
+            print("\n   zstd skipped (zstandard not installed)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# =============================================================================
+# BENCHMARK - PART 3 JSON EXPORT (iterrows + json.dump vs streamed writer)
+# =============================================================================
+#
+# Writes the customer predictions JSON of a synthetic batch the previous
+# way (one dict per row from df.iterrows(), json.dump of the whole
+# document) and with production_json_export in each output format, and
+# reports seconds, records/second and file size. The pretty file is
+# checked to be byte-identical to the previous one.
+#
+# USAGE (from production_test/):
+#   python benchmarks/json_export_benchmark.py [rows]   (default 1,000,000)
+# =============================================================================
+
+import filecmp
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import production_json_export
+from production_events import SILENT
+from production_json_export import JSON_FORMATS, write_predictions_json
+from production_output import export_frame
+from production_part3_business_formatting import format as format_predictions, safe_round_float, safe_string
+
+def synthetic_export_frame(rows, seed=0):
+    """Part 3 predictions of a synthetic batch, as written to files"""
+    rng = np.random.default_rng(seed)
+    income = rng.gamma(2.0, 700.0, rows).astype('float32')
+    df = pd.DataFrame({
+        'identificador_unico': [f"8-{i}" for i in range(rows)],
+        'cliente': np.arange(rows),
+        'predicted_income': income.round(2),
+        'income_lower_90': np.maximum(income - 510.93, 0).round(2),
+        'income_upper_90': (income + 755.02).round(2),
+        'confidence_level': 0.90,
+        'prediction_date': '2026-10-19 10:00:00',
+        'model_version': 'XGBoost_v1.0_Final'
+    })
+    return export_frame(format_predictions(df, events=SILENT))
+
+def write_per_row(df, path, generation_date):
+    """The customer predictions file as Part 3 wrote it before"""
+    records = []
+    for _, row in df.iterrows():
+        records.append({
+            "customer_identification": {
+                "identificador_unico": safe_string(row.get('identificador_unico', '')),
+                "cliente": safe_string(row.get('cliente', ''))
+            },
+            "income_prediction": {
+                "predicted_income": safe_round_float(row['predicted_income']),
+                "confidence_interval": {
+                    "lower_bound": safe_round_float(row['income_lower_90']),
+                    "upper_bound": safe_round_float(row['income_upper_90']),
+                    "confidence_level": safe_round_float(row['confidence_level'], 2),
+                    "interval_width": safe_round_float(row['ci_width'])
+                }
+            },
+            "business_classification": {
+                "income_segment": safe_string(row['income_segment']),
+                "confidence_category": safe_string(row['confidence_category']),
+                "business_priority": safe_string(row['business_priority']),
+                "recommendation": safe_string(row['recommendation'])
+            },
+            "metadata": {
+                "prediction_date": safe_string(row['prediction_date']),
+                "model_version": safe_string(row['model_version'])
+            }
+        })
+    json_data = {
+        "prediction_summary": {
+            "total_customers": len(records),
+            "generation_date": generation_date,
+            "model_version": "XGBoost_v1.0_Final"
+        },
+        "customer_predictions": records
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(json_data, f, indent=2, ensure_ascii=False)
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    generation_date = '2026-10-19 10:00:00'
+
+    print(f"🧪 Synthetic Part 3 predictions: {rows:,} rows")
+    df = synthetic_export_frame(rows)
+    print(f"   JSON encoder: {'orjson' if production_json_export.orjson else 'json module (orjson not installed)'}\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        previous_path = os.path.join(tmp, 'previous.json')
+        start = time.perf_counter()
+        write_per_row(df, previous_path, generation_date)
+        previous_seconds = time.perf_counter() - start
+        print(f"{'writer':<18} {'seconds':>8} {'records/s':>11} {'MB':>8} {'speedup':>8}")
+        print(f"{'iterrows + dump':<18} {previous_seconds:>8.2f} {rows / previous_seconds:>11,.0f} "
+              f"{os.path.getsize(previous_path) / 1e6:>8.1f}")
+
+        for json_format in JSON_FORMATS:
+            path = os.path.join(tmp, f'{json_format}.json')
+            report = write_predictions_json(df, path, json_format, generation_date=generation_date)
+            note = ''
+            if json_format == 'pretty':
+                note = '  identical' if filecmp.cmp(previous_path, path, shallow=False) else '  DIFFERENT'
+            print(f"{'streamed ' + json_format:<18} {report['seconds']:>8.2f} {report['records_per_s']:>11,} "
+                  f"{report['bytes'] / 1e6:>8.1f} {previous_seconds / report['seconds']:>7.1f}x{note}")
+
+if __name__ == "__main__":
+    main()
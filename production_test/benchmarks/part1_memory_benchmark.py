@@ -0,0 +1,96 @@
+# =============================================================================
+# BENCHMARK - PART 1 PEAK MEMORY (typed input schema vs float64/object,
+# and streaming mode)
+# =============================================================================
+#
+# Runs production_part1_main (in-memory mode) on synthetic raw files with
+# the typed schema (float32 / int32 / category) and without it (float64 /
+# object, the previous reader), and in streaming mode (typed, chunks of
+# STREAMING_CHUNKSIZE rows), each in a fresh process, and reports:
+#   - size of the loaded raw DataFrame (in-memory modes)
+#   - peak RSS of the Part 1 run (the process baseline after imports is
+#     reported too, so the pipeline's own share is peak - baseline)
+#
+# Amounts have 8 decimals, so saldo, monto_letra and the ratios built from
+# them have about as many distinct values as rows: whole-file statistics
+# kept per distinct value would show up as streaming peak memory growing
+# with the rows instead of staying flat.
+#
+# USAGE (from production_test/):
+#   python benchmarks/part1_memory_benchmark.py [rows ...]   (default 100000 1000000)
+# =============================================================================
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# VmHWM starts over at exec; ru_maxrss would carry the parent's peak (the
+# synthetic file writer) into the child
+from production_events import SILENT, peak_rss_mb
+
+STREAMING_CHUNKSIZE = 100_000
+MODES = ('object', 'typed', 'streaming')
+
+def child(input_path, mode):
+    """One measured run; prints 'frame_mb baseline_mb peak_mb seconds'"""
+    from production_csv_ingestion import read_production_csv
+    from production_part1_data_cleaning import production_part1_main
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == 'streaming':
+        result = production_part1_main(input_path, input_path + '.clean.arrow', chunksize=STREAMING_CHUNKSIZE,
+                                       events=SILENT)
+    else:
+        result = production_part1_main(input_path, typed=mode == 'typed', events=SILENT)
+    seconds = time.perf_counter() - start
+    peak = peak_rss_mb()
+    if result is None:
+        raise RuntimeError("Part 1 failed")
+    frame_mb = 0.0
+    if mode != 'streaming':
+        # Measured after the run, so this extra read does not count in the peak
+        df, _ = read_production_csv(input_path, typed=mode == 'typed')
+        frame_mb = df.memory_usage(deep=True).sum() / 1e6
+    print(f"{frame_mb:.1f} {baseline:.1f} {peak:.1f} {seconds:.2f}")
+
+def saving(before, after):
+    """Relative reduction, formatted"""
+    return f"{1 - after / before:.0%}" if before > 0 else "n/a"
+
+def measure(input_path, mode):
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', input_path, mode],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    return [float(value) for value in output[-4:]]
+
+def main(sizes):
+    from csv_ingestion_benchmark import write_synthetic_raw_file
+
+    print(f"{'rows':>10} {'schema':>8} {'raw frame MB':>13} {'baseline MB':>12} {'peak RSS MB':>12} "
+          f"{'Part 1 MB':>10} {'seconds':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            input_path = os.path.join(tmp, f'raw_{rows}.csv')
+            write_synthetic_raw_file(input_path, rows, continuous=True)
+            results = {}
+            for mode in MODES:
+                results[mode] = measure(input_path, mode)
+                frame_mb, baseline_mb, peak_mb, seconds = results[mode]
+                frame = f"{frame_mb:>13.1f}" if mode != 'streaming' else f"{'-':>13}"
+                print(f"{rows:>10,} {mode:>8} {frame} "
+                      f"{baseline_mb:>12.1f} {peak_mb:>12.1f} {peak_mb - baseline_mb:>10.1f} {seconds:>8.2f}")
+            (old_frame, old_base, old_peak, _), (new_frame, new_base, new_peak, _) = results['object'], results['typed']
+            print(f"{'':>10} {'saving':>8} {saving(old_frame, new_frame):>13} {'':>12} "
+                  f"{saving(old_peak, new_peak):>12} {saving(old_peak - old_base, new_peak - new_base):>10}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main([int(value) for value in sys.argv[1:]] or [100_000, 1_000_000])
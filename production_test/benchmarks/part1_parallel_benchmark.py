@@ -0,0 +1,60 @@
+# =============================================================================
+# BENCHMARK - PART 1 PARALLEL MODE (throughput vs worker processes)
+# =============================================================================
+#
+# Runs production_part1_main on a synthetic raw file with 1..N worker
+# processes (streaming mode, same chunksize) and reports rows/second,
+# speedup over one worker and parallel efficiency. Every run's output is
+# checked to be identical to the single-worker output.
+#
+# USAGE (from production_test/):
+#   python benchmarks/part1_parallel_benchmark.py [rows] [max_workers] [chunksize]
+#   defaults: 1,000,000 rows, os.cpu_count() workers, 50,000 rows per chunk
+# =============================================================================
+
+import filecmp
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from csv_ingestion_benchmark import write_synthetic_raw_file
+from production_events import SILENT
+from production_part1_data_cleaning import production_part1_main
+
+def run_part1(input_path, output_path, chunksize, workers):
+    """Seconds for one Part 1 run (pipeline output silenced)"""
+    start = time.perf_counter()
+    summary = production_part1_main(input_path, output_path, chunksize=chunksize, workers=workers, events=SILENT)
+    seconds = time.perf_counter() - start
+    if summary is None:
+        raise RuntimeError(f"Part 1 failed with {workers} workers")
+    return seconds, summary
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    chunksize = int(sys.argv[3]) if len(sys.argv) > 3 else 50_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'raw_customers.csv')
+        print(f"🧪 Writing synthetic raw file: {rows:,} rows...")
+        write_synthetic_raw_file(input_path, rows)
+        print(f"   {os.path.getsize(input_path) / 1e6:.1f} MB, {os.cpu_count()} CPU(s) available\n")
+
+        print(f"{'workers':>8} {'seconds':>9} {'rows/s':>11} {'speedup':>8} {'efficiency':>11}  output")
+        baseline_seconds, baseline_path = None, None
+        for workers in range(1, max_workers + 1):
+            output_path = os.path.join(tmp, f'clean_{workers}.csv')
+            seconds, summary = run_part1(input_path, output_path, chunksize, workers)
+            if baseline_seconds is None:
+                baseline_seconds, baseline_path = seconds, output_path
+            speedup = baseline_seconds / seconds
+            same = filecmp.cmp(baseline_path, output_path, shallow=False)
+            print(f"{workers:>8} {seconds:>9.2f} {summary['rows'] / seconds:>11,.0f} "
+                  f"{speedup:>7.2f}x {speedup / workers:>10.0%}  {'identical' if same else 'DIFFERENT'}")
+
+if __name__ == "__main__":
+    main()
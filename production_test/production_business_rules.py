@@ -0,0 +1,139 @@
+# =============================================================================
+# PRODUCTION BUSINESS RULES - DECLARATIVE, VECTORIZED CLASSIFICATION
+# =============================================================================
+#
+# OBJECTIVE: Classify millions of predictions in a few array operations
+# instead of one Python call per row and per label, with the thresholds
+# declared in one config instead of hard-coded in functions
+#
+# The rules (DEFAULT_BUSINESS_RULES, or the same structure in a JSON file):
+#   income_segments  cut-offs on predicted income, one label per interval
+#   confidence       ordered rules "income < x and ci_width < y"; the first
+#                    match wins, otherwise the default label
+#   priority         {confidence: {segment: priority}}; unlisted pairs get
+#                    the default priority
+#   recommendations  {priority: recommendation text}
+#
+# BusinessRules compiles them once into arrays:
+#   segment         np.searchsorted over the cut-offs
+#   confidence      np.select over the rule conditions
+#   priority        lookup table [confidence code, segment code]
+#   recommendation  lookup table [priority code]
+# and classify() returns the four label columns as categoricals (1-byte
+# codes). Missing income or interval width fall in the last segment and
+# the default confidence, as the per-row rules did.
+#
+# Used by Part 3 (classify_income_risk_segments).
+# =============================================================================
+
+import json
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BUSINESS_RULES = {
+    'income_segments': {
+        'cutoffs': [500, 1000, 1500, 2000, 3000],
+        'labels': [
+            "LOW_INCOME_HIGH_RISK", "LOW_INCOME_STABLE", "MIDDLE_INCOME_STABLE",
+            "MIDDLE_INCOME_GROWTH", "HIGH_INCOME_STABLE", "HIGH_INCOME_PREMIUM"
+        ]
+    },
+    'confidence': {
+        'rules': [
+            {'label': "HIGH_CONFIDENCE", 'income_below': 1500, 'ci_width_below': 1200},
+            {'label': "MEDIUM_CONFIDENCE", 'income_below': 2000, 'ci_width_below': 1400}
+        ],
+        'default': "LOWER_CONFIDENCE"
+    },
+    'priority': {
+        'labels': ["PREMIUM_PRIORITY", "HIGH_PRIORITY", "STANDARD_PRIORITY", "REVIEW_REQUIRED"],
+        'table': {
+            "HIGH_CONFIDENCE": {
+                "LOW_INCOME_HIGH_RISK": "STANDARD_PRIORITY",
+                "LOW_INCOME_STABLE": "STANDARD_PRIORITY",
+                "MIDDLE_INCOME_STABLE": "HIGH_PRIORITY",
+                "MIDDLE_INCOME_GROWTH": "HIGH_PRIORITY",
+                "HIGH_INCOME_STABLE": "PREMIUM_PRIORITY",
+                "HIGH_INCOME_PREMIUM": "PREMIUM_PRIORITY"
+            }
+        },
+        'default': "REVIEW_REQUIRED"
+    },
+    'recommendations': {
+        "PREMIUM_PRIORITY": "Offer premium products and personalized services",
+        "HIGH_PRIORITY": "Target for standard loan products and credit increases",
+        "STANDARD_PRIORITY": "Monitor and offer basic financial products",
+        "REVIEW_REQUIRED": "Requires manual review before product offers"
+    }
+}
+
+def _position(labels, label, what):
+    if label not in labels:
+        raise ValueError(f"Unknown {what} in business rules: {label}")
+    return labels.index(label)
+
+class BusinessRules:
+    """Business rules compiled to lookup arrays (see DEFAULT_BUSINESS_RULES)"""
+
+    def __init__(self, rules=None):
+        rules = rules or DEFAULT_BUSINESS_RULES
+
+        segments = rules['income_segments']
+        self.cutoffs = np.asarray(segments['cutoffs'], dtype=np.float64)
+        self.segments = list(segments['labels'])
+        if len(self.segments) != len(self.cutoffs) + 1 or np.any(np.diff(self.cutoffs) <= 0):
+            raise ValueError("Income segments need increasing cut-offs and one label more than cut-offs")
+
+        confidence = rules['confidence']
+        self.confidence_rules = [(rule['income_below'], rule['ci_width_below']) for rule in confidence['rules']]
+        self.confidence_categories = [rule['label'] for rule in confidence['rules']] + [confidence['default']]
+
+        priority = rules['priority']
+        self.priorities = list(priority['labels'])
+        self.priority_table = np.full((len(self.confidence_categories), len(self.segments)),
+                                      _position(self.priorities, priority['default'], 'priority'), dtype=np.int8)
+        for confidence_label, by_segment in priority['table'].items():
+            row = _position(self.confidence_categories, confidence_label, 'confidence label')
+            for segment, label in by_segment.items():
+                self.priority_table[row, _position(self.segments, segment, 'income segment')] = \
+                    _position(self.priorities, label, 'priority')
+
+        texts = [rules['recommendations'][label] for label in self.priorities]
+        self.recommendations = list(dict.fromkeys(texts))
+        self.recommendation_codes = np.array([self.recommendations.index(text) for text in texts], dtype=np.int8)
+
+    def segment_codes(self, income):
+        """Income segment code per row (missing income: last segment)"""
+        return np.searchsorted(self.cutoffs, income, side='right').astype(np.int8)
+
+    def confidence_codes(self, income, width):
+        """Confidence code per row: first matching rule, else the default"""
+        conditions = [(income < income_below) & (width < width_below)
+                      for income_below, width_below in self.confidence_rules]
+        return np.select(conditions, np.arange(len(conditions), dtype=np.int8),
+                         default=len(conditions)).astype(np.int8)
+
+    def classify(self, income, width):
+        """
+        {column: categorical} for income_segment, confidence_category,
+        business_priority and recommendation
+        income, width: predicted income and confidence interval width per row
+        """
+        income = np.asarray(income, dtype=np.float64)
+        width = np.asarray(width, dtype=np.float64)
+        segment = self.segment_codes(income)
+        confidence = self.confidence_codes(income, width)
+        priority = self.priority_table[confidence, segment]
+        recommendation = self.recommendation_codes[priority]
+        return {
+            'income_segment': pd.Categorical.from_codes(segment, categories=self.segments),
+            'confidence_category': pd.Categorical.from_codes(confidence, categories=self.confidence_categories),
+            'business_priority': pd.Categorical.from_codes(priority, categories=self.priorities),
+            'recommendation': pd.Categorical.from_codes(recommendation, categories=self.recommendations)
+        }
+
+def load_business_rules(path):
+    """BusinessRules from a JSON file with the structure of DEFAULT_BUSINESS_RULES"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return BusinessRules(json.load(f))
@@ -0,0 +1,88 @@
+# =============================================================================
+# PRODUCTION DATE PARSING - SINGLE PASS OVER UNIQUE VALUES
+# =============================================================================
+#
+# OBJECTIVE: Parse the raw date columns (fechaingresoempleo, fecha_inicio,
+# fecha_vencimiento) once per distinct string instead of once per row
+#
+# Customer files repeat the same dates thousands of times. Each column is
+# factorized, the format is inferred from a sample of its distinct values,
+# and only the distinct strings are parsed:
+#   1. with the inferred format (DD/MM/YYYY or YYYY-MM-DD),
+#   2. values that fail it with the other known format,
+#   3. whatever is left with free-form parsing (day first), value by value.
+# The parsed uniques are mapped back to the rows with a vectorized take, so
+# a column mixing formats is handled per value rather than per column.
+#
+# Shared by production_test/, partner_pipeline_2/ and the API service
+# (api-service/app/services/prediction_service.py).
+# =============================================================================
+
+import numpy as np
+import pandas as pd
+
+# Known formats, most common in production extracts first
+DATE_FORMATS = ['%d/%m/%Y', '%Y-%m-%d']
+
+FORMAT_SAMPLE_SIZE = 200
+
+def infer_date_format(values, formats=DATE_FORMATS, sample_size=FORMAT_SAMPLE_SIZE):
+    """
+    Known format that parses the most values in a sample of distinct strings
+    Ties keep the order of `formats`; returns None when none parses anything
+    """
+    sample = pd.Series(values[:sample_size], dtype=object)
+    best_format, best_parsed = None, 0
+    for date_format in formats:
+        parsed = pd.to_datetime(sample, format=date_format, errors='coerce').notna().sum()
+        if parsed > best_parsed:
+            best_format, best_parsed = date_format, parsed
+    return best_format
+
+def parse_unique_dates(uniques, formats=DATE_FORMATS):
+    """
+    Parse an array of distinct date strings into a DatetimeIndex
+
+    The inferred format goes first, then the remaining known formats on the
+    values still unparsed, then free-form (day-first) parsing per value.
+    """
+    uniques = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype='datetime64[ns]')
+
+    inferred = infer_date_format(uniques.to_numpy(), formats)
+    ordered = ([inferred] if inferred else []) + [f for f in formats if f != inferred]
+
+    for date_format in ordered:
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(uniques[missing], format=date_format, errors='coerce')
+
+    missing = parsed.isna() & (uniques != '')
+    if missing.any():
+        parsed[missing] = pd.to_datetime(uniques[missing], format='mixed', dayfirst=True, errors='coerce')
+
+    return pd.DatetimeIndex(parsed)
+
+def parse_date_column(series, formats=DATE_FORMATS):
+    """
+    Convert a raw date column to datetime64, parsing each distinct value once
+
+    Missing values stay NaT; values no parser understands become NaT.
+    Columns that already hold datetimes are returned unchanged.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    if len(uniques) == 0:
+        return pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]', name=series.name)
+
+    # Slot for missing values at the end, so -1 codes take NaT
+    parsed = np.append(parse_unique_dates(uniques, formats).to_numpy(), np.datetime64('NaT'))
+    codes = np.where(codes < 0, len(uniques), codes)
+    return pd.Series(parsed.take(codes), index=series.index, name=series.name)
+
+def date_success_rate(series):
+    """Share of rows with a parsed date"""
+    return series.notna().sum() / len(series) if len(series) else 0.0
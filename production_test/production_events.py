@@ -0,0 +1,250 @@
+# =============================================================================
+# PRODUCTION EVENTS - STRUCTURED PIPELINE INSTRUMENTATION
+# =============================================================================
+#
+# OBJECTIVE: One way for every pipeline stage to report what it did, instead
+# of print() calls that callers have to hide by redirecting sys.stdout
+#
+# A PipelineEvents emitter sends event records (plain dicts) to sinks:
+#   - ConsoleSink: the human-readable progress lines, as the parts always
+#     printed them, plus a timing line per stage
+#   - JsonLinesSink: one JSON record per line in a file (run logs, audits)
+#   - MetricsSink: in-memory totals per stage (rows, seconds, peak memory,
+#     imputed values) for reports and tests
+#
+# Events:
+#   message      {'text'}                            progress line
+#   stage_start  {'stage', ...}
+#   stage_end    {'stage', 'status', 'duration_s', 'peak_rss_mb',
+#                 'rows_in', 'rows_out', ...}         fields set by the stage
+#   imputed      {'stage', 'feature', 'count', 'value'}
+#   + any event a stage emits with emit(event, **fields)
+#
+# An emitter without sinks (SILENT) is the quiet mode: messages and events
+# return immediately, stages skip timing and memory probes, nothing is
+# buffered.
+#
+# Shared by production_test/ and partner_pipeline_2/.
+# =============================================================================
+
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+def _quiet(*args, **kwargs):
+    """Stand-in for print() when progress output is disabled"""
+    pass
+
+def peak_rss_mb():
+    """Peak resident set size of the process so far (VmHWM on Linux, ru_maxrss elsewhere)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1e3
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+def reset_peak_rss():
+    """
+    Start a new peak measurement (Linux only)
+
+    Elsewhere the peak cannot be reset and stage peaks are the process peak
+    up to the end of the stage.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+class PipelineEvents:
+    """
+    Emitter of pipeline events to a list of sinks
+
+    sinks: callables taking one event record (dict)
+    messages: whether progress lines (message events) are sent
+    context: fields added to every record (e.g. pipeline='part1')
+    """
+
+    def __init__(self, *sinks, messages=True, **context):
+        self.sinks = list(sinks)
+        self.messages = messages
+        self.context = context
+        self._peaks = []  # running peak of each open stage, outermost first
+
+    @property
+    def enabled(self):
+        return bool(self.sinks)
+
+    @property
+    def verbose(self):
+        """Whether progress lines go anywhere (skip building expensive ones otherwise)"""
+        return self.messages and bool(self.sinks)
+
+    def quiet(self):
+        """Same sinks and stage tracking, without progress lines"""
+        events = PipelineEvents(*self.sinks, messages=False, **self.context)
+        events._peaks = self._peaks
+        return events
+
+    def emit(self, event, **fields):
+        if not self.sinks:
+            return
+        record = {'event': event, 'time': datetime.now().isoformat(timespec='milliseconds')}
+        record.update(self.context)
+        record.update(fields)
+        for sink in self.sinks:
+            sink(record)
+
+    def message(self, text='', *args, **kwargs):
+        """print()-compatible progress line"""
+        if self.messages and self.sinks:
+            self.emit('message', text=' '.join(str(part) for part in (text,) + args))
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """
+        Time a pipeline stage and report it
+
+        Yields a dict the stage fills with its own fields (rows_in,
+        rows_out, ...); they are sent with the stage_end event, together
+        with the duration and the peak RSS during the stage. A stage that
+        gives up without raising sets record['status'] = 'failed'.
+        """
+        if not self.sinks:
+            yield {}
+            return
+
+        # Fold the peak so far into the open stages before restarting the measurement
+        current = peak_rss_mb()
+        self._peaks[:] = [max(peak, current) for peak in self._peaks]
+        reset_peak_rss()
+        self._peaks.append(0.0)
+
+        record = dict(fields)
+        self.emit('stage_start', stage=name, **fields)
+        start = time.perf_counter()
+        status = None
+        try:
+            yield record
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            status = status or record.pop('status', 'ok')
+            peak = max(self._peaks.pop(), peak_rss_mb())
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            record.update({
+                'status': status,
+                'duration_s': round(time.perf_counter() - start, 4),
+                'peak_rss_mb': round(peak, 1)
+            })
+            self.emit('stage_end', stage=name, **record)
+
+# Quiet mode: no sinks, every call returns immediately
+SILENT = PipelineEvents()
+
+def console_events(**context):
+    """Emitter printing to the console, the pipelines' default output"""
+    return PipelineEvents(ConsoleSink(), **context)
+
+def message_logger(events=None, verbose=True):
+    """
+    print()-compatible callable for a stage's progress lines
+
+    With an emitter the lines become its message events; without one they
+    are printed (verbose) or dropped, as the parts did before events.
+    """
+    if events is not None:
+        return events.message if events.verbose else _quiet
+    return print if verbose else _quiet
+
+class ConsoleSink:
+    """Progress lines as printed text, plus one timing line per finished stage"""
+
+    def __init__(self, stream=None, timings=True):
+        self.stream = stream
+        self.timings = timings
+
+    def __call__(self, record):
+        if record['event'] == 'message':
+            print(record['text'], file=self.stream or sys.stdout)
+        elif record['event'] == 'stage_end' and self.timings:
+            rows = ''
+            if record.get('rows_out') is not None:
+                rows = f", {record['rows_out']:,} rows"
+            print(f"   ⏱️ {record['stage']}: {record['duration_s']:.2f}s{rows}, "
+                  f"peak {record['peak_rss_mb']:,.0f} MB" + (' (failed)' if record['status'] != 'ok' else ''),
+                  file=self.stream or sys.stdout)
+
+class JsonLinesSink:
+    """
+    One JSON record per line, appended to `path`
+
+    include_messages: also write the progress lines (off by default, the
+    structured events carry the same information)
+    """
+
+    def __init__(self, path, include_messages=False):
+        self.path = path
+        self.include_messages = include_messages
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __call__(self, record):
+        if record['event'] == 'message' and not self.include_messages:
+            return
+        self._file.write(json.dumps(record, default=str, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class MetricsSink:
+    """
+    In-memory totals of a run
+
+    stages: {stage: {'runs', 'failures', 'seconds', 'peak_rss_mb', 'rows_in', 'rows_out'}}
+    imputed: {feature: values filled}
+    counters: {event: count} for every other event
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.imputed = {}
+        self.counters = {}
+
+    def __call__(self, record):
+        event = record['event']
+        if event == 'stage_end':
+            stage = self.stages.setdefault(record['stage'], {
+                'runs': 0, 'failures': 0, 'seconds': 0.0, 'peak_rss_mb': 0.0, 'rows_in': 0, 'rows_out': 0
+            })
+            stage['runs'] += 1
+            stage['failures'] += record['status'] != 'ok'
+            stage['seconds'] += record['duration_s']
+            stage['peak_rss_mb'] = max(stage['peak_rss_mb'], record['peak_rss_mb'])
+            stage['rows_in'] += record.get('rows_in') or 0
+            stage['rows_out'] += record.get('rows_out') or 0
+        elif event == 'imputed':
+            self.imputed[record['feature']] = self.imputed.get(record['feature'], 0) + record['count']
+        elif event not in ('message', 'stage_start'):
+            self.counters[event] = self.counters.get(event, 0) + 1
+
+    def summary(self):
+        """Snapshot of the totals as plain dicts"""
+        return {
+            'stages': {name: dict(stage) for name, stage in self.stages.items()},
+            'imputed': dict(self.imputed),
+            'counters': dict(self.counters)
+        }
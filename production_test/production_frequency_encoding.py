@@ -0,0 +1,123 @@
+# =============================================================================
+# PRODUCTION FREQUENCY ENCODING - TRAINING-TIME COMBO TABLE
+# =============================================================================
+#
+# OBJECTIVE: Encode location_x_occupation from training-time frequencies,
+# independently of the batch being scored
+#
+# The combo table is stored in the frequency mappings artifact under
+# 'location_x_occupation':
+#   {'ciudad': [city keys], 'ocupacion': [occupation keys],
+#    'counts': int64 matrix, counts[city index, occupation index]}
+# Keys are normalized (stripped, upper case). Encoding a row is an
+# integer-pair lookup in the matrix, so the same customer gets the same
+# value in a full file, a streaming chunk, a parallel worker or the API.
+# Unseen cities, occupations or pairs get DEFAULT_COMBO_FREQUENCY.
+#
+# Shared by production_test/, partner_pipeline_2/ and the API service.
+#
+# USAGE (add the table to an existing mappings artifact):
+#   python production_frequency_encoding.py <training_raw.csv> [mappings.pkl]
+# =============================================================================
+
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+COMBO_TABLE_KEY = 'location_x_occupation'
+DEFAULT_COMBO_FREQUENCY = 1
+DEFAULT_MAPPINGS_PATH = os.path.join('models', 'production', 'production_frequency_mappings_catboost.pkl')
+
+def normalize_category(series):
+    """Categorical text as used for frequency keys: stripped, upper case"""
+    return series.astype(str).str.strip().str.upper()
+
+def factorize_category(series):
+    """
+    Integer codes and normalized keys of a categorical column
+
+    Only the distinct values are normalized; raw values that normalize to
+    the same key (e.g. ' Panama' and 'PANAMA') share a code. Missing values
+    become 'NAN', as astype(str) makes them.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    key_codes, keys = pd.factorize(normalize_category(pd.Series(uniques, dtype=object)))
+    return key_codes[codes], np.asarray(keys, dtype=object)
+
+def lookup_codes(codes, keys, mapping, default):
+    """Per-row values of `mapping`, looked up once per key and taken by code"""
+    return pd.Series(keys, dtype=object).map(mapping).fillna(default).to_numpy()[codes]
+
+def build_combo_table(ciudad, ocupacion):
+    """
+    Location-occupation frequencies of a training set as a combo table
+
+    ciudad / ocupacion: raw training columns (normalized here)
+    """
+    ciudad_codes, ciudad_keys = factorize_category(ciudad)
+    ocupacion_codes, ocupacion_keys = factorize_category(ocupacion)
+    shape = (len(ciudad_keys), len(ocupacion_keys))
+    flat = ciudad_codes.astype(np.int64) * shape[1] + ocupacion_codes
+    counts = np.bincount(flat, minlength=shape[0] * shape[1]).reshape(shape)
+    return {
+        'ciudad': ciudad_keys.tolist(),
+        'ocupacion': ocupacion_keys.tolist(),
+        'counts': counts.astype(np.int64)
+    }
+
+def combo_frequencies(combo_table, ciudad, ocupacion, default=DEFAULT_COMBO_FREQUENCY):
+    """
+    Per-row location_x_occupation from a combo table
+
+    ciudad / ocupacion: (codes, keys) from factorize_category. Keys are
+    resolved to table indexes once; rows are then a vectorized lookup of
+    (city index, occupation index) in the counts matrix.
+    """
+    (ciudad_codes, ciudad_keys), (ocupacion_codes, ocupacion_keys) = ciudad, ocupacion
+    rows = pd.Index(combo_table['ciudad']).get_indexer(ciudad_keys)[ciudad_codes]
+    cols = pd.Index(combo_table['ocupacion']).get_indexer(ocupacion_keys)[ocupacion_codes]
+
+    values = np.full(len(rows), default, dtype=np.int64)
+    known = (rows >= 0) & (cols >= 0)
+    values[known] = combo_table['counts'][rows[known], cols[known]]
+    values[values == 0] = default
+    return values
+
+def add_combo_table(training_file_path, mappings_path=DEFAULT_MAPPINGS_PATH):
+    """
+    Add the training-time combo table to a frequency mappings artifact
+
+    training_file_path: training extract with Ciudad / Ocupacion columns
+    Existing mappings (employer, occupation frequencies) are kept.
+    """
+    print("\n🔢 BUILDING LOCATION x OCCUPATION TABLE")
+    print("="*50)
+
+    training = pd.read_csv(training_file_path, encoding='latin-1', sep=',', dtype=str)
+    training.columns = training.columns.str.lower()
+    if 'ciudad' not in training.columns or 'ocupacion' not in training.columns:
+        raise ValueError("training file needs 'ciudad' and 'ocupacion' columns")
+
+    freq_maps = {}
+    if os.path.exists(mappings_path):
+        with open(mappings_path, 'rb') as f:
+            freq_maps = pickle.load(f)
+
+    table = build_combo_table(training['ciudad'], training['ocupacion'])
+    freq_maps[COMBO_TABLE_KEY] = table
+    with open(mappings_path, 'wb') as f:
+        pickle.dump(freq_maps, f)
+
+    print(f"✅ {len(table['ciudad'])} cities x {len(table['ocupacion'])} occupations, "
+          f"{int((table['counts'] > 0).sum()):,} observed combos from {len(training):,} rows")
+    print(f"💾 Saved to: {mappings_path}")
+    return freq_maps
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python production_frequency_encoding.py <training_raw.csv> [mappings.pkl]")
+        sys.exit(1)
+    add_combo_table(sys.argv[1], *sys.argv[2:3])
@@ -6,11 +6,16 @@
 #
 # STRATEGY:
 # - Single master file: master_predictions.csv & master_predictions.json
+# - Typed checkpoint of the master (master_predictions.arrow) for the next
+#   run to load without re-parsing the CSV (production_checkpoints)
 # - Append new predictions to existing dataset
 # - Maintain prediction history with timestamps
 # - Automatic deduplication based on customer ID + date
 # - Archive old predictions while keeping recent ones
 # - Efficient storage and retrieval for production use
+# - Summary statistics kept per prediction day (master_summary.json,
+#   production_summary); a run summarizes only the days it changed and
+#   merges the stored ones
 #
 # BENEFITS:
 # - Scalable for thousands of daily predictions
@@ -26,11 +31,18 @@ import json
 import os
 from datetime import datetime, timedelta
 import warnings
+from production_checkpoints import checkpoint_path, read_checkpoint, write_checkpoint
+from production_output import export_frame
+from production_summary import SummaryAccumulator, summarize
 warnings.filterwarnings('ignore')
 
 # Set display options
 pd.set_option('display.max_columns', None)
 
+def prediction_days(df):
+    """Prediction day (YYYY-MM-DD) of every row"""
+    return df['prediction_date'].astype(str).str[:10]
+
 class IncrementalPredictionManager:
     """
     Manages incremental prediction dataset with automatic archiving and deduplication
@@ -40,8 +52,17 @@ class IncrementalPredictionManager:
         self.base_folder = base_folder
         self.master_csv = os.path.join(base_folder, "master_predictions.csv")
         self.master_json = os.path.join(base_folder, "master_predictions.json")
+        self.master_checkpoint = checkpoint_path(self.master_csv)
+        self.master_summary = os.path.join(base_folder, "master_summary.json")
         self.archive_folder = os.path.join(base_folder, "archive")
         
+        # Day summaries of the loaded master dataset ({day: state}); days with
+        # new predictions are summarized again
+        self._day_summaries = {}
+        self._changed_days = set()
+        # Summary statistics of the last saved master dataset
+        self.statistics = None
+        
         # Create folders if they don't exist
         self._create_folders()
         
@@ -64,9 +85,11 @@ class IncrementalPredictionManager:
         print("\n📂 LOADING MASTER DATASET")
         print("="*50)
         
-        if os.path.exists(self.master_csv):
+        master_file = self._master_source()
+        self._day_summaries = self._load_day_summaries(master_file)
+        if master_file:
             try:
-                df_master = pd.read_csv(self.master_csv, encoding='utf-8')
+                df_master = read_checkpoint(master_file)
                 print(f"✅ Master dataset loaded: {df_master.shape}")
                 print(f"📊 Date range: {df_master['prediction_date'].min()} to {df_master['prediction_date'].max()}")
                 print(f"🆔 Unique customers: {df_master['identificador_unico'].nunique():,}")
@@ -79,6 +102,18 @@ class IncrementalPredictionManager:
             print("📝 No master dataset found - creating new one")
             return self._create_empty_master()
     
+    def _master_source(self):
+        """
+        File to load the master dataset from: the checkpoint, unless the CSV
+        is newer (edited by hand) or the checkpoint is missing
+        """
+        if not os.path.exists(self.master_checkpoint):
+            return self.master_csv if os.path.exists(self.master_csv) else None
+        if os.path.exists(self.master_csv) and \
+                os.path.getmtime(self.master_csv) > os.path.getmtime(self.master_checkpoint):
+            return self.master_csv
+        return self.master_checkpoint
+
     def _create_empty_master(self):
         """Create empty master dataset with proper structure"""
         columns = [
@@ -112,9 +147,11 @@ class IncrementalPredictionManager:
         if batch_id is None:
             batch_id = datetime.now().strftime('%Y%m%d_%H%M%S')
         
-        # Add batch ID to new predictions
-        df_new = df_new_predictions.copy()
+        # Add batch ID to new predictions (the master dataset is an export:
+        # ci_width added, categorical labels and metadata as values)
+        df_new = export_frame(df_new_predictions)
         df_new['batch_id'] = batch_id
+        self._changed_days |= set(prediction_days(df_new))
         
         print(f"📊 New predictions: {len(df_new):,}")
         print(f"🏷️ Batch ID: {batch_id}")
@@ -264,7 +301,8 @@ class IncrementalPredictionManager:
 
     def save_master_dataset(self, df_master):
         """
-        Save master dataset in both CSV and JSON formats
+        Save master dataset in both CSV and JSON formats, plus the checkpoint
+        the next run loads
         """
         print("\n💾 SAVING MASTER DATASET")
         print("="*50)
@@ -274,6 +312,11 @@ class IncrementalPredictionManager:
             df_master.to_csv(self.master_csv, index=False, encoding='utf-8')
             csv_size = os.path.getsize(self.master_csv) / 1024  # KB
             print(f"✅ CSV saved: master_predictions.csv ({csv_size:.1f} KB)")
+
+            # Checkpoint after the CSV: a CSV newer than the checkpoint was edited by hand
+            if self.master_checkpoint != self.master_csv:
+                write_checkpoint(df_master, self.master_checkpoint)
+                print(f"✅ Checkpoint saved: {os.path.basename(self.master_checkpoint)}")
             
             # Save JSON (structured format)
             json_data = self._create_master_json(df_master)
@@ -291,21 +334,22 @@ class IncrementalPredictionManager:
         """
         Create structured JSON from master dataset
         """
-        # Summary statistics
+        # Summary statistics (merged day summaries)
+        statistics = self._master_statistics(df_master)
         summary = {
             "dataset_metadata": {
                 "last_updated": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                "total_predictions": len(df_master),
+                "total_predictions": statistics.rows,
                 "unique_customers": int(df_master['identificador_unico'].nunique()),
                 "date_range": {
-                    "earliest": df_master['prediction_date'].min(),
-                    "latest": df_master['prediction_date'].max()
-                } if len(df_master) > 0 else {"earliest": None, "latest": None}
+                    "earliest": statistics.earliest,
+                    "latest": statistics.latest
+                }
             },
             "business_summary": {
-                "income_segments": df_master['income_segment'].value_counts().to_dict() if len(df_master) > 0 else {},
-                "business_priorities": df_master['business_priority'].value_counts().to_dict() if len(df_master) > 0 else {},
-                "confidence_levels": df_master['confidence_category'].value_counts().to_dict() if len(df_master) > 0 else {}
+                "income_segments": statistics.label_counts('income_segment'),
+                "business_priorities": statistics.label_counts('business_priority'),
+                "confidence_levels": statistics.label_counts('confidence_category')
             }
         }
         
@@ -330,6 +374,52 @@ class IncrementalPredictionManager:
         
         return summary
     
+    def _load_day_summaries(self, master_file):
+        """
+        Stored {day: state} summaries, when saved after `master_file` (none
+        for a new or hand-edited master dataset)
+        """
+        if not master_file or not os.path.exists(self.master_summary) or \
+                os.path.getmtime(self.master_summary) < os.path.getmtime(master_file):
+            return {}
+        try:
+            with open(self.master_summary, 'r', encoding='utf-8') as f:
+                return json.load(f)['days']
+        except (ValueError, KeyError) as e:
+            print(f"⚠️ Ignoring stored summaries: {e}")
+            return {}
+
+    def _master_statistics(self, df_master):
+        """
+        Summary statistics of the master dataset, merged from one summary per
+        prediction day: stored day summaries are reused unless the day got
+        new predictions or lost rows (deduplication, cleanup)
+        """
+        days = prediction_days(df_master)
+        rows_per_day = days.value_counts(sort=False)
+        day_summaries = {}
+        for day, rows in rows_per_day.items():
+            state = self._day_summaries.get(day)
+            if state is not None and state['rows'] == rows and day not in self._changed_days:
+                day_summaries[day] = SummaryAccumulator.from_dict(state)
+        stale_days = [day for day in rows_per_day.index if day not in day_summaries]
+        if stale_days:
+            in_stale_day = days.isin(stale_days)
+            for day, df_day in df_master[in_stale_day].groupby(days[in_stale_day], sort=False):
+                day_summaries[day] = summarize(df_day)
+        print(f"📊 Summary: {len(stale_days)} of {len(day_summaries)} prediction days summarized")
+        
+        self._day_summaries = {day: day_summaries[day].to_dict() for day in sorted(day_summaries)}
+        with open(self.master_summary, 'w', encoding='utf-8') as f:
+            json.dump({'days': self._day_summaries}, f)
+        self._changed_days = set()
+        
+        statistics = SummaryAccumulator()
+        for day in sorted(day_summaries):
+            statistics.merge(day_summaries[day])
+        self.statistics = statistics
+        return statistics
+    
     def get_customer_history(self, identificador_unico):
         """
         Get prediction history for a specific customer
@@ -395,7 +485,8 @@ def process_new_predictions_incremental(df_new_predictions, cleanup_days=90):
         print("❌ Failed to save master dataset")
         return None
 
-    # Generate processing results
+    # Generate processing results (statistics merged when the master was saved)
+    statistics = manager.statistics
     results = {
         "processing_summary": {
             "batch_id": batch_id,
@@ -410,9 +501,9 @@ def process_new_predictions_incremental(df_new_predictions, cleanup_days=90):
             "archive_folder": manager.archive_folder
         },
         "business_insights": {
-            "income_segments": df_final['income_segment'].value_counts().to_dict() if len(df_final) > 0 else {},
-            "business_priorities": df_final['business_priority'].value_counts().to_dict() if len(df_final) > 0 else {},
-            "average_predicted_income": float(df_final['predicted_income'].mean()) if len(df_final) > 0 else 0
+            "income_segments": statistics.label_counts('income_segment'),
+            "business_priorities": statistics.label_counts('business_priority'),
+            "average_predicted_income": statistics.numeric['predicted_income'].mean if len(df_final) > 0 else 0
         }
     }
 
@@ -0,0 +1,163 @@
+# =============================================================================
+# PRODUCTION JSON EXPORT - STREAMED CUSTOMER PREDICTION FILES
+# =============================================================================
+#
+# OBJECTIVE: Write the customer predictions JSON of Part 3 for millions of
+# rows without a Python dict per row held in memory and one giant dump
+#
+# Records keep the schema of format_for_json_export() (customer
+# identification, income prediction with its interval, business
+# classification, metadata). They are built from column arrays a chunk at
+# a time (values rounded / converted to text per column, not per row and
+# field) and written to the file as each chunk is ready.
+#
+# Output formats:
+#   'pretty'   the document as before: {"prediction_summary": ...,
+#              "customer_predictions": [...]}, 2-space indent (same bytes
+#              as json.dump(indent=2, ensure_ascii=False))
+#   'compact'  the same document without whitespace
+#   'ndjson'   one customer record per line, no envelope
+#
+# orjson serializes the records when installed (several times faster than
+# the json module, which is the fallback). The document is streamed by
+# production_export.write_json_document, compressed when asked.
+#
+# Used by Part 3 (save_prediction_files).
+# =============================================================================
+
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from production_export import json_dumps, open_export, write_json_document
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_FORMATS = ('pretty', 'compact', 'ndjson')
+
+# Customer records built and written at a time
+DEFAULT_JSON_CHUNKSIZE = 50000
+
+# File extension per output format
+JSON_EXTENSIONS = {'pretty': '.json', 'compact': '.json', 'ndjson': '.ndjson'}
+
+MODEL_VERSION = "XGBoost_v1.0_Final"
+
+def dumps(value, pretty=False):
+    """`value` as UTF-8 JSON bytes (pretty: 2-space indent)"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if pretty else 0)
+    return json_dumps(value, pretty)
+
+def rounded_values(column, decimals=2):
+    """Column values as floats rounded like round(float(v)); missing -> 0.0"""
+    values = pd.to_numeric(pd.Series(column), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    values = np.where(np.isnan(values), 0.0, values)
+    # Python's round() per value: np.round differs from it on some halves
+    return [round(value, decimals) for value in values.tolist()]
+
+def text_values(column):
+    """Column values as text; missing -> ''"""
+    column = pd.Series(column)
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # One str() per category; code -1 (missing) takes the trailing ''
+        texts = np.array([str(value) for value in column.cat.categories] + [''], dtype=object)
+        return texts[column.cat.codes.to_numpy()].tolist()
+    values = column.to_numpy(dtype=object).tolist()
+    missing = pd.isna(column).to_numpy()
+    if not missing.any():
+        return [value if value.__class__ is str else str(value) for value in values]
+    return ['' if is_missing else str(value) for value, is_missing in zip(values, missing.tolist())]
+
+def customer_records(df):
+    """One customer prediction record (dict) per row of `df`"""
+    n_rows = len(df)
+    ids = text_values(df['identificador_unico']) if 'identificador_unico' in df.columns else [''] * n_rows
+    clients = text_values(df['cliente']) if 'cliente' in df.columns else [''] * n_rows
+    rows = zip(
+        ids, clients,
+        rounded_values(df['predicted_income']), rounded_values(df['income_lower_90']),
+        rounded_values(df['income_upper_90']), rounded_values(df['confidence_level']),
+        rounded_values(df['ci_width']),
+        text_values(df['income_segment']), text_values(df['confidence_category']),
+        text_values(df['business_priority']), text_values(df['recommendation']),
+        text_values(df['prediction_date']), text_values(df['model_version'])
+    )
+    return [
+        {
+            "customer_identification": {
+                "identificador_unico": identificador,
+                "cliente": cliente
+            },
+            "income_prediction": {
+                "predicted_income": income,
+                "confidence_interval": {
+                    "lower_bound": lower,
+                    "upper_bound": upper,
+                    "confidence_level": level,
+                    "interval_width": width
+                }
+            },
+            "business_classification": {
+                "income_segment": segment,
+                "confidence_category": confidence,
+                "business_priority": priority,
+                "recommendation": recommendation
+            },
+            "metadata": {
+                "prediction_date": prediction_date,
+                "model_version": model_version
+            }
+        }
+        for (identificador, cliente, income, lower, upper, level, width,
+             segment, confidence, priority, recommendation, prediction_date, model_version) in rows
+    ]
+
+def iter_customer_records(df, chunksize=DEFAULT_JSON_CHUNKSIZE):
+    """Customer records of `df`, one list per chunk of rows"""
+    for start in range(0, len(df), chunksize):
+        yield customer_records(df.iloc[start:start + chunksize])
+
+def prediction_summary(n_customers, generation_date=None):
+    """Header of the customer predictions document"""
+    return {
+        "total_customers": n_customers,
+        "generation_date": generation_date or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "model_version": MODEL_VERSION
+    }
+
+def write_predictions_json(df, path, json_format='pretty', chunksize=DEFAULT_JSON_CHUNKSIZE, generation_date=None,
+                           compression=None):
+    """
+    Stream the customer predictions of `df` (export frame: ci_width and
+    labels as values) to `path`
+
+    json_format: 'pretty', 'compact' or 'ndjson' (see above)
+    chunksize: records built and written at a time
+    compression: None, 'gzip' or 'zstd' (production_export.open_export)
+
+    Returns report = records, bytes, seconds, records_per_s, json_format.
+    """
+    if json_format not in JSON_FORMATS:
+        raise ValueError(f"Unknown JSON format: {json_format} (expected one of {', '.join(JSON_FORMATS)})")
+    started = time.perf_counter()
+
+    with open_export(path, compression) as f:
+        n_records = write_json_document(f, {"prediction_summary": prediction_summary(len(df), generation_date)},
+                                        "customer_predictions", iter_customer_records(df, chunksize),
+                                        json_format, dumps)
+
+    seconds = time.perf_counter() - started
+    return {
+        'records': n_records,
+        'bytes': os.path.getsize(path),
+        'seconds': round(seconds, 3),
+        'records_per_s': round(n_records / seconds) if seconds > 0 else None,
+        'json_format': json_format
+    }
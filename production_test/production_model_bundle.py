@@ -0,0 +1,329 @@
+# =============================================================================
+# PRODUCTION MODEL BUNDLE - VERSIONED, FAST-LOADING MODEL ARTIFACT
+# =============================================================================
+#
+# OBJECTIVE: One artifact with everything a scorer needs, loaded in
+# milliseconds and verified, instead of unpickling whatever object the
+# model file holds and guessing where the estimator is
+#
+# A bundle is a folder:
+#   manifest.json           format version, model version, feature order,
+#                           interval offsets, sha256 + size of every member
+#   booster.ubj             XGBoost booster in its native UBJSON format
+#   scaler.npz              StandardScaler parameters as arrays (optional)
+#   feature_transformer.pkl FeatureTransformer state: frequency tables,
+#                           combo table, fill values (optional)
+#   training_info.json,     optional members (training metadata, fallback
+#   <name>.pkl              model, explainers), loaded on first use only
+#
+# Every member is checked against its manifest checksum before it is read;
+# the manifest is written last, so a half-written bundle fails to load.
+#
+# Used by Part 1 (frequency tables), Part 2 (model, feature order, interval
+# offsets) and the API service. Shared by production_test/ and
+# partner_pipeline_2/.
+#
+# USAGE (convert a pickled model artifact):
+#   python production_model_bundle.py <model.pkl> [bundle_folder] [transformer_or_mappings.pkl]
+# =============================================================================
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+from datetime import datetime
+from functools import cached_property
+
+import numpy as np
+
+from production_feature_transformer import DEFAULT_TRANSFORMER_PATH, FeatureTransformer, MODEL_FEATURES
+
+BUNDLE_FORMAT_VERSION = 1
+DEFAULT_BUNDLE_PATH = os.path.join('models', 'production', 'production_model_bundle')
+MANIFEST_FILE = 'manifest.json'
+
+BOOSTER_FILE = 'booster.ubj'
+SCALER_FILE = 'scaler.npz'
+TRANSFORMER_FILE = 'feature_transformer.pkl'
+
+# Optional members stored as JSON; any other optional member is pickled
+JSON_MEMBERS = ('training_info',)
+
+# 90% interval offsets of the production model (5th / 95th percentile residuals)
+DEFAULT_INTERVAL = {'lower_offset': -510.93, 'upper_offset': 755.02, 'confidence_level': 0.90}
+
+# Keys of the pickled artifacts that hold the estimator and its scaler
+ARTIFACT_MODEL_KEYS = ['final_production_model', 'model', 'best_model', 'final_model', 'xgb_model']
+ARTIFACT_SCALER_KEYS = ['final_scaler', 'scaler']
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def is_model_bundle(path=DEFAULT_BUNDLE_PATH):
+    """Whether `path` is a bundle folder (has a manifest)"""
+    return os.path.isfile(os.path.join(path, MANIFEST_FILE))
+
+class ArrayScaler:
+    """
+    StandardScaler.transform from the saved mean / scale arrays
+
+    Same arithmetic as scikit-learn (subtract, then divide, in float64),
+    without importing or unpickling it.
+    """
+
+    def __init__(self, mean=None, scale=None):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        if self.mean_ is not None:
+            X -= self.mean_
+        if self.scale_ is not None:
+            X /= self.scale_
+        return X
+
+class BundleModel:
+    """
+    The bundled XGBoost booster with the predict() of XGBRegressor
+
+    Predictions are identical to the estimator the bundle was made from
+    (same inplace prediction, same best iteration).
+    """
+
+    def __init__(self, booster):
+        self.booster = booster
+        best_iteration = booster.attr('best_iteration')
+        self.iteration_range = (0, int(best_iteration) + 1) if best_iteration is not None else (0, 0)
+
+    def get_booster(self):
+        return self.booster
+
+    def predict(self, X):
+        return self.booster.inplace_predict(X, iteration_range=self.iteration_range, missing=np.nan)
+
+class ModelBundle:
+    """
+    A loaded bundle
+
+    load() reads the manifest and verifies the required members; the
+    booster, scaler and transformer are read on first access, optional
+    members through member(name).
+    """
+
+    def __init__(self, path, manifest, verify=True):
+        self.path = path
+        self.manifest = manifest
+        self.verify = verify
+        self.model_version = manifest.get('model_version')
+        self.created_at = manifest.get('created_at')
+        self.feature_columns = list(manifest['feature_columns'])
+        self.interval = dict(manifest.get('interval') or DEFAULT_INTERVAL)
+        self._members = {}
+        self._verified = set()
+
+    @classmethod
+    def load(cls, path=DEFAULT_BUNDLE_PATH, verify=True):
+        """Open the bundle in `path`; verify=False skips the checksums"""
+        with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported model bundle format: {manifest.get('format_version')} "
+                             f"(expected {BUNDLE_FORMAT_VERSION})")
+        bundle = cls(path, manifest, verify)
+        if verify:
+            for name, entry in manifest['members'].items():
+                if not entry.get('optional'):
+                    bundle._check(name)
+        return bundle
+
+    def has_member(self, name):
+        return name in self.manifest['members']
+
+    def _check(self, name):
+        """Path of a member after checking its size and checksum"""
+        entry = self.manifest['members'][name]
+        file_path = os.path.join(self.path, entry['file'])
+        if not os.path.exists(file_path):
+            raise ValueError(f"Model bundle member missing: {entry['file']}")
+        if self.verify and name not in self._verified:
+            if os.path.getsize(file_path) != entry['bytes'] or _sha256(file_path) != entry['sha256']:
+                raise ValueError(f"Model bundle member {entry['file']} does not match its checksum")
+            self._verified.add(name)
+        return file_path
+
+    @cached_property
+    def model(self):
+        import xgboost as xgb
+
+        booster = xgb.Booster()
+        booster.load_model(self._check('booster'))
+        return BundleModel(booster)
+
+    @cached_property
+    def scaler(self):
+        """ArrayScaler, or None when the model takes unscaled features"""
+        if not self.has_member('scaler'):
+            return None
+        with np.load(self._check('scaler')) as arrays:
+            return ArrayScaler(arrays['mean'] if 'mean' in arrays else None,
+                               arrays['scale'] if 'scale' in arrays else None)
+
+    @cached_property
+    def transformer(self):
+        """FeatureTransformer with the bundled frequency tables, or None"""
+        if not self.has_member('feature_transformer'):
+            return None
+        return FeatureTransformer.load(self._check('feature_transformer'))
+
+    @property
+    def training_info(self):
+        return self.member('training_info', {})
+
+    def member(self, name, default=None):
+        """Optional member, read (and verified) on first use"""
+        if name not in self._members:
+            if not self.has_member(name):
+                return default
+            file_path = self._check(name)
+            if name in JSON_MEMBERS:
+                with open(file_path, encoding='utf-8') as f:
+                    self._members[name] = json.load(f)
+            else:
+                with open(file_path, 'rb') as f:
+                    self._members[name] = pickle.load(f)
+        return self._members[name]
+
+    def predict(self, X):
+        """
+        Predictions for a DataFrame of model features (reordered, scaled if
+        bundled), or an array already in feature_columns order
+        """
+        if hasattr(X, 'columns'):
+            X = X[self.feature_columns]
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        return self.model.predict(X)
+
+def save_model_bundle(path, model, feature_columns, scaler=None, transformer=None, interval=None,
+                      model_version=None, **optional):
+    """
+    Write a bundle folder
+
+    model: XGBRegressor or xgboost Booster
+    scaler: fitted StandardScaler (or anything with mean_ / scale_)
+    transformer: FeatureTransformer whose state (frequency tables, fill
+    values) is bundled
+    optional: extra members read lazily, e.g. training_info={...} (JSON),
+    fallback_model=..., explainer=... (pickled)
+    """
+    os.makedirs(path, exist_ok=True)
+    members = {}
+
+    def add(name, file_name, optional_member=False):
+        file_path = os.path.join(path, file_name)
+        members[name] = {
+            'file': file_name,
+            'bytes': os.path.getsize(file_path),
+            'sha256': _sha256(file_path),
+            'optional': optional_member
+        }
+
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    booster.save_model(os.path.join(path, BOOSTER_FILE))
+    add('booster', BOOSTER_FILE)
+
+    if scaler is not None:
+        arrays = {key: np.asarray(value, dtype=np.float64)
+                  for key, value in (('mean', getattr(scaler, 'mean_', None)), ('scale', getattr(scaler, 'scale_', None)))
+                  if value is not None}
+        np.savez(os.path.join(path, SCALER_FILE), **arrays)
+        add('scaler', SCALER_FILE)
+
+    if transformer is not None:
+        transformer.save(os.path.join(path, TRANSFORMER_FILE))
+        add('feature_transformer', TRANSFORMER_FILE)
+
+    for name, value in optional.items():
+        if value is None:
+            continue
+        if name in JSON_MEMBERS:
+            file_name = f'{name}.json'
+            with open(os.path.join(path, file_name), 'w', encoding='utf-8') as f:
+                json.dump(value, f, indent=2, default=str)
+        else:
+            file_name = f'{name}.pkl'
+            with open(os.path.join(path, file_name), 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        add(name, file_name, optional_member=True)
+
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'model_version': model_version,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'feature_columns': list(feature_columns),
+        'interval': dict(interval or DEFAULT_INTERVAL),
+        'members': members
+    }
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return path
+
+def bundle_from_artifact(artifact_path, bundle_path=DEFAULT_BUNDLE_PATH, transformer_path=None,
+                         model_version=None, interval=None):
+    """
+    Convert a pickled model artifact (estimator, or dict with the estimator,
+    scaler, feature columns, training info, fallback model) into a bundle
+
+    transformer_path: fitted FeatureTransformer artifact or frequency
+    mappings pickle whose tables go into the bundle (default: the fitted
+    transformer when one was saved)
+    """
+    try:
+        import joblib
+        artifact = joblib.load(artifact_path)
+    except ImportError:
+        with open(artifact_path, 'rb') as f:
+            artifact = pickle.load(f)
+
+    if isinstance(artifact, dict):
+        model = next((artifact[key] for key in ARTIFACT_MODEL_KEYS if key in artifact), None)
+        scaler = next((artifact[key] for key in ARTIFACT_SCALER_KEYS if key in artifact), None)
+        feature_columns = artifact.get('feature_columns')
+        optional = {key: artifact.get(key) for key in ('training_info', 'fallback_model', 'explainer')}
+    else:
+        model, scaler, feature_columns, optional = artifact, None, None, {}
+    if model is None or not (hasattr(model, 'get_booster') or hasattr(model, 'save_raw')):
+        raise ValueError(f"No XGBoost model found in {artifact_path}")
+    if feature_columns is None:
+        names = getattr(model, 'feature_names_in_', None)
+        feature_columns = list(names) if names is not None else MODEL_FEATURES
+
+    transformer_path = transformer_path or (DEFAULT_TRANSFORMER_PATH if os.path.exists(DEFAULT_TRANSFORMER_PATH) else None)
+    transformer = None
+    if transformer_path:
+        try:
+            transformer = FeatureTransformer.load(transformer_path)
+        except (ValueError, KeyError, AttributeError):
+            # A frequency mappings pickle rather than a transformer artifact
+            with open(transformer_path, 'rb') as f:
+                transformer = FeatureTransformer(pickle.load(f))
+
+    return save_model_bundle(bundle_path, model, feature_columns, scaler, transformer, interval,
+                             model_version, **optional)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python production_model_bundle.py <model.pkl> [bundle_folder] [transformer_or_mappings.pkl]")
+        sys.exit(1)
+    bundle_path = bundle_from_artifact(sys.argv[1], *sys.argv[2:4])
+    bundle = ModelBundle.load(bundle_path)
+    print(f"✅ Model bundle written to {bundle_path}: {len(bundle.feature_columns)} features, "
+          f"members {sorted(bundle.manifest['members'])}")
@@ -27,35 +27,63 @@ from datetime import datetime
 import warnings
 import pickle
 import os
+import sys
+import multiprocessing
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from production_checkpoints import CheckpointWriter, write_checkpoint
+from production_events import console_events, message_logger
+from production_csv_ingestion import iter_production_csv, read_production_csv, print_ingestion_report
+from production_date_parsing import parse_date_column, date_success_rate
+from production_frequency_encoding import COMBO_TABLE_KEY, factorize_category, lookup_codes
+from production_feature_transformer import (
+    DATE_COLUMNS, DAY_FEATURES, DEFAULT_TRANSFORMER_PATH, MODEL_FEATURES, FeatureTransformer
+)
+from production_model_bundle import DEFAULT_BUNDLE_PATH, ModelBundle, is_model_bundle
+from production_summary import BoundedMedian
 warnings.filterwarnings('ignore')
 
 # Set display options
 pd.set_option('display.max_columns', None)
 
-def load_production_data(file_path):
+# Default rows per chunk for streaming mode (production_part1_main(chunksize=...))
+DEFAULT_CHUNKSIZE = 50000
+
+def load_production_data(file_path, typed=True, events=None):
     """
     Load raw production data with proper encoding and error handling
+    Only the columns the pipeline uses are read; with `typed` numerics are
+    float32 and text columns category (production_csv_ingestion.TYPED_DTYPES)
     """
-    print("🚀 PRODUCTION PART 1 - DATA LOADING")
-    print("="*60)
+    log = message_logger(events)
+    log("🚀 PRODUCTION PART 1 - DATA LOADING")
+    log("="*60)
     
-    print("📂 Loading raw production data...")
+    log("📂 Loading raw production data...")
     try:
-        df = pd.read_csv(file_path, encoding='latin-1', sep=',', on_bad_lines='skip', engine='python')
-        print(f"✅ Dataset loaded successfully: {df.shape}")
-        print(f"📊 Columns found: {len(df.columns)}")
+        # Fast parser (pyarrow/C) with the Python parser only for blocks with malformed lines
+        df, report = read_production_csv(file_path, typed=typed)
+        if events is not None:
+            events.emit('ingestion', rows=report['rows'], blocks=report['blocks'],
+                        fallback_blocks=len(report['fallback_blocks']), bad_lines=len(report['bad_lines']))
+        if events is None or events.verbose:
+            # memory_usage(deep=True) walks every string, only worth it when shown
+            log(f"✅ Dataset loaded successfully: {df.shape} ({df.memory_usage(deep=True).sum() / 1e6:.1f} MB)")
+        print_ingestion_report(report, log=log)
+        log(f"📊 Columns found: {len(df.columns)}")
         return df
     except Exception as e:
-        print(f"❌ Error loading data: {e}")
+        log(f"❌ Error loading data: {e}")
         return None
 
-def standardize_column_names(df):
+def standardize_column_names(df, verbose=True, events=None):
     """
     Standardize column names to match our model requirements
     Based on exploratory data analysis patterns
     """
-    print("\n🔧 STANDARDIZING COLUMN NAMES")
-    print("="*50)
+    log = message_logger(events, verbose)
+    log("\n🔧 STANDARDIZING COLUMN NAMES")
+    log("="*50)
     
     # Column mapping based on typical production data format
     column_mapping = {
@@ -85,45 +113,55 @@ def standardize_column_names(df):
     # Remove BOM characters if present
     df.columns = df.columns.str.replace('\ufeff', '').str.replace('ï»¿', '')
     
-    print(f"✅ Column names standardized")
-    print(f"📋 Key columns available: {[col for col in df.columns if col in ['cliente', 'identificador_unico', 'edad', 'ocupacion', 'nombreempleadorcliente']]}")
+    log(f"✅ Column names standardized")
+    log(f"📋 Key columns available: {[col for col in df.columns if col in ['cliente', 'identificador_unico', 'edad', 'ocupacion', 'nombreempleadorcliente']]}")
     
     return df
 
-def convert_date_columns(df):
+def convert_date_columns(df, verbose=True, events=None):
     """
     Convert date columns to datetime format
     Focus on the 3 key date columns needed for our model
+    DD/MM/YYYY (production), YYYY-MM-DD (ISO/JSON) and free-form dates are
+    all accepted, see production_date_parsing.py
     """
-    print("\n📅 CONVERTING DATE COLUMNS")
-    print("="*50)
+    log = message_logger(events, verbose)
+    log("\n📅 CONVERTING DATE COLUMNS")
+    log("="*50)
     
     # Target date columns for our model
     date_columns = ['fechaingresoempleo', 'fecha_inicio', 'fecha_vencimiento']
     
     for col in date_columns:
         if col in df.columns:
-            print(f"   Converting {col}...")
+            log(f"   Converting {col}...")
             try:
-                # Try DD/MM/YYYY format first (most common in production)
-                df[col] = pd.to_datetime(df[col], format='%d/%m/%Y', errors='coerce')
-                success_rate = df[col].notna().sum() / len(df)
-                print(f"   ✅ {col} converted (success rate: {success_rate:.1%})")
+                # Format inferred from a sample, each distinct date parsed once;
+                # values in another format (ISO, free-form) are parsed per value
+                df[col] = parse_date_column(df[col])
+                success_rate = date_success_rate(df[col])
+                log(f"   ✅ {col} converted (success rate: {success_rate:.1%})")
             except:
-                print(f"   ⚠️ {col} conversion failed - will use default values")
+                log(f"   ⚠️ {col} conversion failed - will use default values")
         else:
-            print(f"   ⚠️ {col} not found in dataset")
+            log(f"   ⚠️ {col} not found in dataset")
     
     return df
 
-def load_frequency_mappings():
+def load_frequency_mappings(events=None):
     """
     Load pre-computed frequency mappings from training data
     These are essential for categorical feature encoding
     """
-    print("\n🔢 LOADING FREQUENCY MAPPINGS")
-    print("="*50)
+    log = message_logger(events)
+    log("\n🔢 LOADING FREQUENCY MAPPINGS")
+    log("="*50)
     
+    bundle_transformer = load_bundle_transformer(events)
+    if bundle_transformer is not None:
+        log("✅ Frequency mappings loaded from the model bundle")
+        return bundle_transformer.freq_maps
+
     try:
         # Path to our production frequency mappings
         freq_maps_path = r'models\production\production_frequency_mappings_catboost.pkl'
@@ -131,21 +169,22 @@ def load_frequency_mappings():
         if os.path.exists(freq_maps_path):
             with open(freq_maps_path, 'rb') as f:
                 freq_maps = pickle.load(f)
-            print("✅ Production frequency mappings loaded successfully")
+            log("✅ Production frequency mappings loaded successfully")
             return freq_maps
         else:
-            print("⚠️ Production frequency mappings not found - using fallback")
-            return get_fallback_frequency_maps()
+            log("⚠️ Production frequency mappings not found - using fallback")
+            return get_fallback_frequency_maps(events)
     except Exception as e:
-        print(f"⚠️ Error loading frequency mappings: {e}")
-        return get_fallback_frequency_maps()
+        log(f"⚠️ Error loading frequency mappings: {e}")
+        return get_fallback_frequency_maps(events)
 
-def get_fallback_frequency_maps():
+def get_fallback_frequency_maps(events=None):
     """
     Fallback frequency mappings based on training data analysis
     These should match the patterns from our exploratory data analysis
     """
-    print("🚨 Using fallback frequency mappings")
+    log = message_logger(events)
+    log("🚨 Using fallback frequency mappings")
     
     return {
         'nombreempleadorcliente': {
@@ -173,162 +212,172 @@ def get_fallback_frequency_maps():
         }
     }
 
-def create_categorical_frequency_features(df):
+def load_bundle_transformer(events=None):
+    """
+    FeatureTransformer of the deployed model bundle (production_model_bundle.py)
+    Returns None without a bundle or when it has no frequency tables
+    """
+    log = message_logger(events)
+    if not is_model_bundle(DEFAULT_BUNDLE_PATH):
+        return None
+    try:
+        return ModelBundle.load(DEFAULT_BUNDLE_PATH).transformer
+    except Exception as e:
+        log(f"⚠️ Error loading model bundle: {e} - using separate artifacts")
+        return None
+
+def load_feature_transformer(events=None):
+    """
+    Load the fitted FeatureTransformer, from the model bundle or the saved artifact
+    Its frequency maps and fill values take the place of the mappings file
+    and the batch medians (see production_feature_transformer.py)
+    """
+    log = message_logger(events)
+    transformer = load_bundle_transformer(events)
+    if transformer is not None and transformer.is_fitted:
+        log(f"✅ Fitted feature transformer loaded from the model bundle ({transformer.training_rows:,} training rows)")
+        return transformer
+    if not os.path.exists(DEFAULT_TRANSFORMER_PATH):
+        return None
+    try:
+        transformer = FeatureTransformer.load(DEFAULT_TRANSFORMER_PATH)
+        log(f"✅ Fitted feature transformer loaded ({transformer.training_rows:,} training rows)")
+        return transformer
+    except Exception as e:
+        log(f"⚠️ Error loading feature transformer: {e} - using frequency mappings")
+        return None
+
+def _location_occupation_codes(ciudad, ocupacion):
+    """
+    Location-occupation combos of every row without building per-row strings
+    Used when the mappings have no training-time combo table
+
+    ciudad / ocupacion: (codes, keys) from factorize_category. The pair of
+    integer codes is factorized and 'CIUDAD_OCUPACION' keys are only built
+    for the distinct pairs.
+
+    Returns:
+        (combo code per row, combo keys, rows per combo)
+    """
+    (ciudad_codes, ciudad_keys), (ocupacion_codes, ocupacion_keys) = ciudad, ocupacion
+    width = max(len(ocupacion_keys), 1)
+    pair_codes, pairs = pd.factorize(ciudad_codes.astype(np.int64) * width + ocupacion_codes)
+
+    combos = ciudad_keys[pairs // width] + '_' + ocupacion_keys[pairs % width]
+    # Different pairs can still spell the same key ('A_B' + 'C' vs 'A' + 'B_C')
+    combo_codes, combo_keys = pd.factorize(pd.Series(combos, dtype=object))
+    counts = np.bincount(combo_codes, weights=np.bincount(pair_codes, minlength=len(pairs)),
+                         minlength=len(combo_keys))
+    return combo_codes[pair_codes], np.asarray(combo_keys, dtype=object), counts.astype(np.int64)
+
+def create_categorical_frequency_features(df, freq_maps=None, combo_counts=None, verbose=True, events=None):
     """
     Create frequency encoding for categorical variables
     This is the most important feature engineering step
+
+    freq_maps: pre-loaded training mappings (loaded here when None)
+    combo_counts: location-occupation counts over the whole file (streaming
+    mode); when None the counts come from this DataFrame. Only used when
+    freq_maps has no training-time combo table (production_frequency_encoding.py)
     """
-    print("\n🎯 CREATING CATEGORICAL FREQUENCY FEATURES")
-    print("="*50)
+    log = message_logger(events, verbose)
+    log("\n🎯 CREATING CATEGORICAL FREQUENCY FEATURES")
+    log("="*50)
     
     # Load frequency mappings from training data
-    freq_maps = load_frequency_mappings()
+    if freq_maps is None:
+        freq_maps = load_frequency_mappings(events)
     
+    # Frequency encodings from the shared FeatureTransformer
+    df = FeatureTransformer(freq_maps).add_frequency_features(df)
+
     # 1. nombreempleadorcliente_consolidated_freq (TOP predictor)
-    print("   Creating nombreempleadorcliente_consolidated_freq...")
     if 'nombreempleadorcliente' in df.columns:
-        # Clean and standardize employer names
-        df['nombreempleadorcliente'] = df['nombreempleadorcliente'].astype(str).str.strip().str.upper()
-        
-        # Apply frequency mapping
-        if 'nombreempleadorcliente' in freq_maps:
-            freq_map = freq_maps['nombreempleadorcliente']
-            default_freq = min(freq_map.values()) if freq_map else 1
-            df['nombreempleadorcliente_consolidated_freq'] = df['nombreempleadorcliente'].map(freq_map).fillna(default_freq)
-        else:
-            df['nombreempleadorcliente_consolidated_freq'] = 1
-        
-        print(f"   ✅ nombreempleadorcliente_consolidated_freq created")
+        log(f"   ✅ nombreempleadorcliente_consolidated_freq created")
     else:
-        print(f"   ⚠️ nombreempleadorcliente not found - setting to default")
-        df['nombreempleadorcliente_consolidated_freq'] = 1
+        log(f"   ⚠️ nombreempleadorcliente not found - setting to default")
     
     # 2. location_x_occupation (interaction feature)
-    print("   Creating location_x_occupation...")
     if 'ciudad' in df.columns and 'ocupacion' in df.columns:
-        # Create location-occupation interaction
-        df['ciudad'] = df['ciudad'].astype(str).str.strip().str.upper()
-        df['ocupacion'] = df['ocupacion'].astype(str).str.strip().str.upper()
-        
-        # Simple interaction: combine and encode frequency
-        df['location_occupation_combo'] = df['ciudad'] + '_' + df['ocupacion']
-        combo_freq = df['location_occupation_combo'].value_counts().to_dict()
-        df['location_x_occupation'] = df['location_occupation_combo'].map(combo_freq).fillna(1)
-        
-        # Clean up temporary column
-        df.drop('location_occupation_combo', axis=1, inplace=True)
-        print(f"   ✅ location_x_occupation created")
+        if COMBO_TABLE_KEY not in freq_maps:
+            # No combo table in the mappings: frequency within this file
+            log("   ⚠️ No location x occupation table in mappings - using counts from this file")
+            combo_codes, combo_keys, counts = _location_occupation_codes(
+                factorize_category(df['ciudad']), factorize_category(df['ocupacion'])
+            )
+            if combo_counts is None:
+                df['location_x_occupation'] = counts[combo_codes]
+            else:
+                df['location_x_occupation'] = lookup_codes(combo_codes, combo_keys, combo_counts, 1)
+        log(f"   ✅ location_x_occupation created")
     else:
-        print(f"   ⚠️ ciudad or ocupacion not found - setting to default")
-        df['location_x_occupation'] = 1
+        log(f"   ⚠️ ciudad or ocupacion not found - setting to default")
     
     return df
 
-def create_temporal_features(df):
+def create_temporal_features(df, reference_date=None, fill_values=None, verbose=True, events=None):
     """
     Create temporal features from date columns
     Convert dates to days since reference point
+
+    reference_date: defaults to now; streaming mode fixes it once per run
+    fill_values: per-feature medians over the whole file (streaming mode);
+    when None missing days are filled with this DataFrame's medians
     """
-    print("\n⏰ CREATING TEMPORAL FEATURES")
-    print("="*50)
+    log = message_logger(events, verbose)
+    log("\n⏰ CREATING TEMPORAL FEATURES")
+    log("="*50)
     
     # Reference date for calculations (current date)
-    reference_date = datetime.now()
-    
-    # 1. fechaingresoempleo_days (employment tenure)
-    print("   Creating fechaingresoempleo_days...")
-    if 'fechaingresoempleo' in df.columns and pd.api.types.is_datetime64_any_dtype(df['fechaingresoempleo']):
-        df['fechaingresoempleo_days'] = (reference_date - df['fechaingresoempleo']).dt.days
-        df['fechaingresoempleo_days'] = df['fechaingresoempleo_days'].fillna(df['fechaingresoempleo_days'].median())
-        print(f"   ✅ fechaingresoempleo_days created")
-    else:
-        print(f"   ⚠️ fechaingresoempleo not available - using default")
-        df['fechaingresoempleo_days'] = 1000  # Default ~3 years
+    if reference_date is None:
+        reference_date = datetime.now()
+    if fill_values is None:
+        fill_values = {}
     
-    # 2. fecha_inicio_days (account start)
-    print("   Creating fecha_inicio_days...")
-    if 'fecha_inicio' in df.columns and pd.api.types.is_datetime64_any_dtype(df['fecha_inicio']):
-        df['fecha_inicio_days'] = (reference_date - df['fecha_inicio']).dt.days
-        df['fecha_inicio_days'] = df['fecha_inicio_days'].fillna(df['fecha_inicio_days'].median())
-        print(f"   ✅ fecha_inicio_days created")
-    else:
-        print(f"   ⚠️ fecha_inicio not available - using default")
-        df['fecha_inicio_days'] = 500  # Default ~1.5 years
+    df = FeatureTransformer(reference_date=reference_date).add_temporal_features(df)
     
-    # 3. fecha_vencimiento_days (loan end date)
-    print("   Creating fecha_vencimiento_days...")
-    if 'fecha_vencimiento' in df.columns and pd.api.types.is_datetime64_any_dtype(df['fecha_vencimiento']):
-        df['fecha_vencimiento_days'] = (df['fecha_vencimiento'] - reference_date).dt.days
-        df['fecha_vencimiento_days'] = df['fecha_vencimiento_days'].fillna(df['fecha_vencimiento_days'].median())
-        print(f"   ✅ fecha_vencimiento_days created")
-    else:
-        print(f"   ⚠️ fecha_vencimiento not available - using default")
-        df['fecha_vencimiento_days'] = 365  # Default 1 year remaining
+    for col, feature in zip(DATE_COLUMNS, DAY_FEATURES):
+        if col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[feature] = df[feature].fillna(fill_values.get(feature, df[feature].median()))
+            log(f"   ✅ {feature} created")
+        else:
+            log(f"   ⚠️ {col} not available - using default")
     
     return df
 
-def create_financial_ratio_features(df):
+def create_financial_ratio_features(df, verbose=True, events=None):
     """
     Create financial ratio features
     These are key predictors of income capacity
     """
-    print("\n💰 CREATING FINANCIAL RATIO FEATURES")
-    print("="*50)
+    log = message_logger(events, verbose)
+    log("\n💰 CREATING FINANCIAL RATIO FEATURES")
+    log("="*50)
     
-    # 1. balance_to_payment_ratio (financial health indicator)
-    print("   Creating balance_to_payment_ratio...")
-    if 'saldo' in df.columns and 'monto_letra' in df.columns:
-        # Avoid division by zero
-        df['balance_to_payment_ratio'] = np.where(
-            df['monto_letra'] > 0,
-            df['saldo'] / df['monto_letra'],
-            0
-        )
-        # Cap extreme values for stability
-        df['balance_to_payment_ratio'] = np.clip(df['balance_to_payment_ratio'], 0, 100)
-        print(f"   ✅ balance_to_payment_ratio created")
-    else:
-        print(f"   ⚠️ saldo or monto_letra missing - setting to default")
-        df['balance_to_payment_ratio'] = 1.0
+    df = FeatureTransformer().add_ratio_features(df)
     
-    # 2. balance_coverage_ratio (balance adequacy)
-    print("   Creating balance_coverage_ratio...")
     if 'saldo' in df.columns and 'monto_letra' in df.columns:
-        # How many months can balance cover payments
-        df['balance_coverage_ratio'] = np.where(
-            df['monto_letra'] > 0,
-            df['saldo'] / (df['monto_letra'] * 12),  # Annual coverage
-            0
-        )
-        df['balance_coverage_ratio'] = np.clip(df['balance_coverage_ratio'], 0, 10)
-        print(f"   ✅ balance_coverage_ratio created")
+        log(f"   ✅ balance_to_payment_ratio, balance_coverage_ratio created")
     else:
-        print(f"   ⚠️ Required columns missing - setting to default")
-        df['balance_coverage_ratio'] = 0.5
-    
-    # 3. payment_per_age (payment burden by age)
-    print("   Creating payment_per_age...")
+        log(f"   ⚠️ saldo or monto_letra missing - setting ratios to default")
     if 'monto_letra' in df.columns and 'edad' in df.columns:
-        df['payment_per_age'] = np.where(
-            df['edad'] > 0,
-            df['monto_letra'] / df['edad'],
-            0
-        )
-        df['payment_per_age'] = np.clip(df['payment_per_age'], 0, 1000)
-        print(f"   ✅ payment_per_age created")
+        log(f"   ✅ payment_per_age created")
     else:
-        print(f"   ⚠️ monto_letra or edad missing - setting to default")
-        df['payment_per_age'] = 10.0
+        log(f"   ⚠️ monto_letra or edad missing - setting to default")
     
     return df
 
-def validate_and_prepare_final_features(df):
+def validate_and_prepare_final_features(df, fill_values=None, verbose=True, events=None):
     """
     Validate that all 11 required features are present and properly formatted
     Handle missing values and ensure data quality
+
+    fill_values: per-feature medians over the whole file (streaming mode);
+    when None missing values are filled with this DataFrame's medians
     """
-    print("\n✅ VALIDATING FINAL FEATURES")
-    print("="*50)
+    log = message_logger(events, verbose)
+    log("\n✅ VALIDATING FINAL FEATURES")
+    log("="*50)
 
     # The exact 11 features our XGBoost model expects
     required_features = [
@@ -345,48 +394,54 @@ def validate_and_prepare_final_features(df):
         'payment_per_age'                          # 11. Payment normalized by age
     ]
 
-    print(f"📋 Checking {len(required_features)} required features...")
+    log(f"📋 Checking {len(required_features)} required features...")
 
     # Check for missing features
     missing_features = []
     for feature in required_features:
         if feature not in df.columns:
             missing_features.append(feature)
-            print(f"   ❌ Missing: {feature}")
+            log(f"   ❌ Missing: {feature}")
         else:
             missing_count = df[feature].isnull().sum()
             missing_pct = (missing_count / len(df)) * 100
-            print(f"   ✅ {feature}: {missing_count} missing ({missing_pct:.1f}%)")
+            log(f"   ✅ {feature}: {missing_count} missing ({missing_pct:.1f}%)")
 
     if missing_features:
-        print(f"🚨 ERROR: Missing required features: {missing_features}")
+        log(f"🚨 ERROR: Missing required features: {missing_features}")
         return None, False
 
     # Handle missing values in existing features
-    print("\n🔧 Handling missing values...")
+    log("\n🔧 Handling missing values...")
     for feature in required_features:
-        if df[feature].isnull().sum() > 0:
-            if df[feature].dtype in ['int64', 'float64']:
-                # Fill numeric features with median
-                median_val = df[feature].median()
+        missing_count = df[feature].isnull().sum()
+        if missing_count > 0:
+            if pd.api.types.is_numeric_dtype(df[feature]):
+                # Fill numeric features with median (float32 columns come from the typed schema)
+                median_val = fill_values[feature] if fill_values and feature in fill_values else df[feature].median()
                 df[feature] = df[feature].fillna(median_val)
-                print(f"   📊 {feature}: filled with median ({median_val:.2f})")
+                log(f"   📊 {feature}: filled with median ({median_val:.2f})")
+                fill_value = float(median_val)
             else:
                 # Fill categorical features with mode or default
                 mode_val = df[feature].mode().iloc[0] if len(df[feature].mode()) > 0 else 0
                 df[feature] = df[feature].fillna(mode_val)
-                print(f"   📊 {feature}: filled with mode ({mode_val})")
+                log(f"   📊 {feature}: filled with mode ({mode_val})")
+                fill_value = mode_val
+            if events is not None:
+                events.emit('imputed', stage='part1.validate', feature=feature, count=int(missing_count),
+                            value=fill_value)
 
     # Ensure proper data types for model
-    print("\n🔧 Optimizing data types...")
+    log("\n🔧 Optimizing data types...")
     for feature in required_features:
         if df[feature].dtype == 'object':
             try:
                 df[feature] = pd.to_numeric(df[feature], errors='coerce')
                 df[feature] = df[feature].fillna(0)
-                print(f"   ✅ {feature}: converted to numeric")
+                log(f"   ✅ {feature}: converted to numeric")
             except:
-                print(f"   ⚠️ {feature}: could not convert to numeric")
+                log(f"   ⚠️ {feature}: could not convert to numeric")
 
         # Optimize numeric types for memory efficiency
         if df[feature].dtype in ['int64']:
@@ -394,58 +449,293 @@ def validate_and_prepare_final_features(df):
         elif df[feature].dtype in ['float64']:
             df[feature] = df[feature].astype('float32')
 
-    print("✅ All features validated and optimized")
+    log("✅ All features validated and optimized")
     return df, True
 
-def production_part1_main(input_file_path, output_file_path=None):
+# The exact 11 features our XGBoost model expects, in output order
+FINAL_FEATURES = MODEL_FEATURES
+
+def read_production_chunks(file_path, chunksize, report=None):
     """
-    Main function for Production Part 1: Data Cleaning & Feature Engineering
+    Iterate over the raw production file in chunks of about `chunksize` rows
+    Same parser as load_production_data(); chunks are line-aligned byte blocks
+    """
+    return iter_production_csv(file_path, rows_per_block=chunksize, report=report)
 
-    Input: Raw production data CSV
-    Output: Clean dataset with exactly 11 features ready for model inference
+# Read-only state of the partition workers: lookup tables and whole-file
+# statistics. Set once per process; forked workers inherit it.
+_PARTITION_STATE = {}
+
+def _init_partition_worker(state):
+    _PARTITION_STATE.update(state)
+
+def _pool_context():
+    """fork where available, so workers inherit the lookup tables instead of unpickling them"""
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+def _run_partitions(function, chunks, state, workers=1):
     """
-    print("🚀 PRODUCTION PART 1 - DATA CLEANING & FEATURE ENGINEERING")
-    print("="*80)
-    print("🎯 OBJECTIVE: Create 11 features for XGBoost income prediction model")
-    print("📋 INPUT: Raw customer data")
-    print("📋 OUTPUT: Clean dataset ready for model inference")
-    print("="*80)
+    Apply `function` to every row partition, yielding results in input order
 
-    # Step 1: Load raw data
-    df = load_production_data(input_file_path)
-    if df is None:
-        print("❌ Failed to load data")
+    workers > 1 runs partitions on a ProcessPoolExecutor; at most two
+    partitions per worker are in flight, so memory stays bounded.
+    """
+    if workers <= 1:
+        _init_partition_worker(state)
+        for chunk in chunks:
+            yield function(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(),
+                             initializer=_init_partition_worker, initargs=(state,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(function, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _partition_statistics(chunk):
+    """Pass 1 on one partition: combo counts, non-missing values, medians and float features"""
+    state = _PARTITION_STATE
+    stats = {'rows': len(chunk), 'combo_counts': {}, 'present': {}, 'medians': {}, 'float_features': set()}
+    chunk = standardize_column_names(chunk, verbose=False)
+    chunk = convert_date_columns(chunk, verbose=False)
+
+    if state['count_combos'] and 'ciudad' in chunk.columns and 'ocupacion' in chunk.columns:
+        _, combo_keys, counts = _location_occupation_codes(
+            factorize_category(chunk['ciudad']), factorize_category(chunk['ocupacion'])
+        )
+        stats['combo_counts'] = dict(zip(combo_keys, counts.tolist()))
+
+    # fillna(NaN) leaves missing days missing, so pass 1 sees the raw values
+    no_fill = {feature: np.nan for feature in DAY_FEATURES}
+    chunk = create_temporal_features(chunk, state['reference_date'], fill_values=no_fill, verbose=False)
+    chunk = create_financial_ratio_features(chunk, verbose=False)
+
+    for feature in FINAL_FEATURES:
+        if feature in chunk.columns and pd.api.types.is_numeric_dtype(chunk[feature]):
+            values = chunk[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+            stats['present'][feature] = int(np.count_nonzero(~np.isnan(values)))
+            if feature in state['median_features']:
+                stats['medians'][feature] = BoundedMedian().add(values)
+            if pd.api.types.is_float_dtype(chunk[feature]):
+                stats['float_features'].add(feature)
+    return stats
+
+def _partition_features(chunk):
+    """
+    Pass 2 on one partition: feature engineering with the whole-file statistics
+    Returns the output columns (IDs + model features), or None if validation fails
+    """
+    state = _PARTITION_STATE
+    chunk = standardize_column_names(chunk, verbose=False)
+    chunk = convert_date_columns(chunk, verbose=False)
+    chunk = create_categorical_frequency_features(chunk, state['freq_maps'], state['combo_counts'], verbose=False)
+    chunk = create_temporal_features(chunk, state['reference_date'], state['fill_values'], verbose=False)
+    chunk = create_financial_ratio_features(chunk, verbose=False)
+
+    chunk, is_valid = validate_and_prepare_final_features(chunk, state['fill_values'], verbose=False)
+    if not is_valid:
         return None
 
-    # Step 2: Standardize column names
-    df = standardize_column_names(df)
+    # Columns that are float anywhere in the file are float in every chunk
+    for feature in state['float_features']:
+        chunk[feature] = chunk[feature].astype('float32')
+
+    id_columns = [col for col in ['cliente', 'identificador_unico'] if col in chunk.columns]
+    if not id_columns:
+        # Chunk indexes continue across chunks, so row_id matches the in-memory mode
+        chunk['row_id'] = chunk.index
+        id_columns = ['row_id']
+    return chunk[id_columns + FINAL_FEATURES]
+
+def collect_streaming_statistics(input_file_path, chunksize, reference_date, count_combos=True, workers=1,
+                                 events=None, median_features=None):
+    """
+    First streaming pass: whole-file statistics that per-chunk processing needs
 
-    # Step 3: Convert date columns
-    df = convert_date_columns(df)
+    Returns the location-occupation combo counts (only with count_combos,
+    i.e. when the mappings have no combo table), the median of the model
+    features in median_features (default: all; used to fill missing values
+    as the in-memory mode does), the features that end up as floats and the
+    missing values per feature.
 
-    # Step 4: Create categorical frequency features
-    df = create_categorical_frequency_features(df)
+    Medians are kept as production_summary.BoundedMedian: exact while a
+    feature has few distinct values, a quantile sketch (within 0.1%) for
+    continuous features, so the statistics stay bounded whatever the rows.
+    """
+    log = message_logger(events)
+    log("\n📊 STREAMING PASS 1 - WHOLE-FILE STATISTICS")
+    log("="*50)
+
+    median_features = set(FINAL_FEATURES if median_features is None else median_features)
+    combo_counts = Counter()
+    present = Counter()
+    medians = {feature: BoundedMedian() for feature in median_features}
+    float_features = set()
+    rows = 0
+    report = {}
+
+    state = {'reference_date': reference_date, 'count_combos': count_combos, 'median_features': median_features}
+    chunks = read_production_chunks(input_file_path, chunksize, report)
+    for stats in _run_partitions(_partition_statistics, chunks, state, workers):
+        rows += stats['rows']
+        combo_counts.update(stats['combo_counts'])
+        present.update(stats['present'])
+        for feature, median in stats['medians'].items():
+            medians[feature].merge(median)
+        float_features |= stats['float_features']
+
+    fill_values = {feature: median.median() for feature, median in medians.items() if median.count}
+    missing_counts = {feature: rows - count for feature, count in present.items() if count}
+    sketched = sorted(feature for feature, median in medians.items() if not median.exact)
+    if sketched:
+        log(f"📐 Sketched medians (many distinct values): {', '.join(sketched)}")
+    log(f"✅ Scanned {rows:,} rows" + (f": {len(combo_counts):,} location-occupation combos" if count_combos else ""))
+    print_ingestion_report(report, log=log)
+    if events is not None:
+        events.emit('ingestion', rows=report['rows'], blocks=report['blocks'],
+                    fallback_blocks=len(report['fallback_blocks']), bad_lines=len(report['bad_lines']))
+    return combo_counts, fill_values, float_features, missing_counts
+
+def production_part1_streaming(input_file_path, output_file_path, chunksize=DEFAULT_CHUNKSIZE, workers=1,
+                               events=None):
+    """
+    Streaming variant of production_part1_main for files that do not fit in memory
+
+    Pass 1 collects whole-file statistics (medians, plus combo counts when
+    the mappings have no combo table); pass 2 re-reads the file chunk by
+    chunk, runs standardization, date conversion, encoding and ratio
+    features on each chunk and appends it to the output file. Peak memory is
+    bounded by `chunksize`. Fill medians that the transformer does not supply
+    are exact only for features with at most EXACT_QUANTILE_VALUES distinct
+    values (production_summary.BoundedMedian); above that they come from a
+    quantile sketch, accurate to about 0.1%, so the missing values of such
+    features are filled slightly differently than in the in-memory mode.
+    Otherwise the output matches the in-memory mode up to float32 formatting.
+
+    workers > 1 runs the partitions of both passes on a process pool; the
+    output is written in input order and is identical to workers=1.
+
+    Returns a summary dict (rows, chunks, columns, output file) instead of
+    the cleaned DataFrame.
+    """
+    events = events if events is not None else console_events()
+    log = events.message
+    log(f"🌊 STREAMING MODE: ~{chunksize:,} rows per chunk"
+        + (f", {workers} worker processes" if workers > 1 else ""))
+
+    transformer = load_feature_transformer(events)
+    reference_date = (transformer and transformer.reference_date) or datetime.now()
+    freq_maps = transformer.freq_maps if transformer else load_frequency_mappings(events)
+    # Fitted medians instead of this file's: only features without one are summarized
+    fitted_fill_values = transformer.fill_values if transformer else {}
+    with events.stage('part1.statistics', workers=workers):
+        combo_counts, fill_values, float_features, missing_counts = collect_streaming_statistics(
+            input_file_path, chunksize, reference_date, count_combos=COMBO_TABLE_KEY not in freq_maps,
+            workers=workers, events=events,
+            median_features=[feature for feature in FINAL_FEATURES if feature not in fitted_fill_values]
+        )
+    fill_values.update(fitted_fill_values)
+    for feature, count in missing_counts.items():
+        if count:
+            events.emit('imputed', stage='part1.features', feature=feature, count=count,
+                        value=fill_values.get(feature))
+
+    log("\n🔧 STREAMING PASS 2 - FEATURE ENGINEERING")
+    log("="*50)
+
+    rows_written = 0
+    chunk_count = 0
+    final_columns = None
+
+    state = {
+        'freq_maps': freq_maps, 'combo_counts': combo_counts, 'fill_values': fill_values,
+        'float_features': float_features, 'reference_date': reference_date
+    }
+    with events.stage('part1.features', workers=workers) as stage, CheckpointWriter(output_file_path) as writer:
+        chunks = read_production_chunks(input_file_path, chunksize)
+        for chunk in _run_partitions(_partition_features, chunks, state, workers):
+            if chunk is None:
+                log(f"❌ Feature validation failed in chunk {chunk_count + 1}")
+                stage.update(status='failed', rows_out=rows_written, chunks=chunk_count)
+                return None
+            if final_columns is None:
+                final_columns = list(chunk.columns)
+                if 'row_id' in final_columns:
+                    log("⚠️ No ID columns found - creating row_id")
+
+            writer.write(chunk)
+            rows_written += len(chunk)
+            chunk_count += 1
+            events.emit('chunk_written', stage='part1.features', chunk=chunk_count, rows=len(chunk))
+            log(f"   ✅ Chunk {chunk_count}: {len(chunk):,} rows appended ({rows_written:,} total)")
+        stage.update(rows_out=rows_written, chunks=chunk_count, output_file=output_file_path)
+
+    log(f"\n🎉 PRODUCTION PART 1 COMPLETED (STREAMING)!")
+    log(f"📊 Rows written: {rows_written:,} in {chunk_count} chunks")
+    log(f"💾 Output: {output_file_path}")
 
-    # Step 5: Create temporal features
-    df = create_temporal_features(df)
+    return {
+        'rows': rows_written,
+        'chunks': chunk_count,
+        'columns': final_columns,
+        'output_file': output_file_path
+    }
 
-    # Step 6: Create financial ratio features
-    df = create_financial_ratio_features(df)
+def clean(df, events=None):
+    """
+    Part 1 as a DataFrame-in/DataFrame-out step: raw customer columns ->
+    ID columns + the 11 model features
 
-    # Step 7: Validate and prepare final features
-    df_final, is_valid = validate_and_prepare_final_features(df)
+    No file is read or written; production_part1_main() wraps it with
+    loading and saving. The input frame is not modified. Returns None when
+    feature validation fails.
 
-    if not is_valid:
-        print("❌ Feature validation failed")
-        return None
+    events: production_events.PipelineEvents (defaults to the console,
+    production_events.SILENT runs quietly)
+    """
+    events = events if events is not None else console_events()
+    log = events.message
+
+    # Fitted transformer state (frequency maps, fill values) when available
+    transformer = load_feature_transformer(events)
+    freq_maps = transformer.freq_maps if transformer else None
+    fill_values = transformer.fill_values if transformer else None
+    reference_date = transformer.reference_date if transformer else None
+
+    with events.stage('part1.features', rows_in=len(df)) as stage:
+        # Step 2: Standardize column names
+        df = standardize_column_names(df, events=events)
+
+        # Step 3: Convert date columns
+        df = convert_date_columns(df, events=events)
+
+        # Step 4: Create categorical frequency features
+        df = create_categorical_frequency_features(df, freq_maps, events=events)
+
+        # Step 5: Create temporal features
+        df = create_temporal_features(df, reference_date, fill_values, events=events)
+
+        # Step 6: Create financial ratio features
+        df = create_financial_ratio_features(df, events=events)
+        stage['rows_out'] = len(df)
+
+    # Step 7: Validate and prepare final features
+    with events.stage('part1.validate', rows_in=len(df)) as stage:
+        df_final, is_valid = validate_and_prepare_final_features(df, fill_values, events=events)
+        if not is_valid:
+            stage['status'] = 'failed'
+            log("❌ Feature validation failed")
+            return None
+        stage['rows_out'] = len(df_final)
 
     # Step 8: Create final dataset with ID columns + model features
-    final_features = [
-        'edad', 'fechaingresoempleo_days', 'balance_to_payment_ratio',
-        'fecha_inicio_days', 'saldo', 'nombreempleadorcliente_consolidated_freq',
-        'location_x_occupation', 'monto_letra', 'fecha_vencimiento_days',
-        'balance_coverage_ratio', 'payment_per_age'
-    ]
+    final_features = FINAL_FEATURES
 
     # Keep ID columns for traceability
     id_columns = []
@@ -454,35 +744,91 @@ def production_part1_main(input_file_path, output_file_path=None):
             id_columns.append(col)
 
     if not id_columns:
-        print("⚠️ No ID columns found - creating row_id")
+        log("⚠️ No ID columns found - creating row_id")
         df_final['row_id'] = df_final.index
         id_columns = ['row_id']
 
-    # Create final dataset
+    # Create final dataset (column selection already makes a new frame)
     final_columns = id_columns + final_features
-    df_clean_final = df_final[final_columns].copy()
+    df_clean_final = df_final[final_columns]
+
+    return df_clean_final
+
+def production_part1_main(input_file_path, output_file_path=None, chunksize=None, workers=None, typed=True,
+                          events=None):
+    """
+    Main function for Production Part 1: Data Cleaning & Feature Engineering
+
+    Input: Raw production data CSV
+    Output: Clean dataset with exactly 11 features ready for model inference
+
+    With `chunksize`, runs in streaming mode (see production_part1_streaming):
+    output_file_path is required and a summary dict is returned instead of
+    the DataFrame. With `workers` > 1, the streaming partitions run in
+    parallel worker processes (chunksize defaults to DEFAULT_CHUNKSIZE).
+    typed=False reads the input as float64 / object columns (in-memory mode).
+    The output format follows output_file_path's extension (production_checkpoints):
+    '.arrow' keeps the dtypes for Part 2, '.csv' writes text.
+    events: production_events.PipelineEvents receiving the progress lines
+    and one stage_start/stage_end pair per step; defaults to the console,
+    production_events.SILENT runs quietly.
+    """
+    events = events if events is not None else console_events()
+    if workers and workers > 1:
+        chunksize = chunksize or DEFAULT_CHUNKSIZE
+    if chunksize:
+        if not output_file_path:
+            raise ValueError("Streaming mode (chunksize/workers) requires output_file_path")
+        return production_part1_streaming(input_file_path, output_file_path, chunksize, workers or 1, events)
+
+    log = events.message
+    log("🚀 PRODUCTION PART 1 - DATA CLEANING & FEATURE ENGINEERING")
+    log("="*80)
+    log("🎯 OBJECTIVE: Create 11 features for XGBoost income prediction model")
+    log("📋 INPUT: Raw customer data")
+    log("📋 OUTPUT: Clean dataset ready for model inference")
+    log("="*80)
+
+    # Step 1: Load raw data
+    with events.stage('part1.load', typed=typed) as stage:
+        df = load_production_data(input_file_path, typed, events)
+        if df is None:
+            stage['status'] = 'failed'
+            log("❌ Failed to load data")
+            return None
+        stage['rows_out'] = len(df)
+
+    # Steps 2-8: feature engineering on the loaded frame
+    df_clean_final = clean(df, events)
+    if df_clean_final is None:
+        return None
+    final_features = FINAL_FEATURES
+    id_columns = [col for col in df_clean_final.columns if col not in final_features]
 
     # Save to file if output path provided
     if output_file_path:
-        print(f"\n💾 Saving clean dataset to: {output_file_path}")
-        df_clean_final.to_csv(output_file_path, index=False, encoding='utf-8')
-        print(f"✅ File saved successfully!")
+        with events.stage('part1.save', rows_in=len(df_clean_final)) as stage:
+            log(f"\n💾 Saving clean dataset to: {output_file_path}")
+            write_checkpoint(df_clean_final, output_file_path)
+            log(f"✅ File saved successfully!")
+            stage.update(rows_out=len(df_clean_final), output_file=output_file_path)
 
     # Final summary
-    print(f"\n🎉 PRODUCTION PART 1 COMPLETED!")
-    print(f"📊 Clean dataset shape: {df_clean_final.shape}")
-    print(f"🆔 ID columns: {id_columns}")
-    print(f"🎯 Model features: {len(final_features)}")
-    print(f"📋 Ready for model inference!")
-
-    # Show feature summary
-    print(f"\n📊 FEATURE SUMMARY:")
-    for feature in final_features:
-        dtype = df_clean_final[feature].dtype
-        min_val = df_clean_final[feature].min()
-        max_val = df_clean_final[feature].max()
-        mean_val = df_clean_final[feature].mean()
-        print(f"   {feature}: {dtype} [{min_val:.2f}, {max_val:.2f}] mean={mean_val:.2f}")
+    log(f"\n🎉 PRODUCTION PART 1 COMPLETED!")
+    log(f"📊 Clean dataset shape: {df_clean_final.shape}")
+    log(f"🆔 ID columns: {id_columns}")
+    log(f"🎯 Model features: {len(final_features)}")
+    log(f"📋 Ready for model inference!")
+
+    # Show feature summary (min/max/mean scans are skipped when nobody reads them)
+    if events.verbose:
+        log(f"\n📊 FEATURE SUMMARY:")
+        for feature in final_features:
+            dtype = df_clean_final[feature].dtype
+            min_val = df_clean_final[feature].min()
+            max_val = df_clean_final[feature].max()
+            mean_val = df_clean_final[feature].mean()
+            log(f"   {feature}: {dtype} [{min_val:.2f}, {max_val:.2f}] mean={mean_val:.2f}")
 
     return df_clean_final
 
@@ -494,13 +840,20 @@ if __name__ == "__main__":
     input_file = r'data\production\final_info_clientes.csv'
     output_file = r'data\production\df_clientes_clean_final.csv'
 
+    # Optional streaming mode for large files: python production_part1_data_cleaning.py 50000
+    # and parallel workers:                     python production_part1_data_cleaning.py 50000 4
+    chunksize = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
     print("🎯 PRODUCTION PART 1 - INCOME PREDICTION DATA CLEANING")
     print("="*80)
 
     # Run Part 1 pipeline
-    df_clean = production_part1_main(input_file, output_file)
+    df_clean = production_part1_main(input_file, output_file, chunksize=chunksize, workers=workers)
 
-    if df_clean is not None:
+    if isinstance(df_clean, dict):
+        print(f"\n🎯 SUCCESS! {df_clean['rows']:,} rows streamed to {df_clean['output_file']}")
+    elif df_clean is not None:
         print(f"\n📋 SAMPLE OF CLEAN DATA:")
         print(df_clean.head())
 
@@ -540,9 +893,19 @@ if __name__ == "__main__":
 🔧 PRODUCTION CONSIDERATIONS:
 - All features handle missing values gracefully
 - Frequency encodings use training data mappings from production_frequency_mappings_catboost.pkl
+- location_x_occupation is looked up in the training-time combo table stored in
+  the mappings (production_frequency_encoding.py), so a customer's value does
+  not depend on the rest of the file; without the table it falls back to
+  counts within the file
 - Extreme values are capped for model stability
 - Data types optimized for memory efficiency (int32, float32)
 - Full traceability with customer IDs preserved
+- Streaming mode (chunksize=...) for full-portfolio files: two passes over the
+  input, whole-file medians (and combo counts) from pass 1, output appended per
+  chunk in pass 2, peak memory bounded by the chunk size
+- Parallel mode (workers=...): the partitions of both streaming passes run on a
+  process pool (lookup tables inherited by forked workers), output written in
+  input order and identical to the single-process run
 
 ✅ VALIDATION:
 - Exactly 11 features as required by XGBoost model
@@ -15,8 +15,14 @@
 #
 # REQUIRED FILES:
 # - models/production/production_model_catboost_all_data.pkl (XGBoost model)
+#   or models/production/production_model_bundle/ (versioned model bundle,
+#   used instead of the .pkl when present - see production_model_bundle.py)
 # - models/production/production_frequency_mappings_catboost.pkl (encodings)
 # - data/production/df_clientes_clean_final.csv (clean dataset from Part 1)
+#
+# SCORING: the 11 features become one float32 matrix (a single allocation,
+# missing values filled in place), scored in chunks of row views with a set
+# number of XGBoost threads (score(chunksize=..., nthread=...), production_scoring.py)
 # =============================================================================
 
 import pandas as pd
@@ -25,6 +31,12 @@ import pickle
 import os
 import warnings
 from datetime import datetime
+from production_checkpoints import read_checkpoint, write_checkpoint
+from production_events import console_events, message_logger
+from production_feature_transformer import MODEL_FEATURES
+from production_model_bundle import DEFAULT_BUNDLE_PATH, DEFAULT_INTERVAL, ModelBundle, is_model_bundle
+from production_output import ci_width, set_batch_metadata
+from production_scoring import DEFAULT_SCORING_CHUNKSIZE, build_feature_matrix, predict_in_chunks
 warnings.filterwarnings('ignore')
 
 # Try to import ML libraries
@@ -45,18 +57,42 @@ except ImportError:
 # Set display options
 pd.set_option('display.max_columns', None)
 
-def load_production_model():
+# Path to our versioned model bundle (used instead of the pickled model when present)
+MODEL_BUNDLE_PATH = DEFAULT_BUNDLE_PATH
+
+def load_model_bundle(events=None):
+    """
+    Load the versioned model bundle: booster, feature order and interval offsets
+    Members are verified against the manifest checksums (production_model_bundle.py)
+    """
+    log = message_logger(events)
+    log("🤖 LOADING PRODUCTION MODEL BUNDLE")
+    log("="*50)
+    log(f"📂 Loading bundle from: {MODEL_BUNDLE_PATH}")
+
+    try:
+        bundle = ModelBundle.load(MODEL_BUNDLE_PATH)
+        # Read the booster now rather than on the first prediction
+        log(f"✅ Model bundle loaded: {type(bundle.model.get_booster()).__name__}, "
+            f"version {bundle.model_version}, {len(bundle.feature_columns)} features")
+        return bundle
+    except Exception as e:
+        log(f"❌ Error loading model bundle: {e}")
+        return None
+
+def load_production_model(events=None):
     """
     Load the trained XGBoost model for income prediction
     Handle different model storage formats (direct model, dict wrapper, etc.)
     """
-    print("🤖 LOADING PRODUCTION MODEL")
-    print("="*50)
+    log = message_logger(events)
+    log("🤖 LOADING PRODUCTION MODEL")
+    log("="*50)
 
     # Path to our final production model
     model_path = r'models\production\production_model_catboost_all_data.pkl'
 
-    print(f"📂 Loading model from: {model_path}")
+    log(f"📂 Loading model from: {model_path}")
 
     try:
         if os.path.exists(model_path):
@@ -64,49 +100,50 @@ def load_production_model():
             if JOBLIB_AVAILABLE:
                 try:
                     loaded_object = joblib.load(model_path)
-                    print("✅ Object loaded successfully with joblib")
+                    log("✅ Object loaded successfully with joblib")
                 except:
-                    print("⚠️ Joblib loading failed, trying pickle...")
+                    log("⚠️ Joblib loading failed, trying pickle...")
                     loaded_object = None
 
             # Fallback to pickle if joblib failed
             if loaded_object is None:
                 with open(model_path, 'rb') as f:
                     loaded_object = pickle.load(f)
-                print("✅ Object loaded successfully with pickle")
+                log("✅ Object loaded successfully with pickle")
 
             # Handle different model storage formats
-            model = extract_model_from_object(loaded_object)
+            model = extract_model_from_object(loaded_object, events)
 
             if model is not None:
-                print(f"✅ Model extracted successfully: {type(model)}")
+                log(f"✅ Model extracted successfully: {type(model)}")
                 return model
             else:
-                print("❌ Could not extract model from loaded object")
-                debug_model_object(loaded_object)
+                log("❌ Could not extract model from loaded object")
+                debug_model_object(loaded_object, events)
                 return None
 
         else:
-            print(f"❌ Model file not found: {model_path}")
+            log(f"❌ Model file not found: {model_path}")
             return None
     except Exception as e:
-        print(f"❌ Error loading model: {e}")
+        log(f"❌ Error loading model: {e}")
         return None
 
-def extract_model_from_object(loaded_object):
+def extract_model_from_object(loaded_object, events=None):
     """
     Extract the actual model from different storage formats
     """
-    print(f"🔍 Analyzing loaded object type: {type(loaded_object)}")
+    log = message_logger(events)
+    log(f"🔍 Analyzing loaded object type: {type(loaded_object)}")
 
     # Case 1: Direct model object
     if hasattr(loaded_object, 'predict'):
-        print("   ✅ Direct model object found")
+        log("   ✅ Direct model object found")
         return loaded_object
 
     # Case 2: Dictionary containing model
     elif isinstance(loaded_object, dict):
-        print("   📋 Dictionary detected - searching for model...")
+        log("   📋 Dictionary detected - searching for model...")
 
         # Common keys where models might be stored
         possible_keys = ['model', 'best_model', 'final_model', 'xgb_model', 'regressor', 'estimator']
@@ -115,70 +152,77 @@ def extract_model_from_object(loaded_object):
             if key in loaded_object:
                 candidate = loaded_object[key]
                 if hasattr(candidate, 'predict'):
-                    print(f"   ✅ Model found in key: '{key}'")
+                    log(f"   ✅ Model found in key: '{key}'")
                     return candidate
 
         # If no direct model found, show available keys
-        print(f"   📋 Available keys: {list(loaded_object.keys())}")
+        log(f"   📋 Available keys: {list(loaded_object.keys())}")
 
         # Try to find any object with predict method
         for key, value in loaded_object.items():
             if hasattr(value, 'predict'):
-                print(f"   ✅ Model found in key: '{key}' (by predict method)")
+                log(f"   ✅ Model found in key: '{key}' (by predict method)")
                 return value
 
-        print("   ❌ No model with predict method found in dictionary")
+        log("   ❌ No model with predict method found in dictionary")
         return None
 
     # Case 3: List or tuple
     elif isinstance(loaded_object, (list, tuple)):
-        print("   📋 List/tuple detected - searching for model...")
+        log("   📋 List/tuple detected - searching for model...")
         for i, item in enumerate(loaded_object):
             if hasattr(item, 'predict'):
-                print(f"   ✅ Model found at index {i}")
+                log(f"   ✅ Model found at index {i}")
                 return item
-        print("   ❌ No model with predict method found in list/tuple")
+        log("   ❌ No model with predict method found in list/tuple")
         return None
 
     # Case 4: Unknown format
     else:
-        print(f"   ❌ Unknown object format: {type(loaded_object)}")
-        print(f"   📋 Object attributes: {dir(loaded_object)}")
+        log(f"   ❌ Unknown object format: {type(loaded_object)}")
+        log(f"   📋 Object attributes: {dir(loaded_object)}")
         return None
 
-def debug_model_object(loaded_object):
+def debug_model_object(loaded_object, events=None):
     """
     Debug function to inspect the loaded object structure
     """
-    print("\n🔍 DEBUG: INSPECTING LOADED OBJECT")
-    print("="*50)
+    log = message_logger(events)
+    log("\n🔍 DEBUG: INSPECTING LOADED OBJECT")
+    log("="*50)
 
-    print(f"Object type: {type(loaded_object)}")
-    print(f"Object size: {len(loaded_object) if hasattr(loaded_object, '__len__') else 'N/A'}")
+    log(f"Object type: {type(loaded_object)}")
+    log(f"Object size: {len(loaded_object) if hasattr(loaded_object, '__len__') else 'N/A'}")
 
     if isinstance(loaded_object, dict):
-        print(f"Dictionary keys: {list(loaded_object.keys())}")
+        log(f"Dictionary keys: {list(loaded_object.keys())}")
         for key, value in loaded_object.items():
-            print(f"  {key}: {type(value)} - Has predict: {hasattr(value, 'predict')}")
+            log(f"  {key}: {type(value)} - Has predict: {hasattr(value, 'predict')}")
 
     elif isinstance(loaded_object, (list, tuple)):
-        print(f"List/tuple contents:")
+        log(f"List/tuple contents:")
         for i, item in enumerate(loaded_object):
-            print(f"  [{i}]: {type(item)} - Has predict: {hasattr(item, 'predict')}")
+            log(f"  [{i}]: {type(item)} - Has predict: {hasattr(item, 'predict')}")
 
     else:
-        print(f"Object attributes: {[attr for attr in dir(loaded_object) if not attr.startswith('_')]}")
-        print(f"Has predict method: {hasattr(loaded_object, 'predict')}")
+        log(f"Object attributes: {[attr for attr in dir(loaded_object) if not attr.startswith('_')]}")
+        log(f"Has predict method: {hasattr(loaded_object, 'predict')}")
 
-def validate_model_features(df, model):
+def validate_model_features(df, model, events=None, expected_features=None):
     """
     Validate that the dataset has exactly the features the model expects
+    expected_features: feature order of the model bundle (default: the 11 features below)
+
+    Returns (X, is_valid): X is the float32 feature matrix in the model's
+    feature order, built with one allocation (production_scoring.build_feature_matrix);
+    missing values are filled with column medians (0 for text converted to numbers)
     """
-    print("\n🔍 VALIDATING MODEL FEATURES")
-    print("="*50)
+    log = message_logger(events)
+    log("\n🔍 VALIDATING MODEL FEATURES")
+    log("="*50)
     
     # Expected 11 features for our XGBoost model
-    expected_features = [
+    expected_features = expected_features or [
         'edad',
         'fechaingresoempleo_days', 
         'balance_to_payment_ratio',
@@ -192,7 +236,7 @@ def validate_model_features(df, model):
         'payment_per_age'
     ]
     
-    print(f"📋 Expected features: {len(expected_features)}")
+    log(f"📋 Expected features: {len(expected_features)}")
     
     # Check if all expected features are present
     missing_features = []
@@ -201,61 +245,85 @@ def validate_model_features(df, model):
     for feature in expected_features:
         if feature in df.columns:
             available_features.append(feature)
-            print(f"   ✅ {feature}: Available")
+            log(f"   ✅ {feature}: Available")
         else:
             missing_features.append(feature)
-            print(f"   ❌ {feature}: Missing")
+            log(f"   ❌ {feature}: Missing")
     
     if missing_features:
-        print(f"\n🚨 ERROR: Missing required features: {missing_features}")
+        log(f"\n🚨 ERROR: Missing required features: {missing_features}")
         return None, False
     
-    # Extract feature matrix for model
-    X = df[expected_features].copy()
-    
     # Validate data types and handle any remaining issues
-    print(f"\n🔧 Feature validation:")
+    log(f"\n🔧 Feature validation:")
+    fill_values = {}
     for feature in expected_features:
-        dtype = X[feature].dtype
-        missing_count = X[feature].isnull().sum()
-        
-        if missing_count > 0:
-            print(f"   ⚠️ {feature}: {missing_count} missing values - filling with median")
-            X[feature] = X[feature].fillna(X[feature].median())
-        
-        # Ensure numeric types
-        if X[feature].dtype == 'object':
-            X[feature] = pd.to_numeric(X[feature], errors='coerce').fillna(0)
-            print(f"   🔧 {feature}: converted to numeric")
+        column = df[feature]
+        dtype = column.dtype
+
+        # Ensure numeric types (text that is not a number becomes 0)
+        if dtype == 'object':
+            column = pd.to_numeric(column, errors='coerce')
+            fill_values[feature] = 0
+            log(f"   🔧 {feature}: converted to numeric")
+
+        missing_count = column.isnull().sum()
+        if missing_count > 0 and feature not in fill_values:
+            log(f"   ⚠️ {feature}: {missing_count} missing values - filling with median")
+            median_val = column.median()
+            fill_values[feature] = median_val
+            if events is not None:
+                events.emit('imputed', stage='part2.validate', feature=feature, count=int(missing_count),
+                            value=float(median_val))
         
-        print(f"   ✅ {feature}: {dtype} - Range [{X[feature].min():.2f}, {X[feature].max():.2f}]")
+        # The fill value lies within the range, so the range is that of the filled column
+        if events is None or events.verbose:
+            log(f"   ✅ {feature}: {dtype} - Range [{column.min():.2f}, {column.max():.2f}]")
     
-    print(f"\n✅ Feature matrix ready: {X.shape}")
+    # Extract feature matrix for model
+    X = build_feature_matrix(df, expected_features, fill_values)
+    
+    log(f"\n✅ Feature matrix ready: {X.shape}")
     return X, True
 
-def generate_predictions_with_confidence(model, X):
+def generate_predictions_with_confidence(model, X, events=None, interval=None, chunksize=DEFAULT_SCORING_CHUNKSIZE,
+                                         nthread=None, feature_columns=None, deduplicate=False):
     """
     Generate income predictions with 90% confidence intervals
+    X: feature matrix from validate_model_features, with columns feature_columns
+    interval: offsets of the model bundle (default: production_model_bundle.DEFAULT_INTERVAL)
+    chunksize / nthread: rows per scoring chunk and XGBoost threads (production_scoring.py)
+    deduplicate: score each distinct feature row once (repeated customers)
     """
-    print("\n🎯 GENERATING INCOME PREDICTIONS")
-    print("="*50)
+    log = message_logger(events)
+    log("\n🎯 GENERATING INCOME PREDICTIONS")
+    log("="*50)
     
     try:
         # Generate point predictions
-        print("📊 Computing point predictions...")
-        predictions = model.predict(X)
+        log("📊 Computing point predictions...")
+        predictions, report = predict_in_chunks(model, X, feature_columns or MODEL_FEATURES,
+                                                chunksize=chunksize, nthread=nthread, deduplicate=deduplicate)
+        if events is not None:
+            events.emit('scoring', **report)
         
-        print(f"✅ Predictions generated for {len(predictions):,} customers")
-        print(f"📈 Prediction range: ${predictions.min():,.2f} to ${predictions.max():,.2f}")
-        print(f"📊 Mean prediction: ${predictions.mean():,.2f}")
+        log(f"✅ Predictions generated for {len(predictions):,} customers")
+        if deduplicate:
+            log(f"🧬 Distinct feature rows scored: {report['unique_rows']:,} of {report['rows']:,} "
+                f"({report['dedup_ratio'] or 1:.2f} rows per scored row)")
+        log(f"⚡ Scored in {report['chunks']} chunk(s) of up to {report['chunksize']:,} rows: "
+            f"{report['seconds']:.2f}s ({report['rows_per_s'] or 0:,} rows/s)")
+        log(f"📈 Prediction range: ${predictions.min():,.2f} to ${predictions.max():,.2f}")
+        log(f"📊 Mean prediction: ${predictions.mean():,.2f}")
         
         # Add confidence intervals (from our final model analysis)
-        print("\n🔒 Adding 90% confidence intervals...")
+        log("\n🔒 Adding 90% confidence intervals...")
         
         # These are the exact confidence interval offsets from our final model
-        CI_LOWER_OFFSET = -510.93  # 5th percentile offset
-        CI_UPPER_OFFSET = 755.02   # 95th percentile offset
-        CONFIDENCE_LEVEL = 0.90    # 90% confidence level
+        interval = interval or DEFAULT_INTERVAL
+        CI_LOWER_OFFSET = interval['lower_offset']         # 5th percentile offset
+        CI_UPPER_OFFSET = interval['upper_offset']         # 95th percentile offset
+        CONFIDENCE_LEVEL = interval['confidence_level']    # 90% confidence level
         
         # Calculate confidence bounds
         lower_bounds = predictions + CI_LOWER_OFFSET
@@ -264,9 +332,9 @@ def generate_predictions_with_confidence(model, X):
         # Ensure no negative income predictions
         lower_bounds = np.maximum(lower_bounds, 0)
         
-        print(f"✅ Confidence intervals added")
-        print(f"📊 Average CI width: ${CI_UPPER_OFFSET - CI_LOWER_OFFSET:.2f}")
-        print(f"🔒 Confidence level: {CONFIDENCE_LEVEL*100:.0f}%")
+        log(f"✅ Confidence intervals added")
+        log(f"📊 Average CI width: ${CI_UPPER_OFFSET - CI_LOWER_OFFSET:.2f}")
+        log(f"🔒 Confidence level: {CONFIDENCE_LEVEL*100:.0f}%")
         
         # Create results dictionary
         results = {
@@ -275,22 +343,24 @@ def generate_predictions_with_confidence(model, X):
             'upper_bounds': upper_bounds,
             'ci_lower_offset': CI_LOWER_OFFSET,
             'ci_upper_offset': CI_UPPER_OFFSET,
-            'confidence_level': CONFIDENCE_LEVEL
+            'confidence_level': CONFIDENCE_LEVEL,
+            'scoring': report
         }
         
         return results
         
     except Exception as e:
-        print(f"❌ Error generating predictions: {e}")
+        log(f"❌ Error generating predictions: {e}")
         return None
 
-def create_predictions_dataframe(df_original, prediction_results):
+def create_predictions_dataframe(df_original, prediction_results, events=None):
     """
     Create final predictions dataframe with customer IDs and predictions
     Ensures identificador_unico is always included for customer identification
     """
-    print("\n📋 CREATING PREDICTIONS DATAFRAME")
-    print("="*50)
+    log = message_logger(events)
+    log("\n📋 CREATING PREDICTIONS DATAFRAME")
+    log("="*50)
 
     # Extract prediction components
     predictions = prediction_results['predictions']
@@ -299,7 +369,7 @@ def create_predictions_dataframe(df_original, prediction_results):
     confidence_level = prediction_results['confidence_level']
 
     # Debug: Show available columns
-    print(f"📋 Available columns in dataset: {list(df_original.columns)}")
+    log(f"📋 Available columns in dataset: {list(df_original.columns)}")
 
     # Priority order for ID columns (identificador_unico is most important)
     priority_id_columns = ['identificador_unico', 'cliente', 'row_id']
@@ -309,11 +379,11 @@ def create_predictions_dataframe(df_original, prediction_results):
     for col in priority_id_columns:
         if col in df_original.columns:
             id_columns.append(col)
-            print(f"   ✅ Found ID column: {col}")
+            log(f"   ✅ Found ID column: {col}")
 
     # If no standard ID columns found, create row_id
     if not id_columns:
-        print("⚠️ No standard ID columns found - creating row_id")
+        log("⚠️ No standard ID columns found - creating row_id")
         df_original = df_original.copy()  # Avoid modifying original
         df_original['row_id'] = df_original.index
         id_columns = ['row_id']
@@ -323,7 +393,7 @@ def create_predictions_dataframe(df_original, prediction_results):
         id_columns.remove('identificador_unico')
         id_columns.insert(0, 'identificador_unico')
 
-    print(f"🆔 Final ID columns (in order): {id_columns}")
+    log(f"🆔 Final ID columns (in order): {id_columns}")
 
     # Create predictions dataframe starting with ID columns
     df_predictions = df_original[id_columns].copy()
@@ -332,99 +402,165 @@ def create_predictions_dataframe(df_original, prediction_results):
     df_predictions['predicted_income'] = predictions.round(2)
     df_predictions['income_lower_90'] = lower_bounds.round(2)
     df_predictions['income_upper_90'] = upper_bounds.round(2)
-    df_predictions['confidence_level'] = confidence_level
-
-    # Add metadata
-    df_predictions['prediction_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    df_predictions['model_version'] = 'XGBoost_v1.0_Final'
-
-    # Add confidence interval width for analysis
-    df_predictions['ci_width'] = df_predictions['income_upper_90'] - df_predictions['income_lower_90']
 
-    print(f"✅ Predictions dataframe created: {df_predictions.shape}")
-    print(f"🆔 ID columns included: {id_columns}")
-    print(f"📊 Prediction columns: ['predicted_income', 'income_lower_90', 'income_upper_90']")
+    # Add metadata: stored once for the batch (df.attrs['batch']) and as
+    # constant categorical columns; ci_width is derived when exported
+    set_batch_metadata(
+        df_predictions,
+        confidence_level=confidence_level,
+        prediction_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        model_version='XGBoost_v1.0_Final',
+        ci_lower_offset=prediction_results['ci_lower_offset'],
+        ci_upper_offset=prediction_results['ci_upper_offset']
+    )
+
+    log(f"✅ Predictions dataframe created: {df_predictions.shape}")
+    log(f"🆔 ID columns included: {id_columns}")
+    log(f"📊 Prediction columns: ['predicted_income', 'income_lower_90', 'income_upper_90']")
 
     # Show sample with ID columns
     if len(df_predictions) > 0:
-        print(f"\n📋 Sample with customer identification:")
+        log(f"\n📋 Sample with customer identification:")
         sample_cols = id_columns + ['predicted_income', 'income_lower_90', 'income_upper_90']
-        print(df_predictions[sample_cols].head(3).to_string(index=False))
+        log(df_predictions[sample_cols].head(3).to_string(index=False))
 
     return df_predictions
 
-def production_part2_main(clean_data_path, output_path=None):
+def score(df_clean, events=None, chunksize=DEFAULT_SCORING_CHUNKSIZE, nthread=None, deduplicate=True):
+    """
+    Part 2 as a DataFrame-in/DataFrame-out step: clean dataset from Part 1 ->
+    predictions with 90% confidence intervals and the ID columns
+
+    No file is read or written; production_part2_main() wraps it with
+    loading and saving. Returns None when the model cannot be loaded or the
+    features do not validate.
+
+    chunksize: rows scored per chunk (None: all at once); nthread: XGBoost
+    threads (None: XGBoost default)
+    deduplicate: rows with the same feature vector (a customer repeated
+    once per loan or product) are scored once and share the prediction
+
+    events: production_events.PipelineEvents (defaults to the console,
+    production_events.SILENT runs quietly)
+    """
+    events = events if events is not None else console_events()
+    log = events.message
+
+    # Step 2: Load production model
+    with events.stage('part2.model') as stage:
+        # The bundle carries the model's feature order and interval offsets
+        if is_model_bundle(MODEL_BUNDLE_PATH):
+            bundle = model = load_model_bundle(events)
+        else:
+            bundle, model = None, load_production_model(events)
+        if model is None:
+            log("❌ Failed to load model")
+            stage['status'] = 'failed'
+            return None
+        stage['model_type'] = type(model).__name__
+    
+    # Step 3: Validate features and prepare feature matrix
+    with events.stage('part2.validate', rows_in=len(df_clean)) as stage:
+        features = bundle.feature_columns if bundle is not None else MODEL_FEATURES
+        X, is_valid = validate_model_features(df_clean, model, events, features)
+        if not is_valid:
+            log("❌ Feature validation failed")
+            stage['status'] = 'failed'
+            return None
+        stage['rows_out'] = len(X)
+    
+    # Step 4: Generate predictions with confidence intervals
+    with events.stage('part2.predict', rows_in=len(X), nthread=nthread) as stage:
+        prediction_results = generate_predictions_with_confidence(
+            model, X, events, bundle.interval if bundle is not None else None, chunksize, nthread, features,
+            deduplicate
+        )
+        if prediction_results is None:
+            log("❌ Prediction generation failed")
+            stage['status'] = 'failed'
+            return None
+        scoring = prediction_results['scoring']
+        stage.update(rows_per_s=scoring['rows_per_s'], unique_rows=scoring['unique_rows'],
+                     dedup_ratio=scoring['dedup_ratio'])
+        
+        # Step 5: Create final predictions dataframe
+        df_predictions = create_predictions_dataframe(df_clean, prediction_results, events)
+        stage['rows_out'] = len(df_predictions)
+
+    return df_predictions
+
+def production_part2_main(clean_data_path, output_path=None, events=None, chunksize=DEFAULT_SCORING_CHUNKSIZE,
+                          nthread=None, deduplicate=True):
     """
     Main function for Production Part 2: Model Inference & Predictions
     
-    Input: Clean dataset from Part 1 (CSV file)
+    Input: Clean dataset from Part 1 (Arrow checkpoint or CSV file)
     Output: Income predictions with confidence intervals
+
+    chunksize / nthread: rows per scoring chunk and XGBoost threads
+    deduplicate: score each distinct feature row once (see score())
+
+    events: production_events.PipelineEvents receiving the progress lines
+    and one stage_start/stage_end pair per step; defaults to the console,
+    production_events.SILENT runs quietly.
     """
-    print("🚀 PRODUCTION PART 2 - MODEL INFERENCE & PREDICTIONS")
-    print("="*80)
-    print("🎯 OBJECTIVE: Generate income predictions with 90% confidence intervals")
-    print("📋 INPUT: Clean dataset with 11 features")
-    print("📋 OUTPUT: Income predictions with confidence bounds")
-    print("="*80)
+    events = events if events is not None else console_events()
+    log = events.message
+    log("🚀 PRODUCTION PART 2 - MODEL INFERENCE & PREDICTIONS")
+    log("="*80)
+    log("🎯 OBJECTIVE: Generate income predictions with 90% confidence intervals")
+    log("📋 INPUT: Clean dataset with 11 features")
+    log("📋 OUTPUT: Income predictions with confidence bounds")
+    log("="*80)
     
     # Step 1: Load clean dataset from Part 1
-    print("📂 Loading clean dataset...")
-    try:
-        df_clean = pd.read_csv(clean_data_path, encoding='utf-8')
-        print(f"✅ Clean dataset loaded: {df_clean.shape}")
-    except Exception as e:
-        print(f"❌ Error loading clean dataset: {e}")
-        return None
-    
-    # Step 2: Load production model
-    model = load_production_model()
-    if model is None:
-        print("❌ Failed to load model")
-        return None
-    
-    # Step 3: Validate features and prepare feature matrix
-    X, is_valid = validate_model_features(df_clean, model)
-    if not is_valid:
-        print("❌ Feature validation failed")
-        return None
+    with events.stage('part2.load') as stage:
+        log("📂 Loading clean dataset...")
+        try:
+            df_clean = read_checkpoint(clean_data_path)
+            log(f"✅ Clean dataset loaded: {df_clean.shape}")
+        except Exception as e:
+            log(f"❌ Error loading clean dataset: {e}")
+            stage['status'] = 'failed'
+            return None
+        stage['rows_out'] = len(df_clean)
     
-    # Step 4: Generate predictions with confidence intervals
-    prediction_results = generate_predictions_with_confidence(model, X)
-    if prediction_results is None:
-        print("❌ Prediction generation failed")
+    # Steps 2-5: model, feature validation, predictions
+    df_predictions = score(df_clean, events, chunksize, nthread, deduplicate)
+    if df_predictions is None:
         return None
     
-    # Step 5: Create final predictions dataframe
-    df_predictions = create_predictions_dataframe(df_clean, prediction_results)
-    
     # Step 6: Save predictions if output path provided
     if output_path:
-        print(f"\n💾 Saving predictions to: {output_path}")
-        df_predictions.to_csv(output_path, index=False, encoding='utf-8')
-        print(f"✅ Predictions saved successfully!")
+        with events.stage('part2.save', rows_in=len(df_predictions)) as stage:
+            log(f"\n💾 Saving predictions to: {output_path}")
+            write_checkpoint(df_predictions, output_path)
+            log(f"✅ Predictions saved successfully!")
+            stage.update(rows_out=len(df_predictions), output_file=output_path)
     
     # Step 7: Display summary statistics
-    print(f"\n🎉 PRODUCTION PART 2 COMPLETED!")
-    print(f"📊 Predictions generated: {len(df_predictions):,}")
+    log(f"\n🎉 PRODUCTION PART 2 COMPLETED!")
+    log(f"📊 Predictions generated: {len(df_predictions):,}")
 
     # Show customer identification info
     id_cols = [col for col in ['identificador_unico', 'cliente', 'row_id'] if col in df_predictions.columns]
-    print(f"🆔 Customer identification: {id_cols}")
-
-    print(f"💰 Income prediction summary:")
-    print(f"   Mean: ${df_predictions['predicted_income'].mean():,.2f}")
-    print(f"   Median: ${df_predictions['predicted_income'].median():,.2f}")
-    print(f"   Min: ${df_predictions['predicted_income'].min():,.2f}")
-    print(f"   Max: ${df_predictions['predicted_income'].max():,.2f}")
-    print(f"🔒 Confidence intervals (90%):")
-    print(f"   Average width: ${df_predictions['ci_width'].mean():,.2f}")
-    print(f"   Model RMSE: $527.24")
-
-    # Show sample with customer ID for verification
-    if len(df_predictions) > 0:
-        sample_cols = id_cols + ['predicted_income', 'income_lower_90', 'income_upper_90']
-        print(f"\n📋 Sample predictions with customer ID:")
-        print(df_predictions[sample_cols].head(3).to_string(index=False))
+    log(f"🆔 Customer identification: {id_cols}")
+
+    if events.verbose:
+        log(f"💰 Income prediction summary:")
+        log(f"   Mean: ${df_predictions['predicted_income'].mean():,.2f}")
+        log(f"   Median: ${df_predictions['predicted_income'].median():,.2f}")
+        log(f"   Min: ${df_predictions['predicted_income'].min():,.2f}")
+        log(f"   Max: ${df_predictions['predicted_income'].max():,.2f}")
+        log(f"🔒 Confidence intervals (90%):")
+        log(f"   Average width: ${ci_width(df_predictions).mean():,.2f}")
+        log(f"   Model RMSE: $527.24")
+
+        # Show sample with customer ID for verification
+        if len(df_predictions) > 0:
+            sample_cols = id_cols + ['predicted_income', 'income_lower_90', 'income_upper_90']
+            log(f"\n📋 Sample predictions with customer ID:")
+            log(df_predictions[sample_cols].head(3).to_string(index=False))
 
     return df_predictions
 
@@ -451,7 +587,8 @@ if __name__ == "__main__":
         print(df_predictions[sample_cols].head())
 
         print(f"\n📊 PREDICTION STATISTICS:")
-        print(df_predictions[['predicted_income', 'income_lower_90', 'income_upper_90', 'ci_width']].describe())
+        print(df_predictions[['predicted_income', 'income_lower_90', 'income_upper_90']]
+              .assign(ci_width=ci_width(df_predictions)).describe())
 
         print(f"\n🆔 CUSTOMER IDENTIFICATION:")
         print(f"   ID columns included: {id_cols}")
@@ -490,7 +627,7 @@ if __name__ == "__main__":
 4. PREDICTION PROCESS:
    • Load trained XGBoost model
    • Validate feature matrix
-   • Generate point predictions
+   • Generate point predictions in chunks (float32 blocks, set XGBoost threads)
    • Add confidence intervals
    • Create business-ready output format
 
@@ -507,7 +644,9 @@ if __name__ == "__main__":
 Columns in predictions dataframe:
 - Customer identification: cliente, identificador_unico (or row_id)
 - Core predictions: predicted_income, income_lower_90, income_upper_90
-- Metadata: confidence_level, prediction_date, model_version, ci_width
+- Metadata: confidence_level, prediction_date, model_version (constant
+  categorical columns, also in df.attrs['batch']); ci_width is derived from
+  the bounds and added by the exports (production_output.export_frame)
 
 📊 EXPECTED PERFORMANCE:
 
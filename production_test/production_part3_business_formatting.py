@@ -19,6 +19,11 @@
 # - income_predictions_YYYYMMDD_HHMMSS.csv
 # - income_predictions_YYYYMMDD_HHMMSS.json
 # - prediction_summary_YYYYMMDD_HHMMSS.json
+#
+# Classifications are categorical columns (fixed label lists below); they
+# are expanded to text only when the files are written (production_output.py)
+# The classification thresholds and tables are declared in
+# production_business_rules.py and applied to whole columns at once
 # =============================================================================
 
 import pandas as pd
@@ -27,11 +32,27 @@ import json
 import os
 from datetime import datetime
 import warnings
+from production_business_rules import BusinessRules, DEFAULT_BUSINESS_RULES
+from production_checkpoints import read_checkpoint
+from production_events import message_logger
+from production_export import export_files, export_path, write_csv_file, write_parquet_file
+from production_json_export import JSON_EXTENSIONS, customer_records, prediction_summary, write_predictions_json
+from production_output import ci_width, export_frame, label_counts
+from production_summary import summarize
 warnings.filterwarnings('ignore')
 
 # Set display options
 pd.set_option('display.max_columns', None)
 
+# Business rules (thresholds and label tables: production_business_rules.py)
+BUSINESS_RULES = BusinessRules(DEFAULT_BUSINESS_RULES)
+
+# Labels of the business classifications (categories of the label columns)
+INCOME_SEGMENTS = BUSINESS_RULES.segments
+CONFIDENCE_CATEGORIES = BUSINESS_RULES.confidence_categories
+BUSINESS_PRIORITIES = BUSINESS_RULES.priorities
+RECOMMENDATIONS = BUSINESS_RULES.recommendations
+
 def create_prediction_folder():
     """
     Create model_pred_files folder if it doesn't exist
@@ -58,140 +79,98 @@ def create_prediction_folder():
         print(f"❌ Error creating folder: {e}")
         return None
 
-def classify_income_risk_segments(df):
+def classify_income_risk_segments(df, events=None, rules=None):
     """
     Classify customers into business risk segments based on predicted income
+    The four label columns are categoricals over the label lists above
+    rules: production_business_rules.BusinessRules (default: BUSINESS_RULES)
     """
-    print("\n🎯 CLASSIFYING INCOME RISK SEGMENTS")
-    print("="*50)
+    log = message_logger(events)
+    log("\n🎯 CLASSIFYING INCOME RISK SEGMENTS")
+    log("="*50)
     
     df = df.copy()
+    rules = rules or BUSINESS_RULES
     
-    # Income-based risk segmentation
-    def get_income_segment(income):
-        if income < 500:
-            return "LOW_INCOME_HIGH_RISK"
-        elif income < 1000:
-            return "LOW_INCOME_STABLE"
-        elif income < 1500:
-            return "MIDDLE_INCOME_STABLE"
-        elif income < 2000:
-            return "MIDDLE_INCOME_GROWTH"
-        elif income < 3000:
-            return "HIGH_INCOME_STABLE"
-        else:
-            return "HIGH_INCOME_PREMIUM"
-    
-    # Apply income segmentation
-    df['income_segment'] = df['predicted_income'].apply(get_income_segment)
-    
-    # Confidence classification based on prediction range
-    def get_confidence_category(predicted_income, ci_width):
-        if predicted_income < 1500 and ci_width < 1200:
-            return "HIGH_CONFIDENCE"
-        elif predicted_income < 2000 and ci_width < 1400:
-            return "MEDIUM_CONFIDENCE"
-        else:
-            return "LOWER_CONFIDENCE"
-    
-    df['confidence_category'] = df.apply(
-        lambda row: get_confidence_category(row['predicted_income'], row['ci_width']), 
-        axis=1
-    )
-    
-    # Business priority classification
-    def get_business_priority(income_segment, confidence_category):
-        if confidence_category == "HIGH_CONFIDENCE":
-            if income_segment in ["MIDDLE_INCOME_STABLE", "MIDDLE_INCOME_GROWTH"]:
-                return "HIGH_PRIORITY"
-            elif income_segment in ["HIGH_INCOME_STABLE", "HIGH_INCOME_PREMIUM"]:
-                return "PREMIUM_PRIORITY"
-            else:
-                return "STANDARD_PRIORITY"
-        else:
-            return "REVIEW_REQUIRED"
-    
-    df['business_priority'] = df.apply(
-        lambda row: get_business_priority(row['income_segment'], row['confidence_category']),
-        axis=1
-    )
-    
-    # Business recommendations
-    def get_recommendation(income_segment, confidence_category, business_priority):
-        if business_priority == "PREMIUM_PRIORITY":
-            return "Offer premium products and personalized services"
-        elif business_priority == "HIGH_PRIORITY":
-            return "Target for standard loan products and credit increases"
-        elif business_priority == "STANDARD_PRIORITY":
-            return "Monitor and offer basic financial products"
-        else:
-            return "Requires manual review before product offers"
-    
-    df['recommendation'] = df.apply(
-        lambda row: get_recommendation(row['income_segment'], row['confidence_category'], row['business_priority']),
-        axis=1
-    )
+    # Segment, confidence, priority and recommendation for all rows at once
+    for column, labels in rules.classify(df['predicted_income'], ci_width(df)).items():
+        df[column] = labels
     
     # Summary statistics
-    segment_counts = df['income_segment'].value_counts()
-    confidence_counts = df['confidence_category'].value_counts()
-    priority_counts = df['business_priority'].value_counts()
+    segment_counts = label_counts(df['income_segment'])
+    confidence_counts = label_counts(df['confidence_category'])
+    priority_counts = label_counts(df['business_priority'])
     
-    print(f"📊 Income segments:")
+    log(f"📊 Income segments:")
     for segment, count in segment_counts.items():
         pct = (count / len(df)) * 100
-        print(f"   {segment}: {count:,} ({pct:.1f}%)")
+        log(f"   {segment}: {count:,} ({pct:.1f}%)")
     
-    print(f"\n🔒 Confidence levels:")
+    log(f"\n🔒 Confidence levels:")
     for conf, count in confidence_counts.items():
         pct = (count / len(df)) * 100
-        print(f"   {conf}: {count:,} ({pct:.1f}%)")
+        log(f"   {conf}: {count:,} ({pct:.1f}%)")
     
-    print(f"\n🎯 Business priorities:")
+    log(f"\n🎯 Business priorities:")
     for priority, count in priority_counts.items():
         pct = (count / len(df)) * 100
-        print(f"   {priority}: {count:,} ({pct:.1f}%)")
+        log(f"   {priority}: {count:,} ({pct:.1f}%)")
     
-    print("✅ Business classifications completed")
+    log("✅ Business classifications completed")
     return df
 
-def create_business_summary(df):
+def format(df_predictions, events=None):
+    """
+    Part 3 as a DataFrame-in/DataFrame-out step: predictions from Part 2 ->
+    predictions with business classifications (segment, confidence,
+    priority, recommendation)
+
+    No file is written; production_part3_main() adds the export files.
+    events: production_events.PipelineEvents for the progress lines
+    (default: printed, production_events.SILENT runs quietly)
+    """
+    return classify_income_risk_segments(df_predictions, events)
+
+def create_business_summary(df, statistics=None):
     """
     Create comprehensive business summary for management reporting
+    All statistics come from one pass over df (production_summary.py);
+    medians are sketched (within 0.1%)
+    statistics: SummaryAccumulator already built for df (or merged from its
+    chunks / batches) to skip that pass
     """
     print("\n📊 CREATING BUSINESS SUMMARY")
     print("="*50)
     
+    if statistics is None:
+        statistics = summarize(df)
+    income = statistics.numeric['predicted_income']
+    width = statistics.numeric['ci_width']
+    
     summary = {
         "prediction_metadata": {
             "generation_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             "model_version": "XGBoost_v1.0_Final",
-            "total_customers": len(df),
+            "total_customers": statistics.rows,
             "model_rmse": 527.24,
             "confidence_level": "90%"
         },
         "income_statistics": {
-            "mean_predicted_income": safe_round_float(df['predicted_income'].mean()),
-            "median_predicted_income": safe_round_float(df['predicted_income'].median()),
-            "min_predicted_income": safe_round_float(df['predicted_income'].min()),
-            "max_predicted_income": safe_round_float(df['predicted_income'].max()),
-            "std_predicted_income": safe_round_float(df['predicted_income'].std())
+            "mean_predicted_income": safe_round_float(income.mean),
+            "median_predicted_income": safe_round_float(income.quantile(0.5)),
+            "min_predicted_income": safe_round_float(income.min),
+            "max_predicted_income": safe_round_float(income.max),
+            "std_predicted_income": safe_round_float(income.std())
         },
         "confidence_analysis": {
-            "average_ci_width": safe_round_float(df['ci_width'].mean()),
-            "median_ci_width": safe_round_float(df['ci_width'].median()),
-            "high_confidence_customers": int(df[df['confidence_category'] == 'HIGH_CONFIDENCE'].shape[0]),
-            "review_required_customers": int(df[df['business_priority'] == 'REVIEW_REQUIRED'].shape[0])
-        },
-        "business_segments": {
-            segment: int(count) for segment, count in df['income_segment'].value_counts().items()
+            "average_ci_width": safe_round_float(width.mean),
+            "median_ci_width": safe_round_float(width.quantile(0.5)),
+            "high_confidence_customers": statistics.labels['confidence_category'].get('HIGH_CONFIDENCE', 0),
+            "review_required_customers": statistics.labels['business_priority'].get('REVIEW_REQUIRED', 0)
         },
-        "business_priorities": {
-            priority: int(count) for priority, count in df['business_priority'].value_counts().items()
-        },
-        "confidence_distribution": {
-            conf: int(count) for conf, count in df['confidence_category'].value_counts().items()
-        }
+        "business_segments": statistics.label_counts('income_segment'),
+        "business_priorities": statistics.label_counts('business_priority'),
+        "confidence_distribution": statistics.label_counts('confidence_category')
     }
     
     print("✅ Business summary created")
@@ -260,86 +239,62 @@ def safe_string(value):
 def format_for_json_export(df):
     """
     Format dataframe for structured JSON export
+    (the whole document in memory; save_prediction_files() streams it)
     """
     print("\n📋 FORMATTING FOR JSON EXPORT")
     print("="*50)
 
-    # Convert dataframe to list of dictionaries
-    records = []
-
-    for _, row in df.iterrows():
-        try:
-            record = {
-                "customer_identification": {
-                    "identificador_unico": safe_string(row.get('identificador_unico', '')),
-                    "cliente": safe_string(row.get('cliente', ''))
-                },
-                "income_prediction": {
-                    "predicted_income": safe_round_float(row['predicted_income']),
-                    "confidence_interval": {
-                        "lower_bound": safe_round_float(row['income_lower_90']),
-                        "upper_bound": safe_round_float(row['income_upper_90']),
-                        "confidence_level": safe_round_float(row['confidence_level'], 2),
-                        "interval_width": safe_round_float(row['ci_width'])
-                    }
-                },
-                "business_classification": {
-                    "income_segment": safe_string(row['income_segment']),
-                    "confidence_category": safe_string(row['confidence_category']),
-                    "business_priority": safe_string(row['business_priority']),
-                    "recommendation": safe_string(row['recommendation'])
-                },
-                "metadata": {
-                    "prediction_date": safe_string(row['prediction_date']),
-                    "model_version": safe_string(row['model_version'])
-                }
-            }
-            records.append(record)
-        except Exception as e:
-            print(f"⚠️ Warning: Error processing row {len(records)}: {e}")
-            continue
+    records = customer_records(df)
 
     json_data = {
-        "prediction_summary": {
-            "total_customers": len(records),
-            "generation_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            "model_version": "XGBoost_v1.0_Final"
-        },
+        "prediction_summary": prediction_summary(len(records)),
         "customer_predictions": records
     }
 
     print(f"✅ JSON format ready with {len(records)} customer records")
     return json_data
 
-def save_prediction_files(df_predictions, folder_path):
+def save_prediction_files(df_predictions, folder_path, json_format='pretty', compression=None, parquet=False):
     """
     Save predictions in both CSV and JSON formats with timestamp
+    json_format: 'pretty' (default), 'compact' or 'ndjson' (.ndjson file),
+    see production_json_export.py
+    compression: None (plain files), 'gzip' (.gz) or 'zstd' (.zst)
+    parquet: also save the CSV columns as a Parquet file
+
+    The CSV, JSON (and Parquet) files are written at the same time, in
+    chunks (production_export.py); the bytes and throughput of each are
+    printed.
     """
     print("\n💾 SAVING PREDICTION FILES")
     print("="*50)
 
+    # Final export: ci_width added, labels and metadata expanded to values
+    df_predictions = export_frame(df_predictions)
+
     # Generate timestamp for unique filenames
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
     try:
-        # 1. Save CSV file
-        csv_filename = f"income_predictions_{timestamp}.csv"
-        csv_path = os.path.join(folder_path, csv_filename)
-
+        # 1. CSV, detailed JSON (and Parquet) files, written concurrently
+        base_path = os.path.join(folder_path, f"income_predictions_{timestamp}")
         df_csv = format_for_csv_export(df_predictions)
-        df_csv.to_csv(csv_path, index=False, encoding='utf-8')
-        print(f"✅ CSV file saved: {csv_filename}")
-
-        # 2. Save detailed JSON file
-        json_filename = f"income_predictions_{timestamp}.json"
-        json_path = os.path.join(folder_path, json_filename)
-
-        json_data = format_for_json_export(df_predictions)
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
-        print(f"✅ JSON file saved: {json_filename}")
-
-        # 3. Save business summary
+        exports = {
+            'csv_file': (export_path(base_path + '.csv', compression),
+                         lambda path: write_csv_file(df_csv, path, compression)),
+            'json_file': (export_path(base_path + JSON_EXTENSIONS[json_format], compression),
+                          lambda path: write_predictions_json(df_predictions, path, json_format,
+                                                              compression=compression)['records'])
+        }
+        if parquet:
+            exports['parquet_file'] = (base_path + '.parquet',
+                                       lambda path: write_parquet_file(df_csv, path, compression))
+        export_report = export_files(exports)
+        for report in export_report.values():
+            print(f"✅ File saved: {os.path.basename(report['path'])} ({report['bytes'] / 1e6:.1f} MB, "
+                  f"{report['seconds']:.2f}s, {report['mb_per_s'] or 0:,} MB/s, {report['rows_per_s'] or 0:,} rows/s)")
+
+        # 2. Save business summary
         summary_filename = f"prediction_summary_{timestamp}.json"
         summary_path = os.path.join(folder_path, summary_filename)
 
@@ -349,11 +304,8 @@ def save_prediction_files(df_predictions, folder_path):
         print(f"✅ Summary file saved: {summary_filename}")
 
         # Return file paths for reference
-        saved_files = {
-            'csv_file': csv_path,
-            'json_file': json_path,
-            'summary_file': summary_path
-        }
+        saved_files = {name: report['path'] for name, report in export_report.items()}
+        saved_files['summary_file'] = summary_path
 
         print(f"\n📂 All files saved in: {os.path.abspath(folder_path)}")
         return saved_files
@@ -362,12 +314,15 @@ def save_prediction_files(df_predictions, folder_path):
         print(f"❌ Error saving files: {e}")
         return None
 
-def production_part3_main(predictions_input_path, create_folder=True):
+def production_part3_main(predictions_input_path, create_folder=True, json_format='pretty', compression=None,
+                          parquet=False):
     """
     Main function for Production Part 3: Business Formatting & Output Generation
 
     Input: Predictions CSV from Part 2 or predictions dataframe
     Output: Business-ready CSV and JSON files in model_pred_files folder
+    json_format: 'pretty', 'compact' or 'ndjson' customer predictions file
+    compression, parquet: export options of save_prediction_files()
     """
     print("🚀 PRODUCTION PART 3 - BUSINESS FORMATTING & OUTPUT GENERATION")
     print("="*80)
@@ -380,7 +335,7 @@ def production_part3_main(predictions_input_path, create_folder=True):
     if isinstance(predictions_input_path, str):
         print("📂 Loading predictions from file...")
         try:
-            df_predictions = pd.read_csv(predictions_input_path, encoding='utf-8')
+            df_predictions = read_checkpoint(predictions_input_path)
             print(f"✅ Predictions loaded: {df_predictions.shape}")
         except Exception as e:
             print(f"❌ Error loading predictions: {e}")
@@ -403,10 +358,10 @@ def production_part3_main(predictions_input_path, create_folder=True):
         folder_path = "."  # Current directory
 
     # Step 3: Add business classifications
-    df_business = classify_income_risk_segments(df_predictions)
+    df_business = format(df_predictions)
 
     # Step 4: Save all prediction files
-    saved_files = save_prediction_files(df_business, folder_path)
+    saved_files = save_prediction_files(df_business, folder_path, json_format, compression, parquet)
 
     if saved_files is None:
         print("❌ Failed to save prediction files")
@@ -465,9 +420,9 @@ if __name__ == "__main__":
 
         print(f"\n📊 BUSINESS CLASSIFICATION SUMMARY:")
         print(f"Income Segments:")
-        print(df_business['income_segment'].value_counts())
+        print(pd.Series(label_counts(df_business['income_segment'])))
         print(f"\nBusiness Priorities:")
-        print(df_business['business_priority'].value_counts())
+        print(pd.Series(label_counts(df_business['business_priority'])))
 
         print(f"\n🎯 SUCCESS! Business files ready for management review")
         print(f"📂 Check model_pred_files/ folder for all output files")
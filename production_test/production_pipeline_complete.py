@@ -16,19 +16,29 @@
 # - Production-ready with comprehensive documentation
 #
 # USAGE:
-# python production_pipeline_complete.py
+# python production_pipeline_complete.py [--checkpoint]
 # 
 # OR programmatically:
 # from production_pipeline_complete import run_complete_pipeline
 # results = run_complete_pipeline()
+#
+# OR in memory, DataFrame in / DataFrame out (no files written):
+# from production_pipeline_complete import run
+# df_business = run(df_raw)
+#
+# Stages hand DataFrames to each other; intermediate files are only written
+# with checkpointing (--checkpoint / checkpoint=True / checkpoint_dir=...).
 # =============================================================================
 
 import pandas as pd
 import numpy as np
 import os
 import sys
+import uuid
 from datetime import datetime
 import warnings
+from production_checkpoints import checkpoint_path, write_checkpoint
+from production_events import message_logger
 warnings.filterwarnings('ignore')
 
 # =============================================================================
@@ -120,9 +130,10 @@ def setup_logging():
 # 🔧 UTILITY FUNCTIONS
 # =============================================================================
 
-def validate_file_paths():
+def validate_file_paths(check_inputs=True):
     """
     Validate that all required files and folders exist
+    check_inputs=False skips the input files (data passed as a DataFrame)
     """
     log = setup_logging()
     log("🔍 VALIDATING FILE PATHS AND DEPENDENCIES")
@@ -130,7 +141,7 @@ def validate_file_paths():
     
     # Check input files
     missing_files = []
-    for file_type, file_path in ProductionConfig.INPUT_FILES.items():
+    for file_type, file_path in (ProductionConfig.INPUT_FILES.items() if check_inputs else []):
         if os.path.exists(file_path):
             log(f"✅ {file_type}: {file_path}")
         else:
@@ -166,23 +177,34 @@ def validate_file_paths():
     log("✅ All file paths validated successfully")
     return True
 
-def create_temp_files():
-    """Create temporary file paths for pipeline stages"""
-    temp_folder = ProductionConfig.OUTPUT_FOLDERS["temp_data"]
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+def create_temp_files(temp_folder=None):
+    """
+    Checkpoint file paths for pipeline stages (Arrow checkpoints when pyarrow is installed)
+    Names are unique per run, so concurrent runs never overwrite each other
+    """
+    temp_folder = temp_folder or ProductionConfig.OUTPUT_FOLDERS["temp_data"]
+    run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
     
     return {
-        "clean_data": os.path.join(temp_folder, f"clean_data_{timestamp}.csv"),
-        "predictions": os.path.join(temp_folder, f"predictions_{timestamp}.csv")
+        "clean_data": checkpoint_path(os.path.join(temp_folder, f"clean_data_{run_id}")),
+        "predictions": checkpoint_path(os.path.join(temp_folder, f"predictions_{run_id}"))
     }
 
+def save_checkpoint(df, checkpoint_file, log):
+    """Write a stage output when checkpointing was requested (checkpoint_file not None)"""
+    if checkpoint_file:
+        os.makedirs(os.path.dirname(checkpoint_file) or '.', exist_ok=True)
+        write_checkpoint(df, checkpoint_file)
+        log(f"💾 Checkpoint saved: {checkpoint_file}")
+
 # =============================================================================
 # 🚀 MAIN PIPELINE FUNCTIONS
 # =============================================================================
 
-def run_part1_data_cleaning(input_file, output_file):
+def run_part1_data_cleaning(df_raw, checkpoint_file=None):
     """
     Part 1: Data Cleaning & Feature Engineering
+    Raw DataFrame in, clean DataFrame out; checkpoint_file also saves it
     """
     log = setup_logging()
     log("\n🚀 PART 1: DATA CLEANING & FEATURE ENGINEERING")
@@ -190,12 +212,13 @@ def run_part1_data_cleaning(input_file, output_file):
     
     try:
         # Import Part 1 functions
-        from production_part1_data_cleaning import production_part1_main
+        from production_part1_data_cleaning import clean
         
         # Run data cleaning
-        df_clean = production_part1_main(input_file, output_file)
+        df_clean = clean(df_raw)
         
         if df_clean is not None:
+            save_checkpoint(df_clean, checkpoint_file, log)
             log(f"✅ Part 1 completed: {df_clean.shape}")
             return df_clean, True
         else:
@@ -211,9 +234,10 @@ def run_part1_data_cleaning(input_file, output_file):
         log(f"❌ Part 1 failed: {e}")
         return None, False
 
-def run_part2_model_inference(clean_data_file, output_file):
+def run_part2_model_inference(df_clean, checkpoint_file=None):
     """
     Part 2: Model Inference & Predictions
+    Clean DataFrame in, predictions out; checkpoint_file also saves them
     """
     log = setup_logging()
     log("\n🚀 PART 2: MODEL INFERENCE & PREDICTIONS")
@@ -221,12 +245,13 @@ def run_part2_model_inference(clean_data_file, output_file):
     
     try:
         # Import Part 2 functions
-        from production_part2_model_inference import production_part2_main
+        from production_part2_model_inference import score
         
         # Run model inference
-        df_predictions = production_part2_main(clean_data_file, output_file)
+        df_predictions = score(df_clean)
         
         if df_predictions is not None:
+            save_checkpoint(df_predictions, checkpoint_file, log)
             log(f"✅ Part 2 completed: {df_predictions.shape}")
             return df_predictions, True
         else:
@@ -252,11 +277,11 @@ def run_part3_incremental_storage(df_predictions):
     
     try:
         # Import Part 3 functions
-        from production_part3_business_formatting import classify_income_risk_segments
+        from production_part3_business_formatting import format as format_predictions
         from production_incremental_predictions import process_new_predictions_incremental
         
         # Add business classifications
-        df_business = classify_income_risk_segments(df_predictions)
+        df_business = format_predictions(df_predictions)
         
         # Process incrementally
         results = process_new_predictions_incremental(
@@ -280,7 +305,40 @@ def run_part3_incremental_storage(df_predictions):
         log(f"❌ Part 3 failed: {e}")
         return None, False
 
-def run_complete_pipeline():
+def run(df, checkpoint_dir=None, events=None):
+    """
+    In-memory pipeline: raw customer DataFrame → business-formatted predictions
+
+    clean (Part 1) → score (Part 2) → format (Part 3), each DataFrame in /
+    DataFrame out. Nothing is written unless checkpoint_dir is given: then
+    the clean data and predictions are also saved there, under names unique
+    to this run. No incremental storage (see run_complete_pipeline).
+
+    events: production_events.PipelineEvents for all stages (default:
+    console, production_events.SILENT runs quietly)
+
+    Returns the formatted predictions, or None when a stage fails.
+    """
+    from production_part1_data_cleaning import clean
+    from production_part2_model_inference import score
+    from production_part3_business_formatting import format as format_predictions
+
+    log = message_logger(events)
+    checkpoints = create_temp_files(checkpoint_dir) if checkpoint_dir else {}
+
+    df_clean = clean(df, events)
+    if df_clean is None:
+        return None
+    save_checkpoint(df_clean, checkpoints.get("clean_data"), log)
+
+    df_predictions = score(df_clean, events)
+    if df_predictions is None:
+        return None
+    save_checkpoint(df_predictions, checkpoints.get("predictions"), log)
+
+    return format_predictions(df_predictions, events)
+
+def run_complete_pipeline(df_raw=None, checkpoint=False):
     """
     🚀 MAIN FUNCTION: Complete End-to-End Production Pipeline
 
@@ -289,6 +347,13 @@ def run_complete_pipeline():
     2. Model Inference & Predictions
     3. Business Formatting & Incremental Storage
 
+    Stages hand DataFrames to each other in memory.
+
+    Args:
+        df_raw: raw customer DataFrame (default: read INPUT_FILES["raw_customer_data"])
+        checkpoint: also save the clean data and predictions in the temp
+            folder (kept after the run, one set of files per run)
+
     Returns:
         dict: Complete pipeline results and statistics
     """
@@ -303,20 +368,26 @@ def run_complete_pipeline():
 
     # Step 0: Validate environment
     log("\n📋 STEP 0: ENVIRONMENT VALIDATION")
-    if not validate_file_paths():
+    if not validate_file_paths(check_inputs=df_raw is None):
         log("❌ Pipeline aborted: Environment validation failed")
         return None
 
-    # Create temporary files
-    temp_files = create_temp_files()
+    # Checkpoint files only when requested
+    temp_files = create_temp_files() if checkpoint else {}
 
     try:
+        # Load raw data (read once, then passed between stages in memory)
+        input_file = ProductionConfig.INPUT_FILES["raw_customer_data"] if df_raw is None else "<DataFrame>"
+        if df_raw is None:
+            from production_part1_data_cleaning import load_production_data
+            df_raw = load_production_data(input_file)
+            if df_raw is None:
+                log("❌ Pipeline aborted: Raw data could not be loaded")
+                return None
+
         # Step 1: Data Cleaning & Feature Engineering
         log("\n📋 STEP 1: DATA CLEANING & FEATURE ENGINEERING")
-        df_clean, part1_success = run_part1_data_cleaning(
-            ProductionConfig.INPUT_FILES["raw_customer_data"],
-            temp_files["clean_data"]
-        )
+        df_clean, part1_success = run_part1_data_cleaning(df_raw, temp_files.get("clean_data"))
 
         if not part1_success:
             log("❌ Pipeline aborted: Part 1 failed")
@@ -324,10 +395,7 @@ def run_complete_pipeline():
 
         # Step 2: Model Inference & Predictions
         log("\n📋 STEP 2: MODEL INFERENCE & PREDICTIONS")
-        df_predictions, part2_success = run_part2_model_inference(
-            temp_files["clean_data"],
-            temp_files["predictions"]
-        )
+        df_predictions, part2_success = run_part2_model_inference(df_clean, temp_files.get("predictions"))
 
         if not part2_success:
             log("❌ Pipeline aborted: Part 2 failed")
@@ -356,7 +424,7 @@ def run_complete_pipeline():
                 "pipeline_version": "v1.0_Complete"
             },
             "data_flow": {
-                "input_file": ProductionConfig.INPUT_FILES["raw_customer_data"],
+                "input_file": input_file,
                 "clean_data_shape": df_clean.shape,
                 "predictions_generated": len(df_predictions),
                 "master_dataset_location": os.path.join(ProductionConfig.OUTPUT_FOLDERS["predictions"], "master_predictions.csv")
@@ -366,7 +434,8 @@ def run_complete_pipeline():
                 "master_csv": os.path.join(ProductionConfig.OUTPUT_FOLDERS["predictions"], "master_predictions.csv"),
                 "master_json": os.path.join(ProductionConfig.OUTPUT_FOLDERS["predictions"], "master_predictions.json"),
                 "archive_folder": os.path.join(ProductionConfig.OUTPUT_FOLDERS["predictions"], "archive"),
-                "log_file": os.path.join(ProductionConfig.OUTPUT_FOLDERS["predictions"], f"pipeline_log_{datetime.now().strftime('%Y%m%d')}.txt")
+                "log_file": os.path.join(ProductionConfig.OUTPUT_FOLDERS["predictions"], f"pipeline_log_{datetime.now().strftime('%Y%m%d')}.txt"),
+                "checkpoints": temp_files
             }
         }
 
@@ -384,6 +453,8 @@ def run_complete_pipeline():
         log(f"   📄 master_predictions.json")
         log(f"   📁 archive/ (for old predictions)")
         log(f"   📝 pipeline_log_{datetime.now().strftime('%Y%m%d')}.txt")
+        for temp_file in temp_files.values():
+            log(f"   💾 {temp_file} (checkpoint)")
 
         log("\n🎯 PIPELINE COMPLETED SUCCESSFULLY!")
         log("   Ready for business use and system integration")
@@ -396,17 +467,6 @@ def run_complete_pipeline():
         log("🔧 TEAM ACTION: Check error details and configuration")
         return None
 
-    finally:
-        # Cleanup temporary files
-        log("\n🧹 CLEANING UP TEMPORARY FILES")
-        for temp_file in temp_files.values():
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-                    log(f"🗑️  Removed: {os.path.basename(temp_file)}")
-            except:
-                pass  # Continue if cleanup fails
-
 # =============================================================================
 # 📋 USAGE EXAMPLES AND DOCUMENTATION
 # =============================================================================
@@ -428,50 +488,26 @@ def run_single_customer_test():
     log("📋 CUSTOMER: 3642 - JARDINERO - Age 47")
     log("="*80)
 
-    # Create single customer test file
-    single_customer_file = os.path.join(ProductionConfig.BASE_PATH, "data", "production", "single_customer_test.csv")
-
-    # Create single customer test data (first customer from main dataset)
-    import pandas as pd
-    df_full = pd.read_csv(ProductionConfig.INPUT_FILES["raw_customer_data"], encoding='utf-8')
-    df_single = df_full.head(1)  # Take first customer
-    df_single.to_csv(single_customer_file, index=False, encoding='utf-8')
-    log(f"📝 Created single customer test file: {single_customer_file}")
+    # Single customer test data (first customer from main dataset), passed in memory
+    df_single = pd.read_csv(ProductionConfig.INPUT_FILES["raw_customer_data"], encoding='utf-8', nrows=1)
+    log(f"📝 Single customer test data: {df_single.shape}")
 
-    # Temporarily change input file to single customer
-    original_input = ProductionConfig.INPUT_FILES["raw_customer_data"]
-    ProductionConfig.INPUT_FILES["raw_customer_data"] = single_customer_file
+    # Run complete pipeline with single customer
+    results = run_complete_pipeline(df_single)
 
-    try:
-        # Run complete pipeline with single customer
-        results = run_complete_pipeline()
-
-        if results:
-            log("\n🎉 SINGLE CUSTOMER TEST RESULTS:")
-            log(f"   ✅ Status: {results['pipeline_status']}")
-            log(f"   ✅ Processing time: {results['execution_summary']['processing_time_seconds']} seconds")
-            log(f"   ✅ Customers processed: {results['execution_summary']['customers_processed']}")
-            log(f"   ✅ Expected: 1 customer")
+    if results:
+        log("\n🎉 SINGLE CUSTOMER TEST RESULTS:")
+        log(f"   ✅ Status: {results['pipeline_status']}")
+        log(f"   ✅ Processing time: {results['execution_summary']['processing_time_seconds']} seconds")
+        log(f"   ✅ Customers processed: {results['execution_summary']['customers_processed']}")
+        log(f"   ✅ Expected: 1 customer")
 
-            if results['execution_summary']['customers_processed'] == 1:
-                log("   🎯 SINGLE CUSTOMER TEST: PASSED")
-            else:
-                log("   ⚠️ SINGLE CUSTOMER TEST: UNEXPECTED COUNT")
-
-        return results
-
-    finally:
-        # Restore original input file
-        ProductionConfig.INPUT_FILES["raw_customer_data"] = original_input
-        log(f"\n🔄 Restored original input file: {original_input}")
+        if results['execution_summary']['customers_processed'] == 1:
+            log("   🎯 SINGLE CUSTOMER TEST: PASSED")
+        else:
+            log("   ⚠️ SINGLE CUSTOMER TEST: UNEXPECTED COUNT")
 
-        # Clean up single customer test file
-        try:
-            if os.path.exists(single_customer_file):
-                os.remove(single_customer_file)
-                log(f"🗑️ Cleaned up test file: {single_customer_file}")
-        except:
-            pass
+    return results
 
 def run_pipeline_with_custom_config(custom_config=None):
     """
@@ -549,24 +585,27 @@ if __name__ == "__main__":
     print("📋 Pipeline: Raw Data → Features → Predictions → Master Dataset")
     print("="*80)
 
-    # Check command line arguments
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "status":
+    # Check command line arguments (--checkpoint keeps the stage outputs on disk)
+    checkpoint = '--checkpoint' in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != '--checkpoint']
+    if args:
+        if args[0] == "status":
             get_pipeline_status()
-        elif sys.argv[1] == "test-single":
+        elif args[0] == "test-single":
             # Run single customer test
             print("🧪 RUNNING SINGLE CUSTOMER TEST")
             print("="*50)
             results = run_single_customer_test()
         else:
-            print(f"❌ Unknown command: {sys.argv[1]}")
+            print(f"❌ Unknown command: {args[0]}")
             print("📋 Available commands:")
             print("   python production_pipeline_complete.py          # Run full pipeline")
             print("   python production_pipeline_complete.py status   # Check status")
             print("   python production_pipeline_complete.py test-single # Test with one customer")
+            print("   python production_pipeline_complete.py --checkpoint # Keep stage outputs in temp/")
     else:
         # Run complete pipeline
-        results = run_complete_pipeline()
+        results = run_complete_pipeline(checkpoint=checkpoint)
 
         if results:
             print(f"\n✅ PIPELINE EXECUTION SUMMARY:")
@@ -31,6 +31,7 @@ import glob
 from datetime import datetime
 import warnings
 import traceback
+from production_checkpoints import checkpoint_path
 warnings.filterwarnings('ignore')
 
 # =============================================================================
@@ -439,28 +440,10 @@ def run_real_feature_engineering_and_prediction(df, dataset_name, log):
         # Import the actual production pipeline (now in same directory)
         from production_pipeline_complete import run_complete_pipeline, ProductionConfig as ProdConfig
 
-        # Create temporary input file for this test
-        temp_input_file = f"production_test/temp_{dataset_name}"
-        df.to_csv(temp_input_file, index=False)
-
-        log(f"📁 Created temporary input file: {temp_input_file}")
-
-        # Temporarily update the production config to use our test file
-        original_input = ProdConfig.INPUT_FILES["raw_customer_data"]
-        ProdConfig.INPUT_FILES["raw_customer_data"] = temp_input_file
-
         log("🚀 Running complete production pipeline...")
 
-        # Run the actual production pipeline
-        results = run_complete_pipeline()
-
-        # Restore original config
-        ProdConfig.INPUT_FILES["raw_customer_data"] = original_input
-
-        # Clean up temp file
-        if os.path.exists(temp_input_file):
-            os.remove(temp_input_file)
-            log(f"🗑️ Cleaned up temporary file")
+        # Run the actual production pipeline on the test data, in memory
+        results = run_complete_pipeline(df)
 
         if results and results.get('pipeline_status') == 'SUCCESS':
             log("✅ Production pipeline completed successfully!")
@@ -670,13 +653,13 @@ def validate_file_paths():
     return True
 
 def create_temp_files():
-    """Create temporary file paths for pipeline stages"""
+    """Create temporary file paths for pipeline stages (Arrow checkpoints when pyarrow is installed)"""
     temp_folder = ProductionConfig.OUTPUT_FOLDERS["temp_data"]
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
     return {
-        "clean_data": os.path.join(temp_folder, f"clean_data_{timestamp}.csv"),
-        "predictions": os.path.join(temp_folder, f"predictions_{timestamp}.csv")
+        "clean_data": checkpoint_path(os.path.join(temp_folder, f"clean_data_{timestamp}")),
+        "predictions": checkpoint_path(os.path.join(temp_folder, f"predictions_{timestamp}"))
     }
 
 # =============================================================================
@@ -0,0 +1,222 @@
+# =============================================================================
+# PRODUCTION SCORING - CHUNKED, THREAD-CONTROLLED MODEL PREDICTION
+# =============================================================================
+#
+# OBJECTIVE: Score multi-million-row inputs with bounded memory instead of
+# copying the whole feature frame and calling model.predict() once
+#
+# build_feature_matrix() turns the clean frame into the model input with a
+# single allocation: one C-contiguous float32 block (rows x features, model
+# column order) - the input XGBoost converts to anyway - filled straight
+# from the frame's column arrays, missing values imputed in place.
+#
+# Rows are scored in chunks: row slices of that matrix are views handed to
+# the model as they are, and predictions go into a preallocated output
+# array. A DataFrame can also be scored without building the matrix: each
+# chunk is then written into one reused block, so peak memory is one chunk
+# block plus the output, whatever the input size.
+#
+# Partner files repeat customers (one row per loan or product), so many
+# rows end up with the same feature vector. With deduplicate=True,
+# unique_rows() hashes every row of the matrix, each distinct vector is
+# scored once and its prediction is copied back to all of its rows; the
+# predictions are the same as scoring every row.
+#
+# nthread sets the XGBoost threads (default: XGBoost's own, all cores);
+# the report gives rows/s, unique rows and the dedup ratio so chunk size
+# and threads can be tuned per host.
+#
+# Used by Part 2 and the API (unique_rows). Shared by production_test/ and
+# partner_pipeline_2/.
+# =============================================================================
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from production_model_bundle import ModelBundle
+
+# Rows per scoring chunk (production_part2_model_inference.score(chunksize=...))
+DEFAULT_SCORING_CHUNKSIZE = 100000
+
+# Rows imputed at a time (bounds the temporary missing-value mask)
+FILL_ROWS = 65536
+
+# Rows compared at a time when checking row hashes for collisions
+COMPARE_ROWS = 65536
+
+# FNV-1a style multiplier combining the per-column hashes of a row
+HASH_PRIME = np.uint64(1099511628211)
+
+def _is_xgboost(model):
+    estimator = model.model if isinstance(model, ModelBundle) else model
+    return hasattr(estimator, 'get_booster')
+
+def set_model_threads(model, nthread):
+    """Threads used by an XGBoost model (estimator, booster or model bundle)"""
+    estimator = model.model if isinstance(model, ModelBundle) else model
+    if nthread and hasattr(estimator, 'get_booster'):
+        estimator.get_booster().set_param('nthread', int(nthread))
+
+def _column_values(column):
+    """Column as a NumPy array without copying when it is already numeric"""
+    if column.dtype == object:
+        # Text left in a feature column: non-numbers become NaN
+        column = pd.to_numeric(column, errors='coerce')
+    if isinstance(column.dtype, np.dtype):
+        return column.to_numpy()
+    return column.to_numpy(dtype=np.float64, na_value=np.nan)
+
+def _fill_missing(target, fill):
+    """Replace NaN in `target` by `fill`, in place"""
+    for start in range(0, len(target), FILL_ROWS):
+        part = target[start:start + FILL_ROWS]
+        missing = np.isnan(part)
+        if missing.any():
+            part[missing] = fill
+
+def _fill_positions(feature_columns, fill_values):
+    return {j: fill_values[feature] for j, feature in enumerate(feature_columns)
+            if fill_values and fill_values.get(feature) is not None}
+
+def fill_block(block, columns, start, fill_values=None):
+    """
+    Copy rows start:start+len(block) of `columns` into `block` (float32,
+    one column per feature) and fill its missing values in place
+    fill_values: {column position: value}
+    """
+    stop = start + len(block)
+    for j, values in enumerate(columns):
+        target = block[:, j]
+        np.copyto(target, values[start:stop], casting='unsafe')
+        fill = (fill_values or {}).get(j)
+        if fill is not None:
+            _fill_missing(target, fill)
+    return block
+
+def build_feature_matrix(df, feature_columns, fill_values=None):
+    """
+    Model input for `df`: C-contiguous float32 array (rows x features, in
+    feature_columns order)
+
+    The matrix is the only allocation: numeric columns are copied into it
+    straight from the frame's arrays (no column copies, no intermediate
+    frame) and missing values are replaced in place.
+
+    fill_values: {feature: value} for missing values (e.g. column medians)
+    """
+    columns = [_column_values(df[feature]) for feature in feature_columns]
+    matrix = np.empty((len(df), len(feature_columns)), dtype=np.float32)
+    return fill_block(matrix, columns, 0, _fill_positions(feature_columns, fill_values))
+
+def _row_words(matrix):
+    """`matrix` as unsigned integers of the same width (compares bit patterns, NaN included)"""
+    return np.ascontiguousarray(matrix).view(f'u{matrix.dtype.itemsize}')
+
+def _row_hashes(words):
+    """One 64-bit hash per row of `words`"""
+    hashes = np.zeros(len(words), dtype=np.uint64)
+    for j in range(words.shape[1]):
+        hashes ^= pd.util.hash_array(words[:, j], categorize=False)
+        hashes *= HASH_PRIME
+    return hashes
+
+def unique_rows(matrix):
+    """
+    Distinct rows of a 2-D array, found by hashing each row
+
+    Returns (unique, inverse): unique holds the distinct rows in order of
+    first appearance and unique[inverse] equals `matrix`; when every row is
+    distinct, `matrix` itself is returned with inverse None. Rows are equal
+    when their bit patterns are, and every hash match is checked, so a hash
+    collision never merges two different rows.
+    """
+    matrix = np.asarray(matrix)
+    words = _row_words(matrix)
+    inverse, hashes = pd.factorize(_row_hashes(words))
+    if len(hashes) == len(matrix):
+        return matrix, None
+    first = np.empty(len(hashes), dtype=np.intp)
+    first[inverse[::-1]] = np.arange(len(matrix) - 1, -1, -1)
+    unique_words = words[first]
+    for start in range(0, len(matrix), COMPARE_ROWS):
+        stop = start + COMPARE_ROWS
+        if not np.array_equal(words[start:stop], unique_words[inverse[start:stop]]):
+            # Hash collision: exact (sorting) comparison of the rows instead,
+            # distinct rows then come in sorted order
+            _, first, inverse = np.unique(words, axis=0, return_index=True, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            break
+    return matrix[first], inverse
+
+def predict_in_chunks(model, data, feature_columns, fill_values=None, chunksize=DEFAULT_SCORING_CHUNKSIZE,
+                      nthread=None, deduplicate=False):
+    """
+    Predictions for every row of `data`, scored chunk by chunk
+
+    data: feature matrix from build_feature_matrix (chunks are views of it),
+    or a DataFrame (chunks are copied into one reused block)
+    feature_columns: model column order
+    fill_values: {feature: value} for missing values of a DataFrame
+    chunksize: rows per chunk (None: all rows in one block)
+    nthread: XGBoost threads (None: XGBoost default)
+    deduplicate: score each distinct feature row once and copy its
+    prediction to the rows repeating it (a DataFrame is first built into a
+    matrix)
+
+    Returns (predictions, report) with report = rows, unique_rows,
+    dedup_ratio (rows per scored row), chunks, chunksize, nthread, seconds,
+    rows_per_s.
+    """
+    started = time.perf_counter()
+    set_model_threads(model, nthread)
+    n_rows = len(data)
+    inverse = None
+    if deduplicate and n_rows:
+        if not isinstance(data, np.ndarray):
+            data = build_feature_matrix(data, feature_columns, fill_values)
+        data, inverse = unique_rows(data)
+    n_scored = len(data)
+    chunksize = max(1, min(chunksize or n_scored, n_scored))
+    matrix = data if isinstance(data, np.ndarray) else None
+    if matrix is None:
+        columns = [_column_values(data[feature]) for feature in feature_columns]
+        fills = _fill_positions(feature_columns, fill_values)
+        buffer = np.empty((chunksize, len(feature_columns)), dtype=np.float32)
+
+    # XGBoost (and bundles) take the block itself; other estimators get a
+    # DataFrame view of it with the feature names
+    takes_array = isinstance(model, ModelBundle) or _is_xgboost(model)
+    predictions = None
+    chunks = 0
+    for start in range(0, n_scored, chunksize):
+        if matrix is not None:
+            # Row slices of a C-contiguous matrix are contiguous views
+            block = matrix[start:start + chunksize]
+        else:
+            block = fill_block(buffer[:min(chunksize, n_scored - start)], columns, start, fills)
+        model_input = block if takes_array else pd.DataFrame(block, columns=feature_columns, copy=False)
+        chunk_predictions = np.asarray(model.predict(model_input))
+        if predictions is None:
+            predictions = np.empty(n_scored, dtype=chunk_predictions.dtype)
+        predictions[start:start + len(block)] = chunk_predictions
+        chunks += 1
+    if predictions is None:
+        predictions = np.empty(0, dtype=np.float32)
+    if inverse is not None:
+        # Every row gets the prediction of its distinct feature vector
+        predictions = predictions[inverse]
+
+    seconds = time.perf_counter() - started
+    report = {
+        'rows': n_rows,
+        'unique_rows': n_scored,
+        'dedup_ratio': round(n_rows / n_scored, 2) if n_scored else None,
+        'chunks': chunks,
+        'chunksize': chunksize,
+        'nthread': nthread,
+        'seconds': round(seconds, 3),
+        'rows_per_s': round(n_rows / seconds) if seconds > 0 else None
+    }
+    return predictions, report
@@ -0,0 +1,364 @@
+# =============================================================================
+# PRODUCTION SUMMARY - SINGLE-PASS, MERGEABLE PREDICTION STATISTICS
+# =============================================================================
+#
+# OBJECTIVE: Compute the business summary statistics of a prediction batch
+# (or of the whole master dataset) in one pass per chunk, and combine
+# partial summaries from chunks, workers or batches instead of scanning
+# the full frame again for every statistic
+#
+# SummaryAccumulator keeps, per chunk it is given:
+# - row count and the prediction date range (earliest / latest)
+# - for predicted income and ci_width: count, mean and sum of squared
+#   deviations (merged with Chan's formula, so mean and std are exact),
+#   min, max and a quantile sketch
+# - label counts of income segment, business priority and confidence
+#
+# Medians come from QuantileSketch, a DDSketch-style sketch: values fall
+# in logarithmic buckets, so any quantile is within DEFAULT_RELATIVE_ACCURACY
+# (0.1%) of a true value, and two sketches merge by adding bucket counts.
+#
+# Accumulators merge (merge()) and serialize to JSON (to_dict() /
+# from_dict()), so stored summaries can be combined with new ones instead
+# of recomputed (see production_incremental_predictions.py).
+#
+# BoundedMedian gives the fill medians of Part 1 streaming: exact value
+# counts while a feature has few distinct values (ages, day counts), the
+# sketch once it has more (balances, ratios), so memory never grows with
+# the number of rows.
+#
+# Used by Part 3 (create_business_summary), the incremental manager and
+# Part 1 streaming. Shared by production_test/ and partner_pipeline_2/.
+# =============================================================================
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from production_output import ci_width
+
+# Relative error of sketched quantiles
+DEFAULT_RELATIVE_ACCURACY = 0.001
+
+# Rows summarized at a time
+DEFAULT_SUMMARY_CHUNKSIZE = 500000
+
+# Values closer to 0 than this are counted as 0 by the sketch
+SKETCH_MIN_VALUE = 1e-9
+
+# Distinct values counted exactly by BoundedMedian before it switches to a sketch
+EXACT_QUANTILE_VALUES = 16384
+
+NUMERIC_COLUMNS = ['predicted_income', 'ci_width']
+LABEL_COLUMNS = ['income_segment', 'business_priority', 'confidence_category']
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative accuracy (logarithmic buckets)"""
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+
+    def _add_buckets(self, store, magnitudes, weights):
+        keys, inverse = np.unique(np.ceil(np.log(magnitudes) / math.log(self.gamma)).astype(np.int64),
+                                  return_inverse=True)
+        counts = np.bincount(inverse.reshape(-1), weights=weights, minlength=len(keys)).astype(np.int64)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def add(self, values, counts=None):
+        """Add an array of values (NaN ignored), each counts[i] times when given"""
+        values = np.asarray(values, dtype=np.float64)
+        counts = np.ones(len(values), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        present = ~np.isnan(values)
+        values, counts = values[present], counts[present]
+        small = np.abs(values) < SKETCH_MIN_VALUE
+        self.zero += int(counts[small].sum())
+        for store, selected, sign in ((self.positive, (values > 0) & ~small, 1),
+                                      (self.negative, (values < 0) & ~small, -1)):
+            if selected.any():
+                self._add_buckets(store, sign * values[selected], counts[selected])
+        self.count += int(counts.sum())
+        return self
+
+    def merge(self, other):
+        """Add the counts of another sketch with the same accuracy"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge quantile sketches with different relative accuracy")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero += other.zero
+        self.count += other.count
+        return self
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        """Value at quantile q (0-1), within the relative accuracy; NaN when empty"""
+        if self.count == 0:
+            return float('nan')
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+    def to_dict(self):
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'positive': {str(key): count for key, count in self.positive.items()},
+            'negative': {str(key): count for key, count in self.negative.items()},
+            'zero': self.zero
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state['relative_accuracy'])
+        sketch.positive = {int(key): count for key, count in state['positive'].items()}
+        sketch.negative = {int(key): count for key, count in state['negative'].items()}
+        sketch.zero = state['zero']
+        sketch.count = sketch.zero + sum(sketch.positive.values()) + sum(sketch.negative.values())
+        return sketch
+
+class NumericSummary:
+    """Count, mean, squared deviations, min, max and quantile sketch of a column"""
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.count = 0
+        self.mean = float('nan')
+        self.m2 = 0.0
+        self.min = float('nan')
+        self.max = float('nan')
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        if count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.min, self.max = count, mean, m2, minimum, maximum
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+        self.count = total
+
+    def add(self, values):
+        """Add an array of values (NaN ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            mean = values.mean()
+            self._combine(len(values), float(mean), float(np.square(values - mean).sum()),
+                          float(values.min()), float(values.max()))
+            self.sketch.add(values)
+        return self
+
+    def merge(self, other):
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def quantile(self, q):
+        """Sketched quantile, kept within the exact min and max"""
+        return min(max(self.sketch.quantile(q), self.min), self.max)
+
+    def std(self):
+        """Sample standard deviation (ddof=1, as pandas); NaN below 2 values"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float('nan')
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max,
+                'sketch': self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        summary = cls()
+        summary.count, summary.m2 = state['count'], state['m2']
+        summary.mean, summary.min, summary.max = (float('nan') if state[key] is None else state[key]
+                                                  for key in ('mean', 'min', 'max'))
+        summary.sketch = QuantileSketch.from_dict(state['sketch'])
+        return summary
+
+class BoundedMedian:
+    """
+    Median of a column in bounded memory: exact value counts while the
+    column has at most max_values distinct values, a QuantileSketch from
+    then on (memory grows with the value range, never with the rows)
+    """
+
+    def __init__(self, max_values=EXACT_QUANTILE_VALUES, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.max_values = max_values
+        self.relative_accuracy = relative_accuracy
+        self.counts = {}
+        self.sketch = None
+        self.count = 0
+        self.min = float('nan')
+        self.max = float('nan')
+
+    @property
+    def exact(self):
+        return self.sketch is None
+
+    def _start_sketch(self):
+        """Move the exact counts into a sketch (too many distinct values)"""
+        if self.sketch is None:
+            self.sketch = QuantileSketch(self.relative_accuracy)
+            if self.counts:
+                self.sketch.add(list(self.counts), list(self.counts.values()))
+            self.counts = {}
+
+    def _add_counts(self, values, counts):
+        if self.sketch is None:
+            for value, count in zip(values.tolist(), counts.tolist()):
+                self.counts[value] = self.counts.get(value, 0) + count
+            if len(self.counts) > self.max_values:
+                self._start_sketch()
+        else:
+            self.sketch.add(values, counts)
+
+    def _add_range(self, count, minimum, maximum):
+        if count:
+            self.min = minimum if self.count == 0 else min(self.min, minimum)
+            self.max = maximum if self.count == 0 else max(self.max, maximum)
+            self.count += count
+
+    def add(self, values):
+        """Add an array of values (NaN ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            unique, counts = np.unique(values, return_counts=True)
+            self._add_counts(unique, counts)
+            self._add_range(len(values), float(unique[0]), float(unique[-1]))
+        return self
+
+    def merge(self, other):
+        """Add the values of another BoundedMedian"""
+        if other.sketch is not None:
+            self._start_sketch()
+            self.sketch.merge(other.sketch)
+        if other.counts:
+            self._add_counts(np.fromiter(other.counts, dtype=np.float64, count=len(other.counts)),
+                             np.fromiter(other.counts.values(), dtype=np.int64, count=len(other.counts)))
+        self._add_range(other.count, other.min, other.max)
+        return self
+
+    def median(self):
+        """Median as pandas computes it while exact, sketched (within min / max) after; NaN when empty"""
+        if self.count == 0:
+            return float('nan')
+        if self.sketch is not None:
+            return min(max(self.sketch.quantile(0.5), self.min), self.max)
+        values = np.array(sorted(self.counts))
+        cumulative = np.cumsum([self.counts[value] for value in values])
+        lower = values[np.searchsorted(cumulative, (self.count - 1) // 2, side='right')]
+        upper = values[np.searchsorted(cumulative, self.count // 2, side='right')]
+        return float((lower + upper) / 2)
+
+def _label_counts(column):
+    """{label: rows} in value_counts() tie order (categories first, else first appearance)"""
+    counts = column.value_counts(sort=False, dropna=True)
+    return {label: int(count) for label, count in counts.items()}
+
+def _json_number(value):
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+class SummaryAccumulator:
+    """Business summary statistics, added chunk by chunk and mergeable"""
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.rows = 0
+        self.numeric = {column: NumericSummary(relative_accuracy) for column in NUMERIC_COLUMNS}
+        self.labels = {column: {} for column in LABEL_COLUMNS}
+        self.earliest = None
+        self.latest = None
+
+    def _add_dates(self, earliest, latest):
+        if earliest is not None:
+            self.earliest = earliest if self.earliest is None else min(self.earliest, earliest)
+            self.latest = latest if self.latest is None else max(self.latest, latest)
+
+    def _add_labels(self, column, counts):
+        target = self.labels[column]
+        for label, count in counts.items():
+            target[label] = target.get(label, 0) + count
+
+    def add(self, df):
+        """Add the rows of one chunk (predictions frame, Part 3 labels optional)"""
+        self.rows += len(df)
+        if 'predicted_income' in df.columns:
+            self.numeric['predicted_income'].add(df['predicted_income'].to_numpy(dtype=np.float64, na_value=np.nan))
+        if 'income_upper_90' in df.columns or 'ci_width' in df.columns:
+            self.numeric['ci_width'].add(ci_width(df).to_numpy(dtype=np.float64, na_value=np.nan))
+        for column in LABEL_COLUMNS:
+            if column in df.columns:
+                self._add_labels(column, _label_counts(df[column]))
+        if 'prediction_date' in df.columns:
+            dates = df['prediction_date'].dropna()
+            if len(dates):
+                dates = np.asarray(dates.astype(str))
+                self._add_dates(str(dates.min()), str(dates.max()))
+        return self
+
+    def merge(self, other):
+        """Add the statistics of another accumulator"""
+        self.rows += other.rows
+        for column, summary in other.numeric.items():
+            self.numeric[column].merge(summary)
+        for column, counts in other.labels.items():
+            self._add_labels(column, counts)
+        self._add_dates(other.earliest, other.latest)
+        return self
+
+    def label_counts(self, column):
+        """{label: rows} most frequent first, labels without rows left out (as label_counts)"""
+        counts = self.labels[column]
+        ordered = sorted(counts.items(), key=lambda item: -item[1])
+        return {label: count for label, count in ordered if count > 0}
+
+    def to_dict(self):
+        """JSON-serializable state (from_dict() restores it)"""
+        numeric = {}
+        for column, summary in self.numeric.items():
+            state = summary.to_dict()
+            for key in ('mean', 'min', 'max'):
+                state[key] = _json_number(state[key])
+            numeric[column] = state
+        return {'rows': self.rows, 'numeric': numeric, 'labels': self.labels,
+                'earliest': self.earliest, 'latest': self.latest}
+
+    @classmethod
+    def from_dict(cls, state):
+        accumulator = cls()
+        accumulator.rows = state['rows']
+        accumulator.numeric = {column: NumericSummary.from_dict(numeric)
+                               for column, numeric in state['numeric'].items()}
+        accumulator.labels = {column: dict(counts) for column, counts in state['labels'].items()}
+        accumulator.earliest, accumulator.latest = state['earliest'], state['latest']
+        return accumulator
+
+def summarize(df, chunksize=DEFAULT_SUMMARY_CHUNKSIZE, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """SummaryAccumulator over `df`, added chunksize rows at a time"""
+    accumulator = SummaryAccumulator(relative_accuracy)
+    for start in range(0, len(df), chunksize):
+        accumulator.add(df.iloc[start:start + chunksize])
+    return accumulator